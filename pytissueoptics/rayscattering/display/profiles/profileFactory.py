@@ -4,7 +4,7 @@ import numpy as np
 
 from pytissueoptics.rayscattering import utils
 from pytissueoptics.rayscattering.display.profiles import Profile1D
-from pytissueoptics.rayscattering.display.utils import Direction
+from pytissueoptics.rayscattering.display.utils import Direction, histogram
 from pytissueoptics.rayscattering.energyLogging import EnergyLogger, EnergyType, PointCloudFactory
 from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
 
@@ -86,8 +86,7 @@ class ProfileFactory:
             return np.zeros(bins)
 
         x, w = dataPoints[:, horizontalDirection.axis + 1], dataPoints[:, 0]
-        histogram, _ = np.histogram(x, bins=bins, range=limits, weights=w)
-        return histogram
+        return histogram(x, w, bins, limits, out=np.zeros(bins))
 
     def _extractHistogramFromViews(
         self,
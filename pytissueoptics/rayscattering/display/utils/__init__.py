@@ -1,3 +1,4 @@
+from .binning import histogram
 from .direction import DEFAULT_X_VIEW_DIRECTIONS, DEFAULT_Y_VIEW_DIRECTIONS, DEFAULT_Z_VIEW_DIRECTIONS, Direction
 
 __all__ = [
@@ -5,4 +6,5 @@ __all__ = [
     "DEFAULT_Y_VIEW_DIRECTIONS",
     "DEFAULT_Z_VIEW_DIRECTIONS",
     "Direction",
+    "histogram",
 ]
@@ -0,0 +1,75 @@
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+HISTOGRAM_CHUNK_SIZE = 2**18
+
+
+def histogram(
+    coordinates: np.ndarray,
+    weights: np.ndarray,
+    bins: Union[int, Sequence[int]],
+    limits: Union[Tuple[float, float], Sequence[Tuple[float, float]]],
+    out: np.ndarray = None,
+    chunkSize: int = HISTOGRAM_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Weighted histogram of (n, d) coordinates (or (n,) for d=1) on a uniform grid of `bins` between the (min, max)
+    `limits` of each axis. Same bins as `np.histogramdd` (points outside the limits are ignored and points on the upper
+    limit fall in the last bin), but the bin of each point is computed directly from the uniform grid, and the input
+    is processed in chunks, so that no float64 copy of all the points (or of a large grid) is made.
+
+    The histogram is accumulated in `out` if given, else in a new float32 array of shape `bins`.
+    """
+    if coordinates.ndim == 1:
+        coordinates = coordinates[:, None]
+        bins, limits = [bins], [limits]
+    bins = [int(n) for n in bins]
+    limits = [(float(limit[0]), float(limit[1])) for limit in limits]
+    if out is None:
+        out = np.zeros(bins, dtype=np.float32)
+    gridSize = int(np.prod(bins))
+    flatOut = out.reshape(-1)
+
+    for start in range(0, len(coordinates), chunkSize):
+        chunkCoordinates = coordinates[start : start + chunkSize]
+        isInside = np.ones(len(chunkCoordinates), dtype=bool)
+        flatIndices = np.zeros(len(chunkCoordinates), dtype=np.intp)
+        for axis, (nBins, limit) in enumerate(zip(bins, limits)):
+            indices = _getBinIndices(chunkCoordinates[:, axis], nBins, limit, isInside)
+            flatIndices *= nBins
+            flatIndices += indices
+        chunkWeights = np.asarray(weights[start : start + chunkSize], dtype=np.float64)
+        if not np.all(isInside):
+            flatIndices, chunkWeights = flatIndices[isInside], chunkWeights[isInside]
+
+        # Grids larger than a chunk are accumulated in place instead of with a float64 bincount of the whole grid.
+        if gridSize <= chunkSize:
+            flatOut += np.bincount(flatIndices, weights=chunkWeights, minlength=gridSize).astype(out.dtype)
+        else:
+            np.add.at(flatOut, flatIndices, chunkWeights.astype(out.dtype))
+
+    if not np.shares_memory(flatOut, out):
+        out[...] = flatOut.reshape(out.shape)
+    return out
+
+
+def _getBinIndices(x: np.ndarray, nBins: int, limit: Tuple[float, float], isInside: np.ndarray) -> np.ndarray:
+    """Bin index of each value with the edge corrections of `np.histogram`. Values outside the limits are set to a valid
+    bin and cleared from the `isInside` mask."""
+    x = np.asarray(x, dtype=np.float64)
+    first, last = limit
+    if first == last:
+        first, last = first - 0.5, last + 0.5
+    isInside &= x >= first
+    isInside &= x <= last
+
+    edges = np.linspace(first, last, nBins + 1)
+    scaledX = (x - first) * (nBins / (last - first))
+    # fmax and fmin also replace NaN values.
+    indices = np.fmin(np.fmax(scaledX, 0, out=scaledX), nBins - 1, out=scaledX).astype(np.intp)
+    # Floating point errors can put a value in the bin next to the one of np.histogram's edges.
+    indices -= x < edges[indices]
+    indices += (x >= edges[indices + 1]) & (indices < nBins - 1)
+    np.maximum(indices, 0, out=indices)
+    return indices
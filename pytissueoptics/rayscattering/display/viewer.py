@@ -5,7 +5,7 @@ import numpy as np
 
 from pytissueoptics.rayscattering import utils
 from pytissueoptics.rayscattering.display.profiles import ProfileFactory
-from pytissueoptics.rayscattering.display.utils import Direction
+from pytissueoptics.rayscattering.display.utils import Direction, histogram
 from pytissueoptics.rayscattering.display.views import View2D, ViewGroup
 from pytissueoptics.rayscattering.energyLogging import (
     EnergyLogger,
@@ -162,8 +162,8 @@ class Viewer:
         limits = limits or self._sceneLimits
         bins = [int((d[1] - d[0]) / binSize) for d in limits]
 
-        # np.histogramdd only works in float64 and requires around 3 times the final memory.
-        requiredMemoryInGB = 3 * 8 * bins[0] * bins[1] * bins[2] / 1024**3
+        # The float32 volume is accumulated in place.
+        requiredMemoryInGB = 4 * bins[0] * bins[1] * bins[2] / 1024**3
         if requiredMemoryInGB > 4:
             utils.warn(
                 f"WARNING: The volume slicer will require a lot of memory ({round(requiredMemoryInGB, 2)} GB). "
@@ -172,14 +172,13 @@ class Viewer:
 
         points = PointCloudFactory(self._logger).getPointCloudOfSolids(energyType=energyType).solidPoints
         try:
-            hist, _ = np.histogramdd(points[:, 1:], bins=bins, weights=points[:, 0], range=limits)
+            hist = histogram(points[:, 1:], points[:, 0], bins, limits)
         except MemoryError:
             utils.warn(
                 "ERROR: Not enough memory to create the volume slicer. "
                 "Consider using a larger binSize or tighter limits."
             )
             return
-        hist = hist.astype(np.float32)
 
         if logScale:
             hist = utils.logNorm(hist)
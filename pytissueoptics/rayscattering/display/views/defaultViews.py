@@ -125,6 +125,10 @@ class View2DSurface(View2D):
             dataPoints[:, 0] *= -1
         return dataPoints
 
+    @property
+    def _binningSign(self) -> int:
+        return 1 if self._surfaceEnergyLeaving else -1
+
     @property
     def group(self) -> ViewGroup:
         return ViewGroup.SURFACES_LEAVING if self._surfaceEnergyLeaving else ViewGroup.SURFACES_ENTERING
@@ -230,6 +234,9 @@ class View2DSlice(View2D):
         )
         return dataPoints[insideSlice]
 
+    def _getProjectionLimits(self) -> Tuple[float, float]:
+        return self._position - self._thickness / 2, self._position + self._thickness / 2
+
 
 class View2DSliceX(View2DSlice):
     def __init__(
@@ -12,6 +12,7 @@ from pytissueoptics.rayscattering.display.utils import (
     DEFAULT_Y_VIEW_DIRECTIONS,
     DEFAULT_Z_VIEW_DIRECTIONS,
     Direction,
+    histogram,
 )
 from pytissueoptics.rayscattering.energyLogging.energyType import EnergyType
 
@@ -140,13 +141,49 @@ class View2D:
         if dataPoints.size == 0:
             return
 
-        u, v, w = dataPoints[:, 1 + self.axisU], dataPoints[:, 1 + self.axisV], dataPoints[:, 0]
-        sumUVProjection = np.histogram2d(
-            u, v, weights=w, bins=(self._binsU, self._binsV), range=(sorted(self._limitsU), sorted(self._limitsV))
-        )[0]
+        uv, w = dataPoints[:, [1 + self.axisU, 1 + self.axisV]], dataPoints[:, 0]
+        sumUVProjection = histogram(
+            uv, w, bins=(self._binsU, self._binsV), limits=(sorted(self._limitsU), sorted(self._limitsV))
+        )
+        self._addProjection(sumUVProjection)
+
+    def getBinningGrid(self) -> Tuple[List[Tuple[float, float]], List[int], int]:
+        """
+        Used internally for on-device binning. Returns the 3D limits and number of bins of a 3D histogram equivalent
+        to this view (with a single bin along the projection axis), as well as the sign of the values to keep (0 to
+        keep all values, 1 to keep the positive values, -1 to keep the negative values as positive values).
+        """
+        limits3D, bins3D = [None, None, None], [1, 1, 1]
+        limits3D[self.axis] = self._getProjectionLimits()
+        limits3D[self.axisU], bins3D[self.axisU] = tuple(sorted(self._limitsU)), self._binsU
+        limits3D[self.axisV], bins3D[self.axisV] = tuple(sorted(self._limitsV)), self._binsV
+        return limits3D, bins3D, self._binningSign
+
+    def addBinnedData(self, histogram3D: np.ndarray):
+        """Used internally to store a 3D histogram binned on the device with the grid of `getBinningGrid`."""
+        sumUVProjection = np.sum(histogram3D, axis=self.axis)
+        if self.axisU > self.axisV:
+            sumUVProjection = sumUVProjection.T
+        if np.any(sumUVProjection):
+            self._addProjection(sumUVProjection)
+
+    def clearData(self):
+        """Used internally to remove the extracted data before extracting it again."""
+        if self._dataUV is not None:
+            self._dataUV = np.zeros_like(self._dataUV)
+        self._hasData = False
+
+    def _addProjection(self, sumUVProjection: np.ndarray):
         self._dataUV += np.flip(sumUVProjection, axis=1)
         self._hasData = True
 
+    def _getProjectionLimits(self) -> Tuple[float, float]:
+        return -np.inf, np.inf
+
+    @property
+    def _binningSign(self) -> int:
+        return 0
+
     def _filter(self, dataPoints: np.ndarray) -> np.ndarray:
         """
         Filters the data points to only keep the ones that are relevant to this view.
@@ -120,14 +120,18 @@ class ViewFactory:
                     )
                 )
         else:
-            sceneBoundingBox = self._scene.getBoundingBox()
-            if sceneBoundingBox is None:
-                limits3D = self._infiniteLimits
-            else:
-                limits3D = sceneBoundingBox.xyzLimits
+            limits3D = self.getSceneLimits()
         limits3D = [(d[0], d[1]) for d in limits3D]
         view.setContext(limits3D=limits3D, binSize3D=self._defaultBinSize3D)
 
+    def getSceneLimits(self) -> List[Tuple[float, float]]:
+        sceneBoundingBox = self._scene.getBoundingBox()
+        if sceneBoundingBox is None:
+            limits3D = self._infiniteLimits
+        else:
+            limits3D = sceneBoundingBox.xyzLimits
+        return [(d[0], d[1]) for d in limits3D]
+
     def _viewHasValidSurfaceLabel(self, view) -> bool:
         if view.surfaceLabel is None:
             return True
@@ -2,10 +2,12 @@ from .energyLogger import EnergyLogger
 from .energyType import EnergyType
 from .pointCloud import PointCloud
 from .pointCloudFactory import PointCloudFactory
+from .voxelGrid import VoxelGrid
 
 __all__ = [
     "EnergyLogger",
     "EnergyType",
     "PointCloud",
     "PointCloudFactory",
+    "VoxelGrid",
 ]
@@ -0,0 +1,91 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Tuple
+
+import numpy as np
+
+EXPORT_COLUMNS = ["energy", "x", "y", "z", "photon_index", "solid_index", "surface_index"]
+COLUMN_DTYPES = [np.float64] * 4 + [np.uint32, np.int32, np.int32]
+CSV_ROW_FORMAT = ",".join(["%.8e"] * 4 + ["%d"] * 3) + "\n"
+EXPORT_CHUNK_SIZE = 2**16
+
+# Rows of data points (value, x, y, z, photonID) of a single interaction key with its solid and surface indices.
+ExportChunk = Tuple[np.ndarray, int, int]
+
+
+class DataExporter:
+    """
+    Writes the raw data points of an EnergyLogger chunk by chunk, as they are read from its storage, so that the
+    exported data never has to fit in memory.
+
+    Two file formats are available:
+    - "csv": a comma-delimited text file <exportName>.csv. With `workers > 1`, the chunks are formatted to text in
+      parallel processes and written in order.
+    - "npy": a directory <exportName>/ of one binary NumPy file per column (<column>.npy), which can be read (or
+      memory-mapped) column by column with `np.load`. Much faster to write and read than text.
+    """
+
+    FORMATS = ("csv", "npy")
+
+    def __init__(self, exportName: str, fileFormat: str = "csv", workers: int = 1):
+        if fileFormat not in self.FORMATS:
+            raise ValueError(f"Unknown export format '{fileFormat}'. Available formats: {self.FORMATS}.")
+        self._exportName = exportName
+        self._fileFormat = fileFormat
+        self._workers = workers
+
+    def export(self, chunks: Iterable[ExportChunk], nRows: int) -> str:
+        """Writes the given chunks, of `nRows` rows in total, and returns the path of the exported file or directory."""
+        if self._fileFormat == "csv":
+            return self._exportCSV(chunks)
+        return self._exportNPY(chunks, nRows)
+
+    def _exportCSV(self, chunks: Iterable[ExportChunk]) -> str:
+        filepath = f"{self._exportName}.csv"
+        with open(filepath, "w") as file:
+            file.write(",".join(EXPORT_COLUMNS) + "\n")
+            if self._workers <= 1:
+                for chunk in chunks:
+                    file.write(formatCSVRows(*chunk))
+                return filepath
+
+            # Only a few chunks are formatted at a time to bound the memory used by the pending text.
+            with ProcessPoolExecutor(max_workers=self._workers) as executor:
+                pendingRows = deque()
+                for chunk in chunks:
+                    pendingRows.append(executor.submit(formatCSVRows, *chunk))
+                    if len(pendingRows) >= 2 * self._workers:
+                        file.write(pendingRows.popleft().result())
+                while pendingRows:
+                    file.write(pendingRows.popleft().result())
+        return filepath
+
+    def _exportNPY(self, chunks: Iterable[ExportChunk], nRows: int) -> str:
+        directory = self._exportName
+        os.makedirs(directory, exist_ok=True)
+        columns = [
+            np.lib.format.open_memmap(os.path.join(directory, f"{column}.npy"), mode="w+", dtype=dtype, shape=(nRows,))
+            for column, dtype in zip(EXPORT_COLUMNS, COLUMN_DTYPES)
+        ]
+        start = 0
+        for dataPoints, solidIndex, surfaceIndex in chunks:
+            end = start + len(dataPoints)
+            for i in range(5):
+                columns[i][start:end] = dataPoints[:, i]
+            columns[5][start:end] = solidIndex
+            columns[6][start:end] = surfaceIndex
+            start = end
+        for column in columns:
+            column.flush()
+        return directory
+
+
+def formatCSVRows(dataPoints: np.ndarray, solidIndex: int, surfaceIndex: int) -> str:
+    """CSV text of the data points, formatted with a single string operation for the whole chunk."""
+    rows = np.empty((len(dataPoints), 7), dtype=np.float64)
+    rows[:, :4] = dataPoints[:, :4]
+    rows[:, 4] = dataPoints[:, 4].astype(np.uint32)
+    rows[:, 5] = solidIndex
+    rows[:, 6] = surfaceIndex
+    return (CSV_ROW_FORMAT * len(rows)) % tuple(rows.ravel().tolist())
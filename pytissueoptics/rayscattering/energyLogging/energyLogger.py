@@ -2,8 +2,7 @@ from __future__ import annotations
 
 import json
 import os
-import pickle
-from typing import Dict, List, Optional, TextIO, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -12,11 +11,16 @@ from pytissueoptics.rayscattering.display.views.view2D import View2D, ViewGroup
 from pytissueoptics.rayscattering.display.views.viewFactory import ViewFactory
 from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
 from pytissueoptics.scene.geometry import Vector
-from pytissueoptics.scene.logger.listArrayContainer import ListArrayContainer
+from pytissueoptics.scene.logger.listArrayContainer import CHUNK_SIZE, ListArrayContainer
 from pytissueoptics.scene.logger.logger import DataType, InteractionData, InteractionKey, Logger
+from pytissueoptics.scene.logger.loggerFile import LoggerFile
+from pytissueoptics.scene.logger.memoryMappedContainer import MemoryMappedContainer
 
 from ..opencl.CLScene import WORLD_SOLID_LABEL
+from .dataExporter import EXPORT_CHUNK_SIZE, DataExporter, ExportChunk
 from .energyType import EnergyType
+from .photonIndex import PhotonIndex
+from .voxelGrid import VoxelGrid
 
 
 class EnergyLogger(Logger):
@@ -31,6 +35,8 @@ class EnergyLogger(Logger):
         defaultViewEnergyType: EnergyType = EnergyType.DEPOSITION,
         defaultBinSize: Union[float, tuple] = 0.01,
         infiniteLimits=((-5, 5), (-5, 5), (-5, 5)),
+        voxelSize: Union[float, tuple] = None,
+        storageDir: str = None,
     ):
         """
         Log the energy deposited by scattering photons as well as the energy that crossed surfaces. Every interaction
@@ -52,9 +58,15 @@ class EnergyLogger(Logger):
         :param defaultBinSize: The default bin size to use when binning the 3D data to 2D views. In the same physical
                 units as the scene. Custom bin sizes can be specified in each View2D.
         :param infiniteLimits: The default limits to use for the 2D views when the scene is infinite (has no solids).
+        :param voxelSize: (Optional) If given, the volumetric energy is also binned to a 3D `voxelGrid` of this voxel
+                size covering the whole scene. Unlike the 3D data points, this grid is kept when `keep3D` is False.
+        :param storageDir: (Optional) If given with `keep3D`, the 3D data points of each interaction key are stored in
+                memory-mapped files in this local directory instead of in RAM. The views and the statistics then read
+                them in chunks, which allows keeping more data points than the available memory.
         """
         self._scene = scene
         self._keep3D = keep3D
+        self._storageDir = storageDir
         self._defaultBinSize = defaultBinSize
         self._infiniteLimits = infiniteLimits
         self._viewFactory = ViewFactory(scene, defaultBinSize, infiniteLimits, energyType=defaultViewEnergyType)
@@ -63,7 +75,14 @@ class EnergyLogger(Logger):
         self._defaultViews = views
         self._views = self._viewFactory.build(views)
         self._outdatedViews = set()
+        self._viewWatermarks: Dict[View2D, Dict[InteractionKey, int]] = {}
+        self._keyViews: Dict[InteractionKey, List[View2D]] = {}
         self._nDataPointsRemoved = 0
+        self._voxelGrid = None
+        self._photonIndices: Dict[InteractionKey, PhotonIndex] = {}
+        self._energyBalance: Optional[Dict[InteractionKey, np.ndarray]] = {}
+        if voxelSize is not None:
+            self._voxelGrid = VoxelGrid(self._viewFactory.getSceneLimits(), voxelSize, energyType=defaultViewEnergyType)
 
         super().__init__(fromFilepath=filepath)
 
@@ -74,12 +93,12 @@ class EnergyLogger(Logger):
             return True
 
         if self.isEmpty:
-            self._views.append(view)
+            self._appendView(view)
             return True
 
         if self.has3D:
+            self._appendView(view)
             self._compileViews([view], detectedBy=view.detectedBy)
-            self._views.append(view)
             return True
 
         for i, existingView in enumerate(self._views):
@@ -87,7 +106,7 @@ class EnergyLogger(Logger):
                 view.initDataFrom(existingView)
                 if existingView in self._outdatedViews:
                     self._outdatedViews.add(view)
-                self._views.append(view)
+                self._appendView(view)
                 return True
 
         utils.warn(
@@ -96,9 +115,13 @@ class EnergyLogger(Logger):
         )
         return False
 
+    def _appendView(self, view: View2D):
+        self._views.append(view)
+        self._keyViews.clear()
+
     def updateView(self, view: View2D):
         if view in self._outdatedViews:
-            self._compileViews([view])
+            self._compileViews([view], detectedBy=view.detectedBy)
 
     def showView(self, view: View2D = None, viewIndex: int = None, logScale: bool = True, colormap: str = "viridis"):
         assert viewIndex is not None or view is not None, "Either `viewIndex` or `view` must be specified."
@@ -120,28 +143,37 @@ class EnergyLogger(Logger):
         for i, view in enumerate(self._views):
             print(f"\t{i}: {view.description}")
 
-    def save(self, filepath: str = None):
+    def save(self, filepath: str = None, compress: bool = False):
+        """Saves the logger to a binary file which can be loaded without reading all of its data. With `compress`, the
+        data is compressed with zlib, but it can no longer be memory-mapped when loaded."""
         if filepath is None and self._filepath is None:
             filepath = self.DEFAULT_LOGGER_PATH
             utils.warn(f"No filepath specified. Saving to {filepath}.")
         elif filepath is None:
             filepath = self._filepath
 
-        with open(filepath, "wb") as file:
-            pickle.dump(
-                (
-                    self._data,
-                    self.info,
-                    self._labels,
-                    self._views,
-                    self._defaultViews,
-                    self._outdatedViews,
-                    self._nDataPointsRemoved,
-                    self._sceneHash,
-                    self.has3D,
-                ),
-                file,
-            )
+        LoggerFile.write(filepath, self._data, self._getState(), compress)
+
+    def _getState(self) -> dict:
+        return {
+            "info": self.info,
+            "labels": self._labels,
+            "views": self._views,
+            "defaultViews": self._defaultViews,
+            "outdatedViews": self._outdatedViews,
+            "viewWatermarks": self._viewWatermarks,
+            "nDataPointsRemoved": self._nDataPointsRemoved,
+            "sceneHash": self._sceneHash,
+            "has3D": self.has3D,
+            "voxelGrid": self._voxelGrid,
+            "energyBalance": self._energyBalance,
+        }
+
+    def _getLegacyState(self, loggerData: tuple) -> dict:
+        keys = ["info", "labels", "views", "defaultViews", "outdatedViews", "nDataPointsRemoved", "sceneHash", "has3D"]
+        state = dict(zip(keys, loggerData[:8]))
+        state["voxelGrid"] = loggerData[8] if len(loggerData) > 8 else None
+        return state
 
     def load(self, filepath: str):
         self._filepath = filepath
@@ -153,18 +185,22 @@ class EnergyLogger(Logger):
             )
             return
 
-        with open(filepath, "rb") as file:
-            (
-                self._data,
-                self.info,
-                self._labels,
-                self._views,
-                oldDefaultViews,
-                self._outdatedViews,
-                self._nDataPointsRemoved,
-                oldSceneHash,
-                oldHas3D,
-            ) = pickle.load(file)
+        state = self._loadFile(filepath)
+        self.info = state["info"]
+        self._labels = state["labels"]
+        self._views = state["views"]
+        self._outdatedViews = state["outdatedViews"]
+        self._keyViews.clear()
+        if "viewWatermarks" in state:
+            self._viewWatermarks = state["viewWatermarks"]
+        else:
+            self._viewWatermarks = self._getLegacyViewWatermarks()
+        self._nDataPointsRemoved = state["nDataPointsRemoved"]
+        if state["voxelGrid"] is not None:
+            self._voxelGrid = state["voxelGrid"]
+        # Files saved before the energy balance was tracked have to be summed from their data points or views.
+        self._energyBalance = state.get("energyBalance")
+        oldDefaultViews, oldSceneHash, oldHas3D = state["defaultViews"], state["sceneHash"], state["has3D"]
 
         if oldSceneHash != self._sceneHash:
             utils.warn(
@@ -208,10 +244,18 @@ class EnergyLogger(Logger):
     def _viewExists(self, view: View2D) -> bool:
         return any([view.isEqualTo(v) for v in self._views])
 
+    @property
+    def voxelGrid(self) -> Optional[VoxelGrid]:
+        return self._voxelGrid
+
     @property
     def has3D(self) -> bool:
         return self._keep3D
 
+    @property
+    def storesDataPointsOnDisk(self) -> bool:
+        return self._storageDir is not None and self._keep3D
+
     @property
     def defaultBinSize(self) -> float:
         return self._defaultBinSize
@@ -229,10 +273,20 @@ class EnergyLogger(Logger):
         data to 2D views if 3D data is being discarded.
         """
         super().logDataPointArray(array, key)
-        self._outdatedViews = set(self._views)
+        self._addEnergyBalance(key, array[:, 0])
 
-        if not self._keep3D:
-            self._compileViews(self._views)
+        if self._voxelGrid is not None and key.volumetric:
+            data = array[:, :4].copy()
+            if self._voxelGrid.energyType == EnergyType.FLUENCE_RATE:
+                data = self._fluenceTransform(key, data)
+            self._voxelGrid.extractData(data)
+
+        if self._keep3D:
+            # Views of detected photons can also change with the data of the detectors.
+            self._outdatedViews.update(self._getKeyViews(key))
+            self._outdatedViews.update(view for view in self._views if view.detectedBy)
+        else:
+            self._extractData(key, array, self._getKeyViews(key))
             self._delete3DData()
 
     def logDataPoint(self, value: float, position: Vector, key: InteractionKey, ID: Optional[int] = None):
@@ -241,7 +295,43 @@ class EnergyLogger(Logger):
             dataPoint.append(ID)
         self.logDataPointArray(np.array([dataPoint]), key)
 
+    @property
+    def tracksEnergyBalance(self) -> bool:
+        """False when some of the logged energy was not summed, e.g. for a logger saved before it was tracked."""
+        return self._energyBalance is not None
+
+    def getEnergyBalance(self, key: InteractionKey) -> Tuple[float, float]:
+        """
+        Sums of the negative and positive values logged for this InteractionKey, which are kept as the data is
+        logged, even when the 3D data is discarded. For a surface, they are the energy that entered (negative) and
+        left (positive) the solid. For a solid, their sum is the energy deposited or detected.
+        """
+        if not self.tracksEnergyBalance:
+            raise RuntimeError("The energy balance of this logger is not tracked.")
+        entering, leaving = self._energyBalance.get(key, (0.0, 0.0))
+        return float(entering), float(leaving)
+
+    def _addEnergyBalance(self, key: InteractionKey, values: np.ndarray):
+        if self._energyBalance is None:
+            return
+        isLeaving = values >= 0
+        balance = self._energyBalance.setdefault(key, np.zeros(2))
+        balance[0] += np.sum(values, where=~isLeaving, dtype=np.float64)
+        balance[1] += np.sum(values, where=isLeaving, dtype=np.float64)
+
+    def _resetEnergyBalance(self):
+        """Sums the energy balance again from the stored data points."""
+        self._energyBalance = {}
+        for key in self._data:
+            for chunk in self.iterDataPoints(key):
+                self._addEnergyBalance(key, chunk[:, 0])
+
     def _compileViews(self, views: List[View2D], detectedBy: Union[str, List[str]] = None):
+        """
+        Bins the stored data points to the given views. Each view keeps a watermark of the number of data points of
+        each interaction key that it already contains, so only the data points logged since are binned. Views of
+        photons `detectedBy` some detectors are instead rebuilt from the filtered data points.
+        """
         if detectedBy is None:
             dataPerInteraction = self._data
             if any(view.detectedBy for view in views):
@@ -251,30 +341,144 @@ class EnergyLogger(Logger):
                 )
         else:
             dataPerInteraction = self.getFiltered(detectedBy)._data
+            for view in views:
+                self._resetView(view)
 
+        viewSet = set(views)
         for key, data in dataPerInteraction.items():
             datapointsContainer: Optional[ListArrayContainer] = data.dataPoints
             if datapointsContainer is None or len(datapointsContainer) == 0:
                 continue
-            for view in views:
-                if view.solidLabel and not utils.labelsEqual(view.solidLabel, key.solidLabel):
-                    continue
-                if view.surfaceLabel and not utils.labelsEqual(view.surfaceLabel, key.surfaceLabel):
-                    continue
-                if view.surfaceLabel is None and key.surfaceLabel is not None:
-                    continue
-
-                data = datapointsContainer.getData()
-                if view.energyType == EnergyType.FLUENCE_RATE:
-                    data = self._fluenceTransform(key, data)
-
-                view.extractData(data)
+            keyViews = [view for view in self._getKeyViews(key) if view in viewSet]
+            if not keyViews:
+                continue
+            if detectedBy is not None:
+                for chunk in datapointsContainer.iterData():
+                    self._extractData(key, chunk, keyViews)
+                continue
+
+            watermarks = [self._viewWatermarks.setdefault(view, {}).get(key, 0) for view in keyViews]
+            nDataPoints = len(datapointsContainer)
+            if min(watermarks) >= nDataPoints:
+                continue
+            # Each chunk is read once for all views, since the data can be memory-mapped or compressed on disk.
+            start = 0
+            for chunk in datapointsContainer.iterData(CHUNK_SIZE):
+                for view, watermark in zip(keyViews, watermarks):
+                    if watermark < start + len(chunk):
+                        self._extractData(key, chunk[max(0, watermark - start) :], [view])
+                start += len(chunk)
+            for view in keyViews:
+                self._viewWatermarks[view][key] = nDataPoints
+
         for view in views:
             self._outdatedViews.discard(view)
 
+    def _extractData(self, key: InteractionKey, dataPoints: np.ndarray, views: List[View2D]):
+        for view in views:
+            data = dataPoints
+            if view.energyType == EnergyType.FLUENCE_RATE:
+                data = self._fluenceTransform(key, data)
+            view.extractData(data)
+
+    def _getKeyViews(self, key: InteractionKey) -> List[View2D]:
+        """Views tracking this interaction key. Cached until the list of views changes."""
+        keyViews = self._keyViews.get(key)
+        if keyViews is None:
+            keyViews = [view for view in self._views if self._viewAcceptsKey(view, key)]
+            self._keyViews[key] = keyViews
+        return keyViews
+
+    def _resetView(self, view: View2D):
+        """Clears the data of the view so that it is rebuilt from all the stored data points."""
+        view.clearData()
+        self._viewWatermarks.pop(view, None)
+        self._outdatedViews.add(view)
+
+    def _getLegacyViewWatermarks(self) -> Dict[View2D, Dict[InteractionKey, int]]:
+        """Watermarks of the views of files saved before they were tracked: the views that were up to date contain all
+        the data points, and the others are rebuilt."""
+        watermarks = {}
+        for view in self._views:
+            if view in self._outdatedViews:
+                view.clearData()
+                continue
+            watermarks[view] = {
+                key: len(data.dataPoints) for key, data in self._data.items() if data.dataPoints is not None
+            }
+        return watermarks
+
+    @staticmethod
+    def _viewAcceptsKey(view: View2D, key: InteractionKey) -> bool:
+        if view.solidLabel and not utils.labelsEqual(view.solidLabel, key.solidLabel):
+            return False
+        if view.surfaceLabel and not utils.labelsEqual(view.surfaceLabel, key.surfaceLabel):
+            return False
+        if view.surfaceLabel is None and key.surfaceLabel is not None:
+            return False
+        return True
+
+    @property
+    def binningGrids(self) -> List[Union[View2D, VoxelGrid]]:
+        """Used internally for on-device binning. The views and the voxel grid that are filled with binned data."""
+        grids = list(self._views)
+        if self._voxelGrid is not None:
+            grids.append(self._voxelGrid)
+        return grids
+
+    def getBinningScale(self, grid: Union[View2D, VoxelGrid], key: InteractionKey) -> Optional[float]:
+        """
+        Used internally for on-device binning. Returns the factor to apply to the values of the given interaction key
+        before binning them to the given grid (view or voxel grid), or None if the grid does not track this key.
+        """
+        if isinstance(grid, VoxelGrid):
+            if not key.volumetric:
+                return None
+        elif not self._viewAcceptsKey(grid, key):
+            return None
+
+        if grid.energyType == EnergyType.FLUENCE_RATE and key.volumetric:
+            if key.solidLabel == WORLD_SOLID_LABEL:
+                mu_a = self._scene.getWorldEnvironment().material.mu_a
+            else:
+                mu_a = self._scene.getMaterial(key.solidLabel).mu_a
+            if mu_a == 0:
+                # No energy can be deposited without absorption.
+                return None
+            return 1 / mu_a
+        return 1.0
+
+    def logBinnedData(
+        self,
+        histograms: List[np.ndarray],
+        keys: List[InteractionKey],
+        nDataPoints: int,
+        energyBalance: Dict[InteractionKey, Tuple[float, float]],
+    ):
+        """
+        Used internally by `CLPhotons` when the data points were binned on the device instead of being logged. The
+        histograms are given in the order of `binningGrids` and the keys are the interaction keys that were seen,
+        along with their energy balance (sums of the negative and positive values).
+        """
+        if self._keep3D:
+            raise RuntimeError("Cannot log binned data to an EnergyLogger that keeps the 3D data.")
+
+        for grid, histogram in zip(self.binningGrids, histograms):
+            grid.addBinnedData(histogram)
+        for key in keys:
+            self._validateKey(key)
+        if self._energyBalance is not None:
+            for key, (entering, leaving) in energyBalance.items():
+                self._energyBalance.setdefault(key, np.zeros(2))[:] += (entering, leaving)
+        self._data.clear()
+        self._dataVersion += 1
+        self._nDataPointsRemoved += nDataPoints
+
     def _delete3DData(self):
         self._nDataPointsRemoved += super().nDataPoints
         self._data.clear()
+        self._dataVersion += 1
+        self._photonIndices.clear()
 
     @property
     def nDataPoints(self) -> int:
@@ -319,6 +523,16 @@ class EnergyLogger(Logger):
 
         return self._getData(DataType.DATA_POINT, key)
 
+    def iterDataPoints(self, key: InteractionKey, chunkSize: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+        """Raw 3D data points recorded for this InteractionKey (as in `getRawDataPoints`) read in chunks of at most
+        `chunkSize` rows, without loading all of them in memory when they are stored on disk."""
+        if not self._keyExists(key):
+            return
+        container: Optional[ListArrayContainer] = self._data[key].dataPoints
+        if container is None:
+            return
+        yield from container.iterData(chunkSize)
+
     def filter(self, detectedBy: Union[str, List[str]]) -> None:
         """Keeps only the data points from photons detected by one of the specified detector(s)."""
         if not self._keep3D:
@@ -327,7 +541,11 @@ class EnergyLogger(Logger):
 
         filteredPhotonIDs = self._getDetectedPhotonIDs(detectedBy)
         self._data = self._getDataForPhotons(filteredPhotonIDs)
-        self._outdatedViews = set(self._views)
+        self._dataVersion += 1
+        self._photonIndices.clear()
+        self._resetEnergyBalance()
+        for view in self._views:
+            self._resetView(view)
 
     def getFiltered(self, detectedBy: Union[str, List[str]]) -> "EnergyLogger":
         """
@@ -336,6 +554,7 @@ class EnergyLogger(Logger):
         filteredLogger = EnergyLogger(self._scene, views=[])
         filteredPhotonIDs = self._getDetectedPhotonIDs(detectedBy)
         filteredLogger._data = self._getDataForPhotons(filteredPhotonIDs)
+        filteredLogger._resetEnergyBalance()
         return filteredLogger
 
     def _getDetectedPhotonIDs(self, detectedBy: Union[str, List[str]]) -> np.ndarray:
@@ -347,52 +566,66 @@ class EnergyLogger(Logger):
             utils.warn(f"No photons detected by: {detectedBy}")
         return photonIDs
 
-    def _getPhotonIDs(self, key: Union[InteractionKey, List[InteractionKey], None] = None) -> np.ndarray:
+    def _getPhotonIDs(self, key: Union[InteractionKey, List[InteractionKey]]) -> np.ndarray:
         """Get all unique photon IDs that interacted with one of the given interaction key(s)."""
-        if isinstance(key, list):
-            all_photon_ids = []
-            for k in key:
-                data = self.getRawDataPoints(k)
-                if data is not None and data.shape[1] >= 5:
-                    all_photon_ids.append(data[:, 4].astype(np.uint32))
-
-            if len(all_photon_ids) == 0:
-                return np.array([], dtype=np.uint32)
-            combined = np.concatenate(all_photon_ids)
-            return np.unique(combined)
-
-        data = self.getRawDataPoints(key)
-        if data is None or data.shape[1] < 5:
+        keys = key if isinstance(key, list) else [key]
+        photonIDs = []
+        for k in keys:
+            if not self._keyExists(k):
+                continue
+            photonIndex = self._getPhotonIndex(k)
+            if photonIndex is not None:
+                photonIDs.append(photonIndex.uniqueIDs)
+
+        if len(photonIDs) == 0:
             return np.array([], dtype=np.uint32)
-        return np.unique(data[:, 4].astype(np.uint32))
+        return np.unique(np.concatenate(photonIDs))
 
     def _getDataForPhotons(self, photonIDs: np.ndarray) -> Dict[InteractionKey, InteractionData]:
         keyToData: Dict[InteractionKey, InteractionData] = {}
-        photonIDs = np.asarray(photonIDs, dtype=np.uint32)
         for key, interactionData in self._data.items():
-            points: Optional[ListArrayContainer] = interactionData.dataPoints
-            if points is None:
+            photonIndex = self._getPhotonIndex(key)
+            if photonIndex is None:
                 continue
-            data = points.getData()
-            if data.shape[1] < 5:
+            rows = photonIndex.getRows(photonIDs)
+            if len(rows) == 0:
                 continue
-            mask = np.isin(data[:, 4].astype(np.uint32), photonIDs)
-            filteredData = data[mask]
-            if filteredData.size > 0:
-                container = ListArrayContainer()
-                container.append(filteredData)
-                keyToData[key] = InteractionData(dataPoints=container)
+            data = interactionData.dataPoints.getData()
+            container = self._makeContainer()
+            for start in range(0, len(rows), CHUNK_SIZE):
+                container.append(np.asarray(data[rows[start : start + CHUNK_SIZE]]))
+            keyToData[key] = InteractionData(dataPoints=container)
         return keyToData
 
+    def _getPhotonIndex(self, key: InteractionKey) -> Optional[PhotonIndex]:
+        """Index of the photon IDs logged for this key, which is built when first needed and then only updated with
+        the data points logged since. Returns None if no photon IDs were logged for this key."""
+        points: Optional[ListArrayContainer] = self._data[key].dataPoints
+        if points is None or points.width is None or points.width < 5:
+            return None
+        photonIndex = self._photonIndices.get(key)
+        if photonIndex is None or not photonIndex.isFor(points):
+            photonIndex = PhotonIndex(points)
+            self._photonIndices[key] = photonIndex
+        photonIndex.update()
+        return photonIndex
+
+    def _makeContainer(self) -> Union[ListArrayContainer, MemoryMappedContainer]:
+        if self.storesDataPointsOnDisk:
+            return MemoryMappedContainer(self._storageDir)
+        return ListArrayContainer()
+
     def _fluenceTransform(self, key: InteractionKey, data: Optional[np.ndarray]) -> Optional[np.ndarray]:
         # Converts volumetric data to fluence rate when needed.
         if not key.volumetric or data is None:
             return data
 
+        # The data is copied to leave the logged energy (which can be a view of the stored data) unchanged.
+        data = data.copy()
         data[:, 0] = data[:, 0] / self._scene.getMaterial(key.solidLabel).mu_a
         return data
 
-    def export(self, exportName: str):
+    def export(self, exportName: str, fileFormat: str = "csv", workers: int = 1):
         """
         Export the raw 3D data points to a CSV file, along with the scene information to a JSON file.
 
@@ -407,6 +640,10 @@ class EnergyLogger(Logger):
         The scene information will be saved in a JSON file named <exportName>.json, which includes details for each solid
         index and surface index, such as their labels, materials, and geometry. The world information is also exported
         as solid index -1.
+
+        The data is streamed to the file in chunks as it is read from the logger storage. With `workers > 1`, the CSV
+        text is formatted in parallel processes. Use `fileFormat="npy"` to instead export each column to a binary
+        NumPy file <exportName>/<column>.npy (with the same column names), which is much faster to write and read.
         """
         if not self.has3D:
             utils.warn("Cannot export data when keep3D is False. No 3D data available.")
@@ -420,38 +657,27 @@ class EnergyLogger(Logger):
                 solidLabels.append(solid.getLabel())
         solidLabels.sort()
 
+        exportKeys = [(InteractionKey(WORLD_SOLID_LABEL), -1, -1)]
+        for i, solidLabel in enumerate(solidLabels):
+            exportKeys.append((InteractionKey(solidLabel), i, -1))
+            for j, surfaceLabel in enumerate(self._scene.getSurfaceLabels(solidLabel)):
+                exportKeys.append((InteractionKey(solidLabel, surfaceLabel), i, j))
+        exportKeys = [
+            (key, i, j) for key, i, j in exportKeys if key in self._data and self._data[key].dataPoints is not None
+        ]
+
         print("Exporting raw data to file...")
-        filepath = f"{exportName}.csv"
-        with open(filepath, "w") as file:
-            file.write("energy,x,y,z,photon_index,solid_index,surface_index\n")
-            self._writeKeyData(file, InteractionKey(WORLD_SOLID_LABEL), -1, -1)
-            for i, solidLabel in enumerate(solidLabels):
-                self._writeKeyData(file, InteractionKey(solidLabel), i, -1)
-                for j, surfaceLabel in enumerate(self._scene.getSurfaceLabels(solidLabel)):
-                    self._writeKeyData(file, InteractionKey(solidLabel, surfaceLabel), i, j)
+        exporter = DataExporter(exportName, fileFormat, workers)
+        nRows = sum(len(self._data[key].dataPoints) for key, _, _ in exportKeys)
+        filepath = exporter.export(self._iterExportChunks(exportKeys), nRows)
         print(f"Exported data points to {filepath}")
 
         self._exportSceneInfo(f"{exportName}.json", solidLabels)
 
-    def _writeKeyData(self, file: TextIO, key: InteractionKey, solidIndex: int, surfaceIndex: int):
-        if key not in self._data or self._data[key].dataPoints is None:
-            return
-
-        dataArray = self._data[key].dataPoints.getData()
-        n_rows = dataArray.shape[0]
-
-        output = np.empty((n_rows, 7), dtype=np.float64)
-        output[:, :4] = dataArray[:, :4]
-        output[:, 4] = dataArray[:, 4].astype(np.uint32)
-        output[:, 5] = solidIndex
-        output[:, 6] = surfaceIndex
-
-        np.savetxt(
-            file,
-            output,
-            delimiter=",",
-            fmt=["%.8e", "%.8e", "%.8e", "%.8e", "%d", "%d", "%d"],
-        )
+    def _iterExportChunks(self, exportKeys: List[tuple]) -> Iterator[ExportChunk]:
+        for key, solidIndex, surfaceIndex in exportKeys:
+            for dataPoints in self._data[key].dataPoints.iterData(EXPORT_CHUNK_SIZE):
+                yield dataPoints, solidIndex, surfaceIndex
 
     def _exportSceneInfo(self, filepath: str, solidLabels: List[str]):
         sceneInfo = {}
@@ -0,0 +1,75 @@
+from typing import Union
+
+import numpy as np
+
+from pytissueoptics.scene.logger.listArrayContainer import ListArrayContainer
+from pytissueoptics.scene.logger.memoryMappedContainer import MemoryMappedContainer
+
+PHOTON_ID_COLUMN = 4
+ROW_BITS = np.uint64(32)
+ROW_MASK = np.uint64(2**32 - 1)
+
+
+class PhotonIndex:
+    """
+    Index of the photon IDs of the data points stored in a container, used to select the data points of given photons
+    without scanning all of them. Each data point is indexed by a single uint64 entry (photonID << 32 | row), and the
+    entries are kept sorted so that the rows of a photon are found by binary search, in the order of the container.
+    Only the rows appended to the container since the last `update` are sorted and merged into the index. Supports
+    containers of up to 2**32 rows.
+    """
+
+    def __init__(self, container: Union[ListArrayContainer, MemoryMappedContainer]):
+        self._container = container
+        self._entries = np.empty(0, dtype=np.uint64)
+
+    def isFor(self, container) -> bool:
+        return self._container is container
+
+    def update(self):
+        nRows = len(self._container)
+        nIndexedRows = len(self._entries)
+        if nRows == nIndexedRows:
+            return
+        newIDs = np.asarray(self._container.getData()[nIndexedRows:, PHOTON_ID_COLUMN]).astype(np.uint32)
+        newEntries = (newIDs.astype(np.uint64) << ROW_BITS) | np.arange(nIndexedRows, nRows, dtype=np.uint64)
+        newEntries.sort()
+        self._entries = self._merge(self._entries, newEntries)
+
+    @staticmethod
+    def _merge(sortedA: np.ndarray, sortedB: np.ndarray) -> np.ndarray:
+        if len(sortedA) == 0:
+            return sortedB
+        merged = np.empty(len(sortedA) + len(sortedB), dtype=sortedA.dtype)
+        isFromB = np.zeros(len(merged), dtype=bool)
+        isFromB[np.searchsorted(sortedA, sortedB) + np.arange(len(sortedB))] = True
+        merged[isFromB] = sortedB
+        merged[~isFromB] = sortedA
+        return merged
+
+    @property
+    def sortedIDs(self) -> np.ndarray:
+        return (self._entries >> ROW_BITS).astype(np.uint32)
+
+    @property
+    def uniqueIDs(self) -> np.ndarray:
+        sortedIDs = self.sortedIDs
+        if len(sortedIDs) == 0:
+            return sortedIDs
+        isFirst = np.empty(len(sortedIDs), dtype=bool)
+        isFirst[0] = True
+        np.not_equal(sortedIDs[1:], sortedIDs[:-1], out=isFirst[1:])
+        return sortedIDs[isFirst]
+
+    def getRows(self, photonIDs: np.ndarray) -> np.ndarray:
+        """Rows of the data points of the given photons, in the order of the container."""
+        photonIDs = np.unique(np.asarray(photonIDs, dtype=np.uint32)).astype(np.uint64)
+        starts = np.searchsorted(self._entries, photonIDs << ROW_BITS, side="left")
+        counts = np.searchsorted(self._entries, (photonIDs + 1) << ROW_BITS, side="left") - starts
+        nRows = int(counts.sum())
+        # Position of every selected entry: the first entry of its photon plus its rank among the entries of the photon.
+        firstPositions = np.cumsum(counts) - counts
+        positions = np.repeat(starts - firstPositions, counts) + np.arange(nRows)
+        rows = (self._entries[positions] & ROW_MASK).astype(np.int64)
+        rows.sort()
+        return rows
@@ -1,3 +1,6 @@
+import weakref
+from typing import Callable, Dict, Hashable, Tuple
+
 import numpy as np
 
 from pytissueoptics.scene.logger import InteractionKey
@@ -6,8 +9,23 @@ from .energyLogger import EnergyLogger
 from .energyType import EnergyType
 from .pointCloud import PointCloud
 
+# Point clouds of each logger, along with the data version of the logger they were built from.
+_POINT_CLOUDS: "weakref.WeakKeyDictionary[EnergyLogger, Tuple[int, Dict[Hashable, PointCloud]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
 
 class PointCloudFactory:
+    """
+    Point clouds of the data points of an EnergyLogger. They are cached per logger until its data changes, so that
+    asking for the same point cloud again (even from another factory) does not concatenate the data points again. The
+    point cloud of a single interaction key is a view of the logged data. The returned arrays are shared and must not
+    be modified.
+
+    Point clouds are only cached when the data points of the logger are in memory. Data points stored on disk or read
+    from a logger file can be larger than the available memory, so their point clouds are rebuilt when asked for.
+    """
+
     def __init__(self, logger: EnergyLogger):
         self._logger = logger
 
@@ -15,15 +33,27 @@ class PointCloudFactory:
         self, solidLabel: str = None, surfaceLabel: str = None, energyType=EnergyType.DEPOSITION
     ) -> PointCloud:
         if not solidLabel and not surfaceLabel:
-            return PointCloud(
-                self.getPointCloudOfSolids(energyType).solidPoints, self.getPointCloudOfSurfaces().surfacePoints
+            return self._getCached(
+                ("all", energyType),
+                lambda: PointCloud(
+                    self.getPointCloudOfSolids(energyType).solidPoints, self.getPointCloudOfSurfaces().surfacePoints
+                ),
             )
+        return self._getCached(
+            ("key", solidLabel, surfaceLabel, energyType),
+            lambda: self._makeKeyPointCloud(solidLabel, surfaceLabel, energyType),
+        )
+
+    def _makeKeyPointCloud(self, solidLabel: str, surfaceLabel: str, energyType: EnergyType) -> PointCloud:
         points = self._logger.getDataPoints(InteractionKey(solidLabel, surfaceLabel), energyType=energyType)
         if surfaceLabel:
             return PointCloud(None, points)
         return PointCloud(points, None)
 
     def getPointCloudOfSolids(self, energyType=EnergyType.DEPOSITION) -> PointCloud:
+        return self._getCached(("solids", energyType), lambda: self._makePointCloudOfSolids(energyType))
+
+    def _makePointCloudOfSolids(self, energyType: EnergyType) -> PointCloud:
         points = []
         for solidLabel in self._logger.getStoredSolidLabels():
             solidPoints = self.getPointCloud(solidLabel, energyType=energyType).solidPoints
@@ -34,6 +64,9 @@ class PointCloudFactory:
         return PointCloud(np.concatenate(points, axis=0), None)
 
     def getPointCloudOfSurfaces(self, solidLabel: str = None) -> PointCloud:
+        return self._getCached(("surfaces", solidLabel), lambda: self._makePointCloudOfSurfaces(solidLabel))
+
+    def _makePointCloudOfSurfaces(self, solidLabel: str = None) -> PointCloud:
         points = []
         solidLabels = (
             [solidLabel] if solidLabel else [_solidLabel for _solidLabel in self._logger.getStoredSolidLabels()]
@@ -45,3 +78,20 @@ class PointCloudFactory:
         if len(points) == 0:
             return PointCloud(None, None)
         return PointCloud(None, np.concatenate(points, axis=0))
+
+    @staticmethod
+    def clearCache():
+        """Releases the cached point clouds of all loggers."""
+        _POINT_CLOUDS.clear()
+
+    def _getCached(self, cacheKey: Hashable, makePointCloud: Callable[[], PointCloud]) -> PointCloud:
+        if not self._logger.hasDataPointsInMemory:
+            _POINT_CLOUDS.pop(self._logger, None)
+            return makePointCloud()
+        dataVersion, pointClouds = _POINT_CLOUDS.get(self._logger, (None, None))
+        if dataVersion != self._logger.dataVersion:
+            pointClouds = {}
+            _POINT_CLOUDS[self._logger] = (self._logger.dataVersion, pointClouds)
+        if cacheKey not in pointClouds:
+            pointClouds[cacheKey] = makePointCloud()
+        return pointClouds[cacheKey]
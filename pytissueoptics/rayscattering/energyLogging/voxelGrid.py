@@ -0,0 +1,77 @@
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from pytissueoptics.rayscattering.display.utils import histogram
+from pytissueoptics.rayscattering.energyLogging.energyType import EnergyType
+
+
+class VoxelGrid:
+    def __init__(
+        self,
+        limits3D: List[Tuple[float, float]],
+        binSize: Union[float, Tuple[float, float, float]],
+        energyType: EnergyType = EnergyType.DEPOSITION,
+    ):
+        """
+        A regular 3D grid of voxels that accumulates the volumetric energy of the logged data points. Unlike the 3D
+        data points, its memory footprint does not grow with the number of photons, so it remains available when the
+        `EnergyLogger` discards the 3D data (keep3D=False).
+
+        :param limits3D: The (min, max) limits of the grid along each XYZ axis. Data points outside are ignored.
+        :param binSize: The size of a voxel along each axis. In the same physical units as the scene.
+        :param energyType: The type of volumetric energy accumulated by the grid.
+        """
+        self._limits = [tuple(sorted(limit)) for limit in limits3D]
+        self._binSize = (binSize, binSize, binSize) if isinstance(binSize, (int, float)) else tuple(binSize)
+        self._bins = tuple(
+            max(1, int((limit[1] - limit[0]) / bin_)) for limit, bin_ in zip(self._limits, self._binSize)
+        )
+        self._energyType = energyType
+
+        try:
+            self._data = np.zeros(self._bins, dtype=np.float32)
+        except MemoryError:
+            raise MemoryError("Cannot allocate memory for the voxel grid. Consider increasing its voxel size.")
+
+    def extractData(self, dataPoints: np.ndarray):
+        """
+        Used internally by EnergyLogger to store 3D datapoints into this grid.
+        Data points are (n, 4) arrays with (value, x, y, z).
+        """
+        if dataPoints.size == 0:
+            return
+        histogram(dataPoints[:, 1:4], dataPoints[:, 0], self._bins, self._limits, out=self._data)
+
+    def getBinningGrid(self) -> Tuple[List[Tuple[float, float]], List[int], int]:
+        """Used internally for on-device binning. Returns the limits and number of bins of the grid, and keeps the
+        values of every sign."""
+        return list(self._limits), list(self._bins), 0
+
+    def addBinnedData(self, histogram3D: np.ndarray):
+        """Used internally to store a 3D histogram binned on the device with the grid of `getBinningGrid`."""
+        self._data += histogram3D.astype(np.float32)
+
+    def getSum(self) -> float:
+        return float(np.sum(self._data))
+
+    @property
+    def data(self) -> np.ndarray:
+        """The accumulated energy of shape (binsX, binsY, binsZ)."""
+        return self._data
+
+    @property
+    def limits(self) -> List[Tuple[float, float]]:
+        return self._limits
+
+    @property
+    def bins(self) -> Tuple[int, int, int]:
+        return self._bins
+
+    @property
+    def binSize(self) -> Tuple[float, float, float]:
+        return self._binSize
+
+    @property
+    def energyType(self) -> EnergyType:
+        return self._energyType
@@ -0,0 +1,94 @@
+from typing import List
+
+import numpy as np
+
+MAX_LEAF_SIZE = 4
+MAX_DEPTH = 60  # Below the traversal stack size of the kernel (BVH_STACK_SIZE).
+
+
+class CLBVH:
+    """
+    Bounding volume hierarchy of the polygons of each solid, flattened in depth-first order for the OpenCL kernel.
+    Nodes are split at the median centroid along their longest axis, so the tree stays balanced and its depth grows as
+    log2(nPolygons). The nodes of every solid are stored in the same lists, each solid having its own root node.
+
+    An inner node has a count of 0, its left child is the next node and its right child is at `firstIDs`. A leaf node
+    references `counts` polygons starting at `firstIDs` in the list of `polygonIDs`.
+    """
+
+    def __init__(self):
+        self._bboxMin: List[np.ndarray] = []
+        self._bboxMax: List[np.ndarray] = []
+        self._firstIDs: List[int] = []
+        self._counts: List[int] = []
+        self._polygonIDs: List[np.ndarray] = []
+        self._nPolygonIDs = 0
+
+    def addSolid(self, trianglePositions: np.ndarray, firstPolygonID: int) -> int:
+        """
+        Builds the hierarchy of a solid and returns the ID of its root node.
+
+        :param trianglePositions: Array of shape (nPolygons, 3, 3) with the vertex positions of each triangle.
+        :param firstPolygonID: Global ID of the first triangle. The others are assumed to follow in order.
+        """
+        triangleMin = trianglePositions.min(axis=1)
+        triangleMax = trianglePositions.max(axis=1)
+        # Pad the boxes to keep the tolerance of the triangle intersection (e.g. flat boxes or hits on an edge).
+        scale = max(1.0, float(np.abs(trianglePositions).max()))
+        padding = 1e-5 * (triangleMax - triangleMin).max(axis=1, keepdims=True) + 1e-6 * scale
+        self._triangleMin = triangleMin - padding
+        self._triangleMax = triangleMax + padding
+        self._centroids = trianglePositions.mean(axis=1)
+        self._firstPolygonID = firstPolygonID
+
+        rootID = len(self._firstIDs)
+        self._buildNode(np.arange(len(trianglePositions)), depth=0)
+        return rootID
+
+    def _buildNode(self, localIDs: np.ndarray, depth: int):
+        nodeID = len(self._firstIDs)
+        self._bboxMin.append(self._triangleMin[localIDs].min(axis=0))
+        self._bboxMax.append(self._triangleMax[localIDs].max(axis=0))
+
+        if len(localIDs) <= MAX_LEAF_SIZE or depth >= MAX_DEPTH:
+            self._firstIDs.append(self._nPolygonIDs)
+            self._counts.append(len(localIDs))
+            self._polygonIDs.append(localIDs + self._firstPolygonID)
+            self._nPolygonIDs += len(localIDs)
+            return
+
+        self._firstIDs.append(0)
+        self._counts.append(0)
+        centroids = self._centroids[localIDs]
+        axis = int(np.argmax(np.ptp(centroids, axis=0)))
+        half = len(localIDs) // 2
+        order = np.argpartition(centroids[:, axis], half)
+        self._buildNode(localIDs[order[:half]], depth + 1)
+        self._firstIDs[nodeID] = len(self._firstIDs)
+        self._buildNode(localIDs[order[half:]], depth + 1)
+
+    @property
+    def bboxMin(self) -> np.ndarray:
+        return np.asarray(self._bboxMin, dtype=np.float32).reshape(-1, 3)
+
+    @property
+    def bboxMax(self) -> np.ndarray:
+        return np.asarray(self._bboxMax, dtype=np.float32).reshape(-1, 3)
+
+    @property
+    def firstIDs(self) -> np.ndarray:
+        return np.asarray(self._firstIDs, dtype=np.uint32)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.asarray(self._counts, dtype=np.uint32)
+
+    @property
+    def polygonIDs(self) -> np.ndarray:
+        if not self._polygonIDs:
+            return np.zeros(1, dtype=np.uint32)
+        return np.concatenate(self._polygonIDs).astype(np.uint32)
+
+    @property
+    def nodeCount(self) -> int:
+        return len(self._firstIDs)
@@ -1,34 +1,61 @@
 import os
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 import numpy as np
 
+from pytissueoptics.rayscattering.energyLogging import EnergyLogger
 from pytissueoptics.rayscattering.opencl import WEIGHT_THRESHOLD
+from pytissueoptics.rayscattering.opencl.buffers.CLObject import BufferOf
 from pytissueoptics.rayscattering.opencl.buffers.dataPointCL import DataPointCL
 from pytissueoptics.rayscattering.opencl.buffers.photonCL import PhotonCL
-from pytissueoptics.rayscattering.opencl.buffers.seedCL import SeedCL
 from pytissueoptics.rayscattering.opencl.CLProgram import CLProgram
 from pytissueoptics.rayscattering.opencl.CLScene import CLScene
-from pytissueoptics.rayscattering.opencl.utils import BatchTiming, CLKeyLog, CLParameters
+from pytissueoptics.rayscattering.opencl.CLSceneCache import SCENE_CACHE
+from pytissueoptics.rayscattering.opencl.CLSource import CLSource
+from pytissueoptics.rayscattering.opencl.utils import BatchTiming, CLBinning, CLKeyLog, CLParameters
+from pytissueoptics.rayscattering.opencl.utils.CLParameters import N_LOG_BUFFERS
 from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
 from pytissueoptics.scene.geometry import Environment
 from pytissueoptics.scene.logger.logger import Logger
 
 PROPAGATION_SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "propagation.c")
+SOURCE_SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "source.c")
 
 
 class CLPhotons:
-    def __init__(self, positions: np.ndarray, directions: np.ndarray):
-        assert positions.shape == directions.shape, "Positions and directions must have the same shape."
+    def __init__(
+        self,
+        positions: np.ndarray = None,
+        directions: np.ndarray = None,
+        source: CLSource = None,
+        N: int = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Photons of the given initial positions and directions, or N photons sampled on the device from the `source`
+        parameters as they enter the propagation, so that the host memory does not grow with N.
+
+        The random numbers of each photon are drawn from a stream keyed by the `seed` and the photon ID, so a seeded
+        propagation gives the same photon paths whatever the batch size or the number of work units. Without a seed,
+        a new one is drawn from numpy for each propagation.
+        """
+        if source is None:
+            assert positions.shape == directions.shape, "Positions and directions must have the same shape."
+            N = len(positions)
         self._positions = positions
         self._directions = directions
-        self._N = np.uint32(len(positions))
+        self._source = source
+        self._seed = seed
+        self._N = np.uint32(N)
         self._weightThreshold = np.float32(WEIGHT_THRESHOLD)
         self._initialMaterial = None
         self._initialSolid = None
 
         self._scene = None
         self._sceneLogger = None
+        self._lastRecordTime = None
 
     def setContext(self, scene: ScatteringScene, environment: Environment, logger: Logger = None):
         self._scene = scene
@@ -39,100 +66,142 @@ class CLPhotons:
     def propagate(self, IPP: float, verbose: bool = False):
         assert self._scene is not None, "Context must be set before propagation."
         program = CLProgram(sourcePath=PROPAGATION_SOURCE_PATH)
-        params = CLParameters(self._N, AVG_IT_PER_PHOTON=IPP)
+        # An EnergyLogger that discards the 3D data only needs its binned views, so the interactions are binned
+        # directly on the device instead of being logged as data points.
+        binsOnDevice = isinstance(self._sceneLogger, EnergyLogger) and not self._sceneLogger.has3D
+        storesOnDisk = isinstance(self._sceneLogger, EnergyLogger) and self._sceneLogger.storesDataPointsOnDisk
+        params = CLParameters(
+            self._N, AVG_IT_PER_PHOTON=IPP, logDataPoints=not binsOnDevice, storesDataPointsInRAM=not storesOnDisk
+        )
 
-        scene = CLScene(self._scene, params.workItemAmount)
+        scene = SCENE_CACHE.getScene(self._scene, params.workItemAmount)
+        binning = CLBinning(scene, params.workItemAmount, energyLogger=self._sceneLogger if binsOnDevice else None)
 
-        kernelPhotons = PhotonCL(
-            self._positions[0 : params.maxPhotonsPerBatch],
-            self._directions[0 : params.maxPhotonsPerBatch],
+        seed = np.uint64(self._seed % 2**64 if self._seed is not None else np.random.randint(0, 2**63, dtype=np.int64))
+        # The photons are supplied and compacted between batches by the kernels of a second program, so that the
+        # photon buffers stay on the device.
+        sourceProgram = CLProgram(sourcePath=SOURCE_SOURCE_PATH)
+        photonFactory = _PhotonFactory(
+            self._positions,
+            self._directions,
+            self._source,
+            sourceProgram,
+            seed,
             materialID=scene.getMaterialID(self._initialMaterial),
             solidID=scene.getSolidID(self._initialSolid),
         )
-        photonPool = PhotonCL(
-            self._positions[params.maxPhotonsPerBatch :],
-            self._directions[params.maxPhotonsPerBatch :],
-            materialID=scene.getMaterialID(self._initialMaterial),
-            solidID=scene.getSolidID(self._initialSolid),
-            startID=params.maxPhotonsPerBatch,
+        kernelPhotons = _KernelPhotons(
+            int(params.maxPhotonsPerBatch), int(self._N), int(params.workItemAmount), sourceProgram, photonFactory
         )
-        photonPool.make(program.device)
-        seeds = SeedCL(params.maxPhotonsPerBatch)
-        logger = DataPointCL(size=params.maxLoggableInteractions)
+        kernelPhotons.refill()
+        # Two log buffers are alternated so that the next batch can run on the device while the log of the previous
+        # batch is copied back and converted to the scene logger on a host thread.
+        nLogBuffers = 1 if binsOnDevice else N_LOG_BUFFERS
+        loggers = [DataPointCL(size=max(1, params.maxLoggableInteractions)) for _ in range(nLogBuffers)]
+        pendingConversions: List[Optional[Future]] = [None] * nLogBuffers
 
         photonCount = 0
         batchCount = 0
 
-        if verbose:
-            timing = BatchTiming(self._N)
-
-        while photonCount < self._N:
-            t1 = time.time_ns()
-            program.launchKernel(
-                kernelName="propagate",
-                N=np.int32(params.workItemAmount),
-                arguments=[
-                    np.int32(params.photonsPerWorkItem),
-                    np.int32(params.maxLoggableInteractionsPerWorkItem),
-                    self._weightThreshold,
-                    np.int32(params.workItemAmount),
-                    kernelPhotons,
-                    scene.materials,
-                    scene.nSolids,
-                    scene.solids,
-                    scene.surfaces,
-                    scene.triangles,
-                    scene.vertices,
-                    scene.solidCandidates,
-                    seeds,
-                    logger,
-                ],
-            )
-            t2 = time.time_ns()
-            log = program.getData(logger)
-            t3 = time.time_ns()
-            self._translateToSceneLogger(log, scene)
-            t4 = time.time_ns()
-
-            logger.reset()
-            program.getData(kernelPhotons, returnData=False)
-            batchPhotonCount, photonCount = self._replaceFullyPropagatedPhotons(
-                kernelPhotons, photonPool, photonCount, params.maxPhotonsPerBatch
-            )
-            if verbose:
-                timing.recordBatch(
-                    batchPhotonCount,
-                    propagationTime=(t2 - t1),
-                    dataTransferTime=(t3 - t2),
-                    dataConversionTime=(t4 - t3),
-                    totalTime=(time.time_ns() - t1),
+        timing = BatchTiming(self._N) if verbose else None
+        self._lastRecordTime = time.time_ns()
+
+        with ThreadPoolExecutor(max_workers=1) as converter:
+            while photonCount < self._N:
+                bufferIndex = batchCount % nLogBuffers
+                logger = loggers[bufferIndex]
+                if pendingConversions[bufferIndex] is not None:
+                    self._recordBatch(pendingConversions[bufferIndex].result(), timing)
+                    pendingConversions[bufferIndex] = None
+                    logger.reset()
+
+                t1 = time.time_ns()
+                program.launchKernel(
+                    kernelName="propagate",
+                    N=np.int32(params.workItemAmount),
+                    arguments=[
+                        np.int32(params.photonsPerWorkItem),
+                        np.int32(params.maxLoggableInteractionsPerWorkItem),
+                        self._weightThreshold,
+                        np.int32(params.workItemAmount),
+                        kernelPhotons.photons,
+                        scene.materials,
+                        scene.nSolids,
+                        scene.solids,
+                        scene.surfaces,
+                        scene.triangles,
+                        scene.vertices,
+                        scene.solidCandidates,
+                        scene.bvhNodes,
+                        scene.bvhPolygonIDs,
+                        scene.polygonSurfaceIDs,
+                        seed,
+                        logger,
+                        binning.isBinning,
+                        binning.nSurfaces,
+                        binning.gridLimits,
+                        binning.gridShapes,
+                        binning.keyGridOffsets,
+                        binning.keyGridIDs,
+                        binning.keyGridScales,
+                        binning.bins,
+                        binning.seenKeys,
+                        binning.keyBalanceIDs,
+                        binning.nBalanceKeys,
+                        binning.keyEnergies,
+                        binning.interactionCounts,
+                    ],
                 )
+                t2 = time.time_ns()
+                copyEvent = None if binsOnDevice else program.enqueueCopy(logger)
 
-            params.maxPhotonsPerBatch = kernelPhotons.length
-            batchCount += 1
+                batchPhotonCount = kernelPhotons.replaceFullyPropagatedPhotons()
+                photonCount += batchPhotonCount
+                if binsOnDevice:
+                    self._recordBatch((batchPhotonCount, t2 - t1, 0, 0), timing)
+                else:
+                    pendingConversions[bufferIndex] = converter.submit(
+                        self._convertLog, logger, copyEvent, scene, batchPhotonCount, propagationTime=(t2 - t1)
+                    )
 
-    def _replaceFullyPropagatedPhotons(
-        self, kernelPhotons: PhotonCL, photonPool: PhotonCL, photonCount: int, currentKernelLength: int
-    ) -> (int, int):
-        photonsToReplace = np.where(kernelPhotons.hostBuffer["weight"] == 0)[0]
-        batchPhotonCount = len(photonsToReplace)
+                params.maxPhotonsPerBatch = kernelPhotons.length
+                batchCount += 1
 
-        if batchPhotonCount == 0:
-            return batchPhotonCount, photonCount
+            for i in range(batchCount, batchCount + nLogBuffers):
+                conversion = pendingConversions[i % nLogBuffers]
+                if conversion is not None:
+                    self._recordBatch(conversion.result(), timing)
 
-        newPhotonsRemaining = photonCount + currentKernelLength < self._N
-        if newPhotonsRemaining:
-            replacement_photons = photonPool.hostBuffer[photonCount : photonCount + batchPhotonCount]
-            photonsToRemove = photonsToReplace[len(replacement_photons) :]
-            photonsToReplace = photonsToReplace[: len(replacement_photons)]
-            kernelPhotons.hostBuffer[photonsToReplace] = replacement_photons
-        else:
-            photonsToRemove = photonsToReplace
+        if binsOnDevice:
+            binning.toEnergyLogger(program)
 
-        kernelPhotons.hostBuffer = np.delete(kernelPhotons.hostBuffer, photonsToRemove)
+    def _convertLog(
+        self, logger: DataPointCL, copyEvent, sceneCL: CLScene, batchPhotonCount: int, propagationTime: int
+    ) -> Tuple[int, int, int, int]:
+        """Runs on the converter thread. Returns the batch timing information (times in nanoseconds)."""
+        t1 = time.time_ns()
+        copyEvent.wait()
+        log = CLProgram.getHostData(logger)
+        t2 = time.time_ns()
+        self._translateToSceneLogger(log, sceneCL)
+        t3 = time.time_ns()
+        return batchPhotonCount, propagationTime, t2 - t1, t3 - t2
 
-        photonCount += batchPhotonCount
-        return batchPhotonCount, photonCount
+    def _recordBatch(self, batchInfo: Tuple[int, int, int, int], timing: Optional[BatchTiming]):
+        """Records the timing of a batch once its log was converted. The total time of a batch is the time elapsed
+        since the previous batch was recorded, since consecutive batches overlap."""
+        batchPhotonCount, propagationTime, dataTransferTime, dataConversionTime = batchInfo
+        if timing is None:
+            return
+        recordTime = time.time_ns()
+        timing.recordBatch(
+            batchPhotonCount,
+            propagationTime=propagationTime,
+            dataTransferTime=dataTransferTime,
+            dataConversionTime=dataConversionTime,
+            totalTime=(recordTime - self._lastRecordTime),
+        )
+        self._lastRecordTime = recordTime
 
     def _translateToSceneLogger(self, log, sceneCL):
         if not self._sceneLogger:
@@ -140,3 +209,117 @@ class CLPhotons:
 
         keyLog = CLKeyLog(log, sceneCL=sceneCL)
         keyLog.toSceneLogger(self._sceneLogger)
+
+
+class _PhotonFactory:
+    """Writes the photons of the given IDs in a photon buffer on the device, either copied from a pool of their initial
+    positions and directions, which is sent to the device once, or sampled from the source."""
+
+    def __init__(
+        self,
+        positions: Optional[np.ndarray],
+        directions: Optional[np.ndarray],
+        source: Optional[CLSource],
+        program: CLProgram,
+        seed: np.uint64,
+        materialID: int,
+        solidID: int,
+    ):
+        self._source = source
+        self._program = program
+        self._seed = seed
+        self._materialID = materialID
+        self._solidID = solidID
+        self._pool = None
+        if source is None:
+            self._pool = PhotonCL(positions, directions, materialID=materialID, solidID=solidID, buildOnce=True)
+
+    def fill(self, photons: PhotonCL, offset: int, firstID: int, count: int):
+        if count == 0:
+            return
+        if self._source is None:
+            self._program.launchKernel(
+                kernelName="copyPhotons",
+                N=count,
+                arguments=[np.uint32(firstID), np.uint32(offset), self._pool, photons],
+            )
+            return
+        self._program.launchKernel(
+            kernelName="generatePhotons",
+            N=count,
+            arguments=[
+                *self._source.getKernelArguments(),
+                np.uint32(self._materialID),
+                np.int32(self._solidID),
+                np.uint32(firstID),
+                np.uint32(offset),
+                photons,
+                self._seed,
+            ],
+        )
+
+
+class _KernelPhotons:
+    """
+    Photons given to the propagation kernel, which stay on the device between batches. After each batch, the photons
+    still propagating are compacted to the start of a second buffer with the `compactPhotons` kernel, and new photons
+    are appended after them until all photons were supplied. The kernel length then shrinks as the run tails off.
+    """
+
+    def __init__(self, capacity: int, N: int, maxBlocks: int, program: CLProgram, photonFactory: _PhotonFactory):
+        self._buffers = [PhotonCL(None, None, materialID=0, solidID=0, N=capacity, buildOnce=True) for _ in range(2)]
+        self._current = 0
+        self._capacity = capacity
+        self._N = N
+        self._maxBlocks = max(1, maxBlocks)
+        self._blockCounts = BufferOf(np.zeros(self._maxBlocks, dtype=np.uint32), buildOnce=True)
+        self._aliveCount = BufferOf(np.zeros(1, dtype=np.uint32), buildOnce=True)
+        self._program = program
+        self._photonFactory = photonFactory
+        self._nextPhotonID = 0
+        # The photon type is included since the kernel scanning the block counts takes no photon buffer.
+        self._buffers[0].make(program.device)
+        program.include(self._buffers[0].declaration)
+        self.length = 0
+
+    @property
+    def photons(self) -> PhotonCL:
+        return self._buffers[self._current]
+
+    def refill(self):
+        """Appends new photons up to the capacity of the buffer, or until all photons were supplied."""
+        count = min(self._capacity - self.length, self._N - self._nextPhotonID)
+        self._photonFactory.fill(self.photons, offset=self.length, firstID=self._nextPhotonID, count=count)
+        self._nextPhotonID += count
+        self.length += count
+
+    def replaceFullyPropagatedPhotons(self) -> int:
+        """Returns the number of photons that were fully propagated during the last batch. Only the count of photons
+        still alive is read back on the host."""
+        if self.length == 0:
+            return 0
+        blockSize = -(-self.length // self._maxBlocks)
+        nBlocks = -(-self.length // blockSize)
+        self._program.launchKernel(
+            kernelName="countAlivePhotons",
+            N=nBlocks,
+            arguments=[np.uint32(self.length), np.uint32(blockSize), self.photons, self._blockCounts],
+        )
+        self._program.launchKernel(
+            kernelName="scanBlockCounts", N=1, arguments=[np.uint32(nBlocks), self._blockCounts, self._aliveCount]
+        )
+        aliveCount = int(self._program.getData(self._aliveCount)[0])
+        deadCount = self.length - aliveCount
+        if deadCount == 0:
+            return 0
+
+        compactedPhotons = self._buffers[1 - self._current]
+        self._program.launchKernel(
+            kernelName="compactPhotons",
+            N=nBlocks,
+            arguments=[np.uint32(self.length), np.uint32(blockSize), self.photons, compactedPhotons, self._blockCounts],
+        )
+        self._current = 1 - self._current
+        self.length = aliveCount
+        self.refill()
+        return deadCount
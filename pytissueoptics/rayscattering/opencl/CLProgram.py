@@ -1,18 +1,18 @@
 import os
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import numpy as np
+from numpy.lib import recfunctions as rfn
 
 try:
     import pyopencl as cl
 except ImportError:
     pass
 
-from numpy.lib import recfunctions as rfn
-
 from pytissueoptics.rayscattering.opencl import CONFIG
 from pytissueoptics.rayscattering.opencl.buffers import CLObject
+from pytissueoptics.rayscattering.opencl.CLProgramCache import PROGRAM_CACHE
 
 
 class CLProgram:
@@ -22,7 +22,11 @@ class CLProgram:
         self._device = CONFIG.device
 
         self._mainQueue = cl.CommandQueue(self._context)
+        self._copyQueue = cl.CommandQueue(self._context)
         self._program: Optional[cl.Program] = None
+        self._programSourceCode: Optional[str] = None
+        self._baseSourceCode: Optional[str] = None
+        self._kernels: Dict[str, "cl.Kernel"] = {}
         self._include = ""
         self._mocks = []
 
@@ -30,6 +34,8 @@ class CLProgram:
         self._mainQueue.finish()
         self._mainQueue.flush()
         self._mainQueue = None
+        self._copyQueue.finish()
+        self._copyQueue = None
         self._context = None
         self._device = None
 
@@ -46,7 +52,9 @@ class CLProgram:
         if verbose:
             print(f" ... {t1 - t0:.3f} s. [Build]")
 
-        kernel = getattr(self._program, kernelName)
+        if kernelName not in self._kernels:
+            self._kernels[kernelName] = cl.Kernel(self._program, kernelName)
+        kernel = self._kernels[kernelName]
         try:
             kernel(self._mainQueue, (N,), None, *buffers)
         except cl.MemoryError:
@@ -61,20 +69,40 @@ class CLProgram:
         for _object in objects:
             _object.build(self._device, self._context)
 
-        typeDeclarations = "".join([_object.declaration for _object in objects])
-        sourceCode = self._include + typeDeclarations + self._makeSource(self._sourcePath)
+        if self._baseSourceCode is None:
+            self._baseSourceCode = self._makeSource(self._sourcePath)
+        # Objects of the same type share a single declaration, which is skipped if it was already included.
+        declarations = dict.fromkeys(_object.declaration for _object in objects)
+        typeDeclarations = "".join([declaration for declaration in declarations if declaration not in self._include])
+        sourceCode = self._include + typeDeclarations + self._baseSourceCode
 
         for code, mock in self._mocks:
             if code not in sourceCode:
                 raise ValueError(f"Invalid mock. Code block not found in source code: {code}")
             sourceCode = sourceCode.replace(code, mock)
 
-        self._program = cl.Program(self._context, sourceCode).build()
+        if sourceCode == self._programSourceCode:
+            return
+        self._program = PROGRAM_CACHE.getProgram(self._context, self._device, sourceCode)
+        self._programSourceCode = sourceCode
+        self._kernels.clear()
 
     def getData(self, _object: CLObject, dtype: np.dtype = np.float32, returnData: bool = True):
         cl.enqueue_copy(self._mainQueue, dest=_object.hostBuffer, src=_object.deviceBuffer)
         if not returnData:
             return
+        return self.getHostData(_object, dtype)
+
+    def enqueueCopy(self, _object: CLObject) -> "cl.Event":
+        """
+        Starts copying the device buffer of the object to its host buffer on a separate queue and returns without
+        waiting, so that other kernels can be launched meanwhile. The returned event must be waited on before
+        reading the host buffer with `getHostData`.
+        """
+        return cl.enqueue_copy(self._copyQueue, dest=_object.hostBuffer, src=_object.deviceBuffer, is_blocking=False)
+
+    @staticmethod
+    def getHostData(_object: CLObject, dtype: np.dtype = np.float32) -> np.ndarray:
         if _object.STRUCT_DTYPE is not None:
             return rfn.structured_to_unstructured(_object.hostBuffer, dtype=dtype)
         else:
@@ -0,0 +1,89 @@
+import hashlib
+import os
+from typing import Optional
+
+try:
+    import pyopencl as cl
+except ImportError:
+    pass
+
+from pytissueoptics.rayscattering.opencl.config.CLConfig import OPENCL_CACHE_DIR
+from pytissueoptics.scene.utils import LRUCache
+
+
+class CLProgramCache:
+    """
+    Cache of compiled OpenCL programs. Programs are kept in memory for the current session and their binaries are
+    saved to disk (next to the OpenCL config file) so that later sessions skip the compilation of unchanged source code.
+
+    Programs are identified by a hash of the complete source code (including struct declarations) and of the device,
+    platform and driver versions. At most `maxPrograms` programs are kept in memory; the least recently used one is
+    released first (its binary stays on disk).
+    """
+
+    def __init__(self, cacheDir: str = OPENCL_CACHE_DIR, maxPrograms: int = 16):
+        self._cacheDir = cacheDir
+        self._programs = LRUCache(maxPrograms)
+
+    def getProgram(self, context: "cl.Context", device: "cl.Device", sourceCode: str) -> "cl.Program":
+        programHash = self._getProgramHash(device, sourceCode)
+        key = (context.int_ptr, programHash)
+        program = self._programs.get(key)
+        if program is None:
+            program = self._loadBinary(context, device, programHash)
+            if program is None:
+                program = cl.Program(context, sourceCode).build()
+                self._saveBinary(program, programHash)
+            self._programs.set(key, program)
+        return program
+
+    def clear(self):
+        """Removes all compiled programs from memory and from disk."""
+        self._programs.clear()
+        if not os.path.exists(self._cacheDir):
+            return
+        for fileName in os.listdir(self._cacheDir):
+            if fileName.endswith(".bin"):
+                os.remove(os.path.join(self._cacheDir, fileName))
+
+    def __len__(self):
+        return len(self._programs)
+
+    @staticmethod
+    def _getProgramHash(device: "cl.Device", sourceCode: str) -> str:
+        deviceInfo = "|".join(
+            [device.platform.name, device.platform.version, device.name, device.driver_version, cl.VERSION_TEXT]
+        )
+        return hashlib.sha256((deviceInfo + sourceCode).encode("utf-8")).hexdigest()
+
+    def _getBinaryPath(self, programHash: str) -> str:
+        return os.path.join(self._cacheDir, f"{programHash}.bin")
+
+    def _loadBinary(self, context: "cl.Context", device: "cl.Device", programHash: str) -> Optional["cl.Program"]:
+        binaryPath = self._getBinaryPath(programHash)
+        if not os.path.exists(binaryPath):
+            return None
+        try:
+            with open(binaryPath, "rb") as f:
+                binary = f.read()
+            return cl.Program(context, [device], [binary]).build()
+        except (OSError, cl.Error):
+            # Invalid or outdated binary. It will be rebuilt from source and overwritten.
+            return None
+
+    def _saveBinary(self, program: "cl.Program", programHash: str):
+        binaryPath = self._getBinaryPath(programHash)
+        tempPath = f"{binaryPath}.{os.getpid()}.tmp"
+        try:
+            binary = program.get_info(cl.program_info.BINARIES)[0]
+            os.makedirs(self._cacheDir, exist_ok=True)
+            with open(tempPath, "wb") as f:
+                f.write(binary)
+            os.replace(tempPath, binaryPath)
+        except (OSError, cl.Error):
+            # The disk cache is optional (e.g. read-only installation).
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+
+
+PROGRAM_CACHE = CLProgramCache()
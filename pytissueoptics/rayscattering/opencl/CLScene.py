@@ -2,13 +2,14 @@ from typing import List
 
 import numpy as np
 
-from pytissueoptics.rayscattering.opencl.buffers import SolidCLInfo, SurfaceCLInfo, TriangleCLInfo
+from pytissueoptics.rayscattering.opencl.buffers import BufferOf, BVHNodeCL, SolidCLInfo, SurfaceCLInfo, TriangleCLInfo
 from pytissueoptics.rayscattering.opencl.buffers.materialCL import MaterialCL
 from pytissueoptics.rayscattering.opencl.buffers.solidCandidateCL import SolidCandidateCL
 from pytissueoptics.rayscattering.opencl.buffers.solidCL import SolidCL
 from pytissueoptics.rayscattering.opencl.buffers.surfaceCL import SurfaceCL
 from pytissueoptics.rayscattering.opencl.buffers.triangleCL import TriangleCL
 from pytissueoptics.rayscattering.opencl.buffers.vertexCL import VertexCL
+from pytissueoptics.rayscattering.opencl.CLBVH import CLBVH
 from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
 
 NO_LOG_ID = 0
@@ -28,16 +29,31 @@ class CLScene:
         self._surfacesInfo = []
         self._trianglesInfo = []
         self._vertices = []
+        self._polygonSurfaceIDs = []
+        self._bvh = CLBVH()
         for solid in scene.solids:
             self._processSolid(solid)
 
+        self._nWorkUnits = nWorkUnits
         self.nSolids = np.uint32(len(scene.solids))
+        self.nSurfaces = np.uint32(len(self._surfacesInfo))
         self.materials = MaterialCL(self._sceneMaterials)
         self.solidCandidates = SolidCandidateCL(nWorkUnits, len(scene.solids))
         self.solids = SolidCL(self._solidsInfo)
         self.surfaces = SurfaceCL(self._surfacesInfo)
         self.triangles = TriangleCL(self._trianglesInfo)
         self.vertices = VertexCL(self._vertices)
+        self.bvhNodes = BVHNodeCL(self._bvh.bboxMin, self._bvh.bboxMax, self._bvh.firstIDs, self._bvh.counts)
+        self.bvhPolygonIDs = BufferOf(self._bvh.polygonIDs, buildOnce=True)
+        self.polygonSurfaceIDs = BufferOf(np.asarray(self._polygonSurfaceIDs or [0], dtype=np.uint32), buildOnce=True)
+
+    def bindScene(self, scene: ScatteringScene, nWorkUnits: int):
+        """Reuses this flattened scene for another instance of the same scene (with equivalent material objects) and
+        resizes the solid candidates scratch buffer for the given number of work units."""
+        self._sceneMaterials = scene.getMaterials()
+        if nWorkUnits != self._nWorkUnits:
+            self._nWorkUnits = nWorkUnits
+            self.solidCandidates = SolidCandidateCL(nWorkUnits, int(self.nSolids))
 
     def getMaterialID(self, material):
         if material is None:
@@ -125,13 +141,20 @@ class CLScene:
         vertexToID = {id(v): i + len(self._vertices) for i, v in enumerate(solidVertices)}
 
         firstSurfaceID = len(self._surfacesInfo)
+        firstPolygonID = len(self._trianglesInfo)
         for surfaceLabel in solid.surfaceLabels:
             surfacePolygons = solid.getPolygons(surfaceLabel)
             self._processSurface(surfaceLabel, surfacePolygons, vertexToID)
 
         lastSurfaceID = len(self._surfacesInfo) - 1
+        bvhRootID = self._buildSolidBVH(solidVertices, firstPolygonID)
         self._vertices.extend(solidVertices)
-        self._solidsInfo.append(SolidCLInfo(solid.bbox, firstSurfaceID, lastSurfaceID))
+        self._solidsInfo.append(SolidCLInfo(solid.bbox, firstSurfaceID, lastSurfaceID, bvhRootID))
+
+    def _buildSolidBVH(self, solidVertices, firstPolygonID) -> int:
+        vertexPositions = np.array([[v.x, v.y, v.z] for v in solidVertices], dtype=np.float64)
+        vertexIDs = np.array([t.vertexIDs for t in self._trianglesInfo[firstPolygonID:]]) - len(self._vertices)
+        return self._bvh.addSolid(vertexPositions[vertexIDs], firstPolygonID)
 
     def _processSurface(self, surfaceLabel, polygons, vertexToID):
         firstPolygonID = len(self._trianglesInfo)
@@ -151,6 +174,7 @@ class CLScene:
             vertexIDs = [vertexToID[id(v)] for v in triangle.vertices]
             self._trianglesInfo.append(TriangleCLInfo(vertexIDs, triangle.normal))
             newSurfaceID = len(self._surfacesInfo)
+            self._polygonSurfaceIDs.append(newSurfaceID)
             self._processPolygon(triangle, surfaceLabel, surfaceID=newSurfaceID)
             lastSolid = currentSolid
 
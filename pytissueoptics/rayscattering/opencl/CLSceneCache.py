@@ -0,0 +1,66 @@
+import hashlib
+
+from pytissueoptics.rayscattering.opencl.CLScene import CLScene
+from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
+from pytissueoptics.scene.utils import LRUCache
+
+
+class CLSceneCache:
+    """
+    In-memory cache of flattened OpenCL scenes (materials, solids, surfaces, triangles, vertices and BVH), so that
+    propagating many times in the same scene (e.g. a parameter sweep) only flattens it once. Since these buffers are
+    only built once, the last `maxSize` scenes also keep their device memory.
+
+    Scenes are identified by the hash of the scene (solid vertices and materials), the hash of each material and, for
+    each solid in order, its label, detector settings and the label, polygon count, smoothing and environments of
+    each surface. Another instance of the same scene reuses the cached buffers.
+    """
+
+    def __init__(self, maxSize: int = 2):
+        self._scenes = LRUCache(maxSize)
+
+    def getScene(self, scene: ScatteringScene, nWorkUnits: int) -> CLScene:
+        key = self.getKey(scene)
+        sceneCL = self._scenes.get(key)
+        if sceneCL is None:
+            sceneCL = CLScene(scene, nWorkUnits)
+        else:
+            sceneCL.bindScene(scene, nWorkUnits)
+        self._scenes.set(key, sceneCL)
+        return sceneCL
+
+    @staticmethod
+    def getKey(scene: ScatteringScene) -> str:
+        materialKeys = tuple(hash(material) for material in scene.getMaterials())
+        solidKeys = []
+        for solid in scene.solids:
+            detectorKey = solid.detectorAcceptanceCosine if solid.isDetector else None
+            surfaceKeys = []
+            for surfaceLabel in solid.surfaceLabels:
+                polygons = solid.getPolygons(surfaceLabel)
+                environmentKeys = tuple(
+                    (environment.solidLabel, hash(environment.material)) if environment else None
+                    for polygon in (polygons[0], polygons[-1])
+                    for environment in (polygon.insideEnvironment, polygon.outsideEnvironment)
+                )
+                surfaceKeys.append((surfaceLabel, len(polygons), polygons[0].toSmooth, environmentKeys))
+            solidKeys.append((solid.getLabel(), hash(solid), detectorKey, tuple(surfaceKeys)))
+        key = repr((hash(scene), materialKeys, tuple(solidKeys)))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @property
+    def maxSize(self) -> int:
+        return self._scenes.maxSize
+
+    @maxSize.setter
+    def maxSize(self, value: int):
+        self._scenes.maxSize = value
+
+    def clear(self):
+        self._scenes.clear()
+
+    def __len__(self):
+        return len(self._scenes)
+
+
+SCENE_CACHE = CLSceneCache()
@@ -0,0 +1,49 @@
+import numpy as np
+
+from pytissueoptics.rayscattering.opencl.buffers.CLObject import cl
+from pytissueoptics.scene.geometry import Vector
+
+DIRECTIONAL_SOURCE = 0
+ISOTROPIC_SOURCE = 1
+
+
+class CLSource:
+    """
+    Parameters of a source given to the `generatePhotons` kernel, which samples the initial position and direction of
+    the photons on the device as they are needed, instead of allocating them all on the host. A directional source
+    samples its positions on a disc of the given diameter centered on its position, and its directions in a cone of
+    the given divergence. An isotropic source samples its directions uniformly on the unit sphere.
+    """
+
+    def __init__(
+        self,
+        sourceType: int,
+        position: Vector,
+        direction: Vector = None,
+        xAxis: Vector = None,
+        yAxis: Vector = None,
+        diameter: float = 0,
+        divergence: float = 0,
+    ):
+        self._sourceType = sourceType
+        self._position = position
+        self._direction = direction if direction is not None else Vector(0, 0, 1)
+        self._xAxis = xAxis if xAxis is not None else Vector(1, 0, 0)
+        self._yAxis = yAxis if yAxis is not None else Vector(0, 1, 0)
+        self._diameter = diameter
+        self._divergence = divergence
+
+    def getKernelArguments(self) -> list:
+        return [
+            np.uint32(self._sourceType),
+            self._toFloat3(self._position),
+            self._toFloat3(self._direction),
+            self._toFloat3(self._xAxis),
+            self._toFloat3(self._yAxis),
+            np.float32(self._diameter),
+            np.float32(self._divergence),
+        ]
+
+    @staticmethod
+    def _toFloat3(vector: Vector):
+        return cl.cltypes.make_float3(vector.x, vector.y, vector.z)
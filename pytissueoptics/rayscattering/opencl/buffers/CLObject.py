@@ -117,9 +117,9 @@ class RandomBuffer(CLObject):
 
 
 class BufferOf(CLObject):
-    def __init__(self, array: np.ndarray):
+    def __init__(self, array: np.ndarray, buildOnce: bool = False):
         self._array = array
-        super().__init__()
+        super().__init__(buildOnce=buildOnce)
 
     def _getInitialHostBuffer(self) -> np.ndarray:
         return self._array
@@ -1,8 +1,8 @@
+from .bvhNodeCL import BVHNodeCL
 from .CLObject import BufferOf, CLObject, EmptyBuffer, RandomBuffer
 from .dataPointCL import DataPointCL
 from .materialCL import MaterialCL
 from .photonCL import PhotonCL
-from .seedCL import SeedCL
 from .solidCandidateCL import SolidCandidateCL
 from .solidCL import SolidCL, SolidCLInfo
 from .surfaceCL import SurfaceCL, SurfaceCLInfo
@@ -10,6 +10,7 @@ from .triangleCL import TriangleCL, TriangleCLInfo
 from .vertexCL import VertexCL
 
 __all__ = [
+    "BVHNodeCL",
     "BufferOf",
     "CLObject",
     "EmptyBuffer",
@@ -17,7 +18,6 @@ __all__ = [
     "DataPointCL",
     "MaterialCL",
     "PhotonCL",
-    "SeedCL",
     "SolidCandidateCL",
     "SolidCL",
     "SolidCLInfo",
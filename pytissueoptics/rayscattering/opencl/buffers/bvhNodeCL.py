@@ -0,0 +1,38 @@
+import numpy as np
+
+from .CLObject import CLObject, cl
+
+
+class BVHNodeCL(CLObject):
+    """
+    Flattened bounding volume hierarchy nodes in depth-first order. An inner node has a `count` of 0, its left child
+    is the next node and its right child is at `firstID`. A leaf node references `count` polygons starting at
+    `firstID` in the list of BVH polygon IDs.
+    """
+
+    STRUCT_NAME = "BVHNode"
+    STRUCT_DTYPE = np.dtype(
+        [
+            ("bbox_min", cl.cltypes.float3),
+            ("bbox_max", cl.cltypes.float3),
+            ("firstID", cl.cltypes.uint),
+            ("count", cl.cltypes.uint),
+        ]
+    )
+
+    def __init__(self, bboxMin: np.ndarray, bboxMax: np.ndarray, firstIDs: np.ndarray, counts: np.ndarray):
+        self._bboxMin = bboxMin
+        self._bboxMax = bboxMax
+        self._firstIDs = firstIDs
+        self._counts = counts
+        super().__init__(buildOnce=True)
+
+    def _getInitialHostBuffer(self) -> np.ndarray:
+        bufferSize = max(len(self._firstIDs), 1)
+        buffer = np.zeros(bufferSize, dtype=self._dtype)
+        for i, axis in enumerate("xyz"):
+            buffer["bbox_min"][axis][: len(self._bboxMin)] = self._bboxMin[:, i]
+            buffer["bbox_max"][axis][: len(self._bboxMax)] = self._bboxMax[:, i]
+        buffer["firstID"][: len(self._firstIDs)] = self._firstIDs
+        buffer["count"][: len(self._counts)] = self._counts
+        return buffer
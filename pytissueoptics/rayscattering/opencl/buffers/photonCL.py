@@ -1,3 +1,5 @@
+from typing import Optional
+
 import numpy as np
 from numpy.lib import recfunctions as rfn
 
@@ -18,28 +20,41 @@ class PhotonCL(CLObject):
             ("solidID", cl.cltypes.int),
             ("lastIntersectedDetectorID", cl.cltypes.int),
             ("ID", cl.cltypes.uint),
+            ("distanceLeft", cl.cltypes.float),
+            ("randomCounter", cl.cltypes.uint),
         ]
     )
 
     def __init__(
-        self, positions: np.ndarray, directions: np.ndarray, materialID: int, solidID: int, weight=1.0, startID=0
+        self,
+        positions: Optional[np.ndarray],
+        directions: Optional[np.ndarray],
+        materialID: int,
+        solidID: int,
+        weight=1.0,
+        startID=0,
+        N: int = None,
+        buildOnce: bool = False,
     ):
+        """Without `positions` and `directions`, the N photons are left at the origin with no direction, to be
+        initialized on the device."""
         self._positions = positions
         self._directions = directions
-        self._N = positions.shape[0]
+        self._N = positions.shape[0] if positions is not None else N
         self._materialID = materialID
         self._solidID = solidID
         self._weight = weight
         self._startID = startID
 
-        super().__init__()
+        super().__init__(buildOnce=buildOnce)
 
     def _getInitialHostBuffer(self) -> np.ndarray:
         buffer = np.zeros(self._N, dtype=self._dtype)
-        buffer = rfn.structured_to_unstructured(buffer)
-        buffer[:, 0:3] = self._positions
-        buffer[:, 4:7] = self._directions
-        buffer = rfn.unstructured_to_structured(buffer, self._dtype)
+        if self._positions is not None:
+            buffer = rfn.structured_to_unstructured(buffer)
+            buffer[:, 0:3] = self._positions
+            buffer[:, 4:7] = self._directions
+            buffer = rfn.unstructured_to_structured(buffer, self._dtype)
         buffer["weight"] = self._weight
         buffer["materialID"] = self._materialID
         buffer["solidID"] = self._solidID
@@ -6,7 +6,9 @@ from pytissueoptics.scene.geometry import BoundingBox
 
 from .CLObject import CLObject, cl
 
-SolidCLInfo = NamedTuple("SolidInfo", [("bbox", BoundingBox), ("firstSurfaceID", int), ("lastSurfaceID", int)])
+SolidCLInfo = NamedTuple(
+    "SolidInfo", [("bbox", BoundingBox), ("firstSurfaceID", int), ("lastSurfaceID", int), ("bvhRootID", int)]
+)
 
 
 class SolidCL(CLObject):
@@ -17,6 +19,7 @@ class SolidCL(CLObject):
             ("bbox_max", cl.cltypes.float3),
             ("firstSurfaceID", cl.cltypes.uint),
             ("lastSurfaceID", cl.cltypes.uint),
+            ("bvhRootID", cl.cltypes.uint),
         ]
     )
 
@@ -36,4 +39,5 @@ class SolidCL(CLObject):
             buffer[i]["bbox_max"][2] = np.float32(solidInfo.bbox.zMax)
             buffer[i]["firstSurfaceID"] = np.uint32(solidInfo.firstSurfaceID)
             buffer[i]["lastSurfaceID"] = np.uint32(solidInfo.lastSurfaceID)
+            buffer[i]["bvhRootID"] = np.uint32(solidInfo.bvhRootID)
         return buffer
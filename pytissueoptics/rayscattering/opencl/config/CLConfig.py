@@ -25,6 +25,7 @@ OPENCL_SOURCE_DIR = os.path.join(OPENCL_PATH, "src")
 
 OPENCL_CONFIG_PATH = os.path.join(OPENCL_PATH, "config.json")
 OPENCL_CONFIG_RELPATH = os.path.relpath(OPENCL_CONFIG_PATH, MODULE_PATH)
+OPENCL_CACHE_DIR = os.path.join(OPENCL_PATH, "programCache")
 
 DEFAULT_CONFIG = {
     "DEVICE_INDEX": None,
@@ -44,6 +45,7 @@ class CLConfig:
 
     def __init__(self):
         self._config = None
+        self._contexts = {}
         self._load()
 
         try:
@@ -277,7 +279,11 @@ class CLConfig:
 
     @property
     def clContext(self):
-        return cl.Context([self.device])
+        # The context is reused across programs so that compiled programs can be cached in memory.
+        device = self.device
+        if device.int_ptr not in self._contexts:
+            self._contexts[device.int_ptr] = cl.Context([device])
+        return self._contexts[device.int_ptr]
 
     def showAvailableDevices(self):
         print("Available devices:")
@@ -0,0 +1,116 @@
+__constant uint GRID_LIMITS_SIZE = 6;  // (minX, minY, minZ, maxX, maxY, maxZ)
+__constant uint GRID_SHAPE_SIZE = 5;  // (binsX, binsY, binsZ, signFilter, offset)
+
+struct Logger {
+    __global DataPoint *dataPoints;
+    bool isBinning;
+    uint nSurfaces;
+    __global float *gridLimits;
+    __global int *gridShapes;
+    __global uint *keyGridOffsets;
+    __global uint *keyGridIDs;
+    __global float *keyGridScales;
+    __global float *bins;
+    __global uint *seenKeys;
+    __global uint *keyBalanceIDs;
+    uint nBalanceKeys;
+    __global float2 *keyEnergies;
+    uint gid;
+};
+
+typedef struct Logger Logger;
+
+Logger dataPointLogger(__global DataPoint *dataPoints){
+    Logger logger = {dataPoints, false, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0};
+    return logger;
+}
+
+void atomicAddFloat(volatile __global float *address, float value){
+    union {
+        uint intValue;
+        float floatValue;
+    } expected, next;
+    do {
+        expected.floatValue = *address;
+        next.floatValue = expected.floatValue + value;
+    } while (atomic_cmpxchg((volatile __global uint *)address, expected.intValue, next.intValue) != expected.intValue);
+}
+
+void compensatedAdd(__global float2 *sum, float value){
+    /*
+    Kahan summation: `sum.x` is the running sum and `sum.y` the opposite of its lost low-order part, so that the
+    corrected sum is `sum.x - sum.y`.
+    */
+    float2 current = *sum;
+    float y = value - current.y;
+    float t = current.x + y;
+    current.y = (t - current.x) - y;
+    current.x = t;
+    *sum = current;
+}
+
+void binDataPoint(Logger *logger, float3 position, float value, int solidID, int surfaceID){
+    /*
+    Adds the value to every 3D histogram (grid) that tracks this interaction key. A 2D view is a grid with a single
+    bin along its projection axis. The value is dropped when outside the grid limits, like np.histogramdd.
+    The negative and positive values of each interaction key are also summed for the energy balance. Each work item
+    has its own compensated sums, so no atomics are needed, and they are reduced in double precision on the host.
+    */
+    uint keyID = (solidID + 1) * (logger->nSurfaces + 1) + (surfaceID + 1);
+    logger->seenKeys[keyID] = 1;
+    uint balanceID = logger->gid * logger->nBalanceKeys + logger->keyBalanceIDs[keyID];
+    compensatedAdd(&logger->keyEnergies[2 * balanceID + (value >= 0)], value);
+
+    float coordinates[3] = {position.x, position.y, position.z};
+    for (uint i = logger->keyGridOffsets[keyID]; i < logger->keyGridOffsets[keyID + 1]; i++){
+        uint gridID = logger->keyGridIDs[i];
+        __global float *limits = logger->gridLimits + gridID * GRID_LIMITS_SIZE;
+        __global int *shape = logger->gridShapes + gridID * GRID_SHAPE_SIZE;
+
+        float gridValue = value * logger->keyGridScales[i];
+        int signFilter = shape[3];
+        if ((signFilter > 0 && gridValue <= 0) || (signFilter < 0 && gridValue >= 0)){
+            continue;
+        }
+        if (signFilter < 0){
+            gridValue = -gridValue;
+        }
+
+        int binID = 0;
+        bool isInside = true;
+        for (uint axis = 0; axis < 3; axis++){
+            float minValue = limits[axis];
+            float maxValue = limits[3 + axis];
+            int nBins = shape[axis];
+            if (!(coordinates[axis] >= minValue && coordinates[axis] <= maxValue)){
+                isInside = false;
+                break;
+            }
+            int axisBinID = 0;
+            if (nBins > 1){
+                axisBinID = min((int)((coordinates[axis] - minValue) / (maxValue - minValue) * nBins), nBins - 1);
+            }
+            binID = binID * nBins + axisBinID;
+        }
+        if (isInside){
+            atomicAddFloat(&logger->bins[shape[4] + binID], gridValue);
+        }
+    }
+}
+
+void logDataPoint(Logger *logger, uint *logIndex, float3 position, float deltaWeight, int solidID, int surfaceID,
+                  uint photonID){
+    if (logger->isBinning){
+        binDataPoint(logger, position, deltaWeight, solidID, surfaceID);
+    } else {
+        __global DataPoint *dataPoint = &logger->dataPoints[*logIndex];
+        dataPoint->x = position.x;
+        dataPoint->y = position.y;
+        dataPoint->z = position.z;
+        dataPoint->delta_weight = deltaWeight;
+        dataPoint->solidID = solidID;
+        dataPoint->surfaceID = surfaceID;
+        dataPoint->photonID = photonID;
+    }
+    (*logIndex)++;
+}
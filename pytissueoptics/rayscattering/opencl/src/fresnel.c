@@ -37,9 +37,9 @@ float _getReflectionCoefficient(float n1, float n2, float thetaIn) {
     return 0.5 * sam * sam * (cap * cap + cam * cam) / (sap * sap * cam * cam);
 }
 
-bool _getIsReflected(float nIn, float nOut, float thetaIn, __global uint *seeds, uint gid) {
+bool _getIsReflected(float nIn, float nOut, float thetaIn, Random *random) {
     float R = _getReflectionCoefficient(nIn, nOut, thetaIn);
-    float randomFloat = getRandomFloatValue(seeds, gid);
+    float randomFloat = getRandomFloatValue(random);
     if (R >= randomFloat) {
         return true;
     }
@@ -57,8 +57,8 @@ float _getRefractionDeflection(float nIn, float nOut, float thetaIn) {
 }
 
 void _createFresnelIntersection(FresnelIntersection* fresnelIntersection,
-                                float nIn, float nOut, float thetaIn, __global uint *seeds, uint gid) {
-    fresnelIntersection->isReflected = _getIsReflected(nIn, nOut, thetaIn, seeds, gid);
+                                float nIn, float nOut, float thetaIn, Random *random) {
+    fresnelIntersection->isReflected = _getIsReflected(nIn, nOut, thetaIn, random);
 
     if (fresnelIntersection->isReflected) {
         fresnelIntersection->angleDeflection = _getReflectionDeflection(thetaIn);
@@ -68,7 +68,7 @@ void _createFresnelIntersection(FresnelIntersection* fresnelIntersection,
 }
 
 FresnelIntersection computeFresnelIntersection(float3 rayDirection, Intersection *intersection,
-        __constant Material *materials, __global Surface *surfaces, __global uint *seeds, uint gid) {
+        __constant Material *materials, __global Surface *surfaces, Random *random) {
     FresnelIntersection fresnelIntersection;
     float3 normal = intersection->normal;
 
@@ -97,7 +97,7 @@ FresnelIntersection computeFresnelIntersection(float3 rayDirection, Intersection
 
     float thetaIn = acos(clamp(dot(normal, rayDirection), -1.0f, 1.0f));
 
-    _createFresnelIntersection(&fresnelIntersection, nIn, nOut, thetaIn, seeds, gid);
+    _createFresnelIntersection(&fresnelIntersection, nIn, nOut, thetaIn, random);
 
     return fresnelIntersection;
 }
@@ -117,11 +117,12 @@ Intersection getLocalIntersection(__global Intersection *intersections, uint gid
 }
 
 __kernel void computeFresnelIntersectionKernel(float3 rayDirection, __global Intersection *intersections,
-        __constant Material *materials, __global Surface *surfaces, __global uint *seeds,
+        __constant Material *materials, __global Surface *surfaces, ulong seed,
         __global FresnelIntersection *fresnelIntersections) {
     uint gid = get_global_id(0);
     Intersection localIntersection = getLocalIntersection(intersections, gid);
-    fresnelIntersections[gid] = computeFresnelIntersection(rayDirection, &localIntersection, materials, surfaces, seeds, gid);
+    Random random = getRandom(seed, PROPAGATION_STREAM, gid, 0);
+    fresnelIntersections[gid] = computeFresnelIntersection(rayDirection, &localIntersection, materials, surfaces, &random);
 }
 
 struct FloatContainer {
@@ -3,6 +3,8 @@ __constant float EPS_BACK_CATCH = 2e-6f;
 __constant float EPS_PARALLEL = 1e-6f;
 __constant float EPS_SIDE = 3e-6f;
 __constant float EPS = 1e-7;
+__constant float EPS_BVH = 1e-5f;
+#define BVH_STACK_SIZE 64
 
 struct Intersection {
     uint exists;
@@ -41,6 +43,9 @@ struct Scene{
     __global Triangle *triangles;
     __global Vertex *vertices;
     __global SolidCandidate *solidCandidates;
+    __global BVHNode *bvhNodes;
+    __global uint *bvhPolygonIDs;
+    __global uint *polygonSurfaceIDs;
 };
 
 typedef struct Scene Scene;
@@ -249,33 +254,74 @@ HitPoint _getTriangleIntersection(Ray ray, float3 v1, float3 v2, float3 v3, floa
     return hitPoint;
 }
 
-Intersection _findClosestPolygonIntersection(Ray ray, uint solidID,
-                                            __global Solid *solids, __global Surface *surfaces,
-                                            __global Triangle *triangles, __global Vertex *vertices,
-                                            uint photonSolidID) {
+bool _rayIntersectsBVHNode(Ray ray, float3 invDirection, __global BVHNode *node) {
+    /*
+    Slab test of the ray segment (with a small margin for the catch zones of the triangle intersection).
+    */
+    float3 t1 = (node->bbox_min - ray.origin) * invDirection;
+    float3 t2 = (node->bbox_max - ray.origin) * invDirection;
+    float3 tNear = fmin(t1, t2);
+    float3 tFar = fmax(t1, t2);
+    float tEnter = fmax(fmax(tNear.x, tNear.y), fmax(tNear.z, -EPS_BVH));
+    float tExit = fmin(fmin(tFar.x, tFar.y), fmin(tFar.z, ray.length + EPS_BVH));
+    return tEnter <= tExit;
+}
+
+Intersection _findClosestPolygonIntersection(Ray ray, uint solidID, Scene *scene, uint photonSolidID) {
+    /*
+    Traverses the bounding volume hierarchy of the solid to only test the triangles near the ray.
+    */
     Intersection intersection;
     intersection.exists = false;
     intersection.distance = INFINITY;
 
     float minSameSolidDistance = -INFINITY;
 
-    for (uint s = solids[solidID-1].firstSurfaceID; s <= solids[solidID-1].lastSurfaceID; s++) {
-        // When an interface joins a side surface, an outside photon could try to intersect with the interface
-        //  while this is not allowed. So we skip these tests (where surface environments dont match the photon).
-        if (photonSolidID != surfaces[s].insideSolidID && photonSolidID != surfaces[s].outsideSolidID) {
+    // Avoid infinite (and NaN) slab distances along the axes where the ray direction is null.
+    float3 safeDirection = select(ray.direction, copysign((float3)(1e-20f), ray.direction),
+                                  isless(fabs(ray.direction), (float3)(1e-20f)));
+    float3 invDirection = 1.0f / safeDirection;
+
+    uint stack[BVH_STACK_SIZE];
+    uint stackSize = 0;
+    stack[stackSize++] = scene->solids[solidID-1].bvhRootID;
+
+    while (stackSize > 0) {
+        uint nodeID = stack[--stackSize];
+        __global BVHNode *node = &scene->bvhNodes[nodeID];
+        if (!_rayIntersectsBVHNode(ray, invDirection, node)) {
             continue;
         }
 
-        for (uint p = surfaces[s].firstPolygonID; p <= surfaces[s].lastPolygonID; p++) {
-            uint vertexIDs[3] = {triangles[p].vertexIDs[0], triangles[p].vertexIDs[1], triangles[p].vertexIDs[2]};
-            HitPoint hitPoint = _getTriangleIntersection(ray, vertices[vertexIDs[0]].position, vertices[vertexIDs[1]].position, vertices[vertexIDs[2]].position, triangles[p].normal);
+        if (node->count == 0) {
+            // Inner node: the left child directly follows its parent.
+            stack[stackSize++] = node->firstID;
+            stack[stackSize++] = nodeID + 1;
+            continue;
+        }
+
+        for (uint i = node->firstID; i < node->firstID + node->count; i++) {
+            uint p = scene->bvhPolygonIDs[i];
+            uint s = scene->polygonSurfaceIDs[p];
+
+            // When an interface joins a side surface, an outside photon could try to intersect with the interface
+            //  while this is not allowed. So we skip these tests (where surface environments dont match the photon).
+            if (photonSolidID != scene->surfaces[s].insideSolidID && photonSolidID != scene->surfaces[s].outsideSolidID) {
+                continue;
+            }
+
+            __global Triangle *triangle = &scene->triangles[p];
+            HitPoint hitPoint = _getTriangleIntersection(ray, scene->vertices[triangle->vertexIDs[0]].position,
+                                                         scene->vertices[triangle->vertexIDs[1]].position,
+                                                         scene->vertices[triangle->vertexIDs[2]].position,
+                                                         triangle->normal);
 
             if (!hitPoint.exists) {
                 continue;
             }
 
-            bool isGoingInside = dot(ray.direction, triangles[p].normal) < 0;
-            uint nextSolidID = isGoingInside ? surfaces[s].insideSolidID : surfaces[s].outsideSolidID;
+            bool isGoingInside = dot(ray.direction, triangle->normal) < 0;
+            uint nextSolidID = isGoingInside ? scene->surfaces[s].insideSolidID : scene->surfaces[s].outsideSolidID;
             if (nextSolidID == photonSolidID) {
                 if (hitPoint.distance > minSameSolidDistance) {
                     minSameSolidDistance = hitPoint.distance;
@@ -283,11 +329,14 @@ Intersection _findClosestPolygonIntersection(Ray ray, uint solidID,
                 continue;
             }
 
-            if (fabs(hitPoint.distance) < fabs(intersection.distance)) {
+            // Ties are resolved by polygon ID to keep the result independent of the traversal order.
+            float hitDistance = fabs(hitPoint.distance);
+            float closestDistance = fabs(intersection.distance);
+            if (hitDistance < closestDistance || (hitDistance == closestDistance && p < intersection.polygonID)) {
                 intersection.exists = true;
                 intersection.distance = hitPoint.distance;
                 intersection.position = hitPoint.position;
-                intersection.normal = triangles[p].normal;
+                intersection.normal = triangle->normal;
                 intersection.surfaceID = s;
                 intersection.polygonID = p;
             }
@@ -409,7 +458,7 @@ Intersection findIntersection(Ray ray, Scene *scene, uint gid, uint photonSolidI
         }
 
         uint solidID = scene->solidCandidates[boxGID].solidID;
-        Intersection intersection = _findClosestPolygonIntersection(ray, solidID, scene->solids, scene->surfaces, scene->triangles, scene->vertices, photonSolidID);
+        Intersection intersection = _findClosestPolygonIntersection(ray, solidID, scene, photonSolidID);
         if (intersection.exists && intersection.distance < closestIntersection.distance) {
             closestIntersection = intersection;
         }
@@ -422,9 +471,12 @@ Intersection findIntersection(Ray ray, Scene *scene, uint gid, uint photonSolidI
 // ----------------- TEST KERNELS -----------------
 
 __kernel void findIntersections(__global Ray *rays, uint nSolids, __global Solid *solids, __global Surface *surfaces,
-        __global Triangle *triangles, __global Vertex *vertices, __global SolidCandidate *solidCandidates, __global Intersection *intersections) {
+        __global Triangle *triangles, __global Vertex *vertices, __global SolidCandidate *solidCandidates,
+        __global BVHNode *bvhNodes, __global uint *bvhPolygonIDs, __global uint *polygonSurfaceIDs,
+        __global Intersection *intersections) {
     uint gid = get_global_id(0);
-    Scene scene = {nSolids, solids, surfaces, triangles, vertices, solidCandidates};
+    Scene scene = {nSolids, solids, surfaces, triangles, vertices, solidCandidates, bvhNodes, bvhPolygonIDs,
+                   polygonSurfaceIDs};
     intersections[gid] = findIntersection(rays[gid], &scene, gid, -1, 0);
 }
 
@@ -3,6 +3,7 @@
 #include "scatteringMaterial.c"
 #include "intersection.c"
 #include "fresnel.c"
+#include "energyLogging.c"
 
 __constant int NULL_SOLID_ID = 0;
 __constant int WORLD_SOLID_ID = -1;
@@ -27,36 +28,30 @@ void decreaseWeightBy(float delta_weight, __global Photon *photons, uint photonI
     photons[photonID].weight -= delta_weight;
 }
 
-void interact(__global Photon *photons, __constant Material *materials, __global DataPoint *logger,
-              uint logIndex, uint photonID){
+void interact(__global Photon *photons, __constant Material *materials, Logger *logger,
+              uint *logIndex, uint photonID){
     float delta_weight = photons[photonID].weight * materials[photons[photonID].materialID].albedo;
     decreaseWeightBy(delta_weight, photons, photonID);
-    logger[logIndex].x = photons[photonID].position.x;
-    logger[logIndex].y = photons[photonID].position.y;
-    logger[logIndex].z = photons[photonID].position.z;
-    logger[logIndex].delta_weight = delta_weight;
-    logger[logIndex].solidID = photons[photonID].solidID;
-    logger[logIndex].surfaceID = NO_SURFACE_ID;
-    logger[logIndex].photonID = photons[photonID].ID;
+    logDataPoint(logger, logIndex, photons[photonID].position, delta_weight, photons[photonID].solidID,
+                 NO_SURFACE_ID, photons[photonID].ID);
 }
 
-void scatter(__global Photon *photons, __constant Material *materials, __global uint *seeds, __global DataPoint *logger,
-             uint *logIndex, uint gid, uint photonID){
+void scatter(__global Photon *photons, __constant Material *materials, Random *random, Logger *logger,
+             uint *logIndex, uint photonID){
 
-    float rndPhi = getRandomFloatValue(seeds, gid);
-    float rndTheta = getRandomFloatValue(seeds, gid);
+    float rndPhi = getRandomFloatValue(random);
+    float rndTheta = getRandomFloatValue(random);
     ScatteringAngles angles = getScatteringAngles(rndPhi, rndTheta, photons, materials, photonID);
 
     scatterBy(angles.phi, angles.theta, photons, photonID);
-    interact(photons, materials, logger, *logIndex, photonID);
-    (*logIndex)++;
+    interact(photons, materials, logger, logIndex, photonID);
 }
 
-void roulette(float weightThreshold, __global Photon *photons, __global uint *seeds, uint gid, uint photonID){
+void roulette(float weightThreshold, __global Photon *photons, Random *random, uint photonID){
     if (photons[photonID].weight >= weightThreshold || photons[photonID].weight == 0){
         return;
     }
-    float randomFloat = getRandomFloatValue(seeds, gid);
+    float randomFloat = getRandomFloatValue(random);
     if (randomFloat < 0.1){
         photons[photonID].weight /= 0.1;
     }
@@ -74,37 +69,22 @@ void refract(FresnelIntersection *fresnelIntersection, __global Photon *photons,
 }
 
 void logIntersection(Intersection *intersection, __global Photon *photons, __global Surface *surfaces,
-                    __global DataPoint *logger, uint *logIndex, uint photonID){
-    uint logID = *logIndex;
-    logger[logID].x = photons[photonID].position.x;
-    logger[logID].y = photons[photonID].position.y;
-    logger[logID].z = photons[photonID].position.z;
-    logger[logID].surfaceID = intersection->surfaceID;
-    logger[logID].solidID = surfaces[intersection->surfaceID].insideSolidID;
-    logger[logID].photonID = photons[photonID].ID;
-
+                    Logger *logger, uint *logIndex, uint photonID){
     bool isLeavingSurface = dot(photons[photonID].direction, intersection->normal) > 0;
     int sign = isLeavingSurface ? 1 : -1;
-    logger[logID].delta_weight = sign * photons[photonID].weight;
-    (*logIndex)++;
+    logDataPoint(logger, logIndex, photons[photonID].position, sign * photons[photonID].weight,
+                 surfaces[intersection->surfaceID].insideSolidID, intersection->surfaceID, photons[photonID].ID);
 
     int outsideSolidID = surfaces[intersection->surfaceID].outsideSolidID;
     if (outsideSolidID == WORLD_SOLID_ID){
         return;
     }
-    logID++;
-    logger[logID].x = photons[photonID].position.x;
-    logger[logID].y = photons[photonID].position.y;
-    logger[logID].z = photons[photonID].position.z;
-    logger[logID].surfaceID = intersection->surfaceID;
-    logger[logID].solidID = outsideSolidID;
-    logger[logID].delta_weight = -sign * photons[photonID].weight;
-    logger[logID].photonID = photons[photonID].ID;
-    (*logIndex)++;
+    logDataPoint(logger, logIndex, photons[photonID].position, -sign * photons[photonID].weight,
+                 outsideSolidID, intersection->surfaceID, photons[photonID].ID);
 }
 
 bool detectOrIgnore(Intersection *intersection, __global Photon *photons, __global Surface *surfaces,
-    __global DataPoint *logger, uint *logIndex, uint gid, uint photonID){
+    Logger *logger, uint *logIndex, uint gid, uint photonID){
     // If the incidence angle is within the numerical aperture, absorb photon.
     float cosIncidence = -1 * dot(intersection->normal, photons[photonID].direction);
     float cosDetector = surfaces[intersection->surfaceID].detectorCosine;
@@ -113,14 +93,8 @@ bool detectOrIgnore(Intersection *intersection, __global Photon *photons, __glob
         return false;  // Outside NA, ignore.
     }
 
-    logger[*logIndex].x = photons[photonID].position.x;
-    logger[*logIndex].y = photons[photonID].position.y;
-    logger[*logIndex].z = photons[photonID].position.z;
-    logger[*logIndex].solidID = surfaces[intersection->surfaceID].insideSolidID;
-    logger[*logIndex].delta_weight = photons[photonID].weight;
-    logger[*logIndex].surfaceID = NO_SURFACE_ID;
-    logger[*logIndex].photonID = photons[photonID].ID;
-    (*logIndex)++;
+    logDataPoint(logger, logIndex, photons[photonID].position, photons[photonID].weight,
+                 surfaces[intersection->surfaceID].insideSolidID, NO_SURFACE_ID, photons[photonID].ID);
 
     // Absorb photon.
     photons[photonID].weight = 0;
@@ -128,9 +102,9 @@ bool detectOrIgnore(Intersection *intersection, __global Photon *photons, __glob
 }
 
 float reflectOrRefract(Intersection *intersection, __global Photon *photons, __constant Material *materials,
-        __global Surface *surfaces, __global DataPoint *logger, uint *logIndex, __global uint *seeds, uint gid, uint photonID){
+        __global Surface *surfaces, Logger *logger, uint *logIndex, Random *random, uint photonID){
     FresnelIntersection fresnelIntersection = computeFresnelIntersection(photons[photonID].direction, intersection,
-                                                                         materials, surfaces, seeds, gid);
+                                                                         materials, surfaces, random);
 
     if (fresnelIntersection.isReflected) {
         if (intersection->isSmooth) {
@@ -171,11 +145,11 @@ float reflectOrRefract(Intersection *intersection, __global Photon *photons, __c
 }
 
 float propagateStep(float distance, __global Photon *photons, __constant Material *materials, Scene *scene,
-                    __global uint *seeds, __global DataPoint *logger, uint *logIndex, uint gid, uint photonID){
+                    Random *random, Logger *logger, uint *logIndex, uint gid, uint photonID){
 
     if (distance <= 0) {
         float mu_t = materials[photons[photonID].materialID].mu_t;
-        float randomNumber = getRandomFloatValue(seeds, gid);
+        float randomNumber = getRandomFloatValue(random);
         distance += getScatteringDistance(mu_t, randomNumber);
         if (distance < 0){
             // Not really possible until mu_t is very high (> 1000) and intense smoothing is applied (order-1 spheres).
@@ -203,7 +177,7 @@ float propagateStep(float distance, __global Photon *photons, __constant Materia
             // Skipping vertex check for now.
             return intersection.distanceLeft;
         } else {
-            distanceLeft = reflectOrRefract(&intersection, photons, materials, scene->surfaces, logger, logIndex, seeds, gid, photonID);
+            distanceLeft = reflectOrRefract(&intersection, photons, materials, scene->surfaces, logger, logIndex, random, photonID);
         }
 
         // Check if intersection lies too close to a vertex.
@@ -235,7 +209,7 @@ float propagateStep(float distance, __global Photon *photons, __constant Materia
 
         moveBy(distance, photons, photonID);
 
-        scatter(photons, materials, seeds, logger, logIndex, gid, photonID);
+        scatter(photons, materials, random, logger, logIndex, photonID);
     }
 
     return distanceLeft;
@@ -243,15 +217,30 @@ float propagateStep(float distance, __global Photon *photons, __constant Materia
 
 __kernel void propagate(uint maxPhotons, uint maxInteractions, float weightThreshold, uint workUnitsAmount, __global Photon *photons,
             __constant Material *materials, uint nSolids, __global Solid *solids, __global Surface *surfaces, __global Triangle *triangles,
-            __global Vertex *vertices, __global SolidCandidate *solidCandidates, __global uint *seeds, __global DataPoint *logger){
+            __global Vertex *vertices, __global SolidCandidate *solidCandidates, __global BVHNode *bvhNodes,
+            __global uint *bvhPolygonIDs, __global uint *polygonSurfaceIDs, ulong seed, __global DataPoint *dataPoints,
+            uint isBinning, uint nSurfaces, __global float *gridLimits, __global int *gridShapes, __global uint *keyGridOffsets,
+            __global uint *keyGridIDs, __global float *keyGridScales, __global float *bins, __global uint *seenKeys,
+            __global uint *keyBalanceIDs, uint nBalanceKeys, __global float2 *keyEnergies,
+            __global ulong *interactionCounts){
     /*
     OpenCL implementation of the Python module Photon.
     See the Python module documentation for more details.
-    */
 
-    Scene scene = {nSolids, solids, surfaces, triangles, vertices, solidCandidates};
+    When binning, the interactions are added to the histogram bins instead of being logged as data points, so the
+    number of interactions is not limited by the size of the data point buffer.
+
+    The random numbers of each photon are drawn from its own stream, keyed by the seed and the photon ID. When the data
+    point buffer is full, the position in this stream and the distance left to travel are saved in the photon, so that
+    its propagation resumes in a later batch exactly as if it had not been interrupted.
+    */
 
+    Scene scene = {nSolids, solids, surfaces, triangles, vertices, solidCandidates, bvhNodes, bvhPolygonIDs,
+                   polygonSurfaceIDs};
     uint gid = get_global_id(0);
+    Logger logger = {dataPoints, isBinning, nSurfaces, gridLimits, gridShapes, keyGridOffsets, keyGridIDs,
+                     keyGridScales, bins, seenKeys, keyBalanceIDs, nBalanceKeys, keyEnergies, gid};
+
     uint logIndex = gid * maxInteractions;
     uint maxLogIndex = logIndex + maxInteractions;
 
@@ -259,19 +248,29 @@ __kernel void propagate(uint maxPhotons, uint maxInteractions, float weightThres
 
     while (photonCount < maxPhotons){
         uint currentPhotonIndex = gid + (photonCount * workUnitsAmount);
-        photons[currentPhotonIndex].er = getAnyOrthogonalGlobal(&photons[currentPhotonIndex].direction);
+        Random random = getRandom(seed, PROPAGATION_STREAM, photons[currentPhotonIndex].ID,
+                                  photons[currentPhotonIndex].randomCounter);
+        if (random.counter == 0){
+            photons[currentPhotonIndex].er = getAnyOrthogonalGlobal(&photons[currentPhotonIndex].direction);
+        }
 
-        float distance = 0;
+        float distance = photons[currentPhotonIndex].distanceLeft;
         while (photons[currentPhotonIndex].weight != 0){
-            if (logIndex >= (maxLogIndex -1)){  // Added -1 to avoid potential overflow when intersection logs twice
+            if (!logger.isBinning && logIndex >= (maxLogIndex -1)){  // Added -1 to avoid potential overflow when intersection logs twice
+                photons[currentPhotonIndex].distanceLeft = distance;
+                photons[currentPhotonIndex].randomCounter = random.counter;
                 return;
             }
             distance = propagateStep(distance, photons, materials, &scene,
-                                     seeds, logger, &logIndex, gid, currentPhotonIndex);
-            roulette(weightThreshold, photons, seeds, gid, currentPhotonIndex);
+                                     &random, &logger, &logIndex, gid, currentPhotonIndex);
+            roulette(weightThreshold, photons, &random, currentPhotonIndex);
         }
         photonCount++;
     }
+
+    if (logger.isBinning){
+        interactionCounts[gid] += logIndex;
+    }
 }
 
 
@@ -291,8 +290,9 @@ __kernel void decreaseWeightByKernel(float delta_weight, __global Photon *photon
     decreaseWeightBy(delta_weight, photons, photonID);
 }
 
-__kernel void rouletteKernel(float weightThreshold, __global uint *seeds, __global Photon *photons, uint photonID){
-    roulette(weightThreshold, photons, seeds, photonID, photonID);
+__kernel void rouletteKernel(float weightThreshold, ulong seed, __global Photon *photons, uint photonID){
+    Random random = getRandom(seed, PROPAGATION_STREAM, photonID, 0);
+    roulette(weightThreshold, photons, &random, photonID);
 }
 
 __kernel void reflectKernel(float3 incidencePlane, float angleDeflection, __global Photon *photons, uint photonID){
@@ -311,7 +311,8 @@ __kernel void refractKernel(float3 incidencePlane, float angleDeflection, __glob
 
 __kernel void interactKernel(__constant Material *materials, __global DataPoint *logger,
                              uint logIndex, __global Photon *photons, uint photonID){
-    interact(photons, materials, logger, logIndex, photonID);
+    Logger dataLogger = dataPointLogger(logger);
+    interact(photons, materials, &dataLogger, &logIndex, photonID);
 }
 
 __kernel void logIntersectionKernel(float3 normal, int surfaceID, __global Surface *surfaces,
@@ -319,28 +320,33 @@ __kernel void logIntersectionKernel(float3 normal, int surfaceID, __global Surfa
     Intersection intersection;
     intersection.normal = normal;
     intersection.surfaceID = surfaceID;
-    logIntersection(&intersection, photons, surfaces, logger, &logIndex, photonID);
+    Logger dataLogger = dataPointLogger(logger);
+    logIntersection(&intersection, photons, surfaces, &dataLogger, &logIndex, photonID);
 }
 
 __kernel void reflectOrRefractKernel(float3 normal, int surfaceID, float distanceLeft,
                                      __constant Material *materials, __global Surface *surfaces,
-                                     __global DataPoint *logger, uint logIndex, __global uint *seeds,
+                                     __global DataPoint *logger, uint logIndex, ulong seed,
                                      __global Photon *photons, uint photonID){
     Intersection intersection;
     intersection.normal = normal;
     intersection.surfaceID = surfaceID;
     intersection.distanceLeft = distanceLeft;
     intersection.isSmooth = surfaces[surfaceID].toSmooth;
-    reflectOrRefract(&intersection, photons, materials, surfaces, logger, &logIndex, seeds, photonID, photonID);
+    Logger dataLogger = dataPointLogger(logger);
+    Random random = getRandom(seed, PROPAGATION_STREAM, photonID, 0);
+    reflectOrRefract(&intersection, photons, materials, surfaces, &dataLogger, &logIndex, &random, photonID);
 }
 
 __kernel void propagateStepKernel(float distance, __constant Material *materials, __global Surface *surfaces,
-                    __global Triangle *triangles, __global Vertex *vertices, __global uint *seeds, __global DataPoint *logger, uint logIndex,
+                    __global Triangle *triangles, __global Vertex *vertices, ulong seed, __global DataPoint *logger, uint logIndex,
                     __global Photon *photons, uint photonID){
     Scene scene;
     scene.surfaces = surfaces;
     scene.triangles = triangles;
     scene.vertices = vertices;
     uint gid = photonID;
-    propagateStep(distance, photons, materials, &scene, seeds, logger, &logIndex, gid, photonID);
+    Logger dataLogger = dataPointLogger(logger);
+    Random random = getRandom(seed, PROPAGATION_STREAM, photonID, 0);
+    propagateStep(distance, photons, materials, &scene, &random, &dataLogger, &logIndex, gid, photonID);
 }
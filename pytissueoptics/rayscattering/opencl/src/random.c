@@ -1,26 +1,81 @@
+/*
+Counter-based random number generator Philox4x32-10 (Salmon et al., "Parallel random numbers: as easy as 1, 2, 3",
+SC11). Each random value is a pure function of a 64-bit seed, a stream, a photon ID and the number of values already
+drawn for this photon, so the random numbers of a photon do not depend on the work item or batch propagating it. The
+state is kept in private memory and only its counter needs to be saved to resume the stream later.
+*/
 
-uint wangHash(uint seed){
-    seed = (seed ^ 61) ^ (seed >> 16);
-    seed *= 9;
-    seed = seed ^ (seed >> 4);
-    seed *= 0x27d4eb2d;
-    seed = seed ^ (seed >> 15);
-    return seed;
+__constant uint PROPAGATION_STREAM = 0;
+__constant uint SOURCE_STREAM = 1;
+
+__constant uint PHILOX_M0 = 0xD2511F53;
+__constant uint PHILOX_M1 = 0xCD9E8D57;
+__constant uint PHILOX_W0 = 0x9E3779B9;
+__constant uint PHILOX_W1 = 0xBB67AE85;
+
+typedef struct {
+    uint2 key;
+    uint stream;
+    uint photonID;
+    uint counter;
+    uint blockIndex;
+    uint4 block;
+} Random;
+
+uint4 philoxRound(uint4 counter, uint2 key){
+    uint hi0 = mul_hi(PHILOX_M0, counter.x);
+    uint lo0 = PHILOX_M0 * counter.x;
+    uint hi1 = mul_hi(PHILOX_M1, counter.z);
+    uint lo1 = PHILOX_M1 * counter.z;
+    return (uint4)(hi1 ^ counter.y ^ key.x, lo1, hi0 ^ counter.w ^ key.y, lo0);
+}
+
+uint4 philox4x32(uint4 counter, uint2 key){
+    for (uint i = 0; i < 10; i++){
+        if (i > 0){
+            key += (uint2)(PHILOX_W0, PHILOX_W1);
+        }
+        counter = philoxRound(counter, key);
+    }
+    return counter;
 }
 
-float getRandomFloatValue(__global unsigned int *seeds, unsigned int id){
-     float result = 0.0f;
-     while(result == 0.0f){
-         uint rnd_seed = wangHash(seeds[id]);
-         seeds[id] = rnd_seed;
-         result = (float)rnd_seed / (float)UINT_MAX;
-     }
-     return result;
+Random getRandom(ulong seed, uint stream, uint photonID, uint counter){
+    Random random = {(uint2)((uint)seed, (uint)(seed >> 32)), stream, photonID, counter, UINT_MAX, (uint4)(0)};
+    return random;
+}
+
+float getRandomFloatValue(Random *random){
+    /*
+    Returns a random value in ]0, 1]. Each block of 4 values drawn is generated at once.
+    */
+    uint blockIndex = random->counter / 4;
+    if (blockIndex != random->blockIndex){
+        random->block = philox4x32((uint4)(random->photonID, blockIndex, random->stream, 0), random->key);
+        random->blockIndex = blockIndex;
+    }
+    uint values[4] = {random->block.x, random->block.y, random->block.z, random->block.w};
+    uint value = values[random->counter % 4];
+    random->counter++;
+    return ((value >> 8) + 1) * (1.0f / 16777216.0f);
 }
 
 // ----------------- TEST KERNELS -----------------
 
- __kernel void fillRandomFloatBuffer(__global unsigned int *seeds, __global float *randomNumbers){
-    int id = get_global_id(0);
-    randomNumbers[id] = getRandomFloatValue(seeds, id);
+__kernel void fillRandomFloatBuffer(ulong seed, uint firstValue, __global float *randomNumbers){
+    /*
+    Fills the buffer with the values of the propagation stream of the photon of ID equal to the work item,
+    starting at the given value.
+    */
+    uint id = get_global_id(0);
+    Random random = getRandom(seed, PROPAGATION_STREAM, id, firstValue);
+    randomNumbers[id] = getRandomFloatValue(&random);
+}
+
+__kernel void fillPhiloxBlock(uint4 counter, uint2 key, __global uint *values){
+    uint4 block = philox4x32(counter, key);
+    values[0] = block.x;
+    values[1] = block.y;
+    values[2] = block.z;
+    values[3] = block.w;
 }
@@ -0,0 +1,111 @@
+#include "random.c"
+
+__constant uint DIRECTIONAL_SOURCE = 0;
+__constant uint ISOTROPIC_SOURCE = 1;
+__constant int NULL_SOLID_ID = 0;
+
+float3 getUniformlySampledDisc(float diameter, float3 xAxis, float3 yAxis, Random *random){
+    float r = diameter / 2 * sqrt(getRandomFloatValue(random));
+    float theta = getRandomFloatValue(random) * 2 * M_PI_F;
+    return r * cos(theta) * xAxis + r * sin(theta) * yAxis;
+}
+
+float3 getUniformlySampledSphere(Random *random){
+    float z = 2 * getRandomFloatValue(random) - 1;
+    float phi = getRandomFloatValue(random) * 2 * M_PI_F;
+    float r = sqrt(max(0.0f, 1 - z * z));
+    return (float3)(r * cos(phi), r * sin(phi), z);
+}
+
+void initializePhoton(__global Photon *photon, float3 position, float3 direction, uint materialID, int solidID,
+                      uint photonID){
+    photon->position = position;
+    photon->direction = direction;
+    photon->er = (float3)(0, 0, 0);
+    photon->weight = 1;
+    photon->materialID = materialID;
+    photon->solidID = solidID;
+    photon->lastIntersectedDetectorID = NULL_SOLID_ID;
+    photon->ID = photonID;
+    photon->distanceLeft = 0;
+    photon->randomCounter = 0;
+}
+
+__kernel void generatePhotons(uint sourceType, float3 position, float3 direction, float3 xAxis, float3 yAxis,
+                              float diameter, float divergence, uint materialID, int solidID, uint firstID,
+                              uint offset, __global Photon *photons, ulong seed){
+    /*
+    Samples the photons of IDs starting at `firstID` from the source parameters, like the Python sources do with
+    `getInitialPositionsAndDirections`, and writes them in the buffer starting at `offset`. Each photon is sampled from
+    the source stream of its ID, so it does not depend on the batch in which it is generated.
+    */
+    uint gid = get_global_id(0);
+    __global Photon *photon = &photons[offset + gid];
+    Random random = getRandom(seed, SOURCE_STREAM, firstID + gid, 0);
+
+    if (sourceType == ISOTROPIC_SOURCE){
+        initializePhoton(photon, position, getUniformlySampledSphere(&random), materialID, solidID, firstID + gid);
+        return;
+    }
+
+    float3 photonPosition = position + getUniformlySampledDisc(diameter, xAxis, yAxis, &random);
+    float3 photonDirection = direction;
+    if (divergence != 0){
+        float thetaDiameter = tan(divergence / 2) * 2;
+        photonDirection = normalize(direction + getUniformlySampledDisc(thetaDiameter, xAxis, yAxis, &random));
+    }
+    initializePhoton(photon, photonPosition, photonDirection, materialID, solidID, firstID + gid);
+}
+
+__kernel void copyPhotons(uint poolOffset, uint offset, __global Photon *pool, __global Photon *photons){
+    /*
+    Copies the photons of a pool of initial photons, starting at `poolOffset`, in the buffer starting at `offset`.
+    */
+    uint gid = get_global_id(0);
+    photons[offset + gid] = pool[poolOffset + gid];
+}
+
+// ----------------- COMPACTION -----------------
+// The photons still propagating (non-zero weight) are moved to the start of another buffer, in order, so that new
+// photons can be appended after them. Each work item handles a contiguous block of photons: the photons alive in each
+// block are counted, an exclusive prefix sum of these counts gives the offset of each block in the compacted buffer,
+// and each block then copies its photons alive from this offset.
+
+__kernel void countAlivePhotons(uint nPhotons, uint blockSize, __global Photon *photons, __global uint *blockCounts){
+    uint gid = get_global_id(0);
+    uint end = min(nPhotons, (gid + 1) * blockSize);
+    uint count = 0;
+    for (uint i = gid * blockSize; i < end; i++){
+        if (photons[i].weight != 0){
+            count++;
+        }
+    }
+    blockCounts[gid] = count;
+}
+
+__kernel void scanBlockCounts(uint nBlocks, __global uint *blockCounts, __global uint *aliveCount){
+    /*
+    Replaces the block counts by their exclusive prefix sum and writes the total count of photons alive. The number of
+    blocks is small (about one per work unit), so a single work item is used.
+    */
+    uint sum = 0;
+    for (uint i = 0; i < nBlocks; i++){
+        uint count = blockCounts[i];
+        blockCounts[i] = sum;
+        sum += count;
+    }
+    aliveCount[0] = sum;
+}
+
+__kernel void compactPhotons(uint nPhotons, uint blockSize, __global Photon *photons,
+                             __global Photon *compactedPhotons, __global uint *blockOffsets){
+    uint gid = get_global_id(0);
+    uint end = min(nPhotons, (gid + 1) * blockSize);
+    uint compactedIndex = blockOffsets[gid];
+    for (uint i = gid * blockSize; i < end; i++){
+        if (photons[i].weight != 0){
+            compactedPhotons[compactedIndex] = photons[i];
+            compactedIndex++;
+        }
+    }
+}
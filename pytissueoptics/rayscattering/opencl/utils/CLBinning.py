@@ -0,0 +1,135 @@
+from typing import TYPE_CHECKING, List, Optional
+
+import numpy as np
+
+from pytissueoptics.rayscattering.opencl.buffers import BufferOf
+from pytissueoptics.rayscattering.opencl.CLScene import CLScene
+from pytissueoptics.scene.logger import InteractionKey
+
+if TYPE_CHECKING:
+    from pytissueoptics.rayscattering.energyLogging import EnergyLogger
+    from pytissueoptics.rayscattering.opencl.CLProgram import CLProgram
+
+GRID_LIMITS_SIZE = 6
+GRID_SHAPE_SIZE = 5
+
+
+class CLBinning:
+    """
+    Device buffers used by the propagation kernel to bin the interactions directly into the 2D views and the voxel
+    grid of an EnergyLogger, instead of logging every data point. Every grid is represented as a 3D histogram (with a
+    single bin along the projection axis of a 2D view) and each interaction key (solidID, surfaceID) is mapped to the
+    list of grids tracking it, along with the value scale to apply (e.g. for fluence rate). The negative and positive
+    values of each key are also summed to give the energy balance of the logger. These sums are kept per work item
+    (with Kahan compensation) and reduced in float64 on the host, like the interaction counts.
+
+    Without an `energyLogger`, binning is disabled and the buffers are only placeholders for the kernel arguments.
+    """
+
+    def __init__(self, sceneCL: CLScene, nWorkItems: int, energyLogger: "EnergyLogger" = None):
+        self._energyLogger = energyLogger
+        self._sceneCL = sceneCL
+        self.isBinning = np.uint32(energyLogger is not None)
+        self.nSurfaces = np.uint32(sceneCL.nSurfaces)
+
+        self._grids = energyLogger.binningGrids if energyLogger is not None else []
+        self._keys = self._getInteractionKeys()
+        self._gridShapes: List[tuple] = []
+
+        gridLimits, gridShapes = self._makeGrids()
+        keyGridOffsets, keyGridIDs, keyGridScales = self._makeKeyGridMap()
+
+        self.gridLimits = BufferOf(gridLimits, buildOnce=True)
+        self.gridShapes = BufferOf(gridShapes, buildOnce=True)
+        self.keyGridOffsets = BufferOf(keyGridOffsets, buildOnce=True)
+        self.keyGridIDs = BufferOf(keyGridIDs, buildOnce=True)
+        self.keyGridScales = BufferOf(keyGridScales, buildOnce=True)
+        self.bins = BufferOf(np.zeros(max(1, self._nBins), dtype=np.float32), buildOnce=True)
+        self.seenKeys = BufferOf(np.zeros(len(self._keys), dtype=np.uint32), buildOnce=True)
+        self._keyBalanceIDs = self._makeKeyBalanceIDs()
+        self.keyBalanceIDs = BufferOf(self._keyBalanceIDs, buildOnce=True)
+        self.nBalanceKeys = np.uint32(self._keyBalanceIDs.max(initial=0) + 1)
+        # (sum, compensation) of the negative and positive values of each balance key for each work item.
+        self.keyEnergies = BufferOf(
+            np.zeros(nWorkItems * int(self.nBalanceKeys) * 2 * 2, dtype=np.float32), buildOnce=True
+        )
+        self.interactionCounts = BufferOf(np.zeros(nWorkItems, dtype=np.uint64), buildOnce=True)
+
+    def _getInteractionKeys(self) -> List[Optional[InteractionKey]]:
+        """Returns the interaction key of every key ID used by the kernel. Invalid key IDs are set to None."""
+        nSolidIDs = max(self._sceneCL.getSolidIDs()) + 2
+        keys = [None] * (nSolidIDs * (int(self.nSurfaces) + 1))
+        for solidID in self._sceneCL.getSolidIDs():
+            for surfaceID in self._sceneCL.getSurfaceIDs(solidID):
+                key = InteractionKey(
+                    self._sceneCL.getSolidLabel(solidID), self._sceneCL.getSurfaceLabel(solidID, surfaceID)
+                )
+                keys[self._getKeyID(solidID, surfaceID)] = key
+        return keys
+
+    def _getKeyID(self, solidID: int, surfaceID: int) -> int:
+        return (solidID + 1) * (int(self.nSurfaces) + 1) + (surfaceID + 1)
+
+    def _makeKeyBalanceIDs(self) -> np.ndarray:
+        """Index of each key ID in the energy balance of a work item. The balance only has the valid keys, followed by
+        a single unused entry shared by all invalid key IDs, so that its size does not grow with solids x surfaces."""
+        isValid = np.array([key is not None for key in self._keys], dtype=bool)
+        keyBalanceIDs = np.full(len(self._keys), np.count_nonzero(isValid), dtype=np.uint32)
+        keyBalanceIDs[isValid] = np.arange(np.count_nonzero(isValid), dtype=np.uint32)
+        return keyBalanceIDs
+
+    def _makeGrids(self):
+        gridLimits = np.zeros((max(1, len(self._grids)), GRID_LIMITS_SIZE), dtype=np.float32)
+        gridShapes = np.zeros((max(1, len(self._grids)), GRID_SHAPE_SIZE), dtype=np.int32)
+        self._nBins = 0
+        for i, grid in enumerate(self._grids):
+            limits3D, bins3D, sign = grid.getBinningGrid()
+            gridLimits[i, :3] = [limit[0] for limit in limits3D]
+            gridLimits[i, 3:] = [limit[1] for limit in limits3D]
+            gridShapes[i] = [*bins3D, sign, self._nBins]
+            self._gridShapes.append(tuple(bins3D))
+            self._nBins += int(np.prod(bins3D))
+        if self._nBins >= np.iinfo(np.int32).max:
+            raise MemoryError("Too many bins to bin on the device. Consider increasing the bin sizes.")
+        return gridLimits.ravel(), gridShapes.ravel()
+
+    def _makeKeyGridMap(self):
+        """Compressed list of the grids (and their value scale) tracking each key ID, ordered by key ID."""
+        keyGridOffsets, keyGridIDs, keyGridScales = [0], [], []
+        for key in self._keys:
+            if key is not None:
+                for gridID, grid in enumerate(self._grids):
+                    scale = self._energyLogger.getBinningScale(grid, key)
+                    if scale is None:
+                        continue
+                    keyGridIDs.append(gridID)
+                    keyGridScales.append(scale)
+            keyGridOffsets.append(len(keyGridIDs))
+
+        keyGridIDs = keyGridIDs if keyGridIDs else [0]
+        keyGridScales = keyGridScales if keyGridScales else [0]
+        return (
+            np.asarray(keyGridOffsets, dtype=np.uint32),
+            np.asarray(keyGridIDs, dtype=np.uint32),
+            np.asarray(keyGridScales, dtype=np.float32),
+        )
+
+    def toEnergyLogger(self, program: "CLProgram"):
+        """Copies the binned data back from the device and adds it to the energy logger."""
+        bins = program.getData(self.bins)
+        seenKeys = program.getData(self.seenKeys)
+        keyEnergies = program.getData(self.keyEnergies).reshape(-1, int(self.nBalanceKeys), 2, 2).astype(np.float64)
+        keyEnergies = np.sum(keyEnergies[..., 0] - keyEnergies[..., 1], axis=0)
+        nDataPoints = int(np.sum(program.getData(self.interactionCounts)))
+
+        histograms = []
+        offset = 0
+        for shape in self._gridShapes:
+            size = int(np.prod(shape))
+            histograms.append(bins[offset : offset + size].reshape(shape))
+            offset += size
+
+        keyIDs = [i for i in np.nonzero(seenKeys)[0] if self._keys[i] is not None]
+        keys = [self._keys[i] for i in keyIDs]
+        energyBalance = {self._keys[i]: tuple(keyEnergies[self._keyBalanceIDs[i]]) for i in keyIDs}
+        self._energyLogger.logBinnedData(histograms, keys, nDataPoints, energyBalance)
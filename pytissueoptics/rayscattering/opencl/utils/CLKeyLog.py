@@ -1,5 +1,6 @@
-from multiprocessing.pool import ThreadPool
-from typing import List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
 import numpy as np
 
@@ -8,6 +9,18 @@ from pytissueoptics.scene.logger import InteractionKey, Logger
 
 SOLID_ID_COL = 5
 SURFACE_ID_COL = 6
+PARTITION_CHUNK_SIZE = 2**18
+N_PARTITION_WORKERS = min(8, os.cpu_count() or 1)
+
+_partitionExecutor: Optional[ThreadPoolExecutor] = None
+
+
+def _getPartitionExecutor() -> ThreadPoolExecutor:
+    """Worker threads shared by all the key logs, created once instead of for every batch."""
+    global _partitionExecutor
+    if _partitionExecutor is None:
+        _partitionExecutor = ThreadPoolExecutor(max_workers=N_PARTITION_WORKERS, thread_name_prefix="CLKeyLog")
+    return _partitionExecutor
 
 
 class CLKeyLog:
@@ -21,10 +34,9 @@ class CLKeyLog:
         self._log = log
         self._sceneCL = sceneCL
 
-        self._keyIndices = []
         self._keyLog = {}
-
-        self._batchSize = min(50000, len(self._log))
+        self._nSurfaceKeys = int(self._sceneCL.nSurfaces) + 1
+        self._nKeys = (max(self._sceneCL.getSolidIDs()) + 2) * self._nSurfaceKeys
 
         self._extractKeyLog()
 
@@ -36,8 +48,7 @@ class CLKeyLog:
     def _extractKeyLog(self):
         if self._sceneCL.nSolids == 0:
             return self._extractNoKeyLog()
-        self._sortLocal()
-        self._merge()
+        self._partition()
 
     def _extractNoKeyLog(self):
         noInteractionIndices = np.where(self._log[:, SOLID_ID_COL] == NO_LOG_ID)[0]
@@ -45,74 +56,52 @@ class CLKeyLog:
         self._log = np.delete(self._log, noInteractionIndices, axis=0)
         self._keyLog[InteractionKey(WORLD_SOLID_LABEL, None)] = self._log
 
-    def _sortLocal(self):
-        """Sorts the log locally by solidID and surfaceID,
-        and for each local batch, it also extracts start and end indices for each key."""
-
-        pool = ThreadPool(8)
-        try:
-            results = [
-                pool.apply_async(self._sortBatch, args=(batchStartIdx,))
-                for batchStartIdx in range(0, self._log.shape[0], self._batchSize)
-            ]
-            self._keyIndices = [res.get() for res in results]
-        finally:
-            pool.close()
-            pool.join()
-
-    def _sortBatch(self, startIdx: int):
-        ba, bb = startIdx, startIdx + self._batchSize
-        batchLog = self._sort(self._log[ba:bb], columns=[SOLID_ID_COL, SURFACE_ID_COL])
-
-        solidChanges = self._getValueChangeIndices(batchLog, column=SOLID_ID_COL)
-
-        batchKeyIndices = {}
-        for i in range(len(solidChanges) - 1):
-            solidID = batchLog[solidChanges[i], SOLID_ID_COL]
-            if solidID == NO_LOG_ID:
-                continue
-            a, b = solidChanges[i], solidChanges[i + 1]
-            batchSolidLog = batchLog[a:b]
-
-            surfaceChanges = self._getValueChangeIndices(batchSolidLog, column=SURFACE_ID_COL)
-            for j in range(len(surfaceChanges) - 1):
-                surfaceID = batchSolidLog[surfaceChanges[j], SURFACE_ID_COL]
-                c, d = surfaceChanges[j], surfaceChanges[j + 1]
-                batchKeyIndices[(int(solidID), int(surfaceID))] = (a + c, a + d)
-
-            batchLog[a:b] = batchSolidLog
-        self._log[ba:bb] = batchLog
-        return batchKeyIndices
-
-    @staticmethod
-    def _getValueChangeIndices(log: np.ndarray, column: int):
-        """Returns the indices where there is a change in the value of the given column."""
-        indices = np.where(log[:-1, column] != log[1:, column])[0] + 1
-        return np.concatenate(([0], indices, [log.shape[0]]))
-
-    @staticmethod
-    def _sort(log: np.ndarray, columns: List[int]):
-        return log[np.lexsort([log[:, i] for i in columns])]
-
-    def _merge(self):
-        """Merges the local batches into a single key log with unique interaction keys."""
-        self._log = self._log[:, :5]
-
-        for i, batchKeyIndices in enumerate(self._keyIndices):
-            batchStartIndex = i * self._batchSize
-            for keyIDs, indices in batchKeyIndices.items():
-                if len(indices) == 0:
-                    continue
-                a, b = batchStartIndex + indices[0], batchStartIndex + indices[1]
-                points = self._log[a:b]
-                key = self._getInteractionKey(*keyIDs)
-                if key not in self._keyLog:
-                    self._keyLog[key] = [points]
-                else:
-                    self._keyLog[key].append(points)
-
-        for key in self._keyLog:
-            self._keyLog[key] = np.concatenate(self._keyLog[key])
+    def _partition(self):
+        """
+        Groups the data points by interaction key with a counting sort, in the order of the log. The key IDs of each
+        chunk of the log are counted, which gives where the data points of every chunk go in the grouped log, then each
+        chunk is copied to its place. The chunks are processed in parallel by the shared worker threads.
+        """
+        executor = _getPartitionExecutor()
+        starts = range(0, len(self._log), PARTITION_CHUNK_SIZE)
+        chunkKeyIDs = list(executor.map(self._getKeyIDs, starts))
+
+        # Data points without interaction are counted in an extra key ID, which is grouped last and dropped.
+        chunkCounts = np.array([np.bincount(keyIDs, minlength=self._nKeys + 1) for keyIDs in chunkKeyIDs])
+        keyCounts = chunkCounts.sum(axis=0)
+        keyOffsets = np.cumsum(keyCounts) - keyCounts
+        chunkOffsets = keyOffsets + np.cumsum(chunkCounts, axis=0) - chunkCounts
+
+        groupedLog = np.empty((len(self._log), 5), dtype=self._log.dtype)
+        list(
+            executor.map(
+                lambda args: self._copyChunk(groupedLog, *args), zip(starts, chunkKeyIDs, chunkCounts, chunkOffsets)
+            )
+        )
+
+        for keyID in np.nonzero(keyCounts[: self._nKeys])[0]:
+            key = self._getInteractionKey(*self._getKeyIDPair(keyID))
+            self._keyLog[key] = groupedLog[keyOffsets[keyID] : keyOffsets[keyID] + keyCounts[keyID]]
+
+    def _getKeyIDs(self, start: int) -> np.ndarray:
+        chunk = self._log[start : start + PARTITION_CHUNK_SIZE]
+        solidIDs = chunk[:, SOLID_ID_COL].astype(np.int32)
+        keyIDs = (solidIDs + 1) * self._nSurfaceKeys + chunk[:, SURFACE_ID_COL].astype(np.int32) + 1
+        keyIDs[solidIDs == NO_LOG_ID] = self._nKeys
+        # Stable sorts of 16-bit integers are radix sorts, which take linear time.
+        return keyIDs.astype(np.uint16 if self._nKeys < 2**16 else np.uint32)
+
+    def _copyChunk(self, groupedLog: np.ndarray, start: int, keyIDs: np.ndarray, counts: np.ndarray, offsets):
+        chunk = self._log[start : start + PARTITION_CHUNK_SIZE]
+        sortedChunk = np.take(chunk, np.argsort(keyIDs, kind="stable"), axis=0)
+        chunkStart = 0
+        for keyID in np.nonzero(counts)[0]:
+            count = counts[keyID]
+            groupedLog[offsets[keyID] : offsets[keyID] + count] = sortedChunk[chunkStart : chunkStart + count, :5]
+            chunkStart += count
+
+    def _getKeyIDPair(self, keyID: int) -> Tuple[int, int]:
+        return int(keyID // self._nSurfaceKeys) - 1, int(keyID % self._nSurfaceKeys) - 1
 
     def _getInteractionKey(self, solidID: int, surfaceID: int):
         return InteractionKey(self._sceneCL.getSolidLabel(solidID), self._sceneCL.getSurfaceLabel(solidID, surfaceID))
@@ -5,27 +5,38 @@ from pytissueoptics.rayscattering.opencl import CONFIG, warnings
 from pytissueoptics.rayscattering.opencl.buffers import DataPointCL
 
 DATAPOINT_SIZE = DataPointCL.getItemSize()
+N_LOG_BUFFERS = 2
 
 
 class CLParameters:
-    def __init__(self, N, AVG_IT_PER_PHOTON):
+    def __init__(self, N, AVG_IT_PER_PHOTON, logDataPoints: bool = True, storesDataPointsInRAM: bool = True):
+        """
+        When `logDataPoints` is False, the interactions are binned on the device, so no memory is allocated to log the
+        data points and the number of interactions per batch is not limited. When `storesDataPointsInRAM` is False,
+        the logged data points are stored on disk, so the available RAM is not checked.
+        """
         nBatch = 1 / CONFIG.BATCH_LOAD_FACTOR
         avgPhotonsPerBatch = int(np.ceil(N / min(nBatch, CONFIG.N_WORK_UNITS)))
-        self._maxLoggerMemory = self._calculateAverageBatchMemorySize(avgPhotonsPerBatch, AVG_IT_PER_PHOTON)
+        self._maxLoggerMemory = 0
+        if logDataPoints:
+            self._maxLoggerMemory = self._calculateAverageBatchMemorySize(avgPhotonsPerBatch, AVG_IT_PER_PHOTON)
         self._workItemAmount = CONFIG.N_WORK_UNITS
         self.maxPhotonsPerBatch = min(2 * avgPhotonsPerBatch, N)
 
-        self._assertEnoughRAM()
+        if storesDataPointsInRAM:
+            self._assertEnoughRAM()
 
     def _calculateAverageBatchMemorySize(self, avgPhotonsPerBatch: int, avgInteractionsPerPhoton: float) -> int:
         """
         Calculates the required number of bytes to allocate for each batch when expecting the given average number of
         interactions per photon. Note that each work unit requires a minimum of 2 available log entries to operate.
+        The same amount is allocated for each of the N_LOG_BUFFERS log buffers.
         """
         avgInteractions = avgPhotonsPerBatch * avgInteractionsPerPhoton
         minInteractions = 2 * CONFIG.N_WORK_UNITS
         batchSize = max(avgInteractions, minInteractions) * DATAPOINT_SIZE
-        maxSize = CONFIG.MAX_MEMORY_MB * 1024**2
+        # The memory limit is shared between the log buffers that are alternated between batches.
+        maxSize = CONFIG.MAX_MEMORY_MB * 1024**2 // N_LOG_BUFFERS
         return min(batchSize, maxSize)
 
     @property
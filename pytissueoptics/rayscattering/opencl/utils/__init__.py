@@ -1,5 +1,6 @@
 from .batchTiming import BatchTiming
+from .CLBinning import CLBinning
 from .CLKeyLog import CLKeyLog
 from .CLParameters import CLParameters
 
-__all__ = ["BatchTiming", "CLKeyLog", "CLParameters"]
+__all__ = ["BatchTiming", "CLBinning", "CLKeyLog", "CLParameters"]
@@ -1,7 +1,9 @@
 import hashlib
+import inspect
 import random
 import time
-from typing import List, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -9,17 +11,62 @@ from pytissueoptics.rayscattering import utils
 from pytissueoptics.rayscattering.energyLogging import EnergyLogger
 from pytissueoptics.rayscattering.opencl import CONFIG, IPPTable, validateOpenCL, warnings
 from pytissueoptics.rayscattering.opencl.CLPhotons import CLPhotons
+from pytissueoptics.rayscattering.opencl.CLSource import DIRECTIONAL_SOURCE, ISOTROPIC_SOURCE, CLSource
 from pytissueoptics.rayscattering.photon import Photon
 from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
+from pytissueoptics.rayscattering.vectorized import NumpyPhotons
 from pytissueoptics.scene.geometry import Environment, Vector
 from pytissueoptics.scene.intersection import FastIntersectionFinder
-from pytissueoptics.scene.logger import Logger
+from pytissueoptics.scene.logger import InteractionKey, Logger
 from pytissueoptics.scene.solids import Sphere
 from pytissueoptics.scene.solids.cone import Cone
 from pytissueoptics.scene.solids.cylinder import Cylinder
 from pytissueoptics.scene.utils import progressBar
 from pytissueoptics.scene.viewer import Abstract3DViewer, Displayable
 
+SHARDS_PER_WORKER = 4
+PHOTON_CHUNK_SIZE = 10000
+SAMPLING_METHODS = (
+    "getInitialPositionsAndDirections",
+    "_getInitialPositions",
+    "_getInitialDirections",
+    "_getUniformlySampledDisc",
+)
+
+
+def _propagateShard(args) -> Dict[InteractionKey, np.ndarray]:
+    """Propagates a contiguous shard of photons in a worker process, which samples them in chunks as they are
+    propagated. Returns the raw data points logged for each interaction key, with photon IDs offset by the ID of the
+    first photon of the shard."""
+    scene, source, firstID, endID, (seed, samplingSeed) = args
+    np.random.seed(seed)
+    random.seed(seed)
+    samplingState = np.random.RandomState(samplingSeed).get_state()
+    N = endID - firstID
+    environment = scene.getEnvironmentAt(source._position)
+    shardLogger = Logger()
+
+    if source._useVectorization:
+        photons = NumpyPhotons.fromChunks(lambda: source._iterInitialPositionsAndDirections(N, samplingState), N)
+        photons.setContext(scene, environment, logger=shardLogger)
+        photons.propagate()
+    else:
+        intersectionFinder = FastIntersectionFinder(scene, useCache=True)
+        for photon in source._iterPhotons(N, samplingState):
+            photon.setContext(environment, intersectionFinder=intersectionFinder, logger=shardLogger)
+            photon.propagate()
+
+    keyData = {}
+    for solidLabel in shardLogger.getStoredSolidLabels():
+        surfaceLabels = shardLogger.getStoredSurfaceLabels(solidLabel)
+        for key in [InteractionKey(solidLabel)] + [InteractionKey(solidLabel, s) for s in surfaceLabels]:
+            dataPoints = shardLogger.getRawDataPoints(key)
+            if dataPoints is None or len(dataPoints) == 0:
+                continue
+            dataPoints[:, 4] += firstID
+            keyData[key] = dataPoints
+    return keyData
+
 
 class Source(Displayable):
     def __init__(
@@ -29,6 +76,7 @@ class Source(Displayable):
         useHardwareAcceleration: bool = True,
         displaySize: float = 0.1,
         seed: Optional[int] = None,
+        useVectorization: bool = False,
     ):
         self._position = position
         self._N = N
@@ -36,27 +84,41 @@ class Source(Displayable):
         if seed is not None:
             np.random.seed(seed)
             random.seed(seed)
+        self._samplingState = self._makeSamplingState()
 
-        self._photons: Union[List[Photon], CLPhotons] = []
+        self._photons: Union[None, List[Photon], CLPhotons, NumpyPhotons] = []
         self._environment = None
         self.displaySize = displaySize
 
         if useHardwareAcceleration:
             useHardwareAcceleration = validateOpenCL()
         self._useHardwareAcceleration = useHardwareAcceleration
+        self._useVectorization = useVectorization
 
         self._loadPhotons()
 
-    def propagate(self, scene: ScatteringScene, logger: Logger = None, showProgress: bool = True):
+    def propagate(self, scene: ScatteringScene, logger: Logger = None, showProgress: bool = True, workers: int = 1):
+        """
+        Propagate all photons of the source in the scene and log their energy to the logger.
+
+        :param workers: Number of processes used to propagate the photons when hardware acceleration is disabled. The
+            photons are split into contiguous shards that are propagated in parallel with independent random streams
+            (derived from the source seed) and merged back into the logger. Ignored with hardware acceleration.
+        """
         self._environment = scene.getEnvironmentAt(self._position)
         self._prepareLogger(logger)
 
         if self._useHardwareAcceleration:
+            if workers > 1:
+                utils.warn("WARNING: Ignoring the `workers` argument when using hardware acceleration.")
             IPP = self._getAverageInteractionsPerPhoton(scene)
             self._propagateOpenCL(IPP, scene, logger, showProgress)
-            if self._seed is None:
-                # Do not update IPP if the seed is set, since it will alter batch statistics.
-                self._updateIPP(scene, logger)
+            # The photon paths of a seeded propagation do not depend on the batch size, so the IPP can be updated.
+            self._updateIPP(scene, logger)
+        elif workers > 1:
+            self._propagateInParallel(scene, logger, showProgress, workers)
+        elif self._useVectorization:
+            self._propagateVectorized(scene, logger, showProgress)
         else:
             self._propagateCPU(scene, logger, showProgress)
 
@@ -65,11 +127,39 @@ class Source(Displayable):
     def _propagateCPU(self, scene: ScatteringScene, logger: Logger = None, showProgress: bool = True):
         if showProgress:
             print(f"Propagating {self._N} photons without hardware acceleration...")
-        intersectionFinder = FastIntersectionFinder(scene)
+        intersectionFinder = FastIntersectionFinder(scene, useCache=True)
+
+        for photon in progressBar(self.photons, total=self._N, desc="Propagating photons", disable=not showProgress):
+            photon.setContext(self._environment, intersectionFinder=intersectionFinder, logger=logger)
+            photon.propagate()
+
+    def _propagateVectorized(self, scene: ScatteringScene, logger: Logger = None, showProgress: bool = True):
+        if showProgress:
+            print(f"Propagating {self._N} photons with vectorized CPU propagation...")
+        self._photons.setContext(scene, self._environment, logger=logger)
+        self._photons.propagate(verbose=showProgress)
 
-        for i in progressBar(range(self._N), desc="Propagating photons", disable=not showProgress):
-            self._photons[i].setContext(self._environment, intersectionFinder=intersectionFinder, logger=logger)
-            self._photons[i].propagate()
+    def _propagateInParallel(self, scene: ScatteringScene, logger: Logger, showProgress: bool, workers: int):
+        if showProgress:
+            print(f"Propagating {self._N} photons on {workers} CPU processes...")
+        nShards = min(self._N, workers * SHARDS_PER_WORKER)
+        bounds = np.linspace(0, self._N, nShards + 1, dtype=int)
+        # Each shard propagates and samples its photons with its own pair of random streams.
+        seeds = [
+            tuple(int(s) for s in child.generate_state(2))
+            for child in np.random.SeedSequence(self._seed).spawn(nShards)
+        ]
+        shards = [(scene, self, start, end, seed) for start, end, seed in zip(bounds[:-1], bounds[1:], seeds)]
+
+        pbar = progressBar(total=self._N, desc="Propagating photons", unit="photons", disable=not showProgress)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Results are merged in shard order so that a seeded propagation is reproducible.
+            for (_, _, start, end, _), keyData in zip(shards, executor.map(_propagateShard, shards)):
+                if logger is not None:
+                    for key, dataPoints in keyData.items():
+                        logger.logDataPointArray(dataPoints, key)
+                pbar.update(end - start)
+        pbar.close()
 
     def _getAverageInteractionsPerPhoton(self, scene: ScatteringScene) -> float:
         """
@@ -124,25 +214,99 @@ class Source(Displayable):
         self._photons.setContext(scene, self._environment, logger=logger)
         self._photons.propagate(IPP=IPP, verbose=showProgress)
 
-    def getInitialPositionsAndDirections(self) -> Tuple[np.ndarray, np.ndarray]:
+    def getInitialPositionsAndDirections(self, N: int = None) -> Tuple[np.ndarray, np.ndarray]:
         """To be implemented by subclasses. Needs to return a tuple containing the
-        initial positions and normalized directions of the photons as (N, 3) numpy arrays."""
+        initial positions and normalized directions of the photons as (N, 3) numpy arrays.
+
+        :param N: Number of photons to sample, which defaults to the photon count of the source. Successive calls sample
+            successive chunks of photons, which lets the CPU propagation generate them as they are propagated.
+        """
         raise NotImplementedError
 
+    def _makeSamplingState(self) -> tuple:
+        """State of the NumPy random stream which samples the photons. It is taken when the source is created, so that
+        the photons only depend on the seed (or on the global random state at creation), even if they are sampled
+        later in chunks. It is independent of the stream used to propagate them."""
+        entropy = self._seed if self._seed is not None else np.random.randint(2**32, dtype=np.uint64)
+        samplingSeed = np.random.SeedSequence(int(entropy)).generate_state(1)
+        return np.random.RandomState(samplingSeed).get_state()
+
+    def _iterInitialPositionsAndDirections(
+        self, N: int = None, samplingState: tuple = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yields the initial positions and directions of N photons (all photons by default) in chunks, sampled from the
+        random state `samplingState` (the one of the source by default). Since the global NumPy random state is only
+        swapped while sampling a chunk, each iteration yields the same photons. Sources that cannot sample a given
+        number of photons are sampled at once and split in chunks."""
+        N = self._N if N is None else N
+        samplingState = self._samplingState if samplingState is None else samplingState
+        chunkSize = PHOTON_CHUNK_SIZE
+        if "N" not in inspect.signature(self.getInitialPositionsAndDirections).parameters:
+            (positions, directions), _ = self._sampleFromState(samplingState, self.getInitialPositionsAndDirections)
+            for start in range(0, N, chunkSize):
+                yield positions[start : start + chunkSize], directions[start : start + chunkSize]
+            return
+        for start in range(0, N, chunkSize):
+            chunk, samplingState = self._sampleFromState(
+                samplingState, self.getInitialPositionsAndDirections, min(chunkSize, N - start)
+            )
+            yield chunk
+
+    @staticmethod
+    def _sampleFromState(samplingState: tuple, sample, *args):
+        """Calls `sample(*args)` with the global NumPy random state set to `samplingState`. Returns its result and the
+        next sampling state, and restores the global random state."""
+        globalState = np.random.get_state()
+        np.random.set_state(samplingState)
+        try:
+            return sample(*args), np.random.get_state()
+        finally:
+            np.random.set_state(globalState)
+
+    def _iterPhotons(self, N: int = None, samplingState: tuple = None) -> Iterator[Photon]:
+        photonID = 0
+        for positions, directions in self._iterInitialPositionsAndDirections(N, samplingState):
+            for i in range(len(positions)):
+                yield Photon(Vector(*positions[i]), Vector(*directions[i]), ID=photonID)
+                photonID += 1
+
     def _loadPhotons(self):
         if self._useHardwareAcceleration:
             self._loadPhotonsOpenCL()
+        elif self._useVectorization:
+            self._loadPhotonsVectorized()
         else:
             self._loadPhotonsCPU()
 
     def _loadPhotonsCPU(self):
-        positions, directions = self.getInitialPositionsAndDirections()
-        for i in range(self._N):
-            self._photons.append(Photon(Vector(*positions[i]), Vector(*directions[i]), ID=i))
+        # The photons are generated in chunks as they are propagated, so that memory does not grow with N.
+        self._photons = None
 
     def _loadPhotonsOpenCL(self):
-        positions, directions = self.getInitialPositionsAndDirections()
-        self._photons = CLPhotons(positions, directions)
+        source = self._getCLSource() if self._samplesLikeCLSource() else None
+        if source is not None:
+            self._photons = CLPhotons(source=source, N=self._N, seed=self._seed)
+            return
+        positions, directions = map(np.concatenate, zip(*self._iterInitialPositionsAndDirections()))
+        self._photons = CLPhotons(positions, directions, seed=self._seed)
+
+    def _getCLSource(self) -> Optional[CLSource]:
+        """Parameters used to sample the photons on the device with hardware acceleration. Sources that cannot be
+        sampled on the device return None, and their photons are given by `getInitialPositionsAndDirections`."""
+        return None
+
+    def _samplesLikeCLSource(self) -> bool:
+        """Whether the photons sampled on the device from `_getCLSource` are the ones of this source, which is not the
+        case when a subclass overrides the sampling methods of the class defining `_getCLSource`."""
+        sourceClass = type(self)
+        clSourceClass = next(cls for cls in sourceClass.__mro__ if "_getCLSource" in cls.__dict__)
+        return all(
+            getattr(sourceClass, method, None) is getattr(clSourceClass, method, None) for method in SAMPLING_METHODS
+        )
+
+    def _loadPhotonsVectorized(self):
+        # The photons are sampled in chunks as they are propagated, so that memory does not grow with N.
+        self._photons = NumpyPhotons.fromChunks(self._iterInitialPositionsAndDirections, self._N)
 
     def _prepareLogger(self, logger: Optional[Logger]):
         if logger is None:
@@ -179,6 +343,12 @@ class Source(Displayable):
 
     @property
     def photons(self):
+        """Photons of the source. Without hardware acceleration nor vectorization, a new iterator sampling the
+        photons in chunks is returned on each access. The photons are the same on each access, since they are sampled
+        from the random state of the source (see `_makeSamplingState`), regardless of the use of `np.random` after
+        the source was created."""
+        if self._photons is None:
+            return self._iterPhotons()
         return self._photons
 
     def getPhotonCount(self) -> int:
@@ -210,6 +380,7 @@ class DirectionalSource(Source):
         useHardwareAcceleration: bool = True,
         displaySize: float = 0.1,
         seed: Optional[int] = None,
+        useVectorization: bool = False,
     ):
         self._diameter = diameter
         self._direction = direction
@@ -219,12 +390,18 @@ class DirectionalSource(Source):
         self._yAxis = self._direction.cross(self._xAxis)
         self._yAxis.normalize()
         super().__init__(
-            position=position, N=N, useHardwareAcceleration=useHardwareAcceleration, displaySize=displaySize, seed=seed
+            position=position,
+            N=N,
+            useHardwareAcceleration=useHardwareAcceleration,
+            displaySize=displaySize,
+            seed=seed,
+            useVectorization=useVectorization,
         )
 
-    def getInitialPositionsAndDirections(self) -> Tuple[np.ndarray, np.ndarray]:
-        positions = self._getInitialPositions()
-        directions = self._getInitialDirections()
+    def getInitialPositionsAndDirections(self, N: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        N = self._N if N is None else N
+        positions = self._getInitialPositions(N)
+        directions = self._getInitialDirections(N)
         return positions, directions
 
     def addToViewer(self, viewer: Abstract3DViewer, representation="surface", colormap="Wistia", opacity=1, **kwargs):
@@ -240,28 +417,33 @@ class DirectionalSource(Source):
 
         viewer.add(base, arrow, representation=representation, colormap=colormap, opacity=opacity, **kwargs)
 
-    def _getInitialPositions(self):
-        return self._getUniformlySampledDisc(self._diameter) + self._position.array
+    def _getInitialPositions(self, N: int):
+        return self._getUniformlySampledDisc(self._diameter, N) + self._position.array
 
-    def _getUniformlySampledDisc(self, diameter) -> np.ndarray:
+    def _getUniformlySampledDisc(self, diameter, N: int) -> np.ndarray:
         # The square root method was used, since the rejection method was slower in numpy because of index lookup.
         # https://stackoverflow.com/questions/5837572/generate-a-random-point-within-a-circle-uniformly
-        r = diameter / 2 * np.sqrt(np.random.random((self._N, 1)))
-        theta = np.random.random((self._N, 1)) * 2 * np.pi
+        r = diameter / 2 * np.sqrt(np.random.random((N, 1)))
+        theta = np.random.random((N, 1)) * 2 * np.pi
         x = r * np.cos(theta)
         y = r * np.sin(theta)
         x = np.tile(x, (1, 3))
         y = np.tile(y, (1, 3))
-        xAxisArray = np.full((self._N, 3), self._xAxis.array)
-        yAxisArray = np.full((self._N, 3), self._yAxis.array)
+        xAxisArray = np.full((N, 3), self._xAxis.array)
+        yAxisArray = np.full((N, 3), self._yAxis.array)
         xDifference = np.multiply(x, xAxisArray)
         yDifference = np.multiply(y, yAxisArray)
 
         discPositions = xDifference + yDifference
         return discPositions
 
-    def _getInitialDirections(self):
-        return np.full((self._N, 3), self._direction.array)
+    def _getInitialDirections(self, N: int):
+        return np.full((N, 3), self._direction.array)
+
+    def _getCLSource(self) -> Optional[CLSource]:
+        return CLSource(
+            DIRECTIONAL_SOURCE, self._position, self._direction, self._xAxis, self._yAxis, diameter=self._diameter
+        )
 
     @property
     def _hashComponents(self) -> tuple:
@@ -277,6 +459,7 @@ class PencilPointSource(DirectionalSource):
         useHardwareAcceleration: bool = True,
         displaySize: float = 0.1,
         seed: Optional[int] = None,
+        useVectorization: bool = False,
     ):
         super().__init__(
             position=position,
@@ -286,16 +469,21 @@ class PencilPointSource(DirectionalSource):
             useHardwareAcceleration=useHardwareAcceleration,
             displaySize=displaySize,
             seed=seed,
+            useVectorization=useVectorization,
         )
 
 
 class IsotropicPointSource(Source):
-    def getInitialPositionsAndDirections(self) -> Tuple[np.ndarray, np.ndarray]:
-        positions = np.full((self._N, 3), self._position.array)
-        directions = np.random.randn(self._N, 3)
+    def getInitialPositionsAndDirections(self, N: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        N = self._N if N is None else N
+        positions = np.full((N, 3), self._position.array)
+        directions = np.random.randn(N, 3)
         directions /= np.linalg.norm(directions, axis=1, keepdims=True)
         return positions, directions
 
+    def _getCLSource(self) -> Optional[CLSource]:
+        return CLSource(ISOTROPIC_SOURCE, self._position)
+
     @property
     def _hashComponents(self) -> tuple:
         return (self._position,)
@@ -312,6 +500,7 @@ class DivergentSource(DirectionalSource):
         useHardwareAcceleration: bool = True,
         displaySize: float = 0.1,
         seed: Optional[int] = None,
+        useVectorization: bool = False,
     ):
         self._divergence = divergence
 
@@ -323,15 +512,27 @@ class DivergentSource(DirectionalSource):
             useHardwareAcceleration=useHardwareAcceleration,
             displaySize=displaySize,
             seed=seed,
+            useVectorization=useVectorization,
         )
 
-    def _getInitialDirections(self):
+    def _getInitialDirections(self, N: int):
         thetaDiameter = np.tan(self._divergence / 2) * 2
-        directions = self._getUniformlySampledDisc(thetaDiameter)
+        directions = self._getUniformlySampledDisc(thetaDiameter, N)
         directions += self._direction.array
         directions /= np.linalg.norm(directions, axis=1, keepdims=True)
         return directions
 
+    def _getCLSource(self) -> Optional[CLSource]:
+        return CLSource(
+            DIRECTIONAL_SOURCE,
+            self._position,
+            self._direction,
+            self._xAxis,
+            self._yAxis,
+            diameter=self._diameter,
+            divergence=self._divergence,
+        )
+
     @property
     def _hashComponents(self) -> tuple:
         return self._position, self._direction, self._diameter, self._divergence
@@ -0,0 +1,163 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pytissueoptics.rayscattering import utils
+from pytissueoptics.rayscattering.display.views import View2D
+from pytissueoptics.rayscattering.display.views.defaultViews import View2DProjection
+from pytissueoptics.rayscattering.energyLogging import EnergyLogger
+from pytissueoptics.scene.logger import InteractionKey
+
+
+@dataclass
+class SurfaceEnergy:
+    entering: Optional[float] = None
+    leaving: Optional[float] = None
+
+
+@dataclass
+class SolidEnergy:
+    deposited: Optional[float] = None
+    surfaces: Dict[str, SurfaceEnergy] = field(default_factory=dict)
+
+
+class EnergyTable:
+    """
+    Energy deposited in each solid and energy entering and leaving each of its surfaces, as absolute values. The table
+    is read from the energy balance of the logger when it is tracked. Otherwise, it is built in a single pass over the
+    stored 3D data points of the logger, or over its 2D views when the 3D data was discarded. An energy that cannot be
+    extracted from the views is None, and asking for it raises an exception.
+    """
+
+    def __init__(self, logger: EnergyLogger):
+        self._solids: Dict[str, SolidEnergy] = {}
+        self._fromViews = not logger.tracksEnergyBalance and not logger.has3D
+        if logger.tracksEnergyBalance:
+            self._readEnergyBalance(logger)
+        elif self._fromViews:
+            self._sumViews(logger)
+        else:
+            self._sumDataPoints(logger)
+
+    def _readEnergyBalance(self, logger: EnergyLogger):
+        for solidLabel in logger.getSeenSolidLabels():
+            solidEnergy = self._solids.setdefault(solidLabel, SolidEnergy())
+            solidEnergy.deposited = abs(sum(logger.getEnergyBalance(InteractionKey(solidLabel))))
+            for surfaceLabel in logger.getSeenSurfaceLabels(solidLabel):
+                entering, leaving = logger.getEnergyBalance(InteractionKey(solidLabel, surfaceLabel))
+                solidEnergy.surfaces[surfaceLabel] = SurfaceEnergy(abs(entering), leaving)
+
+    def _sumDataPoints(self, logger: EnergyLogger):
+        for solidLabel in logger.getStoredSolidLabels():
+            solidEnergy = self._solids.setdefault(solidLabel, SolidEnergy())
+            entering, leaving = self._sumKey(logger, InteractionKey(solidLabel))
+            solidEnergy.deposited = abs(entering + leaving)
+            for surfaceLabel in logger.getStoredSurfaceLabels(solidLabel):
+                entering, leaving = self._sumKey(logger, InteractionKey(solidLabel, surfaceLabel))
+                solidEnergy.surfaces[surfaceLabel] = SurfaceEnergy(abs(entering), leaving)
+
+    @staticmethod
+    def _sumKey(logger: EnergyLogger, key: InteractionKey) -> Tuple[float, float]:
+        """Sums of the negative (entering) and positive (leaving) values logged for the key, read once in chunks."""
+        entering, leaving = 0.0, 0.0
+        for chunk in logger.iterDataPoints(key):
+            values = chunk[:, 0]
+            isLeaving = values >= 0
+            leaving += float(np.sum(values, where=isLeaving, dtype=np.float64))
+            entering += float(np.sum(values, where=~isLeaving, dtype=np.float64))
+        return entering, leaving
+
+    def _sumViews(self, logger: EnergyLogger):
+        """Uses the first view that fully contains the solid for each energy, as for a single solid or surface."""
+        for solidLabel in logger.getSeenSolidLabels():
+            solidEnergy = self._solids.setdefault(solidLabel, SolidEnergy())
+            for surfaceLabel in logger.getSeenSurfaceLabels(solidLabel):
+                solidEnergy.surfaces[surfaceLabel] = SurfaceEnergy()
+
+        solidLimits = {}
+        for view in logger.views:
+            solidLabel = self._findLabel(view.solidLabel, self._solids.keys())
+            if solidLabel is None:
+                continue
+            if solidLabel not in solidLimits:
+                solidLimits[solidLabel] = logger.getSolidLimits(solidLabel)
+            if not self._viewContains(view, solidLimits[solidLabel]):
+                continue
+
+            solidEnergy = self._solids[solidLabel]
+            if isinstance(view, View2DProjection):
+                if solidEnergy.deposited is None:
+                    solidEnergy.deposited = view.getSum()
+                continue
+            surfaceLabel = self._findLabel(view.surfaceLabel, solidEnergy.surfaces.keys())
+            if surfaceLabel is None:
+                continue
+            surfaceEnergy = solidEnergy.surfaces[surfaceLabel]
+            if view.surfaceEnergyLeaving and surfaceEnergy.leaving is None:
+                surfaceEnergy.leaving = view.getSum()
+            elif not view.surfaceEnergyLeaving and surfaceEnergy.entering is None:
+                surfaceEnergy.entering = view.getSum()
+
+    @staticmethod
+    def _findLabel(label: Optional[str], labels) -> Optional[str]:
+        if label is None:
+            return None
+        for _label in labels:
+            if utils.labelsEqual(label, _label):
+                return _label
+        return None
+
+    @staticmethod
+    def _viewContains(view: View2D, solidLimits: List[List[float]]) -> bool:
+        requiredLimitsU = solidLimits[view.axisU]
+        requiredLimitsV = solidLimits[view.axisV]
+        if min(view.limitsU) > min(requiredLimitsU) or max(view.limitsU) < max(requiredLimitsU):
+            return False
+        if min(view.limitsV) > min(requiredLimitsV) or max(view.limitsV) < max(requiredLimitsV):
+            return False
+        return True
+
+    def getDeposited(self, solidLabel: str) -> float:
+        energy = self._getSolid(solidLabel).deposited
+        if energy is None:
+            raise Exception(
+                f"Could not extract absorbance for solid '{solidLabel}'. The 3D data was discarded and "
+                f"no stored 2D view corresponds to this solid."
+            )
+        return energy
+
+    def getEntering(self, solidLabel: str, surfaceLabels: List[str] = None) -> float:
+        return self._sumSurfaces(solidLabel, surfaceLabels, leaving=False)
+
+    def getLeaving(self, solidLabel: str, surfaceLabels: List[str] = None) -> float:
+        return self._sumSurfaces(solidLabel, surfaceLabels, leaving=True)
+
+    def _sumSurfaces(self, solidLabel: str, surfaceLabels: Optional[List[str]], leaving: bool) -> float:
+        """Energy crossing the given surfaces of the solid, or all of its surfaces by default."""
+        surfaces = self._getSolid(solidLabel).surfaces
+        if surfaceLabels is None:
+            surfaceLabels = list(surfaces.keys())
+        energy = 0
+        for surfaceLabel in surfaceLabels:
+            surfaceEnergy = surfaces.get(
+                self._findLabel(surfaceLabel, surfaces.keys()),
+                SurfaceEnergy() if self._fromViews else SurfaceEnergy(0, 0),
+            )
+            value = surfaceEnergy.leaving if leaving else surfaceEnergy.entering
+            if value is None:
+                raise Exception(
+                    f"Could not extract energy {['entering', 'leaving'][leaving]} surface '{surfaceLabel}' "
+                    f"of solid '{solidLabel}'. The 3D data was discarded and no stored 2D view corresponds "
+                    f"to this surface."
+                )
+            energy += value
+        return energy
+
+    def _getSolid(self, solidLabel: str) -> SolidEnergy:
+        _solidLabel = self._findLabel(solidLabel, self._solids.keys())
+        if _solidLabel is not None:
+            return self._solids[_solidLabel]
+        if self._fromViews:
+            return SolidEnergy()
+        return SolidEnergy(deposited=0)
@@ -1,15 +1,14 @@
 import math
 import os
 from dataclasses import dataclass
-from typing import Dict
-
-import numpy as np
+from typing import Dict, Optional
 
 from pytissueoptics.rayscattering import utils
-from pytissueoptics.rayscattering.display.views.defaultViews import View2DProjection
-from pytissueoptics.rayscattering.energyLogging import EnergyLogger, PointCloud, PointCloudFactory
+from pytissueoptics.rayscattering.energyLogging import EnergyLogger
 from pytissueoptics.rayscattering.opencl.CLScene import WORLD_SOLID_LABEL
 
+from .energyTable import EnergyTable
+
 
 @dataclass
 class SurfaceStats:
@@ -27,8 +26,8 @@ class SolidStats:
 class Stats:
     def __init__(self, logger: EnergyLogger):
         self._logger = logger
-        self._pointCloudFactory = PointCloudFactory(logger)
-        self._extractFromViews = not logger.has3D
+        self._energyTable: Optional[EnergyTable] = None
+        self._energyTableVersion = None
 
         self._photonCount = logger.info["photonCount"]
         self._sourceSolidLabel = logger.info["sourceSolidLabel"]
@@ -112,89 +111,22 @@ class Stats:
         return reportString
 
     def getAbsorbance(self, solidLabel: str, useTotalEnergy=False) -> float:
-        if self._extractFromViews:
-            return self._getAbsorbanceFromViews(solidLabel, useTotalEnergy)
-        points = self._getPointCloud(solidLabel).solidPoints
+        absorbedEnergy = self._getEnergyTable().getDeposited(solidLabel)
         energyInput = self.getEnergyInput(solidLabel) if not useTotalEnergy else self.getPhotonCount()
-        return 100 * self._sumEnergy(points) / energyInput if energyInput else math.inf
-
-    def _getAbsorbanceFromViews(self, solidLabel: str, useTotalEnergy=False) -> float:
-        energyInput = self.getEnergyInput(solidLabel) if not useTotalEnergy else self.getPhotonCount()
-        absorbedEnergy = self._getAbsorbedEnergyFromViews(solidLabel)
         return 100 * absorbedEnergy / energyInput if energyInput else math.inf
 
-    def _getAbsorbedEnergyFromViews(self, solidLabel: str) -> float:
-        for view in self._logger.views:
-            if not isinstance(view, View2DProjection):
-                continue
-            if not utils.labelsEqual(solidLabel, view.solidLabel):
-                continue
-            if not self._viewContainsSolid(view, solidLabel):
-                continue
-            return view.getSum()
-
-        raise Exception(
-            f"Could not extract absorbance for solid '{solidLabel}'. The 3D data was discarded and "
-            f"no stored 2D view corresponds to this solid."
-        )
-
-    def _viewContainsSolid(self, view, solidLabel: str) -> bool:
-        solidLimits = self._logger.getSolidLimits(solidLabel)
-        requiredLimitsU = solidLimits[view.axisU]
-        requiredLimitsV = solidLimits[view.axisV]
-        if min(view.limitsU) > min(requiredLimitsU) or max(view.limitsU) < max(requiredLimitsU):
-            return False
-        if min(view.limitsV) > min(requiredLimitsV) or max(view.limitsV) < max(requiredLimitsV):
-            return False
-        return True
-
     def getPhotonCount(self) -> int:
         return self._photonCount
 
     def getEnergyInput(self, solidLabel: str = None) -> float:
         if solidLabel is None:
             return self.getPhotonCount()
-        if self._extractFromViews:
-            return self._getEnergyInputFromViews(solidLabel)
-        points = self._getPointCloudOfSurfaces(solidLabel).enteringSurfacePoints
-        energy = self._sumEnergy(points)
+        energy = self._getEnergyTable().getEntering(solidLabel)
 
         if utils.labelsEqual(self._sourceSolidLabel, solidLabel):
             energy += self.getPhotonCount()
         return energy
 
-    def _getEnergyInputFromViews(self, solidLabel: str) -> float:
-        return self._getEnergyCrossingSolidFromViews(solidLabel, leaving=False)
-
-    def _getEnergyLeavingFromViews(self, solidLabel: str):
-        return self._getEnergyCrossingSolidFromViews(solidLabel, leaving=True)
-
-    def _getEnergyCrossingSolidFromViews(self, solidLabel: str, leaving: bool) -> float:
-        energy = 0
-        for surfaceLabel in self._logger.getSeenSurfaceLabels(solidLabel):
-            energy += self._getSurfaceEnergyFromViews(solidLabel, surfaceLabel, leaving=leaving)
-
-        if utils.labelsEqual(self._sourceSolidLabel, solidLabel) and not leaving:
-            energy += self.getPhotonCount()
-        return energy
-
-    def _getSurfaceEnergyFromViews(self, solidLabel: str, surfaceLabel: str, leaving: bool) -> float:
-        for view in self._logger.views:
-            if not utils.labelsEqual(solidLabel, view.solidLabel):
-                continue
-            if not utils.labelsEqual(surfaceLabel, view.surfaceLabel):
-                continue
-            if view.surfaceEnergyLeaving != leaving:
-                continue
-            if not self._viewContainsSolid(view, solidLabel):
-                continue
-            return view.getSum()
-        raise Exception(
-            f"Could not extract energy {['entering', 'leaving'][leaving]} surface '{surfaceLabel}' "
-            f"of solid '{solidLabel}'. The 3D data was discarded and no stored 2D view corresponds "
-            f"to this surface."
-        )
-
     def _getSurfaceStats(self, solidLabel: str) -> Dict[str, SurfaceStats]:
         stats = {}
         for surfaceLabel in self._logger.getSeenSurfaceLabels(solidLabel):
@@ -204,35 +136,18 @@ class Stats:
     def getTransmittance(self, solidLabel: str, surfaceLabel: str = None, useTotalEnergy=False):
         """Uses local energy input for the desired solid by default. Specify 'useTotalEnergy' = True
         to compare instead with total input energy of the scene."""
-        if self._extractFromViews:
-            return self._getTransmittanceFromViews(solidLabel, surfaceLabel, useTotalEnergy)
-
-        if surfaceLabel is None:
-            points = self._getPointCloudOfSurfaces(solidLabel).leavingSurfacePoints
-        else:
-            points = self._getPointCloud(solidLabel, surfaceLabel).leavingSurfacePoints
-
-        energyInput = self.getEnergyInput(solidLabel) if not useTotalEnergy else self.getPhotonCount()
-        return 100 * self._sumEnergy(points) / energyInput if energyInput else math.inf
-
-    def _getTransmittanceFromViews(self, solidLabel: str, surfaceLabel: str = None, useTotalEnergy=False):
-        if surfaceLabel is None:
-            energyLeaving = self._getEnergyLeavingFromViews(solidLabel)
-        else:
-            energyLeaving = self._getSurfaceEnergyFromViews(solidLabel, surfaceLabel, leaving=True)
+        surfaceLabels = None if surfaceLabel is None else [surfaceLabel]
+        energyLeaving = self._getEnergyTable().getLeaving(solidLabel, surfaceLabels)
 
         energyInput = self.getEnergyInput(solidLabel) if not useTotalEnergy else self.getPhotonCount()
         return 100 * energyLeaving / energyInput if energyInput else math.inf
 
-    @staticmethod
-    def _sumEnergy(points: np.ndarray):
-        return np.abs(np.sum(points[:, 0])) if points is not None else 0
-
-    def _getPointCloud(self, solidLabel: str = None, surfaceLabel: str = None) -> PointCloud:
-        return self._pointCloudFactory.getPointCloud(solidLabel, surfaceLabel)
-
-    def _getPointCloudOfSurfaces(self, solidLabel: str = None) -> PointCloud:
-        return self._pointCloudFactory.getPointCloudOfSurfaces(solidLabel)
+    def _getEnergyTable(self) -> EnergyTable:
+        """Energy table of the logger, built once and again only if the logger data changed."""
+        if self._energyTable is None or self._energyTableVersion != self._logger.dataVersion:
+            self._energyTable = EnergyTable(self._logger)
+            self._energyTableVersion = self._logger.dataVersion
+        return self._energyTable
 
     @staticmethod
     def _saveReport(report: str, filepath: str = None):
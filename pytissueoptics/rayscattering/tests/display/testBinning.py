@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from pytissueoptics.rayscattering.display.utils import histogram
+
+
+class TestBinning(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.points = rng.uniform(-1.2, 1.2, (1000, 4)).astype(np.float32)
+        # Values on the bin edges and on the limits.
+        self.points[:10, 1:] = np.linspace(-1, 1, 10, dtype=np.float32)[:, None]
+
+    def testShouldHaveSameBinsAsNumpyHistogram(self):
+        x, w = self.points[:, 1], self.points[:, 0]
+
+        hist = histogram(x, w, 10, (-1, 1))
+
+        expectedHist, _ = np.histogram(x, bins=10, range=(-1, 1), weights=w)
+        self.assertEqual(np.float32, hist.dtype)
+        self.assertTrue(np.allclose(expectedHist, hist, atol=1e-5))
+
+    def testShouldHaveSameBinsAsNumpyHistogram2D(self):
+        hist = histogram(self.points[:, 1:3], np.ones(1000), (7, 5), ((-1, 1), (-0.5, 1)))
+
+        expectedHist, _, _ = np.histogram2d(
+            self.points[:, 1], self.points[:, 2], bins=(7, 5), range=((-1, 1), (-0.5, 1))
+        )
+        self.assertTrue(np.array_equal(expectedHist, hist))
+
+    def testShouldHaveSameBinsAsNumpyHistogramDD(self):
+        hist = histogram(self.points[:, 1:], self.points[:, 0], (4, 5, 6), [(-1, 1)] * 3, chunkSize=100)
+
+        expectedHist, _ = np.histogramdd(
+            self.points[:, 1:], bins=(4, 5, 6), range=[(-1, 1)] * 3, weights=self.points[:, 0]
+        )
+        self.assertTrue(np.allclose(expectedHist, hist, atol=1e-5))
+
+    def testGivenOutputArray_shouldAccumulateInIt(self):
+        out = np.ones((4, 4), dtype=np.float32)
+
+        hist = histogram(np.array([[0.1, 0.1]]), np.array([2.0]), (4, 4), ((0, 1), (0, 1)), out=out)
+
+        self.assertIs(out, hist)
+        self.assertEqual(3, out[0, 0])
+        self.assertEqual(18, out.sum())
+
+    def testShouldIgnoreNaNValues(self):
+        hist = histogram(np.array([np.nan, 0.5]), np.array([1.0, 1.0]), 2, (0, 1))
+
+        self.assertTrue(np.array_equal([0, 1], hist))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -259,6 +259,28 @@ class TestView2D(unittest.TestCase):
 
         self.assertEqual(value, view.getSum())
 
+    def testGivenView_whenAddBinnedDataOfItsBinningGrid_shouldBeEquivalentToExtractData(self):
+        dataPoints = np.array([[0.5, 2.05, 2.15, 2.95], [0.2, 3.5, 2.55, 2.05], [-0.4, 2.5, 2.95, 2.25]])
+        for view, otherView in [
+            (View2DProjectionX(), View2DProjectionX()),
+            (View2DProjection(Direction.Y_POS, Direction.Z_NEG), View2DProjection(Direction.Y_POS, Direction.Z_NEG)),
+            (View2DSliceZ(position=2.2), View2DSliceZ(position=2.2)),
+            (View2DSurfaceX("cube", "top", False), View2DSurfaceX("cube", "top", False)),
+        ]:
+            view.setContext([(2, 3), (2, 3), (2, 3)], (0.1, 0.2, 0.5))
+            otherView.setContext([(2, 3), (2, 3), (2, 3)], (0.1, 0.2, 0.5))
+            view.extractData(dataPoints.copy())
+
+            limits3D, bins3D, sign = otherView.getBinningGrid()
+            limits3D = [np.clip(limits, -10, 10) for limits in limits3D]
+            filteredPoints = dataPoints if sign == 0 else dataPoints[dataPoints[:, 0] * sign > 0] * [sign, 1, 1, 1]
+            histogram3D = np.histogramdd(
+                filteredPoints[:, 1:], bins=bins3D, range=limits3D, weights=filteredPoints[:, 0]
+            )[0]
+            otherView.addBinnedData(histogram3D)
+
+            self.assertTrue(np.allclose(view.getImageData(logScale=False), otherView.getImageData(logScale=False)))
+
     def testGivenAProjectionViewEqual_shouldBeContainedByTheOther(self):
         solidLabel = "A"
         view1 = View2DProjectionX(solidLabel=solidLabel)
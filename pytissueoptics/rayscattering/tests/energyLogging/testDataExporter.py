@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pytissueoptics.rayscattering.energyLogging.dataExporter import DataExporter, formatCSVRows
+
+
+class TestDataExporter(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.exportName = os.path.join(self.tempDir.name, "test_sim")
+        self.dataPoints = np.random.rand(10, 5).astype(np.float32)
+        self.dataPoints[:, 4] = np.arange(10)
+        self.chunks = [(self.dataPoints[:6], 0, -1), (self.dataPoints[6:], 1, 2)]
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def testWhenFormatCSVRows_shouldFormatLikeSaveTxt(self):
+        rows = np.empty((10, 7), dtype=np.float64)
+        rows[:, :5] = self.dataPoints
+        rows[:, 5:] = [1, 2]
+        expectedText = io.StringIO()
+        np.savetxt(expectedText, rows, delimiter=",", fmt=["%.8e", "%.8e", "%.8e", "%.8e", "%d", "%d", "%d"])
+
+        self.assertEqual(expectedText.getvalue(), formatCSVRows(self.dataPoints, 1, 2))
+
+    def testWhenExportCSV_shouldWriteHeaderAndChunksInOrder(self):
+        filepath = DataExporter(self.exportName).export(iter(self.chunks), 10)
+
+        with open(filepath) as file:
+            lines = file.readlines()
+        self.assertEqual(self.exportName + ".csv", filepath)
+        self.assertEqual("energy,x,y,z,photon_index,solid_index,surface_index\n", lines[0])
+        self.assertEqual(11, len(lines))
+        self.assertTrue(lines[6].endswith(",5,0,-1\n"))
+        self.assertTrue(lines[7].endswith(",6,1,2\n"))
+
+    def testGivenWorkers_whenExportCSV_shouldWriteSameFile(self):
+        serialFilepath = DataExporter(self.exportName).export(iter(self.chunks), 10)
+        with open(serialFilepath) as file:
+            expectedText = file.read()
+
+        parallelFilepath = DataExporter(self.exportName + "_parallel", workers=2).export(iter(self.chunks), 10)
+
+        with open(parallelFilepath) as file:
+            self.assertEqual(expectedText, file.read())
+
+    def testWhenExportNPY_shouldWriteOneFilePerColumn(self):
+        directory = DataExporter(self.exportName, fileFormat="npy").export(iter(self.chunks), 10)
+
+        self.assertEqual(self.exportName, directory)
+        energy = np.load(os.path.join(directory, "energy.npy"))
+        photonIndex = np.load(os.path.join(directory, "photon_index.npy"))
+        solidIndex = np.load(os.path.join(directory, "solid_index.npy"))
+        surfaceIndex = np.load(os.path.join(directory, "surface_index.npy"))
+        self.assertTrue(np.allclose(self.dataPoints[:, 0], energy))
+        self.assertTrue(np.array_equal(np.arange(10), photonIndex))
+        self.assertTrue(np.array_equal([0] * 6 + [1] * 4, solidIndex))
+        self.assertTrue(np.array_equal([-1] * 6 + [2] * 4, surfaceIndex))
+
+    def testWhenExportWithUnknownFormat_shouldRaiseValueError(self):
+        with self.assertRaises(ValueError):
+            DataExporter(self.exportName, fileFormat="xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()
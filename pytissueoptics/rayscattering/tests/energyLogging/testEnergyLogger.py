@@ -1,6 +1,7 @@
 import io
 import json
 import os
+import pickle
 import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
@@ -16,11 +17,12 @@ from pytissueoptics.rayscattering.display.views import (
     View2DSurfaceY,
     ViewGroup,
 )
-from pytissueoptics.rayscattering.energyLogging import EnergyLogger
+from pytissueoptics.rayscattering.energyLogging import EnergyLogger, EnergyType
 from pytissueoptics.rayscattering.materials import ScatteringMaterial
 from pytissueoptics.rayscattering.opencl.CLScene import WORLD_SOLID_LABEL
 from pytissueoptics.rayscattering.samples import PhantomTissue
 from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
+from pytissueoptics.rayscattering.tests.statistics import testStats
 from pytissueoptics.scene.geometry import Vector
 from pytissueoptics.scene.logger import InteractionKey
 from pytissueoptics.scene.solids import Cube
@@ -89,6 +91,63 @@ class TestEnergyLogger(unittest.TestCase):
 
         self.assertEqual(0.5, cubeViewZ.getSum())
 
+    def testGivenUpdatedView_whenLogMoreDataAndUpdateView_shouldOnlyExtractNewData(self):
+        self.logger.logDataPoint(0.5, self.CUBE_CENTER, self.INTERACTION_KEY)
+        cubeViewZ = self.logger.views[5]
+        self.logger.updateView(cubeViewZ)
+
+        self.logger.logDataPoint(0.25, self.CUBE_CENTER, self.INTERACTION_KEY)
+        self.logger.updateView(cubeViewZ)
+
+        self.assertEqual(0.75, cubeViewZ.getSum())
+
+    def testGivenUpdatedView_whenLogDataArrayAfterDataPointsAndUpdateView_shouldOnlyExtractNewData(self):
+        self.logger.logDataPoint(0.5, self.CUBE_CENTER, self.INTERACTION_KEY)
+        cubeViewZ = self.logger.views[5]
+        self.logger.updateView(cubeViewZ)
+
+        self.logger.logDataPointArray(np.full((2, 4), 0.25), self.INTERACTION_KEY)
+        self.logger.logDataPoint(0.125, self.CUBE_CENTER, self.INTERACTION_KEY)
+        self.logger.updateView(cubeViewZ)
+
+        self.assertEqual(1.125, cubeViewZ.getSum())
+
+    def testGivenCompressedLoggerFile_whenUpdateView_shouldExtractDataWithoutLoadingIt(self):
+        previousLogger = EnergyLogger(self.TEST_SCENE)
+        previousLogger.logDataPointArray(np.full((10, 4), 0.5), self.INTERACTION_KEY)
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "test.log")
+            previousLogger.save(filePath, compress=True)
+            logger = EnergyLogger(self.TEST_SCENE, filePath)
+            cubeViewZ = logger.views[5]
+            logger._resetView(cubeViewZ)
+
+            logger.updateView(cubeViewZ)
+
+            self.assertEqual(5, cubeViewZ.getSum())
+            self.assertFalse(logger._data[self.INTERACTION_KEY].dataPoints.isLoaded)
+
+    def testWhenLogDataPoint_shouldOnlyOutdateViewsOfThisKey(self):
+        cubeViewZ = self.logger.views[5]
+        self.logger.updateView(cubeViewZ)
+
+        self.logger.logDataPoint(0.5, self.CUBE_CENTER, InteractionKey(WORLD_SOLID_LABEL))
+        self.logger.updateView(cubeViewZ)
+
+        self.assertEqual(0, cubeViewZ.getSum())
+
+    def testGivenUpdatedView_whenFilter_shouldRebuildViewFromFilteredData(self):
+        self.logger.logDataPoint(0.5, self.CUBE_CENTER, self.INTERACTION_KEY, ID=0)
+        self.logger.logDataPoint(0.25, self.CUBE_CENTER, self.INTERACTION_KEY, ID=1)
+        self.logger.logDataPoint(0.1, Vector(0, 5, 0), InteractionKey("sphere"), ID=1)
+        cubeViewZ = self.logger.views[5]
+        self.logger.updateView(cubeViewZ)
+
+        self.logger.filter(detectedBy="sphere")
+        self.logger.updateView(cubeViewZ)
+
+        self.assertEqual(0.25, cubeViewZ.getSum())
+
     def testWhenAddExistingView_shouldIgnore(self):
         defaultSceneView = View2DProjectionX()
         initialNumberOfViews = len(self.logger.views)
@@ -188,6 +247,143 @@ class TestEnergyLogger(unittest.TestCase):
         self.logger.addView(newView)
         self.assertAlmostEqual(0.1 + 0.4, newView.getSum())
 
+    def testGivenVoxelSize_whenLogDataPoints_shouldBinVolumetricDataToVoxelGrid(self):
+        self.logger = EnergyLogger(self.TEST_SCENE, keep3D=False, voxelSize=0.1)
+        self.logger.logDataPoint(0.8, self.CUBE_CENTER, self.INTERACTION_KEY)
+        self.logger.logDataPoint(0.5, self.CUBE_CENTER, InteractionKey("cube", "cube_top"))
+
+        self.assertEqual((10, 10, 10), self.logger.voxelGrid.bins)
+        self.assertAlmostEqual(0.8, self.logger.voxelGrid.getSum())
+
+    def testGivenLoggerWithVoxelGridPreviouslySaved_whenLoad_shouldLoadVoxelGrid(self):
+        self.logger = EnergyLogger(self.TEST_SCENE, keep3D=False, voxelSize=0.1)
+        self.logger.logDataPoint(0.8, self.CUBE_CENTER, self.INTERACTION_KEY)
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "test.log")
+            self.logger.save(filePath)
+
+            loadedLogger = EnergyLogger(self.TEST_SCENE, filePath, keep3D=False)
+
+        self.assertAlmostEqual(0.8, loadedLogger.voxelGrid.getSum())
+
+    def testGivenNoVoxelSize_shouldNotHaveVoxelGrid(self):
+        self.assertIsNone(self.logger.voxelGrid)
+
+    def testGiven2DLogger_whenLogBinnedData_shouldAddDataToViewsAndVoxelGrid(self):
+        self.logger = EnergyLogger(self.TEST_SCENE, keep3D=False, views=[View2DProjectionX()], voxelSize=0.5)
+        viewHistogram = np.zeros((1, 100, 100))
+        viewHistogram[0, 2, 3] = 0.5
+        voxelHistogram = np.zeros((2, 2, 2))
+        voxelHistogram[1, 1, 1] = 0.5
+
+        self.logger.logBinnedData(
+            [viewHistogram, voxelHistogram], [self.INTERACTION_KEY], nDataPoints=3, energyBalance={}
+        )
+
+        self.assertEqual(0.5, self.logger.views[0].getSum())
+        self.assertEqual(0.5, self.logger.voxelGrid.getSum())
+        self.assertEqual(3, self.logger.nDataPoints)
+        self.assertEqual(["cube"], self.logger.getSeenSolidLabels())
+
+    def testGiven2DLogger_whenLogDataPoints_shouldKeepEnergyBalanceOfEachKey(self):
+        self.logger = EnergyLogger(self.TEST_SCENE, keep3D=False, views=[])
+        surfaceKey = InteractionKey("cube", "cube_top")
+
+        self.logger.logDataPointArray(np.array([[-1, 0, 0, 0], [0.25, 0, 0, 0]]), surfaceKey)
+        self.logger.logDataPoint(0.5, self.CUBE_CENTER, self.INTERACTION_KEY)
+
+        self.assertEqual((-1, 0.25), self.logger.getEnergyBalance(surfaceKey))
+        self.assertEqual((0, 0.5), self.logger.getEnergyBalance(self.INTERACTION_KEY))
+        self.assertEqual((0, 0), self.logger.getEnergyBalance(InteractionKey("cube", "cube_bottom")))
+
+    def testGivenLoggerSaved_whenLoad_shouldLoadEnergyBalance(self):
+        self.logger = EnergyLogger(self.TEST_SCENE, keep3D=False, views=[])
+        self.logger.logDataPoint(0.5, self.CUBE_CENTER, self.INTERACTION_KEY)
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "test.log")
+            self.logger.save(filePath)
+
+            loadedLogger = EnergyLogger(self.TEST_SCENE, filePath, keep3D=False, views=[])
+
+        self.assertEqual((0, 0.5), loadedLogger.getEnergyBalance(self.INTERACTION_KEY))
+
+    def testWhenFilter_shouldKeepEnergyBalanceOfFilteredData(self):
+        self.logger.logDataPointArray(np.array([[0.5, 0, 0, 0, 1], [0.25, 0, 0, 0, 2]]), self.INTERACTION_KEY)
+        self.logger.logDataPointArray(np.array([[0.1, 0, 0, 0, 2]]), InteractionKey("detector"))
+
+        self.logger.filter(detectedBy="detector")
+
+        self.assertEqual((0, 0.25), self.logger.getEnergyBalance(self.INTERACTION_KEY))
+
+    def testWhenGetFiltered_shouldKeepEnergyBalanceOfFilteredData(self):
+        self.logger.logDataPointArray(np.array([[0.5, 0, 0, 0, 1], [0.25, 0, 0, 0, 2]]), self.INTERACTION_KEY)
+        self.logger.logDataPointArray(np.array([[0.1, 0, 0, 0, 2]]), InteractionKey("detector"))
+
+        filteredLogger = self.logger.getFiltered(detectedBy="detector")
+
+        self.assertEqual((0, 0.25), filteredLogger.getEnergyBalance(self.INTERACTION_KEY))
+        self.assertEqual((0, 0.75), self.logger.getEnergyBalance(self.INTERACTION_KEY))
+
+    def testWhenLogBinnedData_shouldAddItsEnergyBalance(self):
+        self.logger = EnergyLogger(self.TEST_SCENE, keep3D=False, views=[])
+        self.logger.logDataPoint(0.5, self.CUBE_CENTER, self.INTERACTION_KEY)
+
+        self.logger.logBinnedData(
+            [], [self.INTERACTION_KEY], nDataPoints=1, energyBalance={self.INTERACTION_KEY: (-1, 0.25)}
+        )
+
+        self.assertEqual((-1, 0.75), self.logger.getEnergyBalance(self.INTERACTION_KEY))
+
+    def testGivenALoggerPickledByPreviousVersions_whenLoad_shouldNotTrackEnergyBalance(self):
+        previousLogger = EnergyLogger(self.TEST_SCENE, keep3D=False, views=[])
+        previousLogger.logDataPoint(0.5, self.CUBE_CENTER, self.INTERACTION_KEY)
+
+        logger = testStats.TestStats.reloadAsLegacyLogger(previousLogger)
+
+        self.assertFalse(logger.tracksEnergyBalance)
+        with self.assertRaises(RuntimeError):
+            logger.getEnergyBalance(self.INTERACTION_KEY)
+
+    def testGivenFluenceVoxelGrid_whenGetBinningScale_shouldScaleVolumetricKeysByAbsorptionCoefficient(self):
+        material = ScatteringMaterial(mu_s=2, mu_a=4, g=0.8, n=1.4)
+        scene = ScatteringScene([Cube(1, material=material, label="cube")])
+        self.logger = EnergyLogger(scene, keep3D=False, defaultViewEnergyType=EnergyType.FLUENCE_RATE, voxelSize=0.5)
+
+        self.assertEqual(0.25, self.logger.getBinningScale(self.logger.voxelGrid, InteractionKey("cube")))
+        self.assertIsNone(self.logger.getBinningScale(self.logger.voxelGrid, InteractionKey("cube", "cube_top")))
+
+    def testGivenStorageDir_whenLogDataPoints_shouldStoreDataPointsOnDisk(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            logger = EnergyLogger(self.TEST_SCENE, storageDir=tempDir)
+
+            logger.logDataPointArray(np.array([[0.5, 0.5, 0.5, 0.5], [1, 0.5, 0.5, 0.5]]), self.INTERACTION_KEY)
+            logger.logDataPoint(2, self.CUBE_CENTER, self.INTERACTION_KEY)
+
+            self.assertEqual(1, len(os.listdir(tempDir)))
+            self.assertTrue(np.array_equal([0.5, 1, 2], logger.getRawDataPoints(self.INTERACTION_KEY)[:, 0]))
+            del logger
+
+    def testGivenStorageDir_whenIterDataPoints_shouldYieldDataPointsInChunks(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            logger = EnergyLogger(self.TEST_SCENE, storageDir=tempDir)
+            logger.logDataPointArray(np.full((10, 4), 0.5), self.INTERACTION_KEY)
+
+            chunks = list(logger.iterDataPoints(self.INTERACTION_KEY, chunkSize=3))
+
+            self.assertEqual([3, 3, 3, 1], [len(chunk) for chunk in chunks])
+            del chunks, logger
+
+    def testGivenStorageDir_whenUpdateView_shouldExtractDataFromDisk(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            logger = EnergyLogger(self.TEST_SCENE, storageDir=tempDir)
+            logger.logDataPointArray(np.full((10, 4), 0.5), self.INTERACTION_KEY)
+            cubeViewZ = logger.views[5]
+
+            logger.updateView(cubeViewZ)
+
+            self.assertEqual(5, cubeViewZ.getSum())
+            del logger
+
     def testWhenSave_shouldSaveLoggerToFile(self):
         with tempfile.TemporaryDirectory() as tempDir:
             filePath = os.path.join(tempDir, "test.log")
@@ -247,6 +443,39 @@ class TestEnergyLogger(unittest.TestCase):
             self.assertTrue(np.array_equal(previousLogger.getRawDataPoints(), logger.getRawDataPoints()))
             self.assertEqual(previousLogger.info, logger.info)
 
+    def testGivenALoggerPickledByPreviousVersions_whenLoad_shouldLoadPreviousLoggerFromFile(self):
+        previousLogger = EnergyLogger(self.TEST_SCENE)
+        previousLogger.logDataPointArray(np.array([[0.5, 0, 0, 0]]), self.INTERACTION_KEY)
+        previousLogger.info["some key"] = "some metadata"
+        state = previousLogger._getState()
+        legacyKeys = ["info", "labels", "views", "defaultViews", "outdatedViews", "nDataPointsRemoved", "sceneHash"]
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "test.log")
+            with open(filePath, "wb") as file:
+                pickle.dump((previousLogger._data, *[state[key] for key in legacyKeys], True), file)
+
+            logger = EnergyLogger(self.TEST_SCENE, filePath)
+
+            self.assertTrue(np.array_equal(previousLogger.getRawDataPoints(), logger.getRawDataPoints()))
+            self.assertEqual(previousLogger.info, logger.info)
+            self.assertEqual(len(previousLogger.views), len(logger.views))
+
+    def testGivenALoggerWithUpdatedViewPreviouslySaved_whenLoadAndLogMoreData_shouldOnlyExtractNewData(self):
+        previousLogger = EnergyLogger(self.TEST_SCENE)
+        previousLogger.logDataPoint(0.5, self.CUBE_CENTER, self.INTERACTION_KEY)
+        previousLogger.updateView(previousLogger.views[5])
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "test.log")
+            previousLogger.save(filePath)
+            logger = EnergyLogger(self.TEST_SCENE, filePath)
+
+            logger.logDataPoint(0.25, self.CUBE_CENTER, self.INTERACTION_KEY)
+            logger.updateView(logger.views[5])
+
+            self.assertEqual(0.75, logger.views[5].getSum())
+
     def testGivenLoggerFromFile_shouldWarnIfLoadedWithDifferentScene(self):
         anotherScene = ScatteringScene([self.CUBE], worldMaterial=ScatteringMaterial(0.5, 0.5, 0.5))
         previousLogger = EnergyLogger(self.TEST_SCENE)
@@ -330,6 +559,23 @@ class TestEnergyLogger(unittest.TestCase):
             self.assertEqual(parse_line(lines[3]), [0.1, 0.7, 0.8, 0.8, 1.0, 2.0, -1.0])
             self.assertEqual(parse_line(lines[4]), [0.4, 0.0, 5.0, 0.0, 0.0, 3.0, -1.0])
 
+    def testWhenExportToNPY_shouldExportEachColumnToFile(self):
+        scene = PhantomTissue(worldMaterial=ScatteringMaterial(0.1, 0.1, 0.99))
+        self.logger = EnergyLogger(scene)
+        self.logger.logDataPoint(0.1, Vector(0.7, 0.8, 0.8), InteractionKey("middleLayer"), ID=1)
+        self.logger.logDataPoint(0.2, Vector(0, 0, 0), InteractionKey(WORLD_SOLID_LABEL), ID=0)
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "test_sim")
+            self.logger.export(filePath, fileFormat="npy")
+
+            energy = np.load(os.path.join(filePath, "energy.npy"))
+            solidIndex = np.load(os.path.join(filePath, "solid_index.npy"))
+            self.assertTrue(os.path.exists(filePath + ".json"))
+
+        self.assertTrue(np.allclose([0.2, 0.1], energy))
+        self.assertTrue(np.array_equal([-1, 2], solidIndex))
+
     def testWhenExport_shouldExportMetadataToFile(self):
         scene = PhantomTissue(worldMaterial=ScatteringMaterial(0.1, 0.1, 0.99))
         scene.add(Sphere(position=Vector(0, 5, 0), material=ScatteringMaterial(0.4, 0.2, 0.9)))
@@ -407,6 +653,17 @@ class TestEnergyLogger(unittest.TestCase):
         self.assertEqual(8, data.shape[0])
         self.assertTrue(np.array_equal(np.unique(data[:, 4]), [1, 2]))
 
+    def testGivenMoreDataLoggedAfterFiltering_whenGetFiltered_shouldAlsoFilterNewData(self):
+        self.logger.logDataPoint(0.1, Vector(0.7, 0.8, 0.8), InteractionKey("cube"), ID=0)
+        self.logger.logDataPoint(0.4, Vector(0, 5, 0), InteractionKey("sphere"), ID=1)
+        self.logger.getFiltered(detectedBy="sphere")
+        self.logger.logDataPoint(0.1, Vector(0.7, 0.8, 0.8), InteractionKey("cube"), ID=2)
+        self.logger.logDataPoint(0.4, Vector(0, 5, 0), InteractionKey("sphere"), ID=2)
+
+        data = self.logger.getFiltered(detectedBy="sphere").getRawDataPoints()
+
+        self.assertTrue(np.array_equal([1, 2, 2], np.sort(data[:, 4])))
+
     def testWhenGetFiltered_shouldReturnANewFilteredLogger(self):
         # Photon 0
         self.logger.logDataPoint(0.1, Vector(0.7, 0.8, 0.8), InteractionKey("cube"), ID=0)
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from pytissueoptics.rayscattering.energyLogging.photonIndex import PhotonIndex
+from pytissueoptics.scene.logger.listArrayContainer import ListArrayContainer
+
+
+class TestPhotonIndex(unittest.TestCase):
+    def setUp(self):
+        self.container = ListArrayContainer()
+        self.container.append(self._makeDataPoints([3, 1, 3, 0, 2]))
+        self.photonIndex = PhotonIndex(self.container)
+        self.photonIndex.update()
+
+    @staticmethod
+    def _makeDataPoints(photonIDs):
+        dataPoints = np.zeros((len(photonIDs), 5), dtype=np.float32)
+        dataPoints[:, 4] = photonIDs
+        return dataPoints
+
+    def testShouldHaveUniquePhotonIDs(self):
+        self.assertTrue(np.array_equal([0, 1, 2, 3], self.photonIndex.uniqueIDs))
+
+    def testWhenGetRows_shouldReturnRowsOfGivenPhotonsInContainerOrder(self):
+        rows = self.photonIndex.getRows(np.array([3, 0]))
+
+        self.assertTrue(np.array_equal([0, 2, 3], rows))
+
+    def testWhenGetRowsOfUnknownPhotons_shouldReturnNoRows(self):
+        rows = self.photonIndex.getRows(np.array([7]))
+
+        self.assertEqual(0, len(rows))
+
+    def testGivenMoreDataAppended_whenUpdate_shouldIndexNewRows(self):
+        self.container.append(self._makeDataPoints([1, 5]))
+
+        self.photonIndex.update()
+
+        self.assertTrue(np.array_equal([1, 5], self.photonIndex.getRows(np.array([1]))))
+        self.assertTrue(np.array_equal([0, 1, 2, 3, 5], self.photonIndex.uniqueIDs))
+
+    def testShouldSelectSameRowsAsScanningAllPhotonIDs(self):
+        photonIDs = np.random.randint(0, 1000, size=5000)
+        self.container.append(self._makeDataPoints(photonIDs))
+        self.photonIndex.update()
+        selectedIDs = np.random.randint(0, 1000, size=50)
+
+        rows = self.photonIndex.getRows(selectedIDs)
+
+        allPhotonIDs = self.container.getData()[:, 4].astype(np.uint32)
+        expectedRows = np.nonzero(np.isin(allPhotonIDs, selectedIDs))[0]
+        self.assertTrue(np.array_equal(expectedRows, rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
+import os
+import tempfile
 import unittest
 
 import numpy as np
 
 from pytissueoptics import EnergyLogger, ScatteringScene
 from pytissueoptics.rayscattering.energyLogging import PointCloudFactory
+from pytissueoptics.scene.geometry import Vector
 from pytissueoptics.scene.logger import InteractionKey
 
 
@@ -63,6 +66,56 @@ class TestPointCloudFactory(unittest.TestCase):
         self.assertIsNone(pointCloud.solidPoints)
         self.assertIsNone(pointCloud.surfacePoints)
 
+    def testWhenGetPointCloudAgain_shouldReturnCachedPointCloud(self):
+        logger = self._createTestLogger()
+        pointCloud = PointCloudFactory(logger).getPointCloud()
+
+        otherPointCloud = PointCloudFactory(logger).getPointCloud()
+
+        self.assertIs(pointCloud, otherPointCloud)
+
+    def testGivenLoggerStoringDataPointsOnDisk_whenGetPointCloudAgain_shouldNotCachePointCloud(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            logger = EnergyLogger(scene=ScatteringScene([]), storageDir=tempDir)
+            logger.logDataPointArray(np.array([[0.5, 1, 0, 0]]), InteractionKey(self.SOLID_LABEL_A))
+            pointCloud = PointCloudFactory(logger).getPointCloud()
+
+            otherPointCloud = PointCloudFactory(logger).getPointCloud()
+
+            self.assertIsNot(pointCloud, otherPointCloud)
+            self.assertTrue(np.array_equal(pointCloud.solidPoints, otherPointCloud.solidPoints))
+            del logger, pointCloud, otherPointCloud
+
+    def testGivenLoggerLoadedFromFile_whenGetPointCloudAgain_shouldNotCachePointCloud(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            filepath = os.path.join(tempDir, "test.log")
+            self._createTestLogger().save(filepath)
+            logger = EnergyLogger(scene=ScatteringScene([]), filepath=filepath)
+            pointCloud = PointCloudFactory(logger).getPointCloud()
+
+            otherPointCloud = PointCloudFactory(logger).getPointCloud()
+
+            self.assertIsNot(pointCloud, otherPointCloud)
+            del logger, pointCloud, otherPointCloud
+
+    def testWhenClearCache_shouldRebuildPointCloud(self):
+        logger = self._createTestLogger()
+        pointCloud = PointCloudFactory(logger).getPointCloud()
+
+        PointCloudFactory.clearCache()
+
+        self.assertIsNot(pointCloud, PointCloudFactory(logger).getPointCloud())
+
+    def testGivenNewDataLogged_whenGetPointCloud_shouldIncludeNewData(self):
+        logger = self._createTestLogger()
+        pointCloudFactory = PointCloudFactory(logger)
+        pointCloudFactory.getPointCloud()
+
+        logger.logDataPoint(0.5, Vector(0, 0, 0), InteractionKey(self.SOLID_LABEL_A))
+        pointCloud = pointCloudFactory.getPointCloud()
+
+        self.assertEqual(self.N_POINTS_PER_SOLID * 2 + 1, len(pointCloud.solidPoints))
+
     def _createTestLogger(self):
         logger = EnergyLogger(scene=ScatteringScene([]))
         solidPointsA = np.array([[0.5, 1, 0, 0], [0.5, 1, 0, 0.1], [0.5, 1, 0, -0.1]])
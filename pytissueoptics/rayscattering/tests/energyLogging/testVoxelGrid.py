@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from pytissueoptics.rayscattering.energyLogging import VoxelGrid
+
+
+class TestVoxelGrid(unittest.TestCase):
+    def testShouldHaveBinsFromLimitsAndBinSize(self):
+        grid = VoxelGrid([(0, 2), (-1, 1), (0, 3)], binSize=(0.5, 1, 0.1))
+        self.assertEqual((4, 2, 30), grid.bins)
+        self.assertEqual((4, 2, 30), grid.data.shape)
+
+    def testWhenExtractData_shouldBinValuesToVoxels(self):
+        grid = VoxelGrid([(0, 1), (0, 1), (0, 1)], binSize=0.5)
+        dataPoints = np.array([[0.5, 0.1, 0.1, 0.1], [0.2, 0.1, 0.1, 0.2], [0.3, 0.9, 0.6, 0.1]])
+
+        grid.extractData(dataPoints)
+
+        self.assertAlmostEqual(0.7, grid.data[0, 0, 0])
+        self.assertAlmostEqual(0.3, grid.data[1, 1, 0])
+        self.assertAlmostEqual(1.0, grid.getSum())
+
+    def testWhenExtractData_shouldIgnoreDataOutOfLimits(self):
+        grid = VoxelGrid([(0, 1), (0, 1), (0, 1)], binSize=0.5)
+
+        grid.extractData(np.array([[0.5, 2, 0.5, 0.5], [0.2, 0.5, 0.5, 0.5]]))
+
+        self.assertAlmostEqual(0.2, grid.getSum())
+
+    def testWhenAddBinnedDataOfItsBinningGrid_shouldBeEquivalentToExtractData(self):
+        dataPoints = np.array([[0.5, 0.1, 0.1, 0.1], [0.3, 0.9, 0.6, 0.1]])
+        grid = VoxelGrid([(0, 1), (0, 1), (0, 1)], binSize=0.25)
+        otherGrid = VoxelGrid([(0, 1), (0, 1), (0, 1)], binSize=0.25)
+        grid.extractData(dataPoints)
+
+        limits3D, bins3D, sign = otherGrid.getBinningGrid()
+        otherGrid.addBinnedData(
+            np.histogramdd(dataPoints[:, 1:], bins=bins3D, range=limits3D, weights=dataPoints[:, 0])[0]
+        )
+
+        self.assertEqual(0, sign)
+        self.assertTrue(np.allclose(grid.data, otherGrid.data))
@@ -7,7 +7,7 @@ import numpy as np
 
 from pytissueoptics import ScatteringMaterial, Vector
 from pytissueoptics.rayscattering.opencl import OPENCL_AVAILABLE, OPENCL_OK
-from pytissueoptics.rayscattering.opencl.buffers import MaterialCL, SeedCL, SurfaceCL, SurfaceCLInfo
+from pytissueoptics.rayscattering.opencl.buffers import MaterialCL, SurfaceCL, SurfaceCLInfo
 from pytissueoptics.rayscattering.opencl.config.CLConfig import OPENCL_SOURCE_DIR
 from pytissueoptics.rayscattering.tests.opencl.src.CLObjects import IntersectionCL
 
@@ -134,7 +134,6 @@ class TestCLFresnel(unittest.TestCase):
     def _computeFresnelIntersection(self, rayDirection: Vector) -> FresnelResult:
         N = 1  # Kernel size errors when trying a vector buffer. Limiting to 1 for now, which is fine for testing.
         singleRayDirectionBuffer = cl.cltypes.make_float3(*rayDirection.array)
-        seeds = SeedCL(N)
         fresnelBuffer = FresnelIntersectionCL(N)
         self.program.launchKernel(
             "computeFresnelIntersectionKernel",
@@ -144,7 +143,7 @@ class TestCLFresnel(unittest.TestCase):
                 self.intersection,
                 self.materials,
                 self.surfaces,
-                seeds,
+                np.uint64(0),
                 fresnelBuffer,
             ],
         )
@@ -185,15 +184,15 @@ class TestCLFresnel(unittest.TestCase):
         return vectorOperatorsSourceCode + randomSourceCode
 
     def _mockIsReflected(self, isReflected: bool):
-        isReflectedFunction = """bool _getIsReflected(float nIn, float nOut, float thetaIn, __global uint *seeds, uint gid) {
+        isReflectedFunction = """bool _getIsReflected(float nIn, float nOut, float thetaIn, Random *random) {
     float R = _getReflectionCoefficient(nIn, nOut, thetaIn);
-    float randomFloat = getRandomFloatValue(seeds, gid);
+    float randomFloat = getRandomFloatValue(random);
     if (R >= randomFloat) {
         return true;
     }
     return false;
 }"""
-        mockFunction = """bool _getIsReflected(float nIn, float nOut, float thetaIn, __global uint *seeds, uint gid) {
+        mockFunction = """bool _getIsReflected(float nIn, float nOut, float thetaIn, Random *random) {
         return %s;
         }""" % str(isReflected).lower()
         self.program.mock(isReflectedFunction, mockFunction)
@@ -4,13 +4,15 @@ import unittest
 
 import numpy as np
 
-from pytissueoptics import Cuboid, ScatteringMaterial, ScatteringScene, Vector
+from pytissueoptics import Cuboid, ScatteringMaterial, ScatteringScene, Sphere, Vector
 from pytissueoptics.rayscattering.opencl import OPENCL_OK
 from pytissueoptics.rayscattering.opencl.CLPhotons import CLScene
 from pytissueoptics.rayscattering.opencl.CLProgram import CLProgram
+from pytissueoptics.rayscattering.opencl.CLScene import WORLD_SOLID_LABEL
 from pytissueoptics.rayscattering.opencl.config.CLConfig import OPENCL_SOURCE_DIR
 from pytissueoptics.rayscattering.tests.opencl.src.CLObjects import RayCL
 from pytissueoptics.rayscattering.tests.opencl.src.testCLFresnel import IntersectionCL
+from pytissueoptics.scene.intersection import Ray, SimpleIntersectionFinder
 
 
 @unittest.skipIf(not OPENCL_OK, "OpenCL device not available.")
@@ -43,6 +45,9 @@ class TestCLIntersection(unittest.TestCase):
                     clScene.triangles,
                     clScene.vertices,
                     clScene.solidCandidates,
+                    clScene.bvhNodes,
+                    clScene.bvhPolygonIDs,
+                    clScene.polygonSurfaceIDs,
                     intersections,
                 ],
             )
@@ -70,6 +75,50 @@ class TestCLIntersection(unittest.TestCase):
         self.assertEqual(rayIntersection["normal"]["z"], -1)
         self.assertEqual(rayIntersection["distanceLeft"], rayLength - abs(rayOrigin[2] - hitPointZ))
 
+    def testGivenHighResolutionSolid_whenFindIntersections_shouldMatchPythonIntersectionFinder(self):
+        sphere = Sphere(radius=1, order=3, material=ScatteringMaterial(0.1, 0.8, 0.8, 1.4))
+        _scene = ScatteringScene([sphere], worldMaterial=ScatteringMaterial())
+        clScene = CLScene(_scene, nWorkUnits=1)
+        finder = SimpleIntersectionFinder(_scene)
+
+        np.random.seed(0)
+        rayLength = 20
+        for _ in range(20):
+            origin = np.random.uniform(-3, 3, 3) + np.array([0, 0, -5])
+            direction = np.random.uniform(-0.3, 0.3, 3) - origin
+            direction /= np.linalg.norm(direction)
+
+            rayIntersection = self._findIntersection(clScene, origin, direction, rayLength)
+
+            ray = Ray(Vector(*origin), Vector(*direction), rayLength)
+            expectedIntersection = finder.findIntersection(ray, currentSolidLabel=WORLD_SOLID_LABEL)
+            self.assertEqual(expectedIntersection is not None, bool(rayIntersection["exists"]))
+            if expectedIntersection is not None:
+                self.assertAlmostEqual(expectedIntersection.distance, rayIntersection["distance"], places=4)
+
+    def _findIntersection(self, clScene, origin, direction, rayLength):
+        rays = RayCL(origins=np.array([origin]), directions=np.array([direction]), lengths=np.array([rayLength]))
+        intersections = IntersectionCL(skipDeclaration=True)
+        self.program.launchKernel(
+            "findIntersections",
+            N=1,
+            arguments=[
+                rays,
+                clScene.nSolids,
+                clScene.solids,
+                clScene.surfaces,
+                clScene.triangles,
+                clScene.vertices,
+                clScene.solidCandidates,
+                clScene.bvhNodes,
+                clScene.bvhPolygonIDs,
+                clScene.polygonSurfaceIDs,
+                intersections,
+            ],
+        )
+        self.program.getData(intersections)
+        return intersections.hostBuffer[0]
+
     def _getTestScene(self):
         material1 = ScatteringMaterial(0.1, 0.8, 0.8, 1.4)
         material2 = ScatteringMaterial(2, 0.8, 0.8, 1.2)
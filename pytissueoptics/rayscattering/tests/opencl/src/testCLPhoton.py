@@ -8,10 +8,10 @@ import numpy as np
 from pytissueoptics import ScatteringMaterial, ScatteringScene, Vector
 from pytissueoptics.rayscattering.opencl import OPENCL_AVAILABLE, OPENCL_OK
 from pytissueoptics.rayscattering.opencl.buffers import (
+    BVHNodeCL,
     DataPointCL,
     MaterialCL,
     PhotonCL,
-    SeedCL,
     SolidCandidateCL,
     SolidCL,
     SurfaceCL,
@@ -23,6 +23,7 @@ from pytissueoptics.rayscattering.opencl.buffers import (
 from pytissueoptics.rayscattering.opencl.CLProgram import CLProgram
 from pytissueoptics.rayscattering.opencl.CLScene import NO_LOG_ID, NO_SURFACE_ID, WORLD_SOLID_ID, CLScene
 from pytissueoptics.rayscattering.opencl.config.CLConfig import OPENCL_SOURCE_DIR
+from pytissueoptics.rayscattering.opencl.utils import CLBinning
 from pytissueoptics.scene.geometry import Vertex
 
 if OPENCL_AVAILABLE:
@@ -133,7 +134,7 @@ class TestCLPhoton(unittest.TestCase):
         weightThreshold = 1e-4
         self.INITIAL_WEIGHT = weightThreshold * 1.1
 
-        photonResult = self._photonFunc("roulette", weightThreshold, SeedCL(1))
+        photonResult = self._photonFunc("roulette", weightThreshold, np.uint64(0))
 
         self.assertAlmostEqual(self.INITIAL_WEIGHT, photonResult.weight)
 
@@ -143,7 +144,7 @@ class TestCLPhoton(unittest.TestCase):
         self.INITIAL_WEIGHT = weightThreshold * 0.9
         self._mockRandomValue(CHANCE + 0.01)
 
-        photonResult = self._photonFunc("roulette", weightThreshold, SeedCL(1))
+        photonResult = self._photonFunc("roulette", weightThreshold, np.uint64(0))
 
         self.assertAlmostEqual(0, photonResult.weight)
 
@@ -153,7 +154,7 @@ class TestCLPhoton(unittest.TestCase):
         self.INITIAL_WEIGHT = weightThreshold * 0.9
         self._mockRandomValue(CHANCE - 0.01)
 
-        photonResult = self._photonFunc("roulette", weightThreshold, SeedCL(1))
+        photonResult = self._photonFunc("roulette", weightThreshold, np.uint64(0))
 
         self.assertAlmostEqual(self.INITIAL_WEIGHT / CHANCE, photonResult.weight)
 
@@ -271,7 +272,7 @@ class TestCLPhoton(unittest.TestCase):
             surfaces,
             logger,
             0,
-            SeedCL(1),
+            np.uint64(0),
         )
 
         expectedDirection = Vector(1, 1, 0)
@@ -311,7 +312,7 @@ class TestCLPhoton(unittest.TestCase):
             surfaces,
             logger,
             0,
-            SeedCL(1),
+            np.uint64(0),
         )
 
         expectedDirection = Vector(0, -1, 0)
@@ -342,7 +343,7 @@ class TestCLPhoton(unittest.TestCase):
             surfaces,
             TriangleCL([]),
             VertexCL([]),
-            SeedCL(1),
+            np.uint64(0),
             logger,
             0,
         )
@@ -362,7 +363,7 @@ class TestCLPhoton(unittest.TestCase):
             surfaces,
             TriangleCL([]),
             VertexCL([]),
-            SeedCL(1),
+            np.uint64(0),
             logger,
             0,
         )
@@ -393,7 +394,7 @@ class TestCLPhoton(unittest.TestCase):
             surfaces,
             triangles,
             VertexCL([vertex]),
-            SeedCL(1),
+            np.uint64(0),
             logger,
             0,
         )
@@ -416,7 +417,7 @@ class TestCLPhoton(unittest.TestCase):
             surfaces,
             TriangleCL([]),
             VertexCL([]),
-            SeedCL(1),
+            np.uint64(0),
             logger,
             0,
         )
@@ -440,7 +441,7 @@ class TestCLPhoton(unittest.TestCase):
             surfaces,
             triangles,
             vertices,
-            SeedCL(1),
+            np.uint64(0),
             logger,
             0,
         )
@@ -465,7 +466,7 @@ class TestCLPhoton(unittest.TestCase):
             surfaces,
             triangles,
             vertices,
-            SeedCL(1),
+            np.uint64(0),
             logger,
             0,
         )
@@ -518,6 +519,7 @@ class TestCLPhoton(unittest.TestCase):
 
         s = self._getCLSceneOfInfiniteMedium(material)
         logger = DataPointCL(maxInteractions)
+        binning = CLBinning(s, nWorkItems=1)
         photonBuffer = PhotonCL(
             positions=np.array([self.INITIAL_POSITION.array]),
             directions=np.array([self.INITIAL_DIRECTION.array]),
@@ -541,8 +543,24 @@ class TestCLPhoton(unittest.TestCase):
                 s.triangles,
                 s.vertices,
                 s.solidCandidates,
-                SeedCL(1),
+                s.bvhNodes,
+                s.bvhPolygonIDs,
+                s.polygonSurfaceIDs,
+                np.uint64(0),
                 logger,
+                binning.isBinning,
+                binning.nSurfaces,
+                binning.gridLimits,
+                binning.gridShapes,
+                binning.keyGridOffsets,
+                binning.keyGridIDs,
+                binning.keyGridScales,
+                binning.bins,
+                binning.seenKeys,
+                binning.keyBalanceIDs,
+                binning.nBalanceKeys,
+                binning.keyEnergies,
+                binning.interactionCounts,
             ],
         )
         return self._getPhotonResult(photonBuffer)
@@ -558,12 +576,12 @@ class TestCLPhoton(unittest.TestCase):
         requiredObjects = [
             MaterialCL([ScatteringMaterial()]),
             SurfaceCL([]),
-            SeedCL(1),
             VertexCL([]),
             DataPointCL(1),
             SolidCandidateCL(1, 1),
             TriangleCL([]),
             SolidCL([]),
+            BVHNodeCL(np.zeros((0, 3)), np.zeros((0, 3)), [], []),
         ]
         missingObjects = []
         for obj in requiredObjects:
@@ -603,17 +621,22 @@ class TestCLPhoton(unittest.TestCase):
         self.fail("Vectors are equal")
 
     def _mockRandomValue(self, value):
-        getRandomFloatValueFunction = """float getRandomFloatValue(__global unsigned int *seeds, unsigned int id){
-     float result = 0.0f;
-     while(result == 0.0f){
-         uint rnd_seed = wangHash(seeds[id]);
-         seeds[id] = rnd_seed;
-         result = (float)rnd_seed / (float)UINT_MAX;
-     }
-     return result;
+        getRandomFloatValueFunction = """float getRandomFloatValue(Random *random){
+    /*
+    Returns a random value in ]0, 1]. Each block of 4 values drawn is generated at once.
+    */
+    uint blockIndex = random->counter / 4;
+    if (blockIndex != random->blockIndex){
+        random->block = philox4x32((uint4)(random->photonID, blockIndex, random->stream, 0), random->key);
+        random->blockIndex = blockIndex;
+    }
+    uint values[4] = {random->block.x, random->block.y, random->block.z, random->block.w};
+    uint value = values[random->counter % 4];
+    random->counter++;
+    return ((value >> 8) + 1) * (1.0f / 16777216.0f);
 }"""
         mockFunction = (
-            """float getRandomFloatValue(__global unsigned int *seeds, unsigned int id){
+            """float getRandomFloatValue(Random *random){
         return %f;
     }"""
             % value
@@ -629,7 +652,7 @@ class TestCLPhoton(unittest.TestCase):
         nextSolidID=0,
     ):
         fresnelCall = """FresnelIntersection fresnelIntersection = computeFresnelIntersection(photons[photonID].direction, intersection,
-                                                                         materials, surfaces, seeds, gid);"""
+                                                                         materials, surfaces, random);"""
         x, y, z = incidencePlane.array
         mockCall = """FresnelIntersection fresnelIntersection;
         fresnelIntersection.isReflected = %s;
@@ -651,6 +674,7 @@ class TestCLPhoton(unittest.TestCase):
         intersection.position = (float3)(%.7f, %.7f, %.7f);
         intersection.normal = (float3)(%.f, %f, %f);
         intersection.surfaceID = %d;
+        intersection.polygonID = 0;
         intersection.distanceLeft = %f;
         """ % (str(exists).lower(), distance, px, py, pz, nx, ny, nz, surfaceID, distanceLeft)
         self.program.mock(intersectionCall, mockCall)
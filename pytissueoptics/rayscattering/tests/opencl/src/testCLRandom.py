@@ -3,58 +3,76 @@ import unittest
 
 import numpy as np
 
-from pytissueoptics.rayscattering.opencl import OPENCL_OK
-from pytissueoptics.rayscattering.opencl.buffers import EmptyBuffer, SeedCL
+from pytissueoptics.rayscattering.opencl import OPENCL_AVAILABLE, OPENCL_OK
+from pytissueoptics.rayscattering.opencl.buffers import BufferOf, EmptyBuffer
 from pytissueoptics.rayscattering.opencl.CLProgram import CLProgram
 from pytissueoptics.rayscattering.opencl.config.CLConfig import OPENCL_SOURCE_DIR
 
+if OPENCL_AVAILABLE:
+    import pyopencl as cl
+else:
+    cl = None
+
 
 @unittest.skipIf(not OPENCL_OK, "OpenCL device not available.")
 class TestCLRandom(unittest.TestCase):
+    N_PHOTONS = 10
+    SEED = 1234
+
     def setUp(self):
         sourcePath = os.path.join(OPENCL_SOURCE_DIR, "random.c")
         self.program = CLProgram(sourcePath)
 
     def testWhenGetRandomValues_shouldBeRandom(self):
-        nWorkUnits = 10
-        np.random.seed(0)
-        seeds = SeedCL(nWorkUnits)
-        valueBuffer = EmptyBuffer(nWorkUnits)
-
-        self.program.launchKernel("fillRandomFloatBuffer", N=nWorkUnits, arguments=[seeds, valueBuffer])
+        randomValues = self._getRandomValues(self.SEED, firstValue=0)
 
-        randomValues = self.program.getData(valueBuffer)
-        self.assertTrue(np.all(randomValues >= 0))
+        self.assertTrue(np.all(randomValues > 0))
         self.assertTrue(np.all(randomValues <= 1))
-        self.assertTrue(len(np.unique(randomValues)) == nWorkUnits)
+        self.assertTrue(len(np.unique(randomValues)) == self.N_PHOTONS)
 
-    def testWhenGetRandomValuesASecondTime_shouldBeDifferent(self):
-        nWorkUnits = 10
-        np.random.seed(0)
-        seeds = SeedCL(nWorkUnits)
+    def testWhenGetNextRandomValues_shouldBeDifferent(self):
+        randomValues1 = self._getRandomValues(self.SEED, firstValue=0)
+        randomValues2 = self._getRandomValues(self.SEED, firstValue=1)
 
-        valueBuffer1 = EmptyBuffer(nWorkUnits)
-        valueBuffer2 = EmptyBuffer(nWorkUnits)
-
-        self.program.launchKernel("fillRandomFloatBuffer", N=nWorkUnits, arguments=[seeds, valueBuffer1])
-        self.program.launchKernel("fillRandomFloatBuffer", N=nWorkUnits, arguments=[seeds, valueBuffer2])
-
-        randomValues1 = self.program.getData(valueBuffer1)
-        randomValues2 = self.program.getData(valueBuffer2)
         self.assertTrue(np.all(randomValues1 != randomValues2))
 
     def testGivenSameSeed_shouldGenerateSameRandomValues(self):
-        nWorkUnits = 10
-        np.random.seed(0)
-        seeds = SeedCL(nWorkUnits)
-        valueBuffer1 = EmptyBuffer(nWorkUnits)
-        self.program.launchKernel("fillRandomFloatBuffer", N=nWorkUnits, arguments=[seeds, valueBuffer1])
-
-        np.random.seed(0)
-        seeds = SeedCL(nWorkUnits)
-        valueBuffer2 = EmptyBuffer(nWorkUnits)
-        self.program.launchKernel("fillRandomFloatBuffer", N=nWorkUnits, arguments=[seeds, valueBuffer2])
-
-        randomValues1 = self.program.getData(valueBuffer1)
-        randomValues2 = self.program.getData(valueBuffer2)
+        randomValues1 = self._getRandomValues(self.SEED, firstValue=5)
+        randomValues2 = self._getRandomValues(self.SEED, firstValue=5)
+
         self.assertTrue(np.all(randomValues1 == randomValues2))
+
+    def testGivenDifferentSeed_shouldGenerateDifferentRandomValues(self):
+        randomValues1 = self._getRandomValues(self.SEED, firstValue=0)
+        randomValues2 = self._getRandomValues(self.SEED + 2**32, firstValue=0)
+
+        self.assertTrue(np.all(randomValues1 != randomValues2))
+
+    def testShouldMatchPhiloxKnownAnswers(self):
+        # Known-answer tests of Philox4x32-10 from the Random123 library.
+        knownAnswers = [
+            ((0, 0, 0, 0), (0, 0), (0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8)),
+            ((0xFFFFFFFF,) * 4, (0xFFFFFFFF,) * 2, (0x408F276D, 0x41C83B0E, 0xA20BC7C6, 0x6D5451FD)),
+            (
+                (0x243F6A88, 0x85A308D3, 0x13198A2E, 0x03707344),
+                (0xA4093822, 0x299F31D0),
+                (0xD16CFE09, 0x94FDCCEB, 0x5001E420, 0x24126EA1),
+            ),
+        ]
+        for counter, key, expectedValues in knownAnswers:
+            values = BufferOf(np.zeros(4, dtype=np.uint32))
+            self.program.launchKernel(
+                "fillPhiloxBlock",
+                N=1,
+                arguments=[cl.cltypes.make_uint4(*counter), cl.cltypes.make_uint2(*key), values],
+            )
+            self.assertEqual(list(expectedValues), list(self.program.getData(values)))
+
+    def _getRandomValues(self, seed: int, firstValue: int) -> np.ndarray:
+        valueBuffer = EmptyBuffer(self.N_PHOTONS)
+        self.program.launchKernel(
+            "fillRandomFloatBuffer",
+            N=self.N_PHOTONS,
+            arguments=[np.uint64(seed), np.uint32(firstValue), valueBuffer],
+        )
+        return self.program.getData(valueBuffer).copy()
@@ -7,9 +7,9 @@ import numpy as np
 from pytissueoptics.rayscattering.materials import ScatteringMaterial
 from pytissueoptics.rayscattering.opencl import OPENCL_OK
 from pytissueoptics.rayscattering.opencl.buffers import (
+    BVHNodeCL,
     DataPointCL,
     MaterialCL,
-    SeedCL,
     SolidCandidateCL,
     SolidCL,
     SurfaceCL,
@@ -99,10 +99,10 @@ class TestCLNormalSmoothing(unittest.TestCase):
         missingObjects = [
             MaterialCL([ScatteringMaterial()]),
             SurfaceCL([]),
-            SeedCL(1),
             DataPointCL(1),
             SolidCandidateCL(1, 1),
             SolidCL([]),
+            BVHNodeCL(np.zeros((0, 3)), np.zeros((0, 3)), [], []),
         ]
 
         for clObject in missingObjects:
@@ -0,0 +1,115 @@
+import math
+import os
+import unittest
+
+import numpy as np
+
+from pytissueoptics.rayscattering.opencl import OPENCL_OK
+from pytissueoptics.rayscattering.opencl.buffers import BufferOf, PhotonCL
+from pytissueoptics.rayscattering.opencl.CLProgram import CLProgram
+from pytissueoptics.rayscattering.opencl.CLSource import DIRECTIONAL_SOURCE, ISOTROPIC_SOURCE, CLSource
+from pytissueoptics.rayscattering.opencl.config.CLConfig import OPENCL_SOURCE_DIR
+from pytissueoptics.scene.geometry import Vector
+
+
+@unittest.skipIf(not OPENCL_OK, "OpenCL device not available.")
+class TestCLSource(unittest.TestCase):
+    N = 1000
+    POSITION = Vector(1, 2, 3)
+    MATERIAL_ID = 2
+    SEED = 7
+    SOLID_ID = 3
+
+    def setUp(self):
+        sourcePath = os.path.join(OPENCL_SOURCE_DIR, "source.c")
+        self.program = CLProgram(sourcePath)
+
+    def _generatePhotons(self, source: CLSource):
+        photons = PhotonCL(None, None, materialID=0, solidID=0, N=self.N)
+        self._launchGeneratePhotons(source, photons, firstID=0, offset=0, count=self.N)
+        data = self.program.getData(photons)
+        return data[:, :3], data[:, 4:7]
+
+    def _launchGeneratePhotons(self, source: CLSource, photons: PhotonCL, firstID: int, offset: int, count: int):
+        arguments = [
+            *source.getKernelArguments(),
+            np.uint32(self.MATERIAL_ID),
+            np.int32(self.SOLID_ID),
+            np.uint32(firstID),
+            np.uint32(offset),
+            photons,
+            np.uint64(self.SEED),
+        ]
+        self.program.launchKernel("generatePhotons", N=count, arguments=arguments)
+
+    def testGivenOffset_whenGeneratePhotons_shouldInitializePhotonsAfterOffsetWithSuccessiveIDs(self):
+        photons = PhotonCL(None, None, materialID=0, solidID=0, weight=0, N=10)
+
+        self._launchGeneratePhotons(CLSource(ISOTROPIC_SOURCE, self.POSITION), photons, firstID=100, offset=4, count=6)
+
+        self.program.getData(photons, returnData=False)
+        self.assertTrue(np.all(photons.hostBuffer["weight"][:4] == 0))
+        self.assertTrue(np.all(photons.hostBuffer["weight"][4:] == 1))
+        self.assertEqual(list(range(100, 106)), list(photons.hostBuffer["ID"][4:]))
+        self.assertTrue(np.all(photons.hostBuffer["materialID"][4:] == self.MATERIAL_ID))
+        self.assertTrue(np.all(photons.hostBuffer["solidID"][4:] == self.SOLID_ID))
+
+    def testWhenCompactPhotons_shouldMovePhotonsAliveToTheStartInOrder(self):
+        weights = np.array([1, 0, 0.5, 0, 0, 1, 0.2, 0, 1, 0], dtype=np.float32)
+        photons = PhotonCL(None, None, materialID=0, solidID=0, N=len(weights))
+        photons.make(self.program.device)
+        photons.hostBuffer["weight"] = weights
+        compactedPhotons = PhotonCL(None, None, materialID=0, solidID=0, weight=0, N=len(weights))
+        blockSize, nBlocks = 3, 4
+        blockCounts = BufferOf(np.zeros(nBlocks, dtype=np.uint32), buildOnce=True)
+        aliveCount = BufferOf(np.zeros(1, dtype=np.uint32), buildOnce=True)
+        nPhotons, blockSize = np.uint32(len(weights)), np.uint32(blockSize)
+
+        self.program.launchKernel("countAlivePhotons", N=nBlocks, arguments=[nPhotons, blockSize, photons, blockCounts])
+        self.program.include(photons.declaration)
+        self.program.launchKernel("scanBlockCounts", N=1, arguments=[np.uint32(nBlocks), blockCounts, aliveCount])
+        self.program.launchKernel(
+            "compactPhotons", N=nBlocks, arguments=[nPhotons, blockSize, photons, compactedPhotons, blockCounts]
+        )
+
+        self.assertEqual(5, self.program.getData(aliveCount)[0])
+        self.program.getData(compactedPhotons, returnData=False)
+        self.assertEqual([0, 2, 5, 6, 8], list(compactedPhotons.hostBuffer["ID"][:5]))
+        self.assertTrue(np.all(compactedPhotons.hostBuffer["weight"][5:] == 0))
+
+    def testGivenDirectionalSource_shouldSamplePositionsOnDiscAndKeepDirection(self):
+        source = CLSource(
+            DIRECTIONAL_SOURCE, self.POSITION, Vector(0, 1, 0), Vector(1, 0, 0), Vector(0, 0, 1), diameter=2
+        )
+
+        positions, directions = self._generatePhotons(source)
+
+        offsets = positions - self.POSITION.array
+        self.assertTrue(np.allclose(0, offsets[:, 1]))
+        self.assertTrue(np.all(np.linalg.norm(offsets, axis=1) <= 1 + 1e-6))
+        self.assertTrue(np.all(directions == [0, 1, 0]))
+
+    def testGivenDivergentSource_shouldSampleDirectionsWithinDivergence(self):
+        divergence = 0.4
+        source = CLSource(
+            DIRECTIONAL_SOURCE, self.POSITION, Vector(0, 0, 1), Vector(1, 0, 0), Vector(0, 1, 0), divergence=divergence
+        )
+
+        positions, directions = self._generatePhotons(source)
+
+        self.assertTrue(np.allclose(self.POSITION.array, positions))
+        self.assertTrue(np.allclose(1, np.linalg.norm(directions, axis=1)))
+        angles = np.arccos(np.clip(directions[:, 2], -1, 1))
+        self.assertTrue(np.all(angles <= divergence / 2 + 1e-4))
+        self.assertFalse(np.allclose(0, angles))
+
+    def testGivenIsotropicSource_shouldSampleDirectionsOnUnitSphere(self):
+        positions, directions = self._generatePhotons(CLSource(ISOTROPIC_SOURCE, self.POSITION))
+
+        self.assertTrue(np.allclose(self.POSITION.array, positions))
+        self.assertTrue(np.allclose(1, np.linalg.norm(directions, axis=1)))
+        self.assertTrue(np.all(np.abs(np.mean(directions, axis=0)) < 5 / math.sqrt(self.N)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from pytissueoptics.rayscattering.opencl.CLBVH import CLBVH, MAX_LEAF_SIZE
+
+
+class TestCLBVH(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        self.triangles = np.random.uniform(-1, 1, (50, 3, 3))
+
+    def testWhenAddSolid_shouldReferenceEveryPolygonOnce(self):
+        bvh = CLBVH()
+        firstPolygonID = 10
+
+        bvh.addSolid(self.triangles, firstPolygonID)
+
+        expectedIDs = np.arange(firstPolygonID, firstPolygonID + len(self.triangles))
+        self.assertEqual(list(expectedIDs), sorted(bvh.polygonIDs))
+
+    def testWhenAddSolid_shouldHaveLeavesOfMaxLeafSize(self):
+        bvh = CLBVH()
+
+        bvh.addSolid(self.triangles, 0)
+
+        self.assertTrue(np.all(bvh.counts <= MAX_LEAF_SIZE))
+        self.assertEqual(len(self.triangles), np.sum(bvh.counts))
+
+    def testWhenAddSolid_shouldHaveLeafBoxesContainingTheirPolygons(self):
+        bvh = CLBVH()
+
+        bvh.addSolid(self.triangles, 0)
+
+        for nodeID in np.nonzero(bvh.counts)[0]:
+            firstID, count = bvh.firstIDs[nodeID], bvh.counts[nodeID]
+            polygons = self.triangles[bvh.polygonIDs[firstID : firstID + count]]
+            self.assertTrue(np.all(polygons.min(axis=(0, 1)) >= bvh.bboxMin[nodeID]))
+            self.assertTrue(np.all(polygons.max(axis=(0, 1)) <= bvh.bboxMax[nodeID]))
+
+    def testWhenAddSolid_shouldHaveInnerBoxesContainingTheirChildren(self):
+        bvh = CLBVH()
+
+        bvh.addSolid(self.triangles, 0)
+
+        for nodeID in np.nonzero(bvh.counts == 0)[0]:
+            for childID in [nodeID + 1, bvh.firstIDs[nodeID]]:
+                self.assertTrue(np.all(bvh.bboxMin[childID] >= bvh.bboxMin[nodeID]))
+                self.assertTrue(np.all(bvh.bboxMax[childID] <= bvh.bboxMax[nodeID]))
+
+    def testGivenTwoSolids_whenAddSolid_shouldReturnRootOfEachSolid(self):
+        bvh = CLBVH()
+
+        firstRootID = bvh.addSolid(self.triangles, 0)
+        nodeCount = bvh.nodeCount
+        secondRootID = bvh.addSolid(self.triangles[:3], len(self.triangles))
+
+        self.assertEqual(0, firstRootID)
+        self.assertEqual(nodeCount, secondRootID)
+        self.assertEqual(3, bvh.counts[secondRootID])
@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 from mockito import arg_that, mock, verify, when
@@ -87,3 +88,19 @@ class TestCLKeyLog(unittest.TestCase):
         verify(sceneLogger, times=1).logDataPointArray(...)
         expectedWorldData = arg_that(lambda arg: np.array_equal(arg, np.array([[1, 0, 0, 0, 0], [3, 0, 0, 0, 0]])))
         verify(sceneLogger).logDataPointArray(expectedWorldData, InteractionKey(WORLD_SOLID_LABEL))
+
+    def testGivenLogOfManyChunks_whenTransferToSceneLogger_shouldKeepLogOrderOfEachKey(self):
+        sceneCL = CLScene(self.scene, nWorkUnits=10)
+        log = np.tile(self._createTestLog(sceneCL), (5, 1))
+        log[:, 0] = np.arange(len(log))
+        with patch("pytissueoptics.rayscattering.opencl.utils.CLKeyLog.PARTITION_CHUNK_SIZE", 3):
+            clKeyLog = CLKeyLog(log, sceneCL)
+        sceneLogger = EnergyLogger(self.scene)
+
+        clKeyLog.toSceneLogger(sceneLogger)
+
+        cubeID = sceneCL.getSolidID(self.cube)
+        expectedCubeValues = log[(log[:, 5] == cubeID) & (log[:, 6] == NO_SURFACE_ID), 0]
+        cubeValues = sceneLogger.getRawDataPoints(InteractionKey(self.cube.getLabel()))[:, 0]
+        self.assertTrue(np.array_equal(expectedCubeValues, cubeValues))
+        self.assertEqual(len(log) - 5, sceneLogger.nDataPoints)
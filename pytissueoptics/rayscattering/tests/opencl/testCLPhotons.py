@@ -1,11 +1,13 @@
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 
 from pytissueoptics import Cube, EnergyLogger, ScatteringMaterial, ScatteringScene
-from pytissueoptics.rayscattering.opencl import OPENCL_OK, WEIGHT_THRESHOLD
+from pytissueoptics.rayscattering.opencl import CONFIG, OPENCL_OK, WEIGHT_THRESHOLD
 from pytissueoptics.rayscattering.opencl.CLPhotons import CLPhotons
-from pytissueoptics.scene.geometry import Environment
+from pytissueoptics.rayscattering.opencl.CLSource import DIRECTIONAL_SOURCE, ISOTROPIC_SOURCE, CLSource
+from pytissueoptics.scene.geometry import Environment, Vector
 from pytissueoptics.scene.logger import InteractionKey
 
 
@@ -72,6 +74,54 @@ class TestCLPhotons(unittest.TestCase):
 
         self.assertAlmostEqual(energyInput, energyScattered + energyLeaving, places=2)
 
+    def testGivenEnergyLoggerWithoutKeep3D_whenPropagate_shouldBinEnergyOnDevice(self):
+        N = 500
+        material = ScatteringMaterial(5, 2, 0.9, 1.4)
+        worldMaterial = ScatteringMaterial()
+        cube = Cube(1, material=material, label="cube")
+        scene = ScatteringScene([cube], worldMaterial=worldMaterial)
+        logger = EnergyLogger(scene, keep3D=False, voxelSize=0.1)
+
+        positions = np.full((N, 3), 0)
+        positions[:, 2] = -1
+        directions = np.full((N, 3), 0)
+        directions[:, 2] = 1
+        photons = CLPhotons(positions, directions)
+        photons.setContext(scene, Environment(worldMaterial), logger=logger)
+
+        photons.propagate(IPP=scene.getEstimatedIPP(WEIGHT_THRESHOLD), verbose=False)
+
+        viewSums = {(v.solidLabel, v.surfaceLabel, v.surfaceEnergyLeaving): v.getSum() for v in logger.views}
+        energyInput = viewSums[("cube", "cube_front", False)]
+        energyScattered = viewSums[("cube", None, True)]
+        energyLeaving = sum(viewSums[("cube", label, True)] for label in cube.surfaceLabels)
+        self.assertAlmostEqual(energyInput, energyScattered + energyLeaving, delta=1e-3 * N)
+        self.assertAlmostEqual(energyScattered, logger.voxelGrid.getSum(), delta=1e-4 * N)
+        self.assertTrue(logger.nDataPoints > N)
+        self.assertEqual(["cube"], logger.getSeenSolidLabels())
+        self.assertIsNone(logger.getRawDataPoints())
+
+    def testGivenMoreInteractionsThanFloat32CanCount_whenBinOnDevice_shouldHaveEnergyBalanceOf3DData(self):
+        N = 20000
+        material = ScatteringMaterial(99, 1, 0.8, 1.4)
+        scene = ScatteringScene([], worldMaterial=material)
+        source = CLSource(ISOTROPIC_SOURCE, Vector(0, 0, 0))
+        worldKey = InteractionKey("world")
+
+        loggers = []
+        for keep3D in [True, False]:
+            logger = EnergyLogger(scene, keep3D=keep3D, views=[])
+            photons = CLPhotons(source=source, N=N, seed=7)
+            photons.setContext(scene, Environment(material), logger=logger)
+            photons.propagate(IPP=scene.getEstimatedIPP(WEIGHT_THRESHOLD), verbose=False)
+            loggers.append(logger)
+
+        values = loggers[0].getRawDataPoints(worldKey)[:, 0].astype(np.float64)
+        self.assertGreater(len(values), 2**24)
+        negativeEnergy, positiveEnergy = loggers[1].getEnergyBalance(worldKey)
+        self.assertEqual(0, negativeEnergy)
+        self.assertAlmostEqual(np.sum(values[values >= 0]), positiveEnergy, delta=1e-6 * N)
+
     def testWhenPropagateOnly1Photon_shouldPropagate(self):
         N = 1
         # Testing in infinite scene so that photons will scatter all their energy
@@ -91,3 +141,58 @@ class TestCLPhotons(unittest.TestCase):
         dataPoints = logger.getRawDataPoints()
         totalWeightScattered = float(np.sum(dataPoints[:, 0]))
         self.assertAlmostEqual(N, totalWeightScattered, places=2)
+
+    def testGivenManyBatches_whenPropagate_shouldLogAllPhotonsOfEveryBatch(self):
+        N = 2000
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        infiniteScene = ScatteringScene([], worldMaterial=worldMaterial)
+        logger = EnergyLogger(infiniteScene)
+
+        positions = np.full((N, 3), 0)
+        directions = np.full((N, 3), 0)
+        directions[:, 2] = 1
+        photons = CLPhotons(positions, directions)
+        photons.setContext(infiniteScene, Environment(worldMaterial), logger=logger)
+        IPP = infiniteScene.getEstimatedIPP(WEIGHT_THRESHOLD)
+
+        photons.propagate(IPP=IPP, verbose=False)
+
+        dataPoints = logger.getRawDataPoints()
+        self.assertEqual(set(range(N)), set(dataPoints[:, 4].astype(int)))
+        self.assertAlmostEqual(N, float(np.sum(dataPoints[:, 0])), delta=0.01 * N)
+
+    def testGivenSource_whenPropagate_shouldSamplePhotonsOnDeviceForEveryBatch(self):
+        N = 2000
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        infiniteScene = ScatteringScene([], worldMaterial=worldMaterial)
+        logger = EnergyLogger(infiniteScene)
+        source = CLSource(DIRECTIONAL_SOURCE, Vector(0, 0, 0), Vector(0, 0, 1), Vector(1, 0, 0), Vector(0, 1, 0), 1)
+
+        photons = CLPhotons(source=source, N=N)
+        photons.setContext(infiniteScene, Environment(worldMaterial), logger=logger)
+        photons.propagate(IPP=infiniteScene.getEstimatedIPP(WEIGHT_THRESHOLD), verbose=False)
+
+        dataPoints = logger.getRawDataPoints()
+        self.assertEqual(set(range(N)), set(dataPoints[:, 4].astype(int)))
+        self.assertAlmostEqual(N, float(np.sum(dataPoints[:, 0])), delta=0.01 * N)
+
+    def testGivenSameSeed_whenPropagateWithDifferentBatchesAndWorkUnits_shouldLogSamePhotonPaths(self):
+        N = 300
+        material = ScatteringMaterial(5, 2, 0.9, 1.4)
+        worldMaterial = ScatteringMaterial()
+        cube = Cube(1, material=material, label="cube")
+        scene = ScatteringScene([cube], worldMaterial=worldMaterial)
+        source = CLSource(DIRECTIONAL_SOURCE, Vector(0, 0, -1), Vector(0, 0, 1), Vector(1, 0, 0), Vector(0, 1, 0), 0.5)
+
+        sortedDataPoints = []
+        # A low IPP makes the log buffers small enough for photons to be interrupted and resumed in later batches.
+        for nWorkUnits, IPP in [(128, 50), (16, 1)]:
+            logger = EnergyLogger(scene)
+            photons = CLPhotons(source=source, N=N, seed=42)
+            photons.setContext(scene, Environment(worldMaterial), logger=logger)
+            with patch.dict(CONFIG._config, {"N_WORK_UNITS": nWorkUnits}):
+                photons.propagate(IPP=IPP, verbose=False)
+            dataPoints = logger.getRawDataPoints()
+            sortedDataPoints.append(dataPoints[np.lexsort(dataPoints.T)])
+
+        self.assertTrue(np.array_equal(sortedDataPoints[0], sortedDataPoints[1]))
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pytissueoptics.rayscattering.opencl import CONFIG, OPENCL_OK
+from pytissueoptics.rayscattering.opencl.CLProgramCache import CLProgramCache
+
+if OPENCL_OK:
+    import pyopencl as cl
+
+SOURCE_CODE = "__kernel void fill(__global float *values) { values[get_global_id(0)] = 2.0f; }"
+
+
+@unittest.skipIf(not OPENCL_OK, "OpenCL device not available.")
+class TestCLProgramCache(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.context = CONFIG.clContext
+        self.device = CONFIG.device
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def testWhenGetSameProgramTwice_shouldReturnCachedProgram(self):
+        cache = CLProgramCache(self.tempDir.name)
+
+        program1 = cache.getProgram(self.context, self.device, SOURCE_CODE)
+        program2 = cache.getProgram(self.context, self.device, SOURCE_CODE)
+
+        self.assertIs(program1, program2)
+        self.assertEqual(1, len(cache))
+
+    def testWhenGetDifferentPrograms_shouldCacheBoth(self):
+        cache = CLProgramCache(self.tempDir.name)
+
+        program1 = cache.getProgram(self.context, self.device, SOURCE_CODE)
+        program2 = cache.getProgram(self.context, self.device, SOURCE_CODE.replace("2.0f", "3.0f"))
+
+        self.assertIsNot(program1, program2)
+        self.assertEqual(2, len(self._getBinaryFiles()))
+
+    def testGivenFullCache_whenGetNewProgram_shouldReleaseLeastRecentlyUsedProgram(self):
+        cache = CLProgramCache(self.tempDir.name, maxPrograms=2)
+        program1 = cache.getProgram(self.context, self.device, SOURCE_CODE)
+        cache.getProgram(self.context, self.device, SOURCE_CODE.replace("2.0f", "3.0f"))
+        cache.getProgram(self.context, self.device, SOURCE_CODE)
+
+        cache.getProgram(self.context, self.device, SOURCE_CODE.replace("2.0f", "4.0f"))
+
+        self.assertEqual(2, len(cache))
+        self.assertIs(program1, cache.getProgram(self.context, self.device, SOURCE_CODE))
+
+    def testWhenGetProgram_shouldSaveProgramBinaryToDisk(self):
+        CLProgramCache(self.tempDir.name).getProgram(self.context, self.device, SOURCE_CODE)
+
+        self.assertEqual(1, len(self._getBinaryFiles()))
+
+    def testGivenProgramBinaryOnDisk_whenGetProgramInNewSession_shouldLoadWorkingProgram(self):
+        CLProgramCache(self.tempDir.name).getProgram(self.context, self.device, SOURCE_CODE)
+
+        program = CLProgramCache(self.tempDir.name).getProgram(self.context, self.device, SOURCE_CODE)
+
+        self.assertEqual([2, 2, 2], list(self._runFillKernel(program)))
+
+    def testGivenInvalidProgramBinaryOnDisk_whenGetProgram_shouldRebuildFromSource(self):
+        CLProgramCache(self.tempDir.name).getProgram(self.context, self.device, SOURCE_CODE)
+        binaryPath = os.path.join(self.tempDir.name, self._getBinaryFiles()[0])
+        with open(binaryPath, "wb") as f:
+            f.write(b"invalid binary")
+
+        program = CLProgramCache(self.tempDir.name).getProgram(self.context, self.device, SOURCE_CODE)
+
+        self.assertEqual([2, 2, 2], list(self._runFillKernel(program)))
+        self.assertNotEqual(b"invalid binary", open(binaryPath, "rb").read())
+
+    def testWhenClear_shouldRemoveProgramsFromMemoryAndDisk(self):
+        cache = CLProgramCache(self.tempDir.name)
+        cache.getProgram(self.context, self.device, SOURCE_CODE)
+
+        cache.clear()
+
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, len(self._getBinaryFiles()))
+
+    def _getBinaryFiles(self):
+        return [f for f in os.listdir(self.tempDir.name) if f.endswith(".bin")]
+
+    def _runFillKernel(self, program) -> np.ndarray:
+        queue = cl.CommandQueue(self.context)
+        values = np.zeros(3, dtype=np.float32)
+        buffer = cl.Buffer(self.context, cl.mem_flags.READ_WRITE | cl.mem_flags.COPY_HOST_PTR, hostbuf=values)
+        cl.Kernel(program, "fill")(queue, (3,), None, buffer)
+        cl.enqueue_copy(queue, values, buffer)
+        queue.finish()
+        return values
@@ -0,0 +1,66 @@
+import unittest
+
+from pytissueoptics import Cube, ScatteringMaterial, ScatteringScene, Sphere
+from pytissueoptics.rayscattering.opencl import OPENCL_OK
+from pytissueoptics.rayscattering.opencl.CLSceneCache import CLSceneCache
+from pytissueoptics.scene.geometry import Vector
+
+
+def makeScene(cubeLabel: str = "cube", mu_s: float = 2) -> ScatteringScene:
+    cube = Cube(2, material=ScatteringMaterial(mu_s, 1, 0.8, 1.4), label=cubeLabel)
+    sphere = Sphere(order=2, position=Vector(0, 0, 4), material=ScatteringMaterial(1, 1, 0.8, 1.4), label="sphere")
+    return ScatteringScene([cube, sphere])
+
+
+@unittest.skipIf(not OPENCL_OK, "OpenCL device not available.")
+class TestCLSceneCache(unittest.TestCase):
+    def testWhenGetSameSceneTwice_shouldReturnCachedCLScene(self):
+        cache = CLSceneCache()
+        scene = makeScene()
+
+        sceneCL1 = cache.getScene(scene, 10)
+        sceneCL2 = cache.getScene(scene, 10)
+
+        self.assertIs(sceneCL1, sceneCL2)
+        self.assertEqual(1, len(cache))
+
+    def testWhenGetAnotherInstanceOfSameScene_shouldReturnCachedCLScene(self):
+        cache = CLSceneCache()
+
+        sceneCL1 = cache.getScene(makeScene(), 10)
+        sceneCL2 = cache.getScene(makeScene(), 10)
+
+        self.assertIs(sceneCL1, sceneCL2)
+
+    def testWhenGetSceneWithOtherLabelsOrMaterials_shouldFlattenAnotherCLScene(self):
+        cache = CLSceneCache()
+
+        sceneCL = cache.getScene(makeScene(), 10)
+
+        self.assertIsNot(sceneCL, cache.getScene(makeScene(cubeLabel="box"), 10))
+        self.assertIsNot(sceneCL, cache.getScene(makeScene(mu_s=3), 10))
+
+    def testWhenGetCachedSceneWithOtherWorkUnits_shouldResizeSolidCandidates(self):
+        cache = CLSceneCache()
+        scene = makeScene()
+        solidCandidates = cache.getScene(scene, 10).solidCandidates
+
+        self.assertIs(solidCandidates, cache.getScene(scene, 10).solidCandidates)
+        self.assertIsNot(solidCandidates, cache.getScene(scene, 20).solidCandidates)
+
+    def testWhenGetAnotherInstanceOfSameScene_shouldFindMaterialsOfNewInstance(self):
+        cache = CLSceneCache()
+        cache.getScene(makeScene(), 10)
+        scene = makeScene()
+
+        sceneCL = cache.getScene(scene, 10)
+
+        self.assertEqual(1, sceneCL.getMaterialID(scene.getSolid("cube").getPolygons()[0].insideEnvironment.material))
+
+    def testWhenGetMoreScenesThanMaxSize_shouldEvictLeastRecentlyUsedScene(self):
+        cache = CLSceneCache(maxSize=1)
+        sceneCL = cache.getScene(makeScene(), 10)
+        cache.getScene(makeScene(cubeLabel="box"), 10)
+
+        self.assertIsNot(sceneCL, cache.getScene(makeScene(), 10))
+        self.assertEqual(1, len(cache))
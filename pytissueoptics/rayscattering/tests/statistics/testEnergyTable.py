@@ -0,0 +1,51 @@
+import unittest
+
+from pytissueoptics.rayscattering.statistics.energyTable import EnergyTable
+from pytissueoptics.rayscattering.tests.statistics import testStats
+
+
+class TestEnergyTable(unittest.TestCase):
+    def testShouldHaveEnergyOfEachSolidAndSurface(self):
+        for keep3D in [False, True]:
+            with self.subTest(["using2DLogger", "using3DLogger"][keep3D]):
+                energyTable = EnergyTable(testStats.TestStats.makeTestCubeLogger(keep3D=keep3D))
+
+                self.assertAlmostEqual(0.8, energyTable.getDeposited("cube"), places=5)
+                self.assertAlmostEqual(1, energyTable.getEntering("cube"), places=5)
+                self.assertAlmostEqual(0.2, energyTable.getLeaving("cube"), places=5)
+                self.assertAlmostEqual(0, energyTable.getLeaving("cube", ["cube_front"]), places=5)
+                self.assertAlmostEqual(0.2, energyTable.getLeaving("cube", ["cube_back"]), places=5)
+
+    def testWhenGetEnergyWithLabelsOfDifferentCase_shouldHaveEnergyOfMatchingSolidAndSurface(self):
+        for keep3D in [False, True]:
+            with self.subTest(["using2DLogger", "using3DLogger"][keep3D]):
+                energyTable = EnergyTable(testStats.TestStats.makeTestCubeLogger(keep3D=keep3D))
+
+                self.assertAlmostEqual(0.8, energyTable.getDeposited("Cube"), places=5)
+                self.assertAlmostEqual(0.2, energyTable.getLeaving("CUBE", ["Cube_Back"]), places=5)
+
+    def testGiven3DLogger_whenGetEnergyOfSolidNotLogged_shouldReturnZero(self):
+        energyTable = EnergyTable(testStats.TestStats.makeTestCubeLogger(keep3D=True))
+
+        self.assertEqual(0, energyTable.getDeposited("sphere"))
+        self.assertEqual(0, energyTable.getEntering("sphere"))
+
+    def testGiven2DLoggerWithNoViews_shouldHaveEnergyFromEnergyBalance(self):
+        energyTable = EnergyTable(testStats.TestStats.makeTestCubeLogger(keep3D=False, noViews=True))
+
+        self.assertAlmostEqual(0.8, energyTable.getDeposited("cube"), places=5)
+        self.assertAlmostEqual(0.2, energyTable.getLeaving("cube", ["cube_back"]), places=5)
+
+    def testGiven2DLoggerWithNoViewsAndNoEnergyBalance_whenGetEnergy_shouldRaiseException(self):
+        logger = testStats.TestStats.makeTestCubeLogger(keep3D=False, noViews=True)
+        logger = testStats.TestStats.reloadAsLegacyLogger(logger)
+        energyTable = EnergyTable(logger)
+
+        with self.assertRaises(Exception):
+            energyTable.getDeposited("cube")
+        with self.assertRaises(Exception):
+            energyTable.getLeaving("cube", ["cube_back"])
+
+
+if __name__ == "__main__":
+    unittest.main()
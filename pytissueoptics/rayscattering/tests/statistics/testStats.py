@@ -1,5 +1,6 @@
 import io
 import os
+import pickle
 import tempfile
 import unittest
 from unittest.mock import patch
@@ -28,8 +29,10 @@ class TestStats(unittest.TestCase):
         "",
     ]
 
-    def _setUp(self, keep3D=True, sourceSolidLabel=None, noViews=False):
+    def _setUp(self, keep3D=True, sourceSolidLabel=None, noViews=False, noEnergyBalance=False):
         logger = self.makeTestCubeLogger(keep3D=keep3D, sourceSolidLabel=sourceSolidLabel, noViews=noViews)
+        if noEnergyBalance:
+            logger = self.reloadAsLegacyLogger(logger)
         self.stats = Stats(logger)
 
     def testWhenGetEnergyInput_shouldReturnTotalPhotonCount(self):
@@ -46,18 +49,26 @@ class TestStats(unittest.TestCase):
                 energy = self.stats.getEnergyInput("cube")
                 self.assertEqual(1, energy)
 
-    def testGiven2DLoggerWithNoViewsOfSolid_whenGetAbsorbanceOfSolid_shouldRaiseException(self):
+    def testGiven2DLoggerWithNoViews_whenGetStats_shouldReturnStatsFromEnergyBalance(self):
         self._setUp(keep3D=False, noViews=True)
+        self.assertAlmostEqual(80, self.stats.getAbsorbance("cube"), places=5)
+        self.assertAlmostEqual(1, self.stats.getEnergyInput("cube"), places=5)
+        self.assertAlmostEqual(20, self.stats.getTransmittance("cube", "cube_back"), places=5)
+
+    def testGiven2DLoggerWithNoViewsOfSolidAndNoEnergyBalance_whenGetAbsorbanceOfSolid_shouldRaiseException(self):
+        self._setUp(keep3D=False, noViews=True, noEnergyBalance=True)
         with self.assertRaises(Exception):
             self.stats.getAbsorbance("cube")
 
-    def testGiven2DLoggerWithNoViewsOfSolid_whenGetEnergyInputOfSolid_shouldRaiseException(self):
-        self._setUp(keep3D=False, noViews=True)
+    def testGiven2DLoggerWithNoViewsOfSolidAndNoEnergyBalance_whenGetEnergyInputOfSolid_shouldRaiseException(self):
+        self._setUp(keep3D=False, noViews=True, noEnergyBalance=True)
         with self.assertRaises(Exception):
             self.stats.getEnergyInput("cube")
 
-    def testGiven2DLoggerWithNoViewsOfSurface_whenGetTransmittanceOfSurface_shouldRaiseException(self):
-        self._setUp(keep3D=False, noViews=True)
+    def testGiven2DLoggerWithNoViewsOfSurfaceAndNoEnergyBalance_whenGetTransmittanceOfSurface_shouldRaiseException(
+        self,
+    ):
+        self._setUp(keep3D=False, noViews=True, noEnergyBalance=True)
         with self.assertRaises(Exception):
             self.stats.getTransmittance("cube", "cube_front")
 
@@ -126,6 +137,18 @@ class TestStats(unittest.TestCase):
         with self.assertWarns(UserWarning):
             self.stats.report(solidLabel="non-existing")
 
+    @staticmethod
+    def reloadAsLegacyLogger(logger: EnergyLogger) -> EnergyLogger:
+        """Saves the logger to a file pickled by previous versions, which did not save the energy balance, and
+        reloads it in a new logger with the same options."""
+        state = logger._getState()
+        legacyKeys = ["info", "labels", "views", "defaultViews", "outdatedViews", "nDataPointsRemoved", "sceneHash"]
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "legacy.log")
+            with open(filePath, "wb") as file:
+                pickle.dump((logger._data, *[state[key] for key in legacyKeys], logger.has3D), file)
+            return EnergyLogger(logger._scene, filePath, keep3D=logger.has3D, views=logger.views)
+
     @staticmethod
     def makeTestCubeLogger(keep3D=True, sourceSolidLabel=None, noViews=False) -> EnergyLogger:
         """We log a few points taken from a unit cube centered at the origin where a single photon
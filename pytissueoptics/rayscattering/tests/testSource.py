@@ -1,6 +1,7 @@
 import os
 import tempfile
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 from mockito import mock, verify, when
@@ -9,6 +10,7 @@ from pytissueoptics.rayscattering import EnergyLogger, PencilPointSource, Photon
 from pytissueoptics.rayscattering.materials import ScatteringMaterial
 from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
 from pytissueoptics.rayscattering.source import DirectionalSource, DivergentSource, IsotropicPointSource, Source
+from pytissueoptics.rayscattering.vectorized import NumpyPhotons
 from pytissueoptics.scene.geometry import Environment, Vector
 from pytissueoptics.scene.logger import Logger
 from pytissueoptics.scene.solids import Solid
@@ -128,6 +130,107 @@ class TestPencilSource(unittest.TestCase):
         for photon in pencilSource.photons:
             self.assertEqual(sourcePosition, photon.position)
 
+    def testGivenVectorization_whenPropagate_shouldPropagateAllPhotonsWithNumpyPhotons(self):
+        N = 10
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        scene = ScatteringScene([], worldMaterial=worldMaterial)
+        logger = EnergyLogger(scene)
+        pencilSource = PencilPointSource(
+            position=Vector(), direction=Vector(0, 0, 1), N=N, useHardwareAcceleration=False, useVectorization=True
+        )
+        self.assertIsInstance(pencilSource.photons, NumpyPhotons)
+
+        pencilSource.propagate(scene, logger=logger, showProgress=False)
+
+        totalWeightScattered = float(np.sum(logger.getRawDataPoints()[:, 0]))
+        self.assertAlmostEqual(N, totalWeightScattered, places=1)
+
+    def testGivenManyWorkers_whenPropagate_shouldMergeAllPhotonsWithUniqueIDs(self):
+        N = 20
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        scene = ScatteringScene([], worldMaterial=worldMaterial)
+        logger = EnergyLogger(scene)
+        pencilSource = PencilPointSource(
+            position=Vector(), direction=Vector(0, 0, 1), N=N, useHardwareAcceleration=False, seed=1
+        )
+
+        pencilSource.propagate(scene, logger=logger, showProgress=False, workers=2)
+
+        dataPoints = logger.getRawDataPoints()
+        self.assertAlmostEqual(N, float(np.sum(dataPoints[:, 0])), places=1)
+        self.assertEqual(set(range(N)), set(dataPoints[:, 4].astype(int)))
+
+    def testGivenManyWorkersAndSameSeed_whenPropagate_shouldLogSameData(self):
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        scene = ScatteringScene([], worldMaterial=worldMaterial)
+        dataPoints = []
+        for _ in range(2):
+            logger = EnergyLogger(scene)
+            pencilSource = PencilPointSource(
+                position=Vector(),
+                direction=Vector(0, 0, 1),
+                N=10,
+                useHardwareAcceleration=False,
+                seed=3,
+                useVectorization=True,
+            )
+            pencilSource.propagate(scene, logger=logger, showProgress=False, workers=2)
+            dataPoints.append(logger.getRawDataPoints())
+
+        self.assertTrue(np.array_equal(dataPoints[0], dataPoints[1]))
+
+    def testWhenCreatedWithoutHardwareAcceleration_shouldNotSamplePhotonsBeforePropagation(self):
+        pencilSource = PencilPointSource(
+            position=Vector(), direction=Vector(0, 0, 1), N=10**9, useHardwareAcceleration=False
+        )
+        self.assertIsNone(pencilSource._photons)
+
+    def testWhenCreatedWithVectorization_shouldNotSamplePhotonsBeforePropagation(self):
+        pencilSource = PencilPointSource(
+            position=Vector(), direction=Vector(0, 0, 1), N=10**9, useHardwareAcceleration=False, useVectorization=True
+        )
+        self.assertIsInstance(pencilSource.photons, NumpyPhotons)
+
+    def testGivenSeed_whenUseRandomNumbersBeforeSamplingPhotons_shouldSampleSamePhotons(self):
+        source = IsotropicPointSource(position=Vector(), N=10, useHardwareAcceleration=False, seed=2)
+        directions = [photon.direction for photon in source.photons]
+
+        np.random.random(5)
+        IsotropicPointSource(position=Vector(), N=10, useHardwareAcceleration=False, seed=3)
+
+        self.assertEqual(directions, [photon.direction for photon in source.photons])
+        otherSource = IsotropicPointSource(position=Vector(), N=10, useHardwareAcceleration=False, seed=2)
+        self.assertEqual(directions, [photon.direction for photon in otherSource.photons])
+
+    def testGivenManyChunks_shouldYieldAllPhotonsWithSuccessiveIDs(self):
+        sourcePosition = Vector(3, 3, 0)
+        pencilSource = PencilPointSource(
+            position=sourcePosition, direction=Vector(0, 0, 1), N=10, useHardwareAcceleration=False
+        )
+
+        with patch("pytissueoptics.rayscattering.source.PHOTON_CHUNK_SIZE", 3):
+            photons = list(pencilSource.photons)
+
+        self.assertEqual(list(range(10)), [photon._ID for photon in photons])
+        for photon in photons:
+            self.assertEqual(sourcePosition, photon.position)
+
+    def testGivenManyChunks_whenPropagate_shouldPropagateAllPhotons(self):
+        N = 10
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        scene = ScatteringScene([], worldMaterial=worldMaterial)
+        logger = EnergyLogger(scene)
+        pencilSource = PencilPointSource(
+            position=Vector(), direction=Vector(0, 0, 1), N=N, useHardwareAcceleration=False
+        )
+
+        with patch("pytissueoptics.rayscattering.source.PHOTON_CHUNK_SIZE", 3):
+            pencilSource.propagate(scene, logger=logger, showProgress=False)
+
+        dataPoints = logger.getRawDataPoints()
+        self.assertAlmostEqual(N, float(np.sum(dataPoints[:, 0])), places=1)
+        self.assertEqual(set(range(N)), set(dataPoints[:, 4].astype(int)))
+
 
 class TestIsotropicPointSource(unittest.TestCase):
     def testShouldHavePhotonsAllPositionedAtTheSourcePosition(self):
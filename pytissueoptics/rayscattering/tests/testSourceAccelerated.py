@@ -9,7 +9,8 @@ from mockito import mock, verify, when
 from pytissueoptics import EnergyLogger, Logger, ScatteringMaterial, ScatteringScene, Vector
 from pytissueoptics.rayscattering.opencl import CONFIG, OPENCL_OK, IPPTable
 from pytissueoptics.rayscattering.opencl.CLPhotons import CLPhotons
-from pytissueoptics.rayscattering.source import Source
+from pytissueoptics.rayscattering.opencl.CLSource import CLSource
+from pytissueoptics.rayscattering.source import DirectionalSource, Source
 from pytissueoptics.scene.geometry import Environment
 
 
@@ -38,6 +39,22 @@ class TestSourceAccelerated(unittest.TestCase):
         source = SinglePhotonSourceAccelerated()
         self.assertIsNotNone(source.photons)
 
+    @patch("pytissueoptics.rayscattering.source.CLPhotons")
+    def testGivenDirectionalSource_shouldSamplePhotonsOnTheDevice(self, _CLPhotonsClassMock):
+        DirectionalSource(Vector(0, 0, 0), Vector(0, 0, 1), diameter=1, N=10, useHardwareAcceleration=True)
+
+        _CLPhotonsClassMock.assert_called_once()
+        self.assertIsInstance(_CLPhotonsClassMock.call_args.kwargs["source"], CLSource)
+
+    @patch("pytissueoptics.rayscattering.source.CLPhotons")
+    def testGivenSubclassOverridingPhotonSampling_shouldLoadItsSampledPhotons(self, _CLPhotonsClassMock):
+        source = OffsetDirectionalSourceAccelerated()
+
+        _CLPhotonsClassMock.assert_called_once()
+        positions, directions = _CLPhotonsClassMock.call_args.args
+        self.assertTrue(np.allclose(source.OFFSET, positions))
+        self.assertTrue(np.allclose([0, 0, 1], directions))
+
     @tempTablePath
     @patch("pytissueoptics.rayscattering.source.CLPhotons")
     def testWhenPropagateNewExperiment_shouldWarnThatIPPWillBeEstimated(self, _CLPhotonsClassMock):
@@ -129,3 +146,13 @@ class SinglePhotonSourceAccelerated(Source):
     @property
     def _hashComponents(self) -> tuple:
         return (self._position,)
+
+
+class OffsetDirectionalSourceAccelerated(DirectionalSource):
+    OFFSET = [1, 2, 3]
+
+    def __init__(self):
+        super().__init__(Vector(0, 0, 0), Vector(0, 0, 1), diameter=0, N=5, useHardwareAcceleration=True)
+
+    def _getInitialPositions(self, N: int):
+        return np.full((N, 3), self.OFFSET, dtype=np.float64)
@@ -0,0 +1,150 @@
+import unittest
+
+import numpy as np
+
+from pytissueoptics import Cube, EnergyLogger, ScatteringMaterial, ScatteringScene, Sphere
+from pytissueoptics.rayscattering.vectorized import NumpyPhotons
+from pytissueoptics.scene.geometry import Environment, Vector
+from pytissueoptics.scene.logger import InteractionKey
+
+
+class TestNumpyPhotons(unittest.TestCase):
+    def testWhenPropagateWithoutContext_shouldNotPropagate(self):
+        positions = np.array([[0, 0, 0], [0, 0, 0]])
+        directions = np.array([[0, 0, 1], [0, 0, 1]])
+        photons = NumpyPhotons(positions, directions)
+
+        with self.assertRaises(AssertionError):
+            photons.propagate()
+
+    def testWhenPropagate_shouldPropagateUntilAllPhotonsHaveNoMoreEnergy(self):
+        N = 100
+        # Testing in infinite scene so that photons will scatter all their energy
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        infiniteScene = ScatteringScene([], worldMaterial=worldMaterial)
+        logger = EnergyLogger(infiniteScene)
+
+        photons = NumpyPhotons(*self._createPencilBeam(N, z=0), maxPhotonsPerBatch=30)
+        photons.setContext(infiniteScene, Environment(worldMaterial), logger=logger)
+
+        photons.propagate()
+
+        dataPoints = logger.getRawDataPoints()
+        totalWeightScattered = float(np.sum(dataPoints[:, 0]))
+        # Roulette effect will result in total weight slightly different from N.
+        self.assertAlmostEqual(N, totalWeightScattered, places=1)
+        self.assertEqual(set(range(N)), set(dataPoints[:, 4].astype(int)))
+
+    def testGivenPhotonsFromChunks_whenPropagate_shouldPullAllChunksAsPhotonsAreAdded(self):
+        N = 100
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        infiniteScene = ScatteringScene([], worldMaterial=worldMaterial)
+        logger = EnergyLogger(infiniteScene)
+        pulledChunkSizes = []
+
+        def getChunks():
+            for chunkSize in [7, 45, 48]:
+                pulledChunkSizes.append(chunkSize)
+                yield self._createPencilBeam(chunkSize, z=0)
+
+        photons = NumpyPhotons.fromChunks(getChunks, N, maxPhotonsPerBatch=30)
+        photons.setContext(infiniteScene, Environment(worldMaterial), logger=logger)
+        self.assertEqual([], pulledChunkSizes)
+
+        photons.propagate()
+
+        dataPoints = logger.getRawDataPoints()
+        self.assertEqual([7, 45, 48], pulledChunkSizes)
+        self.assertAlmostEqual(N, float(np.sum(dataPoints[:, 0])), places=1)
+        self.assertEqual(set(range(N)), set(dataPoints[:, 4].astype(int)))
+
+    def testWhenPropagateInSolids_shouldLogEnergyWithCorrectInteractionKeys(self):
+        N = 100
+        material = ScatteringMaterial(5, 2, 0.9, 1.4)
+        worldMaterial = ScatteringMaterial()
+        cube = Cube(1, material=material, label="cube")
+        scene = ScatteringScene([cube], worldMaterial=worldMaterial)
+        logger = EnergyLogger(scene)
+
+        # start at z = -1, outside of cube starting at z = -0.5
+        photons = NumpyPhotons(*self._createPencilBeam(N, z=-1))
+        photons.setContext(scene, Environment(worldMaterial), logger=logger)
+
+        photons.propagate()
+
+        frontSurfacePoints = logger.getRawDataPoints(InteractionKey("cube", "cube_front"))
+        energyInput = -np.sum(frontSurfacePoints[:, 0])  # should be around 97% of total energy because of reflections
+        cubePoints = logger.getRawDataPoints(InteractionKey("cube"))
+        energyScattered = np.sum(cubePoints[:, 0])
+
+        energyLeaving = 0
+        for surfaceLabel in logger.getStoredSurfaceLabels("cube"):
+            if "front" in surfaceLabel:
+                continue
+            surfacePoints = logger.getRawDataPoints(InteractionKey("cube", surfaceLabel))
+            energyLeaving += np.sum(surfacePoints[:, 0])
+
+        self.assertAlmostEqual(energyInput, energyScattered + energyLeaving, places=2)
+
+    def testWhenPropagateInSmoothSolidInsideAnother_shouldConserveEnergy(self):
+        N = 200
+        cube = Cube(2, material=ScatteringMaterial(2, 1, 0.8, 1.4), label="cube")
+        sphere = Sphere(0.5, order=2, material=ScatteringMaterial(10, 1, 0.8, 1.5), label="sphere", smooth=True)
+        worldMaterial = ScatteringMaterial()
+        scene = ScatteringScene([cube, sphere], worldMaterial=worldMaterial)
+        logger = EnergyLogger(scene)
+
+        photons = NumpyPhotons(*self._createPencilBeam(N, z=-2))
+        photons.setContext(scene, scene.getEnvironmentAt(Vector(0, 0, -2)), logger=logger)
+
+        photons.propagate()
+
+        self.assertTrue(len(logger.getRawDataPoints(InteractionKey("sphere"))) > 0)
+        energyInput = -np.sum(logger.getRawDataPoints(InteractionKey("cube", "cube_front"))[:, 0])
+        energyDeposited = np.sum(logger.getRawDataPoints(InteractionKey("cube"))[:, 0])
+        energyDeposited += np.sum(logger.getRawDataPoints(InteractionKey("sphere"))[:, 0])
+        energyLeaving = 0
+        for surfaceLabel in logger.getStoredSurfaceLabels("cube"):
+            if surfaceLabel.startswith("cube") and "front" not in surfaceLabel:
+                energyLeaving += np.sum(logger.getRawDataPoints(InteractionKey("cube", surfaceLabel))[:, 0])
+        self.assertAlmostEqual(energyInput, energyDeposited + energyLeaving, places=2)
+
+    def testWhenPropagateTowardsDetector_shouldDetectPhotons(self):
+        N = 20
+        worldMaterial = ScatteringMaterial()
+        detector = Cube(1, position=Vector(0, 0, 2), label="detector").asDetector()
+        scene = ScatteringScene([detector], worldMaterial=worldMaterial)
+        logger = EnergyLogger(scene)
+
+        photons = NumpyPhotons(*self._createPencilBeam(N, z=0))
+        photons.setContext(scene, Environment(worldMaterial), logger=logger)
+
+        photons.propagate()
+
+        detectedPoints = logger.getRawDataPoints(InteractionKey("detector"))
+        self.assertEqual(N, len(detectedPoints))
+        self.assertTrue(np.allclose(detectedPoints[:, 0], 1))
+        self.assertTrue(np.allclose(detectedPoints[:, 3], 1.5))
+
+    def testWhenPropagateOnly1Photon_shouldPropagate(self):
+        N = 1
+        worldMaterial = ScatteringMaterial(5, 2, 0.9, 1.4)
+        infiniteScene = ScatteringScene([], worldMaterial=worldMaterial)
+        logger = EnergyLogger(infiniteScene)
+
+        photons = NumpyPhotons(*self._createPencilBeam(N, z=0))
+        photons.setContext(infiniteScene, Environment(worldMaterial), logger=logger)
+
+        photons.propagate()
+
+        dataPoints = logger.getRawDataPoints()
+        totalWeightScattered = float(np.sum(dataPoints[:, 0]))
+        self.assertAlmostEqual(N, totalWeightScattered, places=2)
+
+    @staticmethod
+    def _createPencilBeam(N: int, z: float):
+        positions = np.full((N, 3), 0.0)
+        positions[:, 2] = z
+        directions = np.full((N, 3), 0.0)
+        directions[:, 2] = 1
+        return positions, directions
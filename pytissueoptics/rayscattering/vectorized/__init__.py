@@ -0,0 +1,5 @@
+from .numpyIntersectionFinder import NumpyIntersectionFinder, NumpyIntersections
+from .numpyPhotons import NumpyPhotons
+from .numpyScene import NumpyScene
+
+__all__ = ["NumpyIntersectionFinder", "NumpyIntersections", "NumpyPhotons", "NumpyScene"]
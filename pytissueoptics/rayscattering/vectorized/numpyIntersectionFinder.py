@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from pytissueoptics.scene.intersection import BatchIntersect
+from pytissueoptics.scene.intersection.mollerTrumboreIntersect import MollerTrumboreIntersect
+
+from .numpyScene import NumpyScene
+
+EPS_SIDE = MollerTrumboreIntersect.EPS_SIDE
+
+
+@dataclass
+class NumpyIntersections:
+    """Intersections found for a subset of rays given by `rayIndices`. All other arrays are aligned with it."""
+
+    rayIndices: np.ndarray
+    distance: np.ndarray
+    position: np.ndarray
+    normal: np.ndarray
+    rawNormal: np.ndarray
+    isSmooth: np.ndarray
+    surfaceID: np.ndarray
+    polygonID: np.ndarray
+    distanceLeft: np.ndarray
+
+
+class NumpyIntersectionFinder:
+    """Vectorized implementation of the OpenCL `findIntersection` for many rays at once. The closest intersection of
+    each ray is found by the BatchIntersect search of the scene package in the NumpyScene triangles, then the smooth
+    normals and surface IDs are computed like the OpenCL kernel."""
+
+    def __init__(self, scene: NumpyScene):
+        self._scene = scene
+        self._batchIntersect = BatchIntersect()
+
+    def findIntersections(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        lengths: np.ndarray,
+        solidIDs: np.ndarray,
+        ignoreSolidIDs: np.ndarray,
+    ) -> NumpyIntersections:
+        batch = self._batchIntersect.findIntersections(
+            self._scene.polygonArrays, origins, directions, lengths, solidIDs, ignoreSolidIDs
+        )
+        rayIndices = np.nonzero(batch.exists)[0]
+        return self._composeIntersections(
+            rayIndices,
+            directions[rayIndices],
+            lengths[rayIndices],
+            batch.distance[rayIndices],
+            batch.position[rayIndices],
+            batch.polygonID[rayIndices],
+        )
+
+    def _composeIntersections(
+        self, rayIndices, directions, lengths, distances, positions, polygonIDs
+    ) -> NumpyIntersections:
+        rawNormals = self._scene.triangleNormals[polygonIDs]
+        surfaceIDs = self._scene.triangleSurfaceID[polygonIDs]
+        normals = rawNormals.copy()
+        isSmooth = np.zeros(len(rayIndices), dtype=bool)
+
+        toSmooth = np.nonzero(self._scene.surfaceToSmooth[surfaceIDs])[0]
+        if len(toSmooth) > 0:
+            smoothNormals = self._getSmoothNormals(positions[toSmooth], polygonIDs[toSmooth])
+            # Do not allow the new smooth normal to have a different dot product sign with the ray direction.
+            rayDirections = directions[toSmooth]
+            keepSmooth = (
+                np.sum(smoothNormals * rayDirections, axis=1) * np.sum(rawNormals[toSmooth] * rayDirections, axis=1)
+                >= 0
+            )
+            toSmooth = toSmooth[keepSmooth]
+            smoothNormals = smoothNormals[keepSmooth]
+            normals[toSmooth] = smoothNormals / np.linalg.norm(smoothNormals, axis=1, keepdims=True)
+            isSmooth[toSmooth] = True
+
+        return NumpyIntersections(
+            rayIndices=rayIndices,
+            distance=distances,
+            position=positions,
+            normal=normals,
+            rawNormal=rawNormals,
+            isSmooth=isSmooth,
+            surfaceID=surfaceIDs,
+            polygonID=polygonIDs,
+            distanceLeft=lengths - distances,
+        )
+
+    def _getSmoothNormals(self, positions: np.ndarray, polygonIDs: np.ndarray) -> np.ndarray:
+        """Weighted average of the vertex normals using the same barycentric weights as the OpenCL kernel."""
+        vertexIDs = self._scene.triangleVertexIDs[polygonIDs]
+        vertices = self._scene.vertexPositions[vertexIDs]
+        vertexNormals = self._scene.vertexNormals[vertexIDs]
+
+        weights = np.empty((len(positions), 3))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i in range(3):
+                vertex = vertices[:, i]
+                cotPrev = self._cotangent(positions, vertex, vertices[:, (i + 2) % 3])
+                cotNext = self._cotangent(positions, vertex, vertices[:, (i + 1) % 3])
+                d = np.linalg.norm(vertex - positions, axis=1)
+                weights[:, i] = (cotPrev + cotNext) / (d * d)
+            weights /= np.sum(weights, axis=1, keepdims=True)
+        smoothNormals = np.einsum("ki,kij->kj", weights, vertexNormals)
+
+        # Edge case where the intersection is directly on a vertex, in which case we just use the vertex normal.
+        isOnVertex = np.linalg.norm(positions[:, None, :] - vertices, axis=2) < EPS_SIDE
+        onVertex = np.nonzero(np.any(isOnVertex, axis=1))[0]
+        smoothNormals[onVertex] = vertexNormals[onVertex, np.argmax(isOnVertex[onVertex], axis=1)]
+        return smoothNormals
+
+    @staticmethod
+    def _cotangent(v0: np.ndarray, v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+        edge0 = v0 - v1
+        edge1 = v2 - v1
+        lengthCross = np.maximum(np.linalg.norm(np.cross(edge1, edge0), axis=1), EPS_SIDE)
+        return np.sum(edge1 * edge0, axis=1) / lengthCross
@@ -0,0 +1,411 @@
+from dataclasses import fields
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from pytissueoptics.rayscattering.opencl import WEIGHT_THRESHOLD
+from pytissueoptics.rayscattering.opencl.CLScene import NO_SURFACE_ID, WORLD_SOLID_ID
+from pytissueoptics.rayscattering.opencl.utils import CLKeyLog
+from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
+from pytissueoptics.scene.geometry import Environment
+from pytissueoptics.scene.logger.logger import Logger
+from pytissueoptics.scene.utils import progressBar
+
+from .numpyIntersectionFinder import NumpyIntersectionFinder, NumpyIntersections
+from .numpyScene import NumpyScene
+
+NULL_SOLID_ID = 0
+MIN_ANGLE = 0.0001
+VERTEX_EPS = 3e-7
+VERTEX_STEP = 1e-7
+
+PHOTON_DTYPE = np.dtype(
+    [
+        ("position", np.float64, 3),
+        ("direction", np.float64, 3),
+        ("er", np.float64, 3),
+        ("weight", np.float64),
+        ("materialID", np.int64),
+        ("solidID", np.int64),
+        ("lastIntersectedDetectorID", np.int64),
+        ("ID", np.int64),
+        ("distance", np.float64),
+    ]
+)
+
+
+class NumpyPhotons:
+    """Vectorized CPU implementation of the photon propagation. A batch of live photons is stored in a structured
+    array and every photon of the batch is stepped at once through intersection, Fresnel, scattering, roulette
+    and logging, following the same logic as the OpenCL kernel. Fully propagated photons are replaced by new ones
+    after each step.
+
+    The data points are logged in batches with the same (N, 7) layout as the OpenCL logger, so they are translated
+    to the scene logger with CLKeyLog.
+    """
+
+    def __init__(self, positions: np.ndarray, directions: np.ndarray, maxPhotonsPerBatch: int = 10000):
+        assert positions.shape == directions.shape, "Positions and directions must have the same shape."
+        self._positions = positions
+        self._directions = directions
+        self._getChunks: Optional[Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]]] = None
+        self._chunks: Optional[Iterator[Tuple[np.ndarray, np.ndarray]]] = None
+        self._pendingChunk = (np.empty((0, 3)), np.empty((0, 3)))
+        self._N = len(positions)
+        self._maxPhotonsPerBatch = maxPhotonsPerBatch
+        self._maxLogSize = 20 * maxPhotonsPerBatch
+        self._weightThreshold = WEIGHT_THRESHOLD
+        self._initialMaterial = None
+        self._initialSolid = None
+
+        self._scene = None
+        self._sceneLogger = None
+
+        self._numpyScene = None
+        self._intersectionFinder = None
+        self._log: List[np.ndarray] = []
+        self._logSize = 0
+
+    @classmethod
+    def fromChunks(
+        cls,
+        getChunks: Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]],
+        N: int,
+        maxPhotonsPerBatch: int = 10000,
+    ) -> "NumpyPhotons":
+        """N photons whose initial positions and directions are yielded in chunks by a new `getChunks()` iterator
+        on each propagation. The chunks are only pulled as photons are added to the batch, so that they are never all
+        held in memory."""
+        photons = cls(np.empty((0, 3)), np.empty((0, 3)), maxPhotonsPerBatch)
+        photons._getChunks = getChunks
+        photons._N = N
+        return photons
+
+    def setContext(self, scene: ScatteringScene, environment: Environment, logger: Logger = None):
+        self._scene = scene
+        self._sceneLogger = logger
+        self._initialMaterial = environment.material
+        self._initialSolid = environment.solid
+
+    def propagate(self, verbose: bool = False):
+        assert self._scene is not None, "Context must be set before propagation."
+        self._numpyScene = NumpyScene(self._scene)
+        self._intersectionFinder = NumpyIntersectionFinder(self._numpyScene)
+        self._chunks = iter([(self._positions, self._directions)]) if self._getChunks is None else self._getChunks()
+        self._pendingChunk = (np.empty((0, 3)), np.empty((0, 3)))
+
+        photonCount = min(self._maxPhotonsPerBatch, self._N)
+        photons = self._makePhotons(0, photonCount)
+
+        pbar = progressBar(total=self._N, desc="Propagating photons", unit="photons", disable=not verbose)
+        while len(photons) > 0:
+            self._step(photons)
+            self._roulette(photons)
+            if self._logSize >= self._maxLogSize:
+                self._flushLog()
+
+            isDead = photons["weight"] == 0
+            nDead = int(np.sum(isDead))
+            if nDead == 0:
+                continue
+            pbar.update(nDead)
+
+            newPhotons = self._makePhotons(photonCount, min(photonCount + nDead, self._N))
+            photonCount += len(newPhotons)
+            photons = np.concatenate([photons[~isDead], newPhotons])
+
+        pbar.close()
+        self._flushLog()
+        self._chunks = None
+
+    def _makePhotons(self, startID: int, endID: int) -> np.ndarray:
+        photons = np.zeros(endID - startID, dtype=PHOTON_DTYPE)
+        photons["position"], photons["direction"] = self._takeInitialPositionsAndDirections(endID - startID)
+        photons["er"] = self._getAnyOrthogonal(photons["direction"])
+        photons["weight"] = 1.0
+        photons["materialID"] = self._numpyScene.getMaterialID(self._initialMaterial)
+        photons["solidID"] = self._numpyScene.getSolidID(self._initialSolid)
+        photons["lastIntersectedDetectorID"] = NULL_SOLID_ID
+        photons["ID"] = np.arange(startID, endID)
+        return photons
+
+    def _takeInitialPositionsAndDirections(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        positions, directions = [np.empty((0, 3))], [np.empty((0, 3))]
+        while n > 0:
+            if len(self._pendingChunk[0]) == 0:
+                self._pendingChunk = next(self._chunks)
+            chunkPositions, chunkDirections = self._pendingChunk
+            positions.append(chunkPositions[:n])
+            directions.append(chunkDirections[:n])
+            self._pendingChunk = (chunkPositions[n:], chunkDirections[n:])
+            n -= len(positions[-1])
+        return np.concatenate(positions), np.concatenate(directions)
+
+    def _step(self, photons: np.ndarray):
+        scene = self._numpyScene
+        distance = photons["distance"]
+        toSample = np.nonzero(distance <= 0)[0]
+        if len(toSample) > 0:
+            mu_t = scene.materialMuT[photons["materialID"][toSample]]
+            with np.errstate(divide="ignore"):
+                distance[toSample] += -np.log(self._getRandomFloats(len(toSample))) / mu_t
+            # Not really possible until mu_t is very high (> 1000) and intense smoothing is applied (order-1 spheres).
+            distance[toSample] = np.maximum(distance[toSample], 0)
+
+        intersections = self._intersectionFinder.findIntersections(
+            photons["position"],
+            photons["direction"],
+            distance,
+            photons["solidID"],
+            photons["lastIntersectedDetectorID"],
+        )
+        photons["lastIntersectedDetectorID"] = NULL_SOLID_ID  # Reset ignored detector ID.
+
+        isMissed = np.ones(len(photons), dtype=bool)
+        isMissed[intersections.rayIndices] = False
+        self._moveAndScatter(photons, np.nonzero(isMissed)[0])
+
+        if len(intersections.rayIndices) == 0:
+            return
+        photons["position"][intersections.rayIndices] = intersections.position
+        isDetector = scene.surfaceIsDetector[intersections.surfaceID]
+        self._detectOrIgnore(photons, self._selectIntersections(intersections, isDetector))
+
+        surfaceIntersections = self._selectIntersections(intersections, ~isDetector)
+        photons["distance"][surfaceIntersections.rayIndices] = self._reflectOrRefract(photons, surfaceIntersections)
+        self._correctCloseToVertex(photons, surfaceIntersections)
+
+    def _moveAndScatter(self, photons: np.ndarray, indices: np.ndarray):
+        distance = photons["distance"][indices]
+        isInfinite = np.isinf(distance)
+        photons["weight"][indices[isInfinite]] = 0
+        photons["distance"][indices] = 0
+
+        indices = indices[~isInfinite]
+        photons["position"][indices] += distance[~isInfinite][:, None] * photons["direction"][indices]
+        self._scatter(photons, indices)
+
+    def _scatter(self, photons: np.ndarray, indices: np.ndarray):
+        if len(indices) == 0:
+            return
+        scene = self._numpyScene
+        materialIDs = photons["materialID"][indices]
+        phi = 2 * np.pi * self._getRandomFloats(len(indices))
+        theta = self._getScatteringAngleTheta(scene.materialG[materialIDs], self._getRandomFloats(len(indices)))
+
+        direction = self._normalize(photons["direction"][indices])
+        er = self._normalize(self._rotateAround(photons["er"][indices], direction, phi))
+        direction = self._rotateAround(direction, er, theta)
+        photons["direction"][indices] = direction
+        photons["er"][indices] = self._getAnyOrthogonal(direction)
+
+        weights = photons["weight"][indices]
+        deltaWeights = weights * scene.materialAlbedo[materialIDs]
+        photons["weight"][indices] = weights - deltaWeights
+        self._logDataPoints(
+            deltaWeights, photons["position"][indices], photons["ID"][indices], photons["solidID"][indices]
+        )
+
+    @staticmethod
+    def _getScatteringAngleTheta(g: np.ndarray, randomNumbers: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            temp = (1 - g * g) / (1 - g + 2 * g * randomNumbers)
+            cost = np.where(g == 0, 2 * randomNumbers - 1, (1 + g * g - temp * temp) / (2 * g))
+        return np.arccos(np.clip(cost, -1, 1))
+
+    def _roulette(self, photons: np.ndarray):
+        weights = photons["weight"]
+        toRoulette = np.nonzero((weights < self._weightThreshold) & (weights != 0))[0]
+        if len(toRoulette) == 0:
+            return
+        survives = self._getRandomFloats(len(toRoulette)) < 0.1
+        weights[toRoulette[survives]] /= 0.1
+        weights[toRoulette[~survives]] = 0
+
+    def _detectOrIgnore(self, photons: np.ndarray, intersections: NumpyIntersections):
+        scene = self._numpyScene
+        indices = intersections.rayIndices
+        if len(indices) == 0:
+            return
+        # If the incidence angle is within the numerical aperture, absorb photon.
+        cosIncidence = -np.sum(intersections.normal * photons["direction"][indices], axis=1)
+        insideSolidIDs = scene.surfaceInsideSolidID[intersections.surfaceID]
+        isDetected = cosIncidence >= scene.surfaceDetectorCosine[intersections.surfaceID]
+
+        detected = indices[isDetected]
+        self._logDataPoints(
+            photons["weight"][detected],
+            photons["position"][detected],
+            photons["ID"][detected],
+            insideSolidIDs[isDetected],
+        )
+        photons["weight"][detected] = 0
+        photons["distance"][detected] = 0
+
+        # Prevent re-intersecting with the same detector when passing through it.
+        ignored = indices[~isDetected]
+        photons["lastIntersectedDetectorID"][ignored] = insideSolidIDs[~isDetected]
+        photons["distance"][ignored] = intersections.distanceLeft[~isDetected]
+
+    def _reflectOrRefract(self, photons: np.ndarray, intersections: NumpyIntersections) -> np.ndarray:
+        scene = self._numpyScene
+        indices = intersections.rayIndices
+        surfaceIDs = intersections.surfaceID
+        directions = photons["direction"][indices]
+        distanceLeft = intersections.distanceLeft.copy()
+
+        isGoingInside = np.sum(directions * intersections.normal, axis=1) < 0
+        insideMaterialIDs = scene.surfaceInsideMaterialID[surfaceIDs]
+        outsideMaterialIDs = scene.surfaceOutsideMaterialID[surfaceIDs]
+        nIn = scene.materialN[np.where(isGoingInside, outsideMaterialIDs, insideMaterialIDs)]
+        nOut = scene.materialN[np.where(isGoingInside, insideMaterialIDs, outsideMaterialIDs)]
+        nextMaterialIDs = np.where(isGoingInside, insideMaterialIDs, outsideMaterialIDs)
+        nextSolidIDs = np.where(
+            isGoingInside, scene.surfaceInsideSolidID[surfaceIDs], scene.surfaceOutsideSolidID[surfaceIDs]
+        )
+
+        normals = np.where(isGoingInside[:, None], -intersections.normal, intersections.normal)
+        incidencePlanes = np.cross(directions, normals)
+        isNormalIncidence = np.linalg.norm(incidencePlanes, axis=1) < 1e-7
+        incidencePlanes[isNormalIncidence] = self._getAnyOrthogonal(directions[isNormalIncidence])
+        incidencePlanes = self._normalize(incidencePlanes)
+        thetaIn = np.arccos(np.clip(np.sum(normals * directions, axis=1), -1, 1))
+
+        R = self._getReflectionCoefficients(nIn, nOut, thetaIn)
+        isReflected = R >= self._getRandomFloats(len(indices))
+        with np.errstate(invalid="ignore"):
+            refractionDeflection = thetaIn - np.arcsin(nIn / nOut * np.sin(thetaIn))
+        angleDeflection = np.where(isReflected, 2 * thetaIn - np.pi, refractionDeflection)
+
+        isSmooth = intersections.isSmooth
+        rawDot = np.sum(intersections.rawNormal * directions, axis=1)
+        # Prevent reflection from crossing the raw surface.
+        smoothAngle = np.arccos(np.clip(np.sum(intersections.normal * intersections.rawNormal, axis=1), -1, 1))
+        minDeflectionAngle = smoothAngle + np.abs(angleDeflection) / 2 + MIN_ANGLE
+        toClamp = isSmooth & isReflected & (np.abs(angleDeflection) < minDeflectionAngle)
+        angleDeflection[toClamp] = np.sign(angleDeflection[toClamp]) * minDeflectionAngle[toClamp]
+        # Prevent refraction from not crossing the raw surface.
+        maxDeflectionAngle = np.abs(np.pi / 2 - np.arccos(np.clip(rawDot, -1, 1))) - MIN_ANGLE
+        toClamp = isSmooth & ~isReflected & (np.abs(angleDeflection) > maxDeflectionAngle)
+        angleDeflection[toClamp] = np.sign(angleDeflection[toClamp]) * maxDeflectionAngle[toClamp]
+
+        isRefracted = ~isReflected
+        self._logIntersections(photons, intersections, isRefracted)
+        photons["direction"][indices] = self._rotateAround(directions, incidencePlanes, angleDeflection)
+
+        refracted = indices[isRefracted]
+        mut1 = scene.materialMuT[photons["materialID"][refracted]]
+        mut2 = scene.materialMuT[nextMaterialIDs[isRefracted]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scaledDistanceLeft = np.where(
+                mut1 == 0, 0, np.where(mut2 != 0, distanceLeft[isRefracted] * mut1 / mut2, np.inf)
+            )
+        distanceLeft[isRefracted] = scaledDistanceLeft
+        photons["materialID"][refracted] = nextMaterialIDs[isRefracted]
+        photons["solidID"][refracted] = nextSolidIDs[isRefracted]
+        return distanceLeft
+
+    @staticmethod
+    def _getReflectionCoefficients(n1: np.ndarray, n2: np.ndarray, thetaIn: np.ndarray) -> np.ndarray:
+        """Fresnel reflection coefficients for unpolarized light (same formulation as MCML)."""
+        sa1 = np.sin(thetaIn)
+        sa2 = sa1 * n1 / n2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ca1 = np.sqrt(1 - sa1 * sa1)
+            ca2 = np.sqrt(1 - sa2 * sa2)
+            cap = ca1 * ca2 - sa1 * sa2
+            cam = ca1 * ca2 + sa1 * sa2
+            sap = sa1 * ca2 + ca1 * sa2
+            sam = sa1 * ca2 - ca1 * sa2
+            R = 0.5 * sam * sam * (cap * cap + cam * cam) / (sap * sap * cam * cam)
+
+        R = np.where(sa2 > 1, 1.0, R)
+        R = np.where(thetaIn == 0, ((n2 - n1) / (n2 + n1)) ** 2, R)
+        return np.where(n1 == n2, 0.0, R)
+
+    def _logIntersections(self, photons: np.ndarray, intersections: NumpyIntersections, toLog: np.ndarray):
+        scene = self._numpyScene
+        indices = intersections.rayIndices[toLog]
+        surfaceIDs = intersections.surfaceID[toLog]
+        weights = photons["weight"][indices]
+        positions = photons["position"][indices]
+        photonIDs = photons["ID"][indices]
+
+        isLeavingSurface = np.sum(photons["direction"][indices] * intersections.normal[toLog], axis=1) > 0
+        signs = np.where(isLeavingSurface, 1, -1)
+        self._logDataPoints(signs * weights, positions, photonIDs, scene.surfaceInsideSolidID[surfaceIDs], surfaceIDs)
+
+        outsideSolidIDs = scene.surfaceOutsideSolidID[surfaceIDs]
+        hasOutsideSolid = outsideSolidIDs != WORLD_SOLID_ID
+        self._logDataPoints(
+            -signs[hasOutsideSolid] * weights[hasOutsideSolid],
+            positions[hasOutsideSolid],
+            photonIDs[hasOutsideSolid],
+            outsideSolidIDs[hasOutsideSolid],
+            surfaceIDs[hasOutsideSolid],
+        )
+
+    def _correctCloseToVertex(self, photons: np.ndarray, intersections: NumpyIntersections):
+        """If an intersection lies too close to a vertex, move the photon away slightly."""
+        scene = self._numpyScene
+        vertexIDs = scene.triangleVertexIDs[intersections.polygonID]
+        vertexDistances = np.linalg.norm(intersections.position[:, None, :] - scene.vertexPositions[vertexIDs], axis=2)
+        isCloseToVertex = vertexDistances < VERTEX_EPS
+        toCorrect = np.nonzero(np.any(isCloseToVertex, axis=1))[0]
+        if len(toCorrect) == 0:
+            return
+
+        indices = intersections.rayIndices[toCorrect]
+        closeVertexIDs = vertexIDs[toCorrect, np.argmax(isCloseToVertex[toCorrect], axis=1)]
+        solidIDsTowardsNormal = scene.surfaceOutsideSolidID[intersections.surfaceID[toCorrect]]
+        stepSigns = np.where(solidIDsTowardsNormal == photons["solidID"][indices], 1, -1)
+        photons["position"][indices] += stepSigns[:, None] * scene.vertexNormals[closeVertexIDs] * VERTEX_STEP
+
+    def _logDataPoints(self, weights, positions, photonIDs, solidIDs, surfaceIDs=NO_SURFACE_ID):
+        if self._sceneLogger is None or len(weights) == 0:
+            return
+        dataPoints = np.empty((len(weights), 7), dtype=np.float64)
+        dataPoints[:, 0] = weights
+        dataPoints[:, 1:4] = positions
+        dataPoints[:, 4] = photonIDs
+        dataPoints[:, 5] = solidIDs
+        dataPoints[:, 6] = surfaceIDs
+        self._log.append(dataPoints)
+        self._logSize += len(dataPoints)
+
+    def _flushLog(self):
+        if len(self._log) == 0:
+            return
+        keyLog = CLKeyLog(np.concatenate(self._log), sceneCL=self._numpyScene)
+        keyLog.toSceneLogger(self._sceneLogger)
+        self._log = []
+        self._logSize = 0
+
+    @staticmethod
+    def _selectIntersections(intersections: NumpyIntersections, mask: np.ndarray) -> NumpyIntersections:
+        return NumpyIntersections(*(getattr(intersections, field.name)[mask] for field in fields(intersections)))
+
+    @staticmethod
+    def _getRandomFloats(n: int) -> np.ndarray:
+        # Exclude zero to avoid infinite scattering distances.
+        return 1 - np.random.random(n)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=vectors.copy(), where=norms != 0)
+
+    @staticmethod
+    def _rotateAround(vectors: np.ndarray, unitAxes: np.ndarray, angles: np.ndarray) -> np.ndarray:
+        """Rodrigues' rotation of each vector around its unit axis by the given angle."""
+        cost = np.cos(angles)[:, None]
+        sint = np.sin(angles)[:, None]
+        axisDot = np.sum(unitAxes * vectors, axis=1, keepdims=True)
+        return vectors * cost + np.cross(unitAxes, vectors) * sint + unitAxes * axisDot * (1 - cost)
+
+    @staticmethod
+    def _getAnyOrthogonal(vectors: np.ndarray) -> np.ndarray:
+        x, y, z = vectors[:, 0], vectors[:, 1], vectors[:, 2]
+        zero = np.zeros_like(x)
+        useXY = (np.abs(z) < np.abs(x))[:, None]
+        return np.where(useXY, np.stack([y, -x, zero], axis=1), np.stack([zero, -z, y], axis=1))
@@ -0,0 +1,69 @@
+import numpy as np
+
+from pytissueoptics.rayscattering.opencl.CLScene import CLScene
+from pytissueoptics.rayscattering.scatteringScene import ScatteringScene
+from pytissueoptics.scene.intersection import PolygonArrays
+
+
+class NumpyScene(CLScene):
+    """Flattened version of a ScatteringScene stored in contiguous NumPy arrays to be used by the vectorized CPU
+    engine. It shares the solid, surface and material IDs of the CLScene, so the resulting (N, 7) logs can be
+    translated to the scene logger with CLKeyLog. The triangles are also exposed as PolygonArrays (one triangle per
+    polygon) for the batched intersection search.
+    """
+
+    def __init__(self, scene: ScatteringScene):
+        super().__init__(scene, nWorkUnits=1)
+
+        self.surfaceInsideMaterialID = self._getSurfaceArray("insideMaterialID", np.int64)
+        self.surfaceOutsideMaterialID = self._getSurfaceArray("outsideMaterialID", np.int64)
+        self.surfaceInsideSolidID = self._getSurfaceArray("insideSolidID", np.int64)
+        self.surfaceOutsideSolidID = self._getSurfaceArray("outsideSolidID", np.int64)
+        self.surfaceToSmooth = self._getSurfaceArray("toSmooth", bool)
+        self.surfaceIsDetector = self._getSurfaceArray("isDetector", bool)
+        self.surfaceDetectorCosine = self._getSurfaceArray("detectorCosine", np.float64)
+
+        self.vertexPositions = np.array([v.array for v in self._vertices], dtype=np.float64).reshape(-1, 3)
+        self.vertexNormals = np.array(
+            [v.normal.array if v.normal is not None else np.zeros(3) for v in self._vertices], dtype=np.float64
+        ).reshape(-1, 3)
+
+        self.triangleVertexIDs = np.array([t.vertexIDs for t in self._trianglesInfo], dtype=np.int64).reshape(-1, 3)
+        self.triangleNormals = np.array([t.normal.array for t in self._trianglesInfo], dtype=np.float64).reshape(-1, 3)
+        self.triangleSurfaceID = np.zeros(len(self._trianglesInfo), dtype=np.int64)
+        for surfaceID, surfaceInfo in enumerate(self._surfacesInfo):
+            self.triangleSurfaceID[surfaceInfo.firstPolygonID : surfaceInfo.lastPolygonID + 1] = surfaceID
+
+        self.materialMuT = np.array([m.mu_t for m in self._sceneMaterials], dtype=np.float64)
+        self.materialAlbedo = np.array([m.getAlbedo() for m in self._sceneMaterials], dtype=np.float64)
+        self.materialG = np.array([m.g for m in self._sceneMaterials], dtype=np.float64)
+        self.materialN = np.array([m.n for m in self._sceneMaterials], dtype=np.float64)
+
+        self.polygonArrays = self._getPolygonArrays()
+
+    def _getPolygonArrays(self) -> PolygonArrays:
+        nTriangles = len(self._trianglesInfo)
+        return PolygonArrays(
+            solidIDs=np.arange(1, len(self._solidsInfo) + 1, dtype=np.int64),
+            solidBBoxMin=np.array(
+                [[s.bbox.xMin, s.bbox.yMin, s.bbox.zMin] for s in self._solidsInfo], dtype=np.float64
+            ).reshape(-1, 3),
+            solidBBoxMax=np.array(
+                [[s.bbox.xMax, s.bbox.yMax, s.bbox.zMax] for s in self._solidsInfo], dtype=np.float64
+            ).reshape(-1, 3),
+            solidPolygonStartIDs=np.array(
+                [self._surfacesInfo[s.firstSurfaceID].firstPolygonID for s in self._solidsInfo], dtype=np.int64
+            ),
+            solidPolygonEndIDs=np.array(
+                [self._surfacesInfo[s.lastSurfaceID].lastPolygonID + 1 for s in self._solidsInfo], dtype=np.int64
+            ),
+            triangleVertices=self.vertexPositions[self.triangleVertexIDs].reshape(nTriangles, 1, 3, 3),
+            triangleNormals=self.triangleNormals.reshape(nTriangles, 1, 3),
+            triangleMask=np.ones((nTriangles, 1), dtype=bool),
+            normals=self.triangleNormals,
+            insideSolidIDs=self.surfaceInsideSolidID[self.triangleSurfaceID],
+            outsideSolidIDs=self.surfaceOutsideSolidID[self.triangleSurfaceID],
+        )
+
+    def _getSurfaceArray(self, field: str, dtype) -> np.ndarray:
+        return np.array([getattr(s, field) for s in self._surfacesInfo], dtype=dtype)
@@ -1,11 +1,16 @@
+from .batchIntersect import BatchIntersect, IntersectionBatch
 from .intersectionFinder import FastIntersectionFinder, Intersection, SimpleIntersectionFinder
+from .polygonArrays import PolygonArrays
 from .ray import Ray
 from .raySource import RaySource, UniformRaySource
 
 __all__ = [
+    "BatchIntersect",
     "Intersection",
+    "IntersectionBatch",
     "FastIntersectionFinder",
     "SimpleIntersectionFinder",
+    "PolygonArrays",
     "Ray",
     "RaySource",
     "UniformRaySource",
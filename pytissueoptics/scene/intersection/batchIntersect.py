@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .bboxIntersect import GemsBoxIntersect
+from .mollerTrumboreIntersect import MollerTrumboreIntersect
+from .polygonArrays import PolygonArrays
+
+MAX_PAIRS_PER_CHUNK = 2**18
+
+
+@dataclass
+class IntersectionBatch:
+    """Closest intersection of each of N rays. Rays without intersection have a polygonID of -1, an infinite
+    distance and NaN position and normal. The distance is signed (a backward catch is slightly negative) and the
+    normal is the raw polygon normal (without smoothing)."""
+
+    distance: np.ndarray
+    position: np.ndarray
+    polygonID: np.ndarray
+    normal: np.ndarray
+
+    @property
+    def exists(self) -> np.ndarray:
+        return self.polygonID >= 0
+
+
+class BatchIntersect:
+    """
+    Vectorized closest intersection search of many rays in the polygons of PolygonArrays. This is the batched
+    counterpart of the single ray search of the intersection finders (and of the OpenCL `findIntersection`).
+
+    Rays are given as (N, 3) origins and unit directions with (N,) lengths (np.inf for infinite rays), (N,) current
+    solid IDs and (N,) solid IDs to ignore (-1 for none).
+    """
+
+    def __init__(self):
+        self._polygonIntersect = MollerTrumboreIntersect()
+        self._boxIntersect = GemsBoxIntersect()
+
+    def findIntersections(
+        self,
+        arrays: PolygonArrays,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        lengths: np.ndarray,
+        solidIDs: np.ndarray,
+        ignoreSolidIDs: np.ndarray,
+    ) -> IntersectionBatch:
+        """
+        1. Compute the bounding box distance of each ray to each solid (0 if the ray starts inside or if the ray is
+            currently in this solid, -1 if the box is missed or if the solid is ignored).
+        2. Visit the solid candidates of each ray in order of bbox distance, skipping a candidate when its bbox
+            distance is greater than the closest intersection found so far for that ray.
+        3. For each solid, test all its polygons in chunks with the vectorized Möller–Trumbore intersection.
+        """
+        nRays = len(origins)
+        closestDistance = np.full(nRays, np.inf)
+        closestPosition = np.full((nRays, 3), np.nan)
+        closestPolygonID = np.full(nRays, -1, dtype=np.int64)
+
+        nSolids = len(arrays.solidIDs)
+        if nSolids > 0:
+            bboxDistances = self._findBBoxDistances(arrays, origins, directions, lengths, solidIDs, ignoreSolidIDs)
+            candidateOrder = np.argsort(bboxDistances, axis=1, kind="stable")
+            rows = np.arange(nRays)
+            for rank in range(nSolids):
+                candidates = candidateOrder[:, rank]
+                candidateDistances = bboxDistances[rows, candidates]
+                isActive = (candidateDistances != -1) & (candidateDistances <= closestDistance)
+                for solidIndex in np.unique(candidates[isActive]):
+                    rayIndices = np.nonzero(isActive & (candidates == solidIndex))[0]
+                    polygonIDs = np.arange(
+                        arrays.solidPolygonStartIDs[solidIndex], arrays.solidPolygonEndIDs[solidIndex]
+                    )
+                    distance, position, polygonID = self.findClosestPolygonIntersections(
+                        arrays,
+                        polygonIDs,
+                        origins[rayIndices],
+                        directions[rayIndices],
+                        lengths[rayIndices],
+                        solidIDs[rayIndices],
+                    )
+                    isCloser = (polygonID >= 0) & (distance < closestDistance[rayIndices])
+                    rayIndices = rayIndices[isCloser]
+                    closestDistance[rayIndices] = distance[isCloser]
+                    closestPosition[rayIndices] = position[isCloser]
+                    closestPolygonID[rayIndices] = polygonID[isCloser]
+
+        return self.composeBatch(arrays, closestDistance, closestPosition, closestPolygonID)
+
+    def findClosestPolygonIntersections(
+        self,
+        arrays: PolygonArrays,
+        polygonIDs: np.ndarray,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        lengths: np.ndarray,
+        solidIDs: np.ndarray,
+        ignoreSolidIDs: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Closest intersection of each ray with the given polygons. Returns the (N,) signed distances, (N, 3)
+        positions and (N,) polygon IDs, which are -1 when there is no intersection. When `ignoreSolidIDs` is given,
+        polygons whose inside solid is ignored by a ray are skipped for that ray."""
+        nRays = len(origins)
+        rows = np.arange(nRays)
+        bestAbsDistance = np.full(nRays, np.inf)
+        bestDistance = np.full(nRays, np.inf)
+        bestPosition = np.zeros((nRays, 3))
+        bestPolygonID = np.full(nRays, -1, dtype=np.int64)
+        minSameSolidDistance = np.full(nRays, -np.inf)
+
+        chunkSize = max(1, MAX_PAIRS_PER_CHUNK // max(nRays, 1))
+        for start in range(0, len(polygonIDs), chunkSize):
+            chunkIDs = polygonIDs[start : start + chunkSize]
+            hits, distances, positions = self._getPolygonIntersections(arrays, chunkIDs, origins, directions, lengths)
+
+            # When an interface joins a side surface, an outside photon could try to intersect with the interface.
+            #  This is not allowed, so we skip these tests (where surface environments dont match the photon).
+            insideSolidIDs = arrays.insideSolidIDs[chunkIDs]
+            outsideSolidIDs = arrays.outsideSolidIDs[chunkIDs]
+            currentSolidIDs = solidIDs[:, None]
+            hits &= (insideSolidIDs == currentSolidIDs) | (outsideSolidIDs == currentSolidIDs)
+            if ignoreSolidIDs is not None:
+                hits &= insideSolidIDs != ignoreSolidIDs[:, None]
+
+            # Discard intersections where the ray is heading towards its current solid (possible because of the
+            #  epsilon catch zone in our Moller-Trumbore intersect).
+            isGoingInside = directions @ arrays.normals[chunkIDs].T < 0
+            nextSolidIDs = np.where(isGoingInside, insideSolidIDs, outsideSolidIDs)
+            isSameSolid = hits & (nextSolidIDs == currentSolidIDs)
+            minSameSolidDistance = np.maximum(
+                minSameSolidDistance, np.max(np.where(isSameSolid, distances, -np.inf), axis=1)
+            )
+
+            absDistances = np.where(hits & ~isSameSolid, np.abs(distances), np.inf)
+            closest = np.argmin(absDistances, axis=1)
+            isCloser = absDistances[rows, closest] < bestAbsDistance
+            bestAbsDistance[isCloser] = absDistances[rows, closest][isCloser]
+            bestDistance[isCloser] = distances[rows, closest][isCloser]
+            bestPosition[isCloser] = positions[rows, closest][isCloser]
+            bestPolygonID[isCloser] = chunkIDs[closest[isCloser]]
+
+        # Cancel back catch. Surface overlap.
+        bestPolygonID[(bestDistance == 0) & (minSameSolidDistance == 0)] = -1
+        # Cancel back catch if the same-solid intersect distance is greater.
+        bestPolygonID[(bestDistance < 0) & (minSameSolidDistance > bestDistance + 1e-7)] = -1
+        return bestDistance, bestPosition, bestPolygonID
+
+    @staticmethod
+    def composeBatch(
+        arrays: PolygonArrays, distances: np.ndarray, positions: np.ndarray, polygonIDs: np.ndarray
+    ) -> IntersectionBatch:
+        exists = polygonIDs >= 0
+        distances = np.where(exists, distances, np.inf)
+        positions = np.where(exists[:, None], positions, np.nan)
+        normals = np.full((len(polygonIDs), 3), np.nan)
+        normals[exists] = arrays.normals[polygonIDs[exists]]
+        return IntersectionBatch(distances, positions, polygonIDs, normals)
+
+    def _findBBoxDistances(self, arrays: PolygonArrays, origins, directions, lengths, solidIDs, ignoreSolidIDs):
+        bboxDistances = np.empty((len(origins), len(arrays.solidIDs)))
+        for i, solidID in enumerate(arrays.solidIDs):
+            _, distances = self._boxIntersect.getIntersections(
+                origins, directions, lengths, arrays.solidBBoxMin[i], arrays.solidBBoxMax[i]
+            )
+            distances[solidIDs == solidID] = 0
+            distances[ignoreSolidIDs == solidID] = -1
+            bboxDistances[:, i] = distances
+        return bboxDistances
+
+    def _getPolygonIntersections(
+        self, arrays: PolygonArrays, polygonIDs: np.ndarray, origins, directions, lengths
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Intersection of each ray with each polygon, which is the one of its first intersecting triangle. Returns
+        the (N, M) hit mask, (N, M) signed distances and (N, M, 3) hit points."""
+        triangleVertices = arrays.triangleVertices[polygonIDs]
+        triangleNormals = arrays.triangleNormals[polygonIDs]
+        triangleMask = arrays.triangleMask[polygonIDs]
+
+        hits = np.zeros((len(origins), len(polygonIDs)), dtype=bool)
+        distances = np.zeros((len(origins), len(polygonIDs)))
+        positions = np.zeros((len(origins), len(polygonIDs), 3))
+        for k in range(triangleVertices.shape[1]):
+            triangleHits, triangleDistances, trianglePositions = self._polygonIntersect.getTriangleIntersections(
+                origins, directions, lengths, triangleVertices[:, k], triangleNormals[:, k]
+            )
+            isFirstHit = triangleHits & triangleMask[None, :, k] & ~hits
+            distances[isFirstHit] = triangleDistances[isFirstHit]
+            positions[isFirstHit] = trianglePositions[isFirstHit]
+            hits |= isFirstHit
+        return hits, distances, positions
@@ -1,4 +1,7 @@
-from typing import Union
+import math
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from pytissueoptics.scene.geometry import BoundingBox, Vector
 
@@ -75,6 +78,75 @@ class GemsBoxIntersect(BoxIntersectStrategy):
 
         return Vector(*hitPoint)
 
+    def getDistance(
+        self, origin: Sequence[float], direction: Sequence[float], length: Optional[float], minCorner, maxCorner
+    ) -> Optional[float]:
+        """Allocation-free version of `getIntersection` for a ray and a box given as sequences of XYZ floats.
+        Returns the distance to the box (0 if the ray starts inside) or None if the ray misses the box."""
+        inside = True
+        maxT = [-1.0, -1.0, -1.0]
+        candidatePlanes = [0.0, 0.0, 0.0]
+        for i in range(3):
+            if origin[i] < minCorner[i]:
+                candidatePlanes[i] = minCorner[i]
+            elif origin[i] > maxCorner[i]:
+                candidatePlanes[i] = maxCorner[i]
+            else:
+                continue
+            inside = False
+            if direction[i] != 0:
+                maxT[i] = (candidatePlanes[i] - origin[i]) / direction[i]
+
+        if inside:
+            return 0.0
+
+        plane = maxT.index(max(maxT))
+        t = maxT[plane]
+        if t < 0:
+            return None
+        if length and t > length:
+            return None
+
+        squaredDistance = 0.0
+        for i in range(3):
+            if i != plane:
+                hitCoordinate = origin[i] + t * direction[i]
+                if hitCoordinate < minCorner[i] or hitCoordinate > maxCorner[i]:
+                    return None
+            else:
+                hitCoordinate = candidatePlanes[i]
+            squaredDistance += (hitCoordinate - origin[i]) ** 2
+        return math.sqrt(squaredDistance)
+
+    def getIntersections(
+        self, origins: np.ndarray, directions: np.ndarray, lengths: np.ndarray, minCorner, maxCorner
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized version of `getIntersection` for (N, 3) ray origins and directions with (N,) lengths.
+        Returns a (N,) boolean mask of the rays which start inside the box and the (N,) distances to the box, where
+        rays starting inside have a distance of 0 and rays missing the box have a distance of -1."""
+        minCorner = np.asarray(minCorner, dtype=np.float64)
+        maxCorner = np.asarray(maxCorner, dtype=np.float64)
+        isLeft = origins < minCorner
+        isRight = origins > maxCorner
+        isMiddle = ~isLeft & ~isRight
+        inside = np.all(isMiddle, axis=1)
+        candidatePlanes = np.where(isLeft, minCorner, maxCorner)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            maxT = np.where(~isMiddle & (directions != 0), (candidatePlanes - origins) / directions, -1)
+        plane = np.argmax(maxT, axis=1)
+        rows = np.arange(len(origins))
+        tPlane = maxT[rows, plane]
+
+        hitPoints = origins + tPlane[:, None] * directions
+        hitPoints[rows, plane] = candidatePlanes[rows, plane]
+        isOnBox = np.all((hitPoints >= minCorner) & (hitPoints <= maxCorner), axis=1)
+        exists = (tPlane >= 0) & (tPlane <= lengths) & isOnBox
+
+        distances = np.where(exists, np.linalg.norm(hitPoints - origins, axis=1), -1.0)
+        distances[inside] = 0
+        return inside, distances
+
 
 class ZacharBoxIntersect(BoxIntersectStrategy):
     """https://gamedev.stackexchange.com/a/18459
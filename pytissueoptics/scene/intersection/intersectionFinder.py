@@ -2,16 +2,20 @@ import sys
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 
+import numpy as np
+
 from pytissueoptics.scene import shader
 from pytissueoptics.scene.geometry import Environment, Polygon, Vector
 from pytissueoptics.scene.geometry.polygon import WORLD_LABEL
 from pytissueoptics.scene.scene import Scene
 from pytissueoptics.scene.solids import Solid
-from pytissueoptics.scene.tree import Node, SpacePartition
+from pytissueoptics.scene.tree import TREE_CACHE, SpacePartition
 from pytissueoptics.scene.tree.treeConstructor.binary import NoSplitThreeAxesConstructor
 
+from .batchIntersect import BatchIntersect, IntersectionBatch
 from .bboxIntersect import GemsBoxIntersect
 from .mollerTrumboreIntersect import MollerTrumboreIntersect
+from .polygonArrays import PolygonArrays
 from .ray import Ray
 
 
@@ -34,12 +38,64 @@ class IntersectionFinder:
         self._scene = scene
         self._polygonIntersect = MollerTrumboreIntersect()
         self._boxIntersect = GemsBoxIntersect()
+        self._batchIntersect = BatchIntersect()
+        self._polygonArrays = None
 
     def findIntersection(
         self, ray: Ray, currentSolidLabel: Optional[str], ignoreLabel: Optional[str] = None
     ) -> Optional[Intersection]:
         raise NotImplementedError
 
+    def findIntersections(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        lengths: np.ndarray,
+        solidIDs: np.ndarray,
+        ignoreSolidIDs: Optional[np.ndarray] = None,
+    ) -> IntersectionBatch:
+        """
+        Batched version of `findIntersection` for N rays given as (N, 3) origins and directions with (N,) lengths
+        (np.inf for infinite rays). The current solid (and the solid to ignore, if any) of each ray is given by its ID
+        in `solidLabels` (see `getSolidID`). Polygon IDs are indices in `polygons`.
+
+        Uses the same search as SimpleIntersectionFinder with a vectorized Möller–Trumbore intersection, including
+        its epsilon catch zones.
+        """
+        rays = self._prepareRays(origins, directions, lengths, solidIDs, ignoreSolidIDs)
+        return self._batchIntersect.findIntersections(self._getPolygonArrays(), *rays)
+
+    @property
+    def solidLabels(self) -> List[str]:
+        """Solid labels indexed by the solid IDs of `findIntersections`. The world has an ID of 0."""
+        return self._getPolygonArrays().solidLabels
+
+    @property
+    def polygons(self) -> List[Polygon]:
+        """Scene polygons indexed by the polygon IDs returned by `findIntersections`."""
+        return self._getPolygonArrays().polygons
+
+    def getSolidID(self, solidLabel: str) -> int:
+        return self._getPolygonArrays().getSolidID(solidLabel)
+
+    def _getPolygonArrays(self) -> PolygonArrays:
+        if self._polygonArrays is None:
+            self._polygonArrays = PolygonArrays.fromScene(self._scene)
+        return self._polygonArrays
+
+    @staticmethod
+    def _prepareRays(origins, directions, lengths, solidIDs, ignoreSolidIDs) -> Tuple[np.ndarray, ...]:
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+        nRays = len(origins)
+        lengths = np.broadcast_to(np.asarray(lengths, dtype=np.float64), (nRays,))
+        solidIDs = np.broadcast_to(np.asarray(solidIDs, dtype=np.int64), (nRays,))
+        if ignoreSolidIDs is None:
+            ignoreSolidIDs = -1
+        ignoreSolidIDs = np.broadcast_to(np.asarray(ignoreSolidIDs, dtype=np.int64), (nRays,))
+        return origins, directions, lengths, solidIDs, ignoreSolidIDs
+
     def _findClosestPolygonIntersection(
         self, ray: Ray, polygons: List[Polygon], currentSolidLabel: str, ignoreLabel: Optional[str] = None
     ) -> Optional[Intersection]:
@@ -163,49 +219,151 @@ class SimpleIntersectionFinder(IntersectionFinder):
 
 
 class FastIntersectionFinder(IntersectionFinder):
-    def __init__(self, scene: Scene, constructor=NoSplitThreeAxesConstructor(), maxDepth=20, minLeafSize=6):
+    def __init__(
+        self,
+        scene: Scene,
+        constructor=NoSplitThreeAxesConstructor(),
+        maxDepth=20,
+        minLeafSize=6,
+        useCache: bool = False,
+    ):
+        """
+        :param useCache: Reuse the tree of a previous finder of the same geometry and parameters from TREE_CACHE
+            instead of building it. The space partition (`_partition`) is then not available.
+        """
         super(FastIntersectionFinder, self).__init__(scene)
-        self._partition = SpacePartition(
-            self._scene.getBoundingBox(), self._scene.getPolygons(), constructor, maxDepth, minLeafSize
+        if useCache:
+            self._partition = None
+            tree = TREE_CACHE.getTree(self._scene, constructor, maxDepth, minLeafSize)
+        else:
+            self._partition = SpacePartition(
+                self._scene.getBoundingBox(), self._scene.getPolygons(), constructor, maxDepth, minLeafSize
+            )
+            tree = self._partition.flatten()
+        # Plain lists are faster than NumPy arrays for the scalar access of the traversal.
+        self._bboxMin = tree.bboxMin.tolist()
+        self._bboxMax = tree.bboxMax.tolist()
+        self._firstChildIDs = tree.firstChildIDs.tolist()
+        self._childCounts = tree.childCounts.tolist()
+        self._leafPolygons = [
+            tree.getLeafPolygons(nodeID) if childCount == 0 else None
+            for nodeID, childCount in enumerate(self._childCounts)
+        ]
+        self._tree = tree
+
+    def findIntersections(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        lengths: np.ndarray,
+        solidIDs: np.ndarray,
+        ignoreSolidIDs: Optional[np.ndarray] = None,
+    ) -> IntersectionBatch:
+        """
+        Batched version of `findIntersection` which traverses the space partition like the single ray search, but
+        for the subset of rays reaching each node. The rays of a node are its parent rays which intersect its bounding
+        box before their closest intersection found so far, and the polygons of a leaf are tested with the vectorized
+        Möller–Trumbore intersection.
+        """
+        arrays = self._getPolygonArrays()
+        origins, directions, lengths, solidIDs, ignoreSolidIDs = self._prepareRays(
+            origins, directions, lengths, solidIDs, ignoreSolidIDs
         )
+        nRays = len(origins)
+        closestDistance = np.full(nRays, np.inf)
+        closestPosition = np.full((nRays, 3), np.nan)
+        closestPolygonID = np.full(nRays, -1, dtype=np.int64)
+
+        tree = self._tree
+        stack = [(0, np.arange(nRays))]
+        while stack:
+            nodeID, rayIndices = stack.pop()
+            childCount = self._childCounts[nodeID]
+            if childCount == 0:
+                firstID = tree.firstPolygonIDs[nodeID]
+                polygonIDs = tree.leafPolygonIDs[firstID : firstID + tree.polygonCounts[nodeID]]
+                distance, position, polygonID = self._batchIntersect.findClosestPolygonIntersections(
+                    arrays,
+                    polygonIDs,
+                    origins[rayIndices],
+                    directions[rayIndices],
+                    lengths[rayIndices],
+                    solidIDs[rayIndices],
+                    ignoreSolidIDs[rayIndices],
+                )
+                isCloser = (polygonID >= 0) & (distance < closestDistance[rayIndices])
+                rayIndices = rayIndices[isCloser]
+                closestDistance[rayIndices] = distance[isCloser]
+                closestPosition[rayIndices] = position[isCloser]
+                closestPolygonID[rayIndices] = polygonID[isCloser]
+                continue
+
+            _, bboxDistances = self._boxIntersect.getIntersections(
+                origins[rayIndices],
+                directions[rayIndices],
+                lengths[rayIndices],
+                tree.bboxMin[nodeID],
+                tree.bboxMax[nodeID],
+            )
+            rayIndices = rayIndices[(bboxDistances != -1) & (bboxDistances <= closestDistance[rayIndices])]
+            if len(rayIndices) == 0:
+                continue
+
+            # Push the children in reverse order to explore them in order.
+            firstChildID = self._firstChildIDs[nodeID]
+            for childID in range(firstChildID + childCount - 1, firstChildID - 1, -1):
+                stack.append((childID, rayIndices))
+
+        return self._batchIntersect.composeBatch(arrays, closestDistance, closestPosition, closestPolygonID)
+
+    def _getPolygonArrays(self) -> PolygonArrays:
+        if self._polygonArrays is None:
+            # Leaf polygon IDs refer to the tree polygons, which can include polygons split by the tree constructor.
+            self._polygonArrays = PolygonArrays.fromScene(self._scene, self._tree.polygons)
+        return self._polygonArrays
 
     def findIntersection(
         self, ray: Ray, currentSolidLabel: str, ignoreLabel: Optional[str] = None
     ) -> Optional[Intersection]:
-        self._currentSolidLabel = currentSolidLabel
-        intersection = self._findIntersection(ray, self._partition.root, ignoreLabel=ignoreLabel)
+        intersection = self._findIntersection(ray, currentSolidLabel, ignoreLabel)
         return self._composeIntersection(ray, intersection)
 
     def _findIntersection(
-        self, ray: Ray, node: Node, closestDistance=sys.maxsize, ignoreLabel: Optional[str] = None
+        self, ray: Ray, currentSolidLabel: str, ignoreLabel: Optional[str] = None
     ) -> Optional[Intersection]:
+        """
+        Depth-first traversal of the flattened space partition using a stack of node IDs. The leaves are not tested
+        against their bounding box, and a node is not explored if its bounding box is further than the closest
+        intersection found so far.
+        """
         # todo: test if this node search is still compatible with the new core intersection logic
         #  which can now require testing a polygon slightly behind the ray origin.
-        if node.isLeaf:
-            intersection = self._findClosestPolygonIntersection(
-                ray, node.polygons, self._currentSolidLabel, ignoreLabel
-            )
-            return intersection
+        origin = ray.origin.array
+        direction = ray.direction.array
+        closestDistance = sys.maxsize
+        closestIntersection = None
 
-        if not self._nodeIsWorthExploring(ray, node, closestDistance):
-            return None
+        stack = [0]
+        while stack:
+            nodeID = stack.pop()
+            childCount = self._childCounts[nodeID]
+            if childCount == 0:
+                intersection = self._findClosestPolygonIntersection(
+                    ray, self._leafPolygons[nodeID], currentSolidLabel, ignoreLabel
+                )
+                if intersection is not None and intersection.distance < closestDistance:
+                    closestDistance = intersection.distance
+                    closestIntersection = intersection
+                continue
 
-        closestIntersection = None
-        for child in node.children:
-            intersection = self._findIntersection(ray, child, closestDistance, ignoreLabel)
-            if intersection is None:
+            bboxDistance = self._boxIntersect.getDistance(
+                origin, direction, ray.length, self._bboxMin[nodeID], self._bboxMax[nodeID]
+            )
+            if bboxDistance is None or bboxDistance > closestDistance:
                 continue
-            if intersection.distance < closestDistance:
-                closestDistance = intersection.distance
-                closestIntersection = intersection
 
-        return closestIntersection
+            # Push the children in reverse order to explore them in order.
+            firstChildID = self._firstChildIDs[nodeID]
+            stack.extend(range(firstChildID + childCount - 1, firstChildID - 1, -1))
 
-    def _nodeIsWorthExploring(self, ray, node, closestDistance) -> bool:
-        bboxIntersectionPoint = self._boxIntersect.getIntersection(ray, node.bbox)
-        if bboxIntersectionPoint is None:
-            return False
-        bboxDistance = (bboxIntersectionPoint - ray.origin).getNorm()
-        if bboxDistance > closestDistance:
-            return False
-        return True
+        return closestIntersection
@@ -1,4 +1,6 @@
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
+
+import numpy as np
 
 from pytissueoptics.scene.geometry import Polygon, Quad, Triangle, Vector
 
@@ -94,6 +96,60 @@ class MollerTrumboreIntersect:
         # Case 4: No intersection.
         return None
 
+    def getTriangleIntersections(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        lengths: np.ndarray,
+        vertices: np.ndarray,
+        normals: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized version of the triangle intersection above which tests each of the N rays against each of the
+        M triangles at once. Rays are given as (N, 3) origins and directions with (N,) lengths (np.inf for infinite
+        rays) and triangles as (M, 3, 3) vertices with (M, 3) normals.
+
+        Returns a (N, M) boolean hit mask, the (N, M) signed hit distances and the (N, M, 3) hit points. As in the
+        OpenCL implementation, a backward catch of a ray lying on the triangle returns a distance of 0 to prioritize
+        this intersection. Values where the mask is False are undefined.
+        """
+        v1, v2, v3 = vertices[:, 0], vertices[:, 1], vertices[:, 2]
+        edgeA = v2 - v1
+        edgeB = v3 - v1
+        direction = directions[:, None, :]
+        pVector = np.cross(direction, edgeB[None])
+        determinant = np.einsum("mk,nmk->nm", edgeA, pVector)
+
+        rayIsParallel = np.abs(determinant) < self.EPS_PARALLEL
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverseDeterminant = 1.0 / determinant
+            tVector = origins[:, None, :] - v1[None]
+            u = np.einsum("nmk,nmk->nm", tVector, pVector) * inverseDeterminant
+            qVector = np.cross(tVector, edgeA[None])
+            v = np.einsum("nmk,nmk->nm", direction, qVector) * inverseDeterminant
+            t = np.einsum("mk,nmk->nm", edgeB, qVector) * inverseDeterminant
+
+            isInside = ~rayIsParallel & (u >= -self.EPS_SIDE) & (u <= 1.0)
+            isInside &= (v >= -self.EPS_SIDE) & (u + v <= 1.0 + self.EPS_SIDE)
+
+            hitPoints = origins[:, None, :] + t[..., None] * direction
+
+            error = np.where(u < -self.EPS, -u, 0) + np.where(v < -self.EPS, -v, 0)
+            error += np.where(u + v > 1.0 + self.EPS, u + v - 1.0, 0)
+            correctionDirection = (v1 + v2 + v3)[None] - hitPoints * 3
+            hitPoints += correctionDirection * 2 * np.where(error > 0, error, 0)[..., None]
+
+            length = lengths[:, None]
+            isInRange = (t >= 0) & (length >= t)
+
+            dt = np.where(t <= 0, t, t - length)
+            dt_T = np.abs(np.einsum("mk,nk->nm", normals, directions) * dt)
+            isForwardCatch = (t > length) & (dt_T < self.EPS_CATCH)
+            isBackwardCatch = (t < 0) & ((t > -self.EPS_BACK_CATCH) | (dt_T < self.EPS_CATCH))
+
+        hits = isInside & (isInRange | isForwardCatch | isBackwardCatch)
+        distances = np.where(isBackwardCatch & (dt_T < self.EPS), 0.0, t)
+        return hits, distances, hitPoints
+
     def _getQuadIntersection(self, ray: Ray, quad: Quad) -> Optional[Vector]:
         v1, v2, v3, v4 = quad.vertices
         triangleA = Triangle(v1, v2, v4)
@@ -0,0 +1,103 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from pytissueoptics.scene.geometry import Polygon, Quad, Triangle
+from pytissueoptics.scene.geometry.polygon import WORLD_LABEL
+from pytissueoptics.scene.scene import Scene
+
+
+@dataclass
+class PolygonArrays:
+    """
+    Polygons of a scene stored in contiguous NumPy arrays for the batched intersection search (see BatchIntersect).
+
+    Solids are identified by integer IDs, where the world has an ID of 0. Solid arrays (`solidIDs`, bounding boxes and
+    polygon ranges) are aligned, and the polygons of the i-th solid are the IDs `solidPolygonStartIDs[i]` to
+    `solidPolygonEndIDs[i]` (excluded).
+
+    Polygons are split into K triangles (K=1 for triangles, K=2 for quads) in the same way as MollerTrumboreIntersect,
+    padded for polygons with fewer vertices, so that a polygon intersects at its first intersecting triangle.
+    """
+
+    solidIDs: np.ndarray
+    solidBBoxMin: np.ndarray
+    solidBBoxMax: np.ndarray
+    solidPolygonStartIDs: np.ndarray
+    solidPolygonEndIDs: np.ndarray
+    triangleVertices: np.ndarray
+    triangleNormals: np.ndarray
+    triangleMask: np.ndarray
+    normals: np.ndarray
+    insideSolidIDs: np.ndarray
+    outsideSolidIDs: np.ndarray
+    polygons: List[Polygon] = field(default_factory=list)
+    solidLabels: List[str] = field(default_factory=lambda: [WORLD_LABEL])
+
+    @classmethod
+    def fromScene(cls, scene: Scene, polygons: Optional[List[Polygon]] = None) -> "PolygonArrays":
+        """
+        Solid IDs are indices in `solidLabels`, which starts with the world label, followed by the label of every
+        solid of the scene and by the label of every other environment (e.g. the layers of a stack). Polygon IDs are
+        indices in `polygons`, which defaults to the scene polygons. Other polygons can only be appended after them.
+        """
+        polygons = scene.getPolygons() if polygons is None else polygons
+        solidLabels = [WORLD_LABEL]
+
+        def getSolidID(solidLabel: str) -> int:
+            if solidLabel not in solidLabels:
+                solidLabels.append(solidLabel)
+            return solidLabels.index(solidLabel)
+
+        nSolids = len(scene.solids)
+        solidIDs = np.array([getSolidID(solid.getLabel()) for solid in scene.solids], dtype=np.int64)
+        polygonCounts = [len(solid.getPolygons()) for solid in scene.solids]
+        solidPolygonEndIDs = np.cumsum(polygonCounts, dtype=np.int64)
+
+        nPolygons = len(polygons)
+        nTrianglesMax = max([len(polygon.vertices) - 2 for polygon in polygons], default=1)
+        arrays = cls(
+            solidIDs=solidIDs,
+            solidBBoxMin=np.array(
+                [[s.bbox.xMin, s.bbox.yMin, s.bbox.zMin] for s in scene.solids], dtype=np.float64
+            ).reshape(nSolids, 3),
+            solidBBoxMax=np.array(
+                [[s.bbox.xMax, s.bbox.yMax, s.bbox.zMax] for s in scene.solids], dtype=np.float64
+            ).reshape(nSolids, 3),
+            solidPolygonStartIDs=solidPolygonEndIDs - np.asarray(polygonCounts, dtype=np.int64),
+            solidPolygonEndIDs=solidPolygonEndIDs,
+            triangleVertices=np.zeros((nPolygons, nTrianglesMax, 3, 3), dtype=np.float64),
+            triangleNormals=np.zeros((nPolygons, nTrianglesMax, 3), dtype=np.float64),
+            triangleMask=np.zeros((nPolygons, nTrianglesMax), dtype=bool),
+            normals=np.zeros((nPolygons, 3), dtype=np.float64),
+            insideSolidIDs=np.zeros(nPolygons, dtype=np.int64),
+            outsideSolidIDs=np.zeros(nPolygons, dtype=np.int64),
+            polygons=list(polygons),
+            solidLabels=solidLabels,
+        )
+
+        for i, polygon in enumerate(polygons):
+            arrays.normals[i] = polygon.normal.array
+            arrays.insideSolidIDs[i] = getSolidID(polygon.insideEnvironment.solidLabel)
+            outsideLabel = polygon.outsideEnvironment.solidLabel if polygon.outsideEnvironment else WORLD_LABEL
+            arrays.outsideSolidIDs[i] = getSolidID(outsideLabel)
+
+            if isinstance(polygon, Triangle):
+                triangles = [polygon]
+            elif isinstance(polygon, Quad):
+                v1, v2, v3, v4 = polygon.vertices
+                triangles = [Triangle(v1, v2, v4), Triangle(v2, v3, v4)]
+            else:
+                triangles = [
+                    Triangle(polygon.vertices[0], polygon.vertices[k + 1], polygon.vertices[k + 2])
+                    for k in range(len(polygon.vertices) - 2)
+                ]
+            for k, triangle in enumerate(triangles):
+                arrays.triangleVertices[i, k] = [vertex.array for vertex in triangle.vertices]
+                arrays.triangleNormals[i, k] = triangle.normal.array
+                arrays.triangleMask[i, k] = True
+        return arrays
+
+    def getSolidID(self, solidLabel: str) -> int:
+        return self.solidLabels.index(solidLabel)
@@ -1,31 +1,111 @@
-import copy
-from typing import Optional
+from typing import Iterator, Optional
 
 import numpy as np
 
+INITIAL_CAPACITY = 64
+CHUNK_SIZE = 2**20
+
+
+class _GrowableArray:
+    """2D array of rows with a preallocated capacity that doubles when full, so that appending n rows one block at a
+    time costs O(n) copies in total. The stored rows are a view of the buffer, without copy."""
+
+    def __init__(self, width: int, dtype: np.dtype):
+        self._buffer = np.empty((INITIAL_CAPACITY, width), dtype=dtype)
+        self._length = 0
+
+    @classmethod
+    def fromArray(cls, array: np.ndarray) -> "_GrowableArray":
+        """Wraps the given 2D array without copying it (e.g. a memory-mapped file) until rows are appended."""
+        growableArray = cls.__new__(cls)
+        growableArray._buffer = array
+        growableArray._length = array.shape[0]
+        return growableArray
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def width(self) -> int:
+        return self._buffer.shape[1]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._buffer.dtype
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._buffer[: self._length]
+
+    def appendRow(self, row: list):
+        self._reserve(self._length + 1, self._buffer.dtype)
+        self._buffer[self._length] = row
+        self._length += 1
+
+    def appendRows(self, rows: np.ndarray):
+        self._reserve(self._length + rows.shape[0], np.result_type(self._buffer.dtype, rows.dtype))
+        self._buffer[self._length : self._length + rows.shape[0]] = rows
+        self._length += rows.shape[0]
+
+    def _reserve(self, length: int, dtype: np.dtype):
+        if length <= self._buffer.shape[0] and dtype == self._buffer.dtype and self._buffer.flags.writeable:
+            return
+        capacity = max(self._buffer.shape[0], INITIAL_CAPACITY)
+        while capacity < length:
+            capacity *= 2
+        buffer = np.empty((capacity, self.width), dtype=dtype)
+        buffer[: self._length] = self.data
+        self._buffer = buffer
+
 
 class ListArrayContainer:
+    """
+    Rows of data appended either one at a time as lists (e.g. a single interaction) or in blocks as 2D arrays (e.g. a
+    batch of interactions). Both kinds of rows are stored in growable arrays with amortized O(1) appends. Rows
+    appended as lists come first in the data, followed by the rows appended as arrays, which keep the dtype of the
+    appended arrays (e.g. float32 from OpenCL).
+
+    `getData` returns a view of the stored rows without copy when a single kind of rows was appended.
+    """
+
     def __init__(self):
-        self._list = None
-        self._array = None
+        self._list: Optional[_GrowableArray] = None
+        self._array: Optional[_GrowableArray] = None
+
+    @classmethod
+    def fromArray(cls, array: np.ndarray) -> "ListArrayContainer":
+        """Container of the rows of the given 2D array, which is not copied (e.g. a memory-mapped file) until more rows
+        are appended."""
+        container = cls()
+        container._array = _GrowableArray.fromArray(array)
+        return container
 
     def __len__(self):
         length = 0
         if self._list is not None:
             length += len(self._list)
         if self._array is not None:
-            length += self._array.shape[0]
+            length += len(self._array)
         return length
 
     @property
     def _width(self):
         if self._list is not None:
-            return len(self._list[0])
+            return self._list.width
         elif self._array is not None:
-            return self._array.shape[1]
+            return self._array.width
         else:
             return None
 
+    @property
+    def width(self) -> Optional[int]:
+        return self._width
+
+    @property
+    def dtype(self) -> Optional[np.dtype]:
+        dtypes = [rows.dtype for rows in (self._list, self._array) if rows is not None]
+        return np.result_type(*dtypes) if dtypes else None
+
     def _assertSameWidth(self, data):
         if self._width is None:
             return
@@ -38,29 +118,61 @@ class ListArrayContainer:
         self._assertSameWidth(item)
         if isinstance(item, list):
             if self._list is None:
-                self._list = [copy.deepcopy(item)]
-            else:
-                self._list.append(item)
+                self._list = _GrowableArray(len(item), np.float64)
+            self._list.appendRow(item)
         elif isinstance(item, np.ndarray):
             if self._array is None:
-                self._array = copy.deepcopy(item)
-            else:
-                self._array = np.concatenate((self._array, item), axis=0)
+                self._array = _GrowableArray(item.shape[1], item.dtype)
+            self._array.appendRows(item)
 
     def extend(self, other: "ListArrayContainer"):
-        if self._list is None:
-            self._list = copy.deepcopy(other._list)
-        elif other._list is not None:
-            self._list.extend(other._list)
+        if not isinstance(other, ListArrayContainer):
+            # Other storages of the same contract (e.g. on disk) are read in chunks.
+            for rows in other.iterData():
+                self.append(rows)
+            return
+        if other._list is not None:
+            if self._list is None:
+                self._list = _GrowableArray(other._list.width, np.float64)
+            self._list.appendRows(other._list.data)
         if other._array is not None:
-            self.append(other._array)
+            self.append(other._array.data)
 
     def getData(self) -> Optional[np.ndarray]:
         if self._list is None and self._array is None:
             return None
         if self._list is None:
-            return self._array
+            return self._array.data
         if self._array is None:
-            return np.array(self._list)
-        mergedData = np.concatenate((np.array(self._list), self._array), axis=0)
+            return self._list.data
+        mergedData = np.concatenate((self._list.data, self._array.data), axis=0)
         return mergedData
+
+    def iterData(self, chunkSize: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+        """Yields the rows of `getData` in chunks of at most `chunkSize` rows."""
+        for rows in (self._list, self._array):
+            if rows is None:
+                continue
+            for i in range(0, len(rows), chunkSize):
+                yield rows.data[i : i + chunkSize]
+
+    def __getstate__(self):
+        # Only the stored rows are saved, without the unused capacity.
+        return {
+            "_list": None if self._list is None else self._list.data,
+            "_array": None if self._array is None else self._array.data,
+        }
+
+    def __setstate__(self, state):
+        # Also loads the containers of previous versions, which stored a list of rows and a single array.
+        self._list = self._makeGrowableArray(state["_list"], np.float64)
+        self._array = self._makeGrowableArray(state["_array"])
+
+    @staticmethod
+    def _makeGrowableArray(rows, dtype=None) -> Optional[_GrowableArray]:
+        if rows is None:
+            return None
+        rows = np.asarray(rows, dtype=dtype)
+        growableArray = _GrowableArray(rows.shape[1], rows.dtype)
+        growableArray.appendRows(rows)
+        return growableArray
@@ -9,6 +9,8 @@ import numpy as np
 
 from pytissueoptics.scene.geometry import Vector
 from pytissueoptics.scene.logger.listArrayContainer import ListArrayContainer
+from pytissueoptics.scene.logger.loggerFile import FileBlockContainer, LoggerFile
+from pytissueoptics.scene.logger.memoryMappedContainer import MemoryMappedContainer
 
 
 @dataclass(frozen=True)
@@ -49,6 +51,7 @@ class Logger:
         self.info: dict = {}
         self._filepath = None
         self._labels = {}
+        self._dataVersion = 0
 
         if fromFilepath:
             self.load(fromFilepath)
@@ -103,18 +106,28 @@ class Logger:
         assert array.shape[1] == 6 and array.ndim == 2, "Segment array must be of shape (n, 6)"
         self._appendData(array, DataType.SEGMENT, key)
 
+    @property
+    def dataVersion(self) -> int:
+        """Incremented whenever the logged data changes, e.g. to invalidate data derived from it."""
+        return self._dataVersion
+
     def _appendData(self, data: Union[List, np.ndarray], dataType: DataType, key: InteractionKey = None):
         if key is None:
             key = InteractionKey(None, None)
         self._validateKey(key)
+        self._dataVersion += 1
         previousData = getattr(self._data[key], dataType.value)
         if previousData is None:
-            previousData = ListArrayContainer()
+            previousData = self._makeContainer()
             previousData.append(data)
             setattr(self._data[key], dataType.value, previousData)
         else:
             previousData.append(data)
 
+    def _makeContainer(self) -> ListArrayContainer:
+        """Storage of the data logged for a new interaction key and data type."""
+        return ListArrayContainer()
+
     def _validateKey(self, key: InteractionKey):
         if key not in self._data:
             self._data[key] = InteractionData()
@@ -171,15 +184,20 @@ class Logger:
             return True
         return False
 
-    def save(self, filepath: str = None):
+    def save(self, filepath: str = None, compress: bool = False):
+        """Saves the logger to a binary file (see `loggerFile`) which can be loaded without reading all of its data.
+        With `compress`, the data is compressed with zlib, but it can no longer be memory-mapped when loaded."""
         if filepath is None and self._filepath is None:
             filepath = self.DEFAULT_LOGGER_PATH
             warnings.warn(f"No filepath specified. Saving to {filepath}.")
         elif filepath is None:
             filepath = self._filepath
 
-        with open(filepath, "wb") as file:
-            pickle.dump((self._data, self.info, self._labels), file)
+        LoggerFile.write(filepath, self._data, self._getState(), compress)
+
+    def _getState(self) -> dict:
+        """Attributes saved along with the logged data."""
+        return {"info": self.info, "labels": self._labels}
 
     def load(self, filepath: str):
         self._filepath = filepath
@@ -191,13 +209,47 @@ class Logger:
             )
             return
 
-        with open(filepath, "rb") as file:
-            self._data, self.info, self._labels = pickle.load(file)
+        state = self._loadFile(filepath)
+        self.info = state["info"]
+        self._labels = state["labels"]
+
+    def _loadFile(self, filepath: str) -> dict:
+        """Loads the logged data of the file and returns the attributes saved with it. The data blocks are only read
+        from the file when accessed. Also loads the pickled files of previous versions."""
+        if not LoggerFile.isLoggerFile(filepath):
+            with open(filepath, "rb") as file:
+                loggerData = pickle.load(file)
+            self._data = loggerData[0]
+            self._dataVersion += 1
+            return self._getLegacyState(loggerData[1:])
+
+        self._dataVersion += 1
+        keys, blocks, state = LoggerFile.read(filepath)
+        keys = [InteractionKey(*key) for key in keys]
+        self._data = {key: InteractionData() for key in keys}
+        for keyIndex, dataType, container in blocks:
+            setattr(self._data[keys[keyIndex]], dataType, container)
+        return state
+
+    def _getLegacyState(self, loggerData: tuple) -> dict:
+        """Attributes of the pickled tuple of previous versions, which follow the logged data."""
+        info, labels = loggerData
+        return {"info": info, "labels": labels}
 
     @property
     def hasFilePath(self):
         return self._filepath is not None
 
+    @property
+    def hasDataPointsInMemory(self) -> bool:
+        """Whether all the data points are held in memory, as opposed to being read from a file when accessed."""
+        for data in self._data.values():
+            if isinstance(data.dataPoints, MemoryMappedContainer):
+                return False
+            if isinstance(data.dataPoints, FileBlockContainer) and not data.dataPoints.isInMemory:
+                return False
+        return True
+
     @property
     def nDataPoints(self) -> int:
         return sum(len(data.dataPoints) for data in self._data.values())
@@ -0,0 +1,247 @@
+"""
+Binary file format of a saved Logger.
+
+Every data array of the logger (points, data points and segments of each InteractionKey) is stored as a raw block of
+rows, followed by the pickled state of the logger (info, labels, views, ...) and by a JSON header describing where
+each block is. The header is at the end of the file so that the blocks can be streamed to the file without knowing
+their size in advance. All values are little-endian.
+
+    MAGIC                  8 bytes, b"PTOLOG\\x00\\x01"
+    blocks                 raw C-ordered rows, each block starting at a multiple of 64 bytes
+    state                  pickled dict of the other attributes of the logger
+    header                 UTF-8 JSON
+    headerOffset, size     2 x uint64
+
+The header is of the form:
+
+    {"version": 1,
+     "state": {"offset": int, "nbytes": int},
+     "keys": [[solidLabel, surfaceLabel], ...],
+     "blocks": [{"key": index in keys, "dataType": "points" | "dataPoints" | "segments",
+                 "dtype": "<f4", "shape": [rows, columns], "compression": null | "zlib",
+                 "chunks": [[offset, nbytes, rows], ...]}, ...]}
+
+Uncompressed blocks are a single chunk, which is memory-mapped when the file is read. Compressed blocks are split in
+chunks of at most CHUNK_SIZE rows compressed independently with zlib. Blocks are only read from the file when their
+data is accessed, so that looking at a single key of a large file does not read the whole file.
+"""
+
+import json
+import os
+import pickle
+import tempfile
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .listArrayContainer import CHUNK_SIZE, ListArrayContainer
+
+MAGIC = b"PTOLOG\x00\x01"
+VERSION = 1
+ALIGNMENT = 64
+FOOTER_SIZE = 16
+COMPRESSION = "zlib"
+DATA_TYPES = ("points", "dataPoints", "segments")
+
+
+class LoggerFile:
+    @staticmethod
+    def isLoggerFile(filepath: str) -> bool:
+        with open(filepath, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+
+    @staticmethod
+    def write(filepath: str, data: Dict, state: dict, compress: bool = False):
+        """Writes the logger data, a dict of InteractionKey to InteractionData, and its picklable state. The file is
+        written next to the destination and then moved over it, so that a logger loaded from the same file (which
+        may still be memory-mapped) is not corrupted while it is saved."""
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fileDescriptor, tempPath = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fileDescriptor, "wb") as file:
+                file.write(MAGIC)
+                keys, blocks = [], []
+                for keyIndex, (key, interactionData) in enumerate(data.items()):
+                    keys.append([key.solidLabel, key.surfaceLabel])
+                    for dataType in DATA_TYPES:
+                        container = getattr(interactionData, dataType)
+                        if container is None or container.width is None:
+                            continue
+                        block = LoggerFile._writeBlock(file, container, compress)
+                        block.update(key=keyIndex, dataType=dataType)
+                        blocks.append(block)
+
+                stateBytes = pickle.dumps(state)
+                header = {
+                    "version": VERSION,
+                    "state": {"offset": file.tell(), "nbytes": len(stateBytes)},
+                    "keys": keys,
+                    "blocks": blocks,
+                }
+                file.write(stateBytes)
+                headerBytes = json.dumps(header).encode("utf-8")
+                headerOffset = file.tell()
+                file.write(headerBytes)
+                file.write(np.array([headerOffset, len(headerBytes)], dtype="<u8").tobytes())
+            LoggerFile._detachFromFile(data, filepath)
+            os.replace(tempPath, filepath)
+        except BaseException:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+
+    @staticmethod
+    def _detachFromFile(data: Dict, filepath: str):
+        """Copies to memory the blocks read from the file about to be replaced, since their offsets will no longer be
+        valid, and releases their memory maps of this file (which would otherwise prevent replacing it on Windows)."""
+        for interactionData in data.values():
+            for dataType in DATA_TYPES:
+                container = getattr(interactionData, dataType)
+                if isinstance(container, FileBlockContainer) and container.isFrom(filepath):
+                    container.detach()
+
+    @staticmethod
+    def _writeBlock(file, container, compress: bool) -> dict:
+        dtype = np.dtype(container.dtype).newbyteorder("<")
+        chunks = []
+        if not compress:
+            file.write(b"\x00" * (-file.tell() % ALIGNMENT))
+            offset = file.tell()
+            for rows in container.iterData(CHUNK_SIZE):
+                file.write(np.ascontiguousarray(rows, dtype=dtype).tobytes())
+            chunks.append([offset, file.tell() - offset, len(container)])
+        else:
+            for rows in container.iterData(CHUNK_SIZE):
+                compressedRows = zlib.compress(np.ascontiguousarray(rows, dtype=dtype).tobytes())
+                chunks.append([file.tell(), len(compressedRows), len(rows)])
+                file.write(compressedRows)
+        return {
+            "dtype": dtype.str,
+            "shape": [len(container), container.width],
+            "compression": COMPRESSION if compress else None,
+            "chunks": chunks,
+        }
+
+    @staticmethod
+    def read(
+        filepath: str,
+    ) -> Tuple[List[Tuple[Optional[str], Optional[str]]], List[Tuple[int, str, "FileBlockContainer"]], dict]:
+        """Returns the (solidLabel, surfaceLabel) of every interaction key, the (keyIndex, dataType, container) of every
+        data block, where the data is only read when accessed, and the state of the logger."""
+        with open(filepath, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"'{filepath}' is not a logger file.")
+            file.seek(-FOOTER_SIZE, os.SEEK_END)
+            headerOffset, headerSize = (int(value) for value in np.frombuffer(file.read(FOOTER_SIZE), dtype="<u8"))
+            file.seek(headerOffset)
+            header = json.loads(file.read(headerSize).decode("utf-8"))
+            if header["version"] > VERSION:
+                raise ValueError(
+                    f"Logger file '{filepath}' was saved with a newer file format (version {header['version']})."
+                )
+            file.seek(header["state"]["offset"])
+            state = pickle.loads(file.read(header["state"]["nbytes"]))
+
+        keys = [tuple(key) for key in header["keys"]]
+        blocks = [(block["key"], block["dataType"], FileBlockContainer(filepath, block)) for block in header["blocks"]]
+        return keys, blocks, state
+
+
+class FileBlockContainer:
+    """
+    Same contract as ListArrayContainer for a data block of a logger file. The block is only read when its data is
+    accessed: uncompressed blocks are memory-mapped and compressed blocks are decompressed in memory. `iterData` reads
+    the rows chunk by chunk without keeping them. Appending rows first loads the block in a ListArrayContainer.
+    """
+
+    def __init__(self, filepath: str, block: dict):
+        self._filepath = os.path.abspath(filepath)
+        self._block = block
+        self._dtype = np.dtype(block["dtype"])
+        self._shape = tuple(block["shape"])
+        self._container: Optional[ListArrayContainer] = None
+
+    def __len__(self):
+        if self._container is not None:
+            return len(self._container)
+        return self._shape[0]
+
+    @property
+    def isLoaded(self) -> bool:
+        return self._container is not None
+
+    @property
+    def isInMemory(self) -> bool:
+        """Whether the rows are held in memory, which is not the case before they are read or when memory-mapped."""
+        if self._container is None:
+            return False
+        return self._filepath is None or self._block["compression"] is not None
+
+    def isFrom(self, filepath: str) -> bool:
+        return self._filepath is not None and os.path.abspath(filepath) == self._filepath
+
+    @property
+    def width(self) -> int:
+        return self._shape[1]
+
+    @property
+    def dtype(self) -> np.dtype:
+        if self._container is not None:
+            return self._container.dtype
+        return self._dtype
+
+    def getData(self) -> np.ndarray:
+        return self._load().getData()
+
+    def iterData(self, chunkSize: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+        if self._container is not None or self._block["compression"] is None:
+            yield from self._load().iterData(chunkSize)
+            return
+        for chunk in self._block["chunks"]:
+            rows = self._readCompressedChunk(chunk)
+            for start in range(0, len(rows), chunkSize):
+                yield rows[start : start + chunkSize]
+
+    def append(self, item):
+        self._load().append(item)
+
+    def extend(self, other):
+        self._load().extend(other)
+
+    def detach(self):
+        """Copies the rows of the block to memory, without memory map, so that its file can be replaced or deleted."""
+        if self._container is None and self._block["compression"] is None and self._shape[0] > 0:
+            offset = self._block["chunks"][0][0]
+            count = self._shape[0] * self._shape[1]
+            array = np.fromfile(self._filepath, dtype=self._dtype, count=count, offset=offset).reshape(self._shape)
+            self._container = ListArrayContainer.fromArray(array)
+        elif isinstance(self._container, ListArrayContainer) and self._container.width is not None:
+            self._container = ListArrayContainer.fromArray(np.array(self._container.getData()))
+        else:
+            self._load()
+        self._filepath = None
+
+    def _load(self) -> ListArrayContainer:
+        if self._container is None:
+            if self._block["compression"] is None:
+                offset = self._block["chunks"][0][0]
+                if self._shape[0] == 0:
+                    array = np.empty(self._shape, dtype=self._dtype)
+                else:
+                    array = np.memmap(self._filepath, dtype=self._dtype, mode="r", offset=offset, shape=self._shape)
+            else:
+                chunks = [self._readCompressedChunk(chunk) for chunk in self._block["chunks"]]
+                array = np.concatenate(chunks) if chunks else np.empty(self._shape, dtype=self._dtype)
+            self._container = ListArrayContainer.fromArray(array)
+        return self._container
+
+    def _readCompressedChunk(self, chunk: List[int]) -> np.ndarray:
+        offset, nbytes, nRows = chunk
+        with open(self._filepath, "rb") as file:
+            file.seek(offset)
+            buffer = zlib.decompress(file.read(nbytes))
+        return np.frombuffer(buffer, dtype=self._dtype).reshape(nRows, self.width)
+
+    def __reduce__(self):
+        return ListArrayContainer.fromArray, (np.array(self.getData()),)
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import weakref
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from .listArrayContainer import CHUNK_SIZE, ListArrayContainer
+
+INITIAL_CAPACITY = 1024
+
+
+class MemoryMappedContainer:
+    """
+    Same contract as ListArrayContainer, but the rows are appended to a memory-mapped file in the given directory
+    instead of being kept in RAM, so that the stored data can be larger than the available memory. The file capacity
+    doubles when full. `getData` returns a memory-mapped view which is only read from disk when accessed, and
+    `iterData` reads the rows in chunks.
+
+    The dtype of the rows is set by the first data appended (float64 for lists) and later rows are converted to it.
+    The file is removed when the container is garbage collected. When pickled, the data is loaded in memory and
+    restored as a ListArrayContainer.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        fileDescriptor, self._filepath = tempfile.mkstemp(suffix=".bin", prefix="dataPoints_", dir=directory)
+        os.close(fileDescriptor)
+        self._finalizer = weakref.finalize(self, _removeFile, self._filepath)
+        self._map: Optional[np.memmap] = None
+        self._dtype = None
+        self._width = None
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def filepath(self) -> str:
+        return self._filepath
+
+    @property
+    def width(self) -> Optional[int]:
+        return self._width
+
+    @property
+    def dtype(self) -> Optional[np.dtype]:
+        return self._dtype
+
+    def _assertSameWidth(self, data):
+        if self._width is None:
+            return
+        if isinstance(data, list):
+            assert len(data) == self._width
+        elif isinstance(data, np.ndarray):
+            assert data.shape[1] == self._width
+
+    def append(self, item):
+        self._assertSameWidth(item)
+        if isinstance(item, list):
+            item = np.asarray([item], dtype=self._dtype or np.float64)
+        elif not isinstance(item, np.ndarray):
+            return
+        if self._width is None:
+            self._width, self._dtype = item.shape[1], item.dtype
+        self._reserve(self._length + item.shape[0])
+        self._map[self._length : self._length + item.shape[0]] = item
+        self._length += item.shape[0]
+
+    def extend(self, other: Union[ListArrayContainer, "MemoryMappedContainer"]):
+        for chunk in other.iterData():
+            self.append(np.asarray(chunk))
+
+    def getData(self) -> Optional[np.ndarray]:
+        if self._width is None:
+            return None
+        if self._map is None:
+            return np.empty((0, self._width), dtype=self._dtype)
+        return self._map[: self._length]
+
+    def iterData(self, chunkSize: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+        """Yields the rows of `getData` in chunks of at most `chunkSize` rows."""
+        for i in range(0, self._length, chunkSize):
+            yield self._map[i : min(i + chunkSize, self._length)]
+
+    def flush(self):
+        if self._map is not None:
+            self._map.flush()
+
+    def _reserve(self, length: int):
+        capacity = 0 if self._map is None else self._map.shape[0]
+        if length <= capacity:
+            return
+        capacity = max(capacity, INITIAL_CAPACITY)
+        while capacity < length:
+            capacity *= 2
+
+        # Views returned by getData keep the previous mapping, which remains valid.
+        self.flush()
+        with open(self._filepath, "r+b") as file:
+            file.truncate(capacity * self._width * self._dtype.itemsize)
+        self._map = np.memmap(self._filepath, dtype=self._dtype, mode="r+", shape=(capacity, self._width))
+
+    def __reduce__(self):
+        return _makeListArrayContainer, (None if self._width is None else np.array(self.getData()),)
+
+
+def _makeListArrayContainer(data: Optional[np.ndarray]) -> ListArrayContainer:
+    container = ListArrayContainer()
+    if data is not None:
+        container.append(data)
+    return container
+
+
+def _removeFile(filepath: str):
+    try:
+        os.remove(filepath)
+    except OSError:
+        # Still mapped by a view on some platforms. Left to the OS cleanup of the directory.
+        pass
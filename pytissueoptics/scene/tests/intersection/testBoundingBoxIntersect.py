@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from pytissueoptics.scene.geometry import BoundingBox, Vector
 from pytissueoptics.scene.intersection import Ray
 from pytissueoptics.scene.intersection.bboxIntersect import BoxIntersectStrategy, GemsBoxIntersect, ZacharBoxIntersect
@@ -98,6 +100,43 @@ class TestGemsBoxIntersect(BaseTestAnyBoxIntersect, unittest.TestCase):
         self.assertEqual(1, intersection.y)
         self.assertEqual(0, intersection.z)
 
+    def testGivenManyRays_shouldReturnSameDistancesAsSingleRayIntersect(self):
+        box = BoundingBox([1, 2], [1, 2], [-1, 0])
+        origins = np.array([[-1, -1, 0], [1.5, 1.5, -0.5], [0, 0, 0], [0.5, 1.5, -0.5], [0.5, 1.5, -0.5]])
+        directions = np.array([[1, 1, 0], [0, 0, 1], [-1, 0, 0], [1, 0, 0], [1, 0, 0]], dtype=np.float64)
+        directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+        lengths = np.array([np.inf, np.inf, np.inf, 1, 0.4])
+
+        inside, distances = self.intersectStrategy.getIntersections(
+            origins, directions, lengths, [box.xMin, box.yMin, box.zMin], [box.xMax, box.yMax, box.zMax]
+        )
+
+        self.assertEqual([False, True, False, False, False], inside.tolist())
+        for i in range(len(origins)):
+            length = None if np.isinf(lengths[i]) else lengths[i]
+            ray = Ray(Vector(*origins[i]), Vector(*directions[i]), length)
+            expected = self.intersectStrategy.getIntersection(ray, box)
+            expectedDistance = -1 if expected is None else (expected - ray.origin).getNorm()
+            self.assertAlmostEqual(expectedDistance, distances[i])
+
+    def testGivenManyRays_whenGetDistance_shouldReturnSameDistancesAsSingleRayIntersect(self):
+        box = BoundingBox([1, 2], [1, 2], [-1, 0])
+        origins = [[-1, -1, 0], [1.5, 1.5, -0.5], [0, 0, 0], [0.5, 1.5, -0.5], [0.5, 1.5, -0.5]]
+        directions = [[1, 1, 0], [0, 0, 1], [-1, 0, 0], [1, 0, 0], [1, 0, 0]]
+        lengths = [None, None, None, 1, 0.4]
+
+        for origin, direction, length in zip(origins, directions, lengths):
+            ray = Ray(Vector(*origin), Vector(*direction), length)
+            distance = self.intersectStrategy.getDistance(
+                ray.origin.array, ray.direction.array, length, [1, 1, -1], [2, 2, 0]
+            )
+
+            expected = self.intersectStrategy.getIntersection(ray, box)
+            if expected is None:
+                self.assertIsNone(distance)
+            else:
+                self.assertAlmostEqual((expected - ray.origin).getNorm(), distance)
+
     @property
     def intersectStrategy(self) -> BoxIntersectStrategy:
         return GemsBoxIntersect()
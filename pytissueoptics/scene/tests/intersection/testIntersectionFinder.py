@@ -1,6 +1,8 @@
 import math
 import unittest
 
+import numpy as np
+
 from pytissueoptics.scene.geometry import Vector, primitives
 from pytissueoptics.scene.geometry.polygon import WORLD_LABEL
 from pytissueoptics.scene.intersection import FastIntersectionFinder, Ray, SimpleIntersectionFinder, UniformRaySource
@@ -9,6 +11,7 @@ from pytissueoptics.scene.scene import Scene
 from pytissueoptics.scene.solids import Cube, Sphere
 from pytissueoptics.scene.tests.scene.benchmarkScenes import PhantomScene
 from pytissueoptics.scene.tree.treeConstructor.binary import (
+    BinnedSAHConstructor,
     NoSplitOneAxisConstructor,
     NoSplitThreeAxesConstructor,
     SplitThreeAxesConstructor,
@@ -234,6 +237,46 @@ class BaseTestAnyIntersectionFinder:
         intersection = self.getIntersectionFinder([solid]).findIntersection(ray, WORLD_LABEL, ignoreLabel="ignoreMe")
         self.assertIsNone(intersection)
 
+    def testGivenNoSolids_whenFindIntersections_shouldNotFindIntersections(self):
+        intersectionFinder = self.getIntersectionFinder([])
+
+        intersections = intersectionFinder.findIntersections(
+            np.zeros((2, 3)), [[0, 0, 1], [1, 0, 0]], np.inf, intersectionFinder.getSolidID(WORLD_LABEL)
+        )
+
+        self.assertEqual([False, False], intersections.exists.tolist())
+        self.assertTrue(np.all(np.isinf(intersections.distance)))
+
+    def testGivenRaysIntersectingASolidWithQuadPrimitive_whenFindIntersections_shouldReturnIntersections(self):
+        solid = Cube(2, position=Vector(0, 0, 5), primitive=primitives.QUAD)
+        intersectionFinder = self.getIntersectionFinder([solid])
+        origins = [[-0.5, 0.5, 0], [0.5, -0.5, 0], [5, 0, 0]]
+
+        intersections = intersectionFinder.findIntersections(
+            origins, [[0, 0, 1]] * 3, [np.inf, np.inf, np.inf], intersectionFinder.getSolidID(WORLD_LABEL)
+        )
+
+        self.assertEqual([True, True, False], intersections.exists.tolist())
+        self.assertTrue(np.allclose([4, 4], intersections.distance[:2]))
+        self.assertTrue(np.allclose([[-0.5, 0.5, 4], [0.5, -0.5, 4]], intersections.position[:2]))
+        self.assertTrue(np.allclose([[0, 0, -1], [0, 0, -1]], intersections.normal[:2]))
+        hitPolygon = intersectionFinder.polygons[intersections.polygonID[0]]
+        self.assertEqual(solid.surfaces.getPolygons("front")[0], hitPolygon)
+
+    def testGivenIgnoreSolidID_whenFindIntersections_shouldNotIntersectWithIt(self):
+        solid = Cube(2, position=Vector(0, 0, 5), label="ignoreMe")
+        intersectionFinder = self.getIntersectionFinder([solid])
+
+        intersections = intersectionFinder.findIntersections(
+            [[0, 0.5, 0]],
+            [[0, 0, 1]],
+            [np.inf],
+            [intersectionFinder.getSolidID(WORLD_LABEL)],
+            ignoreSolidIDs=[intersectionFinder.getSolidID("ignoreMe")],
+        )
+
+        self.assertFalse(intersections.exists[0])
+
     def assertVectorEqual(self, expected, actual):
         self.assertEqual(expected.x, actual.x)
         self.assertEqual(expected.y, actual.y)
@@ -260,6 +303,7 @@ class TestEndToEndIntersection(unittest.TestCase):
             FastIntersectionFinder(scene, constructor=NoSplitOneAxisConstructor(), maxDepth=3),
             FastIntersectionFinder(scene, constructor=NoSplitThreeAxesConstructor(), maxDepth=3),
             FastIntersectionFinder(scene, constructor=SplitThreeAxesConstructor(), maxDepth=3),
+            FastIntersectionFinder(scene, constructor=BinnedSAHConstructor(), maxDepth=3),
         ]
 
     def _getSubTestTag(self, intersectionFinder: IntersectionFinder):
@@ -277,6 +321,22 @@ class TestEndToEndIntersection(unittest.TestCase):
                 expectedPosition = Vector(0, 4, -9.95)
                 self.assertEqual(expectedPosition, intersection.position)
 
+    def testGivenManyRays_whenFindIntersections_shouldReturnSameIntersectionsAsSingleRaySearch(self):
+        rays = UniformRaySource(Vector(0, 4, 0), Vector(0, 0, -1), 180, 60, xResolution=20, yResolution=10).rays
+        origins = np.array([ray.origin.array for ray in rays])
+        directions = np.array([ray.direction.array for ray in rays])
+        for intersectionFinder in self.intersectionFinders:
+            with self.subTest(self._getSubTestTag(intersectionFinder)):
+                worldID = intersectionFinder.getSolidID(WORLD_LABEL)
+                intersections = intersectionFinder.findIntersections(origins, directions, np.inf, worldID)
+
+                for i, ray in enumerate(rays):
+                    expected = intersectionFinder.findIntersection(ray, WORLD_LABEL)
+                    self.assertEqual(expected is not None, intersections.exists[i])
+                    if expected is not None:
+                        self.assertAlmostEqual(expected.distance, intersections.distance[i])
+                        self.assertIs(expected.polygon, intersectionFinder.polygons[intersections.polygonID[i]])
+
     def testGivenRaysTowardsScene_shouldNeverReturnNone(self):
         rays = UniformRaySource(Vector(0, 4, 0), Vector(0, 0, -1), 180, 0, xResolution=20, yResolution=1).rays
         for intersectionFinder in self.intersectionFinders:
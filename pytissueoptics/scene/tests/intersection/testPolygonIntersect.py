@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from pytissueoptics.scene.geometry import Polygon, Quad, Triangle, Vector, Vertex
 from pytissueoptics.scene.intersection import Ray
 from pytissueoptics.scene.intersection.mollerTrumboreIntersect import MollerTrumboreIntersect
@@ -93,3 +95,48 @@ class BaseTestAnyPolygonIntersect(unittest.TestCase):
         for poly in [self.triangle, self.quad, self.polygon]:
             intersection = self.intersectStrategy.getIntersection(ray, poly)
             self.assertIsNone(intersection)
+
+
+class TestVectorizedTriangleIntersect(unittest.TestCase):
+    vertices = np.array([[[0, 0, 0], [1, 0, 0], [0, 1, 0]]], dtype=np.float64)
+    normals = np.array([[0, 0, 1]], dtype=np.float64)
+
+    def setUp(self):
+        self.intersectStrategy = MollerTrumboreIntersect()
+
+    def testGivenRaysAndTriangle_shouldReturnSameIntersectionsAsSingleRayIntersect(self):
+        origins = np.array([[0.25, 0.25, 2], [0.25, 0.25, 1], [0.25, 0.25, 2], [0.25, 0.25, 2]])
+        directions = np.array([[0.1, 0, -1], [-0.3, 0, -1], [0, 0, -1], [0, 0, -1]])
+        directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+        lengths = np.array([np.inf, np.inf, 2 - MollerTrumboreIntersect.EPS_CATCH / 2, 1.8])
+        triangle = Triangle(Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(0, 1, 0))
+
+        hits, distances, positions = self.intersectStrategy.getTriangleIntersections(
+            origins, directions, lengths, self.vertices, self.normals
+        )
+
+        for i in range(len(origins)):
+            length = None if np.isinf(lengths[i]) else lengths[i]
+            ray = Ray(Vector(*origins[i]), Vector(*directions[i]), length)
+            expected = self.intersectStrategy.getIntersection(ray, triangle)
+            self.assertEqual(expected is not None, hits[i, 0])
+            if expected is not None:
+                self.assertTrue(np.allclose(expected.array, positions[i, 0]))
+
+    def testGivenRayStartingOnTriangleAndGoingBackward_shouldReturnZeroDistance(self):
+        origins = np.array([[0.25, 0.25, -MollerTrumboreIntersect.EPS / 2]])
+        directions = np.array([[1.0, 0, 0]])
+
+        hits, distances, _ = self.intersectStrategy.getTriangleIntersections(
+            origins, directions, np.array([1.0]), self.vertices, self.normals
+        )
+
+        self.assertFalse(hits[0, 0])
+
+        directions = np.array([[0, 0, -1.0]])
+        hits, distances, _ = self.intersectStrategy.getTriangleIntersections(
+            origins, directions, np.array([1.0]), self.vertices, self.normals
+        )
+
+        self.assertTrue(hits[0, 0])
+        self.assertEqual(0, distances[0, 0])
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 import numpy as np
@@ -70,3 +71,39 @@ class TestListArrayContainer(unittest.TestCase):
 
         self.otherListArrayContainer.append(np.array([[4, 5, 6]]))
         self.assertTrue(np.array_equal(np.array([[1, 2, 3]]), self.listArrayContainer.getData()))
+
+    def testWhenAppendingManyArrays_shouldKeepArrayDataInAppendOrder(self):
+        arrays = [np.full((i, 3), i) for i in range(1, 40)]
+        for array in arrays:
+            self.listArrayContainer.append(array)
+
+        self.assertTrue(np.array_equal(np.concatenate(arrays), self.listArrayContainer.getData()))
+        self.assertEqual(sum(len(array) for array in arrays), len(self.listArrayContainer))
+
+    def testWhenAppendingFloat32Arrays_shouldKeepFloat32Data(self):
+        self.listArrayContainer.append(np.ones((2, 3), dtype=np.float32))
+        self.listArrayContainer.append(np.ones((2, 3), dtype=np.float32))
+
+        self.assertEqual(np.float32, self.listArrayContainer.getData().dtype)
+
+    def testGivenOnlyArrayData_whenGettingData_shouldNotCopyData(self):
+        self.listArrayContainer.append(np.array([[1, 2, 3]]))
+        self.listArrayContainer.append(np.array([[4, 5, 6]]))
+
+        self.assertTrue(np.shares_memory(self.listArrayContainer.getData(), self.listArrayContainer.getData()))
+
+    def testWhenPickling_shouldRestoreSameData(self):
+        self.listArrayContainer.append([1, 2, 3])
+        self.listArrayContainer.append(np.array([[4, 5, 6]], dtype=np.float32))
+
+        container = pickle.loads(pickle.dumps(self.listArrayContainer))
+        container.append([7, 8, 9])
+
+        self.assertTrue(np.array_equal([[1, 2, 3], [7, 8, 9], [4, 5, 6]], container.getData()))
+
+    def testGivenContainerStateOfPreviousVersion_whenUnpickling_shouldRestoreSameData(self):
+        container = ListArrayContainer.__new__(ListArrayContainer)
+
+        container.__setstate__({"_list": [[1, 2, 3]], "_array": np.array([[4, 5, 6]])})
+
+        self.assertTrue(np.array_equal([[1, 2, 3], [4, 5, 6]], container.getData()))
@@ -0,0 +1,132 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from pytissueoptics.scene.logger import InteractionKey, Logger
+from pytissueoptics.scene.logger.loggerFile import FileBlockContainer, LoggerFile
+
+
+class TestLoggerFile(unittest.TestCase):
+    KEY = InteractionKey("solid", "surface")
+    OTHER_KEY = InteractionKey("other")
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tempDir.name, "test.log")
+        self.logger = Logger()
+        self.dataPoints = np.random.rand(100, 4).astype(np.float32)
+        self.logger.logDataPointArray(self.dataPoints, self.KEY)
+        self.logger.logPointArray(np.random.rand(10, 3), self.OTHER_KEY)
+        self.logger.info["photonCount"] = 100
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def testWhenSave_shouldWriteLoggerFile(self):
+        self.logger.save(self.filepath)
+
+        self.assertTrue(LoggerFile.isLoggerFile(self.filepath))
+
+    def testGivenSavedLogger_whenLoad_shouldLoadSameDataWithSameDtype(self):
+        self.logger.save(self.filepath)
+
+        logger = Logger(self.filepath)
+
+        data = logger.getRawDataPoints(self.KEY)
+        self.assertEqual(np.float32, data.dtype)
+        self.assertTrue(np.array_equal(self.dataPoints, data))
+        self.assertTrue(np.array_equal(self.logger.getPoints(self.OTHER_KEY), logger.getPoints(self.OTHER_KEY)))
+        self.assertEqual(self.logger.info, logger.info)
+        self.assertEqual(self.logger.getSeenSolidLabels(), logger.getSeenSolidLabels())
+
+    def testGivenSavedLogger_whenLoad_shouldOnlyReadDataBlocksWhenAccessed(self):
+        self.logger.save(self.filepath)
+
+        logger = Logger(self.filepath)
+        dataPoints = logger._data[self.KEY].dataPoints
+        points = logger._data[self.OTHER_KEY].points
+        self.assertIsInstance(dataPoints, FileBlockContainer)
+        self.assertEqual(100, len(dataPoints))
+        self.assertFalse(dataPoints.isLoaded)
+
+        data = logger.getRawDataPoints(self.KEY)
+
+        self.assertIsInstance(data, np.memmap)
+        self.assertTrue(dataPoints.isLoaded)
+        self.assertFalse(points.isLoaded)
+
+    def testGivenCompressedLogger_whenLoad_shouldLoadSameData(self):
+        self.logger.logDataPointArray(np.zeros((1000, 4), dtype=np.float32), self.KEY)
+        self.logger.save(self.filepath, compress=True)
+        uncompressedFilepath = os.path.join(self.tempDir.name, "uncompressed.log")
+        self.logger.save(uncompressedFilepath)
+
+        logger = Logger(self.filepath)
+
+        self.assertTrue(np.array_equal(self.logger.getRawDataPoints(self.KEY), logger.getRawDataPoints(self.KEY)))
+        self.assertLess(os.path.getsize(self.filepath), os.path.getsize(uncompressedFilepath))
+
+    def testGivenCompressedLogger_whenIterData_shouldYieldChunksWithoutLoadingTheBlock(self):
+        self.logger.save(self.filepath, compress=True)
+        dataPoints = Logger(self.filepath)._data[self.KEY].dataPoints
+
+        chunks = list(dataPoints.iterData(chunkSize=30))
+
+        self.assertEqual([30, 30, 30, 10], [len(chunk) for chunk in chunks])
+        self.assertTrue(np.array_equal(self.dataPoints, np.concatenate(chunks)))
+        self.assertFalse(dataPoints.isLoaded)
+
+    def testGivenLoadedLogger_whenLogMoreData_shouldAppendToLoadedData(self):
+        self.logger.save(self.filepath)
+        logger = Logger(self.filepath)
+        newDataPoints = np.ones((5, 4), dtype=np.float32)
+
+        logger.logDataPointArray(newDataPoints, self.KEY)
+
+        expectedData = np.concatenate([self.dataPoints, newDataPoints])
+        self.assertTrue(np.array_equal(expectedData, logger.getRawDataPoints(self.KEY)))
+
+    def testGivenLoadedLogger_whenSaveToSameFile_shouldKeepItsData(self):
+        self.logger.save(self.filepath)
+        logger = Logger(self.filepath)
+
+        logger.save()
+
+        self.assertTrue(np.array_equal(self.dataPoints, logger.getRawDataPoints(self.KEY)))
+        self.assertTrue(np.array_equal(self.dataPoints, Logger(self.filepath).getRawDataPoints(self.KEY)))
+
+    def testGivenLoadedLoggerWithMappedData_whenSaveToSameFile_shouldCopyItsDataToMemory(self):
+        self.logger.save(self.filepath)
+        logger = Logger(self.filepath)
+        self.assertIsInstance(logger.getRawDataPoints(self.KEY), np.memmap)
+
+        logger.save()
+
+        data = logger.getRawDataPoints(self.KEY)
+        self.assertNotIsInstance(data, np.memmap)
+        self.assertTrue(np.array_equal(self.dataPoints, data))
+        self.assertTrue(np.array_equal(self.logger.getPoints(self.OTHER_KEY), logger.getPoints(self.OTHER_KEY)))
+
+    def testGivenLoggerPickledByPreviousVersions_whenLoad_shouldLoadLogger(self):
+        with open(self.filepath, "wb") as file:
+            pickle.dump((self.logger._data, self.logger.info, self.logger._labels), file)
+
+        logger = Logger(self.filepath)
+
+        self.assertTrue(np.array_equal(self.dataPoints, logger.getRawDataPoints(self.KEY)))
+        self.assertEqual(self.logger.info, logger.info)
+
+    def testGivenLoadedLogger_whenPickled_shouldPickleItsData(self):
+        self.logger.save(self.filepath)
+        logger = Logger(self.filepath)
+
+        container = pickle.loads(pickle.dumps(logger._data[self.KEY].dataPoints))
+
+        self.assertTrue(np.array_equal(self.dataPoints, container.getData()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from pytissueoptics.scene.logger.listArrayContainer import ListArrayContainer
+from pytissueoptics.scene.logger.memoryMappedContainer import MemoryMappedContainer
+
+
+class TestMemoryMappedContainer(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.container = MemoryMappedContainer(self.tempDir.name)
+
+    def tearDown(self):
+        del self.container
+        self.tempDir.cleanup()
+
+    def testShouldInitializeDataToNone(self):
+        self.assertEqual(0, len(self.container))
+        self.assertIsNone(self.container.getData())
+
+    def testWhenAppendingManyArrays_shouldStoreDataInFile(self):
+        arrays = [np.full((i * 100, 4), i, dtype=np.float32) for i in range(1, 30)]
+        for array in arrays:
+            self.container.append(array)
+
+        data = self.container.getData()
+        self.assertIsInstance(data, np.memmap)
+        self.assertEqual(np.float32, data.dtype)
+        self.assertTrue(np.array_equal(np.concatenate(arrays), data))
+        self.assertGreaterEqual(os.path.getsize(self.container.filepath), data.nbytes)
+
+    def testWhenAppendingList_shouldHaveArrayData(self):
+        self.container.append([1, 2, 3])
+        self.container.append([4, 5, 6])
+
+        self.assertTrue(np.array_equal([[1, 2, 3], [4, 5, 6]], self.container.getData()))
+
+    def testWhenAppendingArrayWithMoreColumns_shouldRaiseException(self):
+        self.container.append(np.array([[1, 2, 3]]))
+
+        with self.assertRaises(AssertionError):
+            self.container.append(np.array([[4, 5, 6, 7]]))
+
+    def testWhenIteratingData_shouldYieldAllRowsInChunks(self):
+        self.container.append(np.arange(30).reshape(10, 3))
+
+        chunks = list(self.container.iterData(chunkSize=4))
+
+        self.assertEqual([4, 4, 2], [len(chunk) for chunk in chunks])
+        self.assertTrue(np.array_equal(self.container.getData(), np.concatenate(chunks)))
+
+    def testWhenExtendingWithListArrayContainer_shouldAppendItsData(self):
+        other = ListArrayContainer()
+        other.append([1, 2, 3])
+        other.append(np.array([[4, 5, 6]]))
+
+        self.container.extend(other)
+
+        self.assertTrue(np.array_equal([[1, 2, 3], [4, 5, 6]], self.container.getData()))
+
+    def testWhenPickling_shouldRestoreDataInMemory(self):
+        self.container.append(np.array([[1, 2, 3]]))
+
+        container = pickle.loads(pickle.dumps(self.container))
+
+        self.assertIsInstance(container, ListArrayContainer)
+        self.assertTrue(np.array_equal([[1, 2, 3]], container.getData()))
+
+    def testWhenGarbageCollected_shouldRemoveFile(self):
+        filepath = self.container.filepath
+        self.assertTrue(os.path.exists(filepath))
+
+        self.container = None
+
+        self.assertFalse(os.path.exists(filepath))
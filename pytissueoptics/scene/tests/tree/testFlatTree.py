@@ -0,0 +1,45 @@
+import unittest
+
+from pytissueoptics.scene.geometry import BoundingBox, Polygon, Vertex
+from pytissueoptics.scene.tree import FlatTree, Node
+
+
+class TestFlatTree(unittest.TestCase):
+    def setUp(self):
+        self.polygons = [Polygon([Vertex(0, 0, i), Vertex(1, 0, i), Vertex(0, 1, i)]) for i in range(3)]
+        self.root = Node(polygons=self.polygons, bbox=BoundingBox([0, 1], [0, 1], [0, 2]))
+        left = Node(self.root, self.polygons[:2], BoundingBox([0, 1], [0, 1], [0, 1]), depth=1)
+        right = Node(self.root, self.polygons[1:], BoundingBox([0, 1], [0, 1], [1, 2]), depth=1)
+        self.root.children.extend([left, right])
+
+    def testShouldHaveNodesInBreadthFirstOrder(self):
+        tree = FlatTree(self.root, self.polygons)
+
+        self.assertEqual(3, tree.nodeCount)
+        self.assertEqual([0, 0, 0], tree.bboxMin[0].tolist())
+        self.assertEqual([1, 1, 2], tree.bboxMax[0].tolist())
+        self.assertEqual([0, 0, 1], tree.bboxMin[2].tolist())
+
+    def testShouldHaveChildRangeOfInnerNodes(self):
+        tree = FlatTree(self.root, self.polygons)
+
+        self.assertEqual([1, 0, 0], tree.firstChildIDs.tolist())
+        self.assertEqual([2, 0, 0], tree.childCounts.tolist())
+
+    def testShouldHavePolygonRangeOfLeaves(self):
+        tree = FlatTree(self.root, self.polygons)
+
+        self.assertEqual([0, 2, 2], tree.polygonCounts.tolist())
+        self.assertEqual([0, 0, 2], tree.firstPolygonIDs.tolist())
+        self.assertEqual([0, 1, 1, 2], tree.leafPolygonIDs.tolist())
+        self.assertEqual(self.polygons[:2], tree.getLeafPolygons(1))
+        self.assertEqual(self.polygons[1:], tree.getLeafPolygons(2))
+
+    def testGivenLeafPolygonNotInPolygons_shouldAppendItToPolygons(self):
+        newPolygon = Polygon([Vertex(0, 0, 5), Vertex(1, 0, 5), Vertex(0, 1, 5)])
+        self.root.children[1].polygons.append(newPolygon)
+
+        tree = FlatTree(self.root, self.polygons)
+
+        self.assertEqual(4, len(tree.polygons))
+        self.assertIs(newPolygon, tree.getLeafPolygons(2)[-1])
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pytissueoptics.scene.geometry import Vector
+from pytissueoptics.scene.scene import Scene
+from pytissueoptics.scene.solids import Cube, Sphere
+from pytissueoptics.scene.tree import TreeCache
+from pytissueoptics.scene.tree.treeConstructor.binary import NoSplitThreeAxesConstructor, SplitThreeAxesConstructor
+
+
+def makeScene() -> Scene:
+    return Scene([Cube(2, label="cube"), Sphere(order=2, label="sphere", position=Vector(0, 0, 4))])
+
+
+class TestTreeCache(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.constructor = NoSplitThreeAxesConstructor()
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def testWhenGetTreeOfSameSceneTwice_shouldReturnCachedTree(self):
+        cache = TreeCache()
+        scene = makeScene()
+
+        tree1 = cache.getTree(scene, self.constructor, 6, 2)
+        tree2 = cache.getTree(scene, self.constructor, 6, 2)
+
+        self.assertIs(tree1, tree2)
+        self.assertEqual(1, len(cache))
+
+    def testWhenGetTreeOfAnotherInstanceOfSameGeometry_shouldReuseNodesWithTheNewPolygons(self):
+        cache = TreeCache()
+        tree1 = cache.getTree(makeScene(), self.constructor, 6, 2)
+        scene2 = makeScene()
+
+        tree2 = cache.getTree(scene2, self.constructor, 6, 2)
+
+        self.assertIs(tree1.leafPolygonIDs, tree2.leafPolygonIDs)
+        self.assertTrue(all(a is b for a, b in zip(tree2.polygons, scene2.getPolygons())))
+
+    def testWhenGetTreeWithOtherParameters_shouldBuildAnotherTree(self):
+        cache = TreeCache()
+        scene = makeScene()
+
+        tree1 = cache.getTree(scene, self.constructor, 6, 2)
+        tree2 = cache.getTree(scene, NoSplitThreeAxesConstructor(nbOfSplitPlanes=10), 6, 2)
+        tree3 = cache.getTree(scene, self.constructor, 4, 2)
+
+        self.assertIsNot(tree1, tree2)
+        self.assertIsNot(tree1, tree3)
+        self.assertEqual(3, len(cache))
+
+    def testGivenMovedSolid_whenGetTree_shouldBuildAnotherTree(self):
+        cache = TreeCache()
+        scene = makeScene()
+        tree1 = cache.getTree(scene, self.constructor, 6, 2)
+
+        scene.getSolid("cube").translateBy(Vector(1, 0, 0))
+        tree2 = cache.getTree(scene, self.constructor, 6, 2)
+
+        self.assertIsNot(tree1, tree2)
+
+    def testGivenSameGeometryWithPolygonsInAnotherOrder_whenGetTree_shouldBuildAnotherTree(self):
+        cache = TreeCache(cacheDir=self.tempDir.name)
+        tree1 = cache.getTree(makeScene(), self.constructor, 6, 2)
+        scene2 = makeScene()
+        sphere = scene2.getSolid("sphere")
+        for surfaceLabel in sphere.surfaceLabels:
+            sphere.surfaces.getPolygons(surfaceLabel).reverse()
+
+        tree2 = cache.getTree(scene2, self.constructor, 6, 2)
+
+        self.assertIsNot(tree1.leafPolygonIDs, tree2.leafPolygonIDs)
+        self.assertEqual(2, len(cache))
+        self.assertEqual(2, len(os.listdir(self.tempDir.name)))
+
+    def testGivenCacheDir_whenGetTreeInNewSession_shouldLoadSameTreeFromDisk(self):
+        tree1 = TreeCache(cacheDir=self.tempDir.name).getTree(makeScene(), self.constructor, 6, 2)
+        scene2 = makeScene()
+
+        tree2 = TreeCache(cacheDir=self.tempDir.name).getTree(scene2, self.constructor, 6, 2)
+
+        self.assertEqual(1, len(os.listdir(self.tempDir.name)))
+        for name, array in tree1.getArrays().items():
+            np.testing.assert_array_equal(array, tree2.getArrays()[name])
+        self.assertTrue(all(a is b for a, b in zip(tree2.polygons, scene2.getPolygons())))
+
+    def testGivenTreeWithSplitPolygons_shouldNotSaveItToDisk(self):
+        cache = TreeCache(cacheDir=self.tempDir.name)
+
+        tree = cache.getTree(makeScene(), SplitThreeAxesConstructor(), 6, 2)
+
+        self.assertGreater(len(tree.polygons), len(makeScene().getPolygons()))
+        self.assertEqual(0, len(os.listdir(self.tempDir.name)))
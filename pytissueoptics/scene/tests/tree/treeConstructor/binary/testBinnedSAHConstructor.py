@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from pytissueoptics.scene.geometry import Triangle, Vertex
+from pytissueoptics.scene.tests.scene.benchmarkScenes import PhantomScene
+from pytissueoptics.scene.tree import Node, SpacePartition
+from pytissueoptics.scene.tree.treeConstructor.binary import BinnedSAHConstructor, NoSplitOneAxisConstructor
+
+
+class TestBinnedSAHConstructor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.constructor = BinnedSAHConstructor()
+
+    def testGivenPolygons_whenCountingPolygonsPerSide_shouldMatchPolygonClassification(self):
+        polygons = [
+            Triangle(Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(1, 1, 0)),
+            Triangle(Vertex(-5, -5, 0), Vertex(-5, 5, 0), Vertex(5, 5, 0)),
+            Triangle(Vertex(3, -3, 2), Vertex(1, -1, 1), Vertex(1, -1, 1)),
+            Triangle(Vertex(0, 1, 0), Vertex(1, 1, 0), Vertex(1, 1, 1)),
+            Triangle(Vertex(0, 2, 0), Vertex(1, 1, 0), Vertex(1, 1, 0)),
+        ]
+        planes = np.array([-3.0, -0.5, 0, 1, 2.5])
+        polygonMin, polygonMax = self.constructor._getPolygonBounds(polygons)
+
+        nLeft, nRight, nBoth = self.constructor._countPolygonsPerSide(polygonMin[:, 1], polygonMax[:, 1], planes)
+
+        classifier = NoSplitOneAxisConstructor()
+        classifier.currentNode = Node(polygons=polygons)
+        for i, plane in enumerate(planes):
+            left, right, both = classifier._classifyNodePolygons("y", plane)
+            self.assertEqual([len(left), len(right), len(both)], [nLeft[i], nRight[i], nBoth[i]])
+
+    def testGivenScene_whenConstructingTree_shouldHaveEveryPolygonInALeaf(self):
+        scene = PhantomScene()
+        polygons = scene.getPolygons()
+
+        partition = SpacePartition(scene.getBoundingBox(), polygons, self.constructor, maxDepth=6, minLeafSize=2)
+
+        leafPolygonIDs = set()
+        for leaf in partition.getLeafNodes():
+            leafPolygonIDs.update(id(polygon) for polygon in leaf.polygons)
+        self.assertEqual({id(polygon) for polygon in polygons}, leafPolygonIDs)
+        self.assertGreater(partition.getLeafCount(), 1)
+        self.assertLessEqual(partition.getMaxDepth(), 6)
+
+    def testGivenManyWorkers_whenConstructingTree_shouldBuildSameTreeAsSingleWorker(self):
+        scene = PhantomScene()
+        partitions = [
+            SpacePartition(scene.getBoundingBox(), scene.getPolygons(), BinnedSAHConstructor(workers=workers), 6, 2)
+            for workers in [1, 2]
+        ]
+
+        leaves, parallelLeaves = [partition.getLeafNodes() for partition in partitions]
+        self.assertEqual(len(leaves), len(parallelLeaves))
+        for leaf, parallelLeaf in zip(leaves, parallelLeaves):
+            self.assertEqual(leaf.depth, parallelLeaf.depth)
+            self.assertEqual(leaf.bbox, parallelLeaf.bbox)
+            self.assertListEqual(leaf.polygons, parallelLeaf.polygons)
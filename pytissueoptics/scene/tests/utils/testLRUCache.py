@@ -0,0 +1,31 @@
+import unittest
+
+from pytissueoptics.scene.utils import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def testGivenMissingKey_whenGet_shouldReturnNone(self):
+        self.assertIsNone(LRUCache().get("key"))
+
+    def testWhenSetMoreThanMaxSize_shouldEvictLeastRecentlyUsedEntry(self):
+        cache = LRUCache(maxSize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        self.assertEqual(2, len(cache))
+        self.assertNotIn("b", cache)
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+
+    def testWhenReduceMaxSize_shouldEvictOldestEntries(self):
+        cache = LRUCache(maxSize=3)
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.set(key, i)
+
+        cache.maxSize = 1
+
+        self.assertEqual(1, len(cache))
+        self.assertIn("c", cache)
@@ -1,5 +1,7 @@
+from .flatTree import FlatTree
 from .node import Node
 from .spacePartition import SpacePartition
+from .treeCache import TREE_CACHE, TreeCache
 from .treeConstructor.treeConstructor import TreeConstructor
 
-__all__ = ["Node", "SpacePartition", "TreeConstructor"]
+__all__ = ["FlatTree", "Node", "SpacePartition", "TREE_CACHE", "TreeCache", "TreeConstructor"]
@@ -0,0 +1,130 @@
+from typing import Dict, List
+
+import numpy as np
+
+from pytissueoptics.scene.geometry import Polygon
+
+from .node import Node
+
+
+class FlatTree:
+    """
+    Compact representation of a tree of nodes stored in contiguous NumPy arrays. Nodes are numbered in breadth-first
+    order (the root is node 0), so the children of a node are contiguous.
+
+    - bboxMin, bboxMax: (nNodes, 3) corners of the bounding box of each node (NaN without a bounding box).
+    - firstChildIDs, childCounts: (nNodes,) range of the children of each node. Leaves have no children.
+    - firstPolygonIDs, polygonCounts: (nNodes,) range of the polygons of each leaf in `leafPolygonIDs`.
+    - leafPolygonIDs: (nLeafPolygons,) index of each leaf polygon in `polygons`. A polygon can be in many leaves.
+
+    Polygons created by the tree constructor (e.g. when splitting polygons) are appended after the given polygons.
+    """
+
+    ARRAY_NAMES = (
+        "bboxMin",
+        "bboxMax",
+        "firstChildIDs",
+        "childCounts",
+        "firstPolygonIDs",
+        "polygonCounts",
+        "leafPolygonIDs",
+    )
+
+    def __init__(self, root: Node, polygons: List[Polygon]):
+        self._polygons = list(polygons)
+        polygonToID = {id(polygon): i for i, polygon in enumerate(self._polygons)}
+
+        nodes = [root]
+        i = 0
+        while i < len(nodes):
+            nodes.extend(nodes[i].children)
+            i += 1
+
+        nNodes = len(nodes)
+        self._bboxMin = np.empty((nNodes, 3), dtype=np.float64)
+        self._bboxMax = np.empty((nNodes, 3), dtype=np.float64)
+        self._firstChildIDs = np.zeros(nNodes, dtype=np.int64)
+        self._childCounts = np.zeros(nNodes, dtype=np.int64)
+        self._firstPolygonIDs = np.zeros(nNodes, dtype=np.int64)
+        self._polygonCounts = np.zeros(nNodes, dtype=np.int64)
+
+        leafPolygonIDs = []
+        nextChildID = 1
+        for nodeID, node in enumerate(nodes):
+            bbox = node.bbox
+            if bbox is None:
+                self._bboxMin[nodeID] = self._bboxMax[nodeID] = np.nan
+            else:
+                self._bboxMin[nodeID] = [bbox.xMin, bbox.yMin, bbox.zMin]
+                self._bboxMax[nodeID] = [bbox.xMax, bbox.yMax, bbox.zMax]
+            if node.isLeaf:
+                self._firstPolygonIDs[nodeID] = len(leafPolygonIDs)
+                self._polygonCounts[nodeID] = len(node.polygons)
+                for polygon in node.polygons:
+                    if id(polygon) not in polygonToID:
+                        polygonToID[id(polygon)] = len(self._polygons)
+                        self._polygons.append(polygon)
+                    leafPolygonIDs.append(polygonToID[id(polygon)])
+            else:
+                self._firstChildIDs[nodeID] = nextChildID
+                self._childCounts[nodeID] = len(node.children)
+                nextChildID += len(node.children)
+
+        self._leafPolygonIDs = np.asarray(leafPolygonIDs, dtype=np.int64)
+
+    @classmethod
+    def fromArrays(cls, arrays: Dict[str, np.ndarray], polygons: List[Polygon]) -> "FlatTree":
+        """Returns the tree described by the node arrays of `getArrays()` with its leaf polygon IDs referring to the
+        given polygons (e.g. the same polygons of another scene instance)."""
+        leafPolygonIDs = arrays["leafPolygonIDs"]
+        if len(leafPolygonIDs) > 0 and leafPolygonIDs.max() >= len(polygons):
+            raise ValueError("The tree refers to more polygons than the ones given.")
+        tree = cls.__new__(cls)
+        tree._polygons = list(polygons)
+        for name in cls.ARRAY_NAMES:
+            setattr(tree, f"_{name}", np.asarray(arrays[name]))
+        return tree
+
+    def getArrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, f"_{name}") for name in self.ARRAY_NAMES}
+
+    def getLeafPolygons(self, nodeID: int) -> List[Polygon]:
+        firstID = self._firstPolygonIDs[nodeID]
+        polygonIDs = self._leafPolygonIDs[firstID : firstID + self._polygonCounts[nodeID]]
+        return [self._polygons[i] for i in polygonIDs]
+
+    @property
+    def nodeCount(self) -> int:
+        return len(self._childCounts)
+
+    @property
+    def polygons(self) -> List[Polygon]:
+        return self._polygons
+
+    @property
+    def bboxMin(self) -> np.ndarray:
+        return self._bboxMin
+
+    @property
+    def bboxMax(self) -> np.ndarray:
+        return self._bboxMax
+
+    @property
+    def firstChildIDs(self) -> np.ndarray:
+        return self._firstChildIDs
+
+    @property
+    def childCounts(self) -> np.ndarray:
+        return self._childCounts
+
+    @property
+    def firstPolygonIDs(self) -> np.ndarray:
+        return self._firstPolygonIDs
+
+    @property
+    def polygonCounts(self) -> np.ndarray:
+        return self._polygonCounts
+
+    @property
+    def leafPolygonIDs(self) -> np.ndarray:
+        return self._leafPolygonIDs
@@ -2,6 +2,7 @@ from typing import List, Optional
 
 from pytissueoptics.scene.geometry import BoundingBox, Polygon, Vector
 
+from .flatTree import FlatTree
 from .node import Node
 from .treeConstructor import TreeConstructor
 
@@ -33,11 +34,18 @@ class SpacePartition:
         self._constructor = constructor
         self._root = Node(polygons=self._polygons, bbox=self._bbox)
         self._constructor.constructTree(self._root, maxDepth=maxDepth, minLeafSize=minLeafSize)
+        self._flatTree = None
 
     @property
     def root(self) -> Node:
         return self._root
 
+    def flatten(self) -> FlatTree:
+        """Returns the tree as contiguous arrays of node bounds, child ranges and leaf polygon ranges."""
+        if self._flatTree is None:
+            self._flatTree = FlatTree(self._root, self._polygons)
+        return self._flatTree
+
     def searchPoint(self, point: Vector, node: Node = None) -> Optional[Node]:
         if node is None:
             node = self._root
@@ -0,0 +1,124 @@
+import hashlib
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from pytissueoptics.scene.geometry import Polygon
+from pytissueoptics.scene.scene import Scene
+from pytissueoptics.scene.utils import LRUCache
+
+from .flatTree import FlatTree
+from .spacePartition import SpacePartition
+from .treeConstructor import TreeConstructor
+
+
+class TreeCache:
+    """
+    Cache of the flattened space partitions of scenes, so that propagating many times in the same geometry (e.g. a
+    parameter sweep) only builds its tree once. The last `maxSize` trees are kept in memory. When a `cacheDir` is
+    set, trees are also saved to disk so that later sessions skip their construction.
+
+    Trees are identified by the hash of the scene (solid vertices and materials), the hash and polygon count of each
+    solid (in order), a digest of the polygon vertices (in order) and the constructor parameters. A cached tree is
+    bound to the polygons of the given scene, which can be another instance of the same geometry, since the leaves
+    refer to polygons by their index. Trees which contain polygons created by the constructor (e.g. when
+    splitting polygons) can only be reused with the original scene instance and are never saved to disk.
+    """
+
+    def __init__(self, maxSize: int = 4, cacheDir: Optional[str] = None):
+        self._trees = LRUCache(maxSize)
+        self.cacheDir = cacheDir
+
+    def getTree(self, scene: Scene, constructor: TreeConstructor, maxDepth: int, minLeafSize: int) -> FlatTree:
+        polygons = scene.getPolygons()
+        key = self.getKey(scene, constructor, maxDepth, minLeafSize)
+
+        tree = self._trees.get(key)
+        if tree is not None:
+            tree = self._bindTree(tree, polygons)
+        if tree is None:
+            tree = self._loadTree(key, polygons)
+        if tree is None:
+            partition = SpacePartition(scene.getBoundingBox(), polygons, constructor, maxDepth, minLeafSize)
+            tree = partition.flatten()
+            self._saveTree(key, tree, polygons)
+        self._trees.set(key, tree)
+        return tree
+
+    @staticmethod
+    def getKey(scene: Scene, constructor: TreeConstructor, maxDepth: int, minLeafSize: int) -> str:
+        solidKeys = tuple((hash(solid), len(solid.getPolygons())) for solid in scene.getSolids())
+        polygonsDigest = TreeCache._getPolygonsDigest(scene.getPolygons())
+        key = repr((hash(scene), solidKeys, polygonsDigest, constructor.parameters, maxDepth, minLeafSize))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _getPolygonsDigest(polygons: List[Polygon]) -> str:
+        """Digest of the vertex coordinates of each polygon, in order. Solid hashes ignore the order and triangulation
+        of their faces, which would bind the leaves of a cached tree to the wrong polygons."""
+        vertexCounts = np.array([len(polygon.vertices) for polygon in polygons], dtype=np.int64)
+        coordinates = np.array(
+            [(vertex.x, vertex.y, vertex.z) for polygon in polygons for vertex in polygon.vertices], dtype=np.float64
+        )
+        digest = hashlib.sha256(vertexCounts.tobytes())
+        digest.update(coordinates.tobytes())
+        return digest.hexdigest()
+
+    @property
+    def maxSize(self) -> int:
+        return self._trees.maxSize
+
+    @maxSize.setter
+    def maxSize(self, value: int):
+        self._trees.maxSize = value
+
+    def clear(self):
+        """Removes all trees from memory and from disk."""
+        self._trees.clear()
+        if self.cacheDir is None or not os.path.exists(self.cacheDir):
+            return
+        for fileName in os.listdir(self.cacheDir):
+            if fileName.endswith(".npz"):
+                os.remove(os.path.join(self.cacheDir, fileName))
+
+    def __len__(self):
+        return len(self._trees)
+
+    @staticmethod
+    def _bindTree(tree: FlatTree, polygons: List[Polygon]) -> Optional[FlatTree]:
+        if len(tree.polygons) >= len(polygons) and all(a is b for a, b in zip(tree.polygons, polygons)):
+            return tree
+        if len(tree.polygons) != len(polygons):
+            return None
+        return FlatTree.fromArrays(tree.getArrays(), polygons)
+
+    def _getTreePath(self, key: str) -> str:
+        return os.path.join(self.cacheDir, f"{key}.npz")
+
+    def _loadTree(self, key: str, polygons: List[Polygon]) -> Optional[FlatTree]:
+        if self.cacheDir is None or not os.path.exists(self._getTreePath(key)):
+            return None
+        try:
+            with np.load(self._getTreePath(key)) as arrays:
+                return FlatTree.fromArrays({name: arrays[name] for name in FlatTree.ARRAY_NAMES}, polygons)
+        except (OSError, KeyError, ValueError):
+            # Invalid or outdated file. The tree will be rebuilt and overwritten.
+            return None
+
+    def _saveTree(self, key: str, tree: FlatTree, polygons: List[Polygon]):
+        if self.cacheDir is None or len(tree.polygons) != len(polygons):
+            return
+        treePath = self._getTreePath(key)
+        tempPath = f"{treePath}.{os.getpid()}.tmp.npz"
+        try:
+            os.makedirs(self.cacheDir, exist_ok=True)
+            np.savez(tempPath, **tree.getArrays())
+            os.replace(tempPath, treePath)
+        except OSError:
+            # The disk cache is optional (e.g. read-only directory).
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+
+
+TREE_CACHE = TreeCache()
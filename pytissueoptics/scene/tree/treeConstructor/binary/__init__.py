@@ -1,6 +1,13 @@
+from .binnedSAHConstructor import BinnedSAHConstructor
 from .noSplitOneAxisConstructor import NoSplitOneAxisConstructor
 from .noSplitThreeAxesConstructor import NoSplitThreeAxesConstructor
 from .sahSearchResult import SAHSearchResult
 from .splitTreeAxesConstructor import SplitThreeAxesConstructor
 
-__all__ = ["NoSplitOneAxisConstructor", "NoSplitThreeAxesConstructor", "SplitThreeAxesConstructor", "SAHSearchResult"]
+__all__ = [
+    "BinnedSAHConstructor",
+    "NoSplitOneAxisConstructor",
+    "NoSplitThreeAxesConstructor",
+    "SplitThreeAxesConstructor",
+    "SAHSearchResult",
+]
@@ -0,0 +1,273 @@
+import math
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from pytissueoptics.scene.geometry import BoundingBox, Polygon
+from pytissueoptics.scene.tree import Node
+from pytissueoptics.scene.tree.treeConstructor import SplitNodeResult, TreeConstructor
+
+# A subtree of polygon indices: (bboxMin, bboxMax, polygonIDs, children).
+SplitTree = Tuple[np.ndarray, np.ndarray, np.ndarray, List[Union["SplitTree", Future]]]
+
+
+class BinnedSAHConstructor(TreeConstructor):
+    def __init__(
+        self,
+        nbOfBins: int = 32,
+        intersectionCost: float = 0.5,
+        traversalCost: float = 1,
+        noSharedBonus: float = 2,
+        emptySpaceBonus: float = 2,
+        workers: int = 1,
+    ):
+        """
+        Same surface area heuristic (SAH) as NoSplitThreeAxesConstructor, but evaluated on the polygon bounds stored
+        in NumPy arrays. The number of polygons on each side of the `nbOfBins - 1` split planes of every axis is
+        counted at once with cumulative sums of binned polygon bounds, instead of classifying every polygon for each
+        plane. Polygons are never split.
+
+        :param workers: Number of processes used to build sibling subtrees in parallel. The first levels of the tree
+            are built in the calling process until there are enough subtrees to keep the workers busy.
+        """
+        super().__init__()
+        self._nbOfBins = nbOfBins
+        self._intersectionCost = intersectionCost
+        self._traversalCost = traversalCost
+        self._noSharedBonus = noSharedBonus
+        self._emptySpaceBonus = emptySpaceBonus
+        self._workers = workers
+
+    def constructTree(self, node: Node, maxDepth: int, minLeafSize: int):
+        if not node.polygons:
+            return
+        polygonMin, polygonMax = self._getPolygonBounds(node.polygons)
+        bboxMin, bboxMax = self._getBBoxLimits(node.bbox)
+        polygonIDs = np.arange(len(node.polygons))
+
+        if self._workers > 1:
+            parallelDepth = node.depth + math.ceil(math.log2(self._workers)) + 1
+            with ProcessPoolExecutor(max_workers=self._workers) as executor:
+                splitTree = self._buildSplitTree(
+                    polygonMin,
+                    polygonMax,
+                    polygonIDs,
+                    bboxMin,
+                    bboxMax,
+                    node.depth,
+                    maxDepth,
+                    minLeafSize,
+                    executor,
+                    parallelDepth,
+                )
+                splitTree = self._resolveSplitTree(splitTree)
+        else:
+            splitTree = self._buildSplitTree(
+                polygonMin, polygonMax, polygonIDs, bboxMin, bboxMax, node.depth, maxDepth, minLeafSize
+            )
+
+        self._attachChildren(node, splitTree)
+
+    def _splitNode(self, node: Node) -> SplitNodeResult:
+        polygonMin, polygonMax = self._getPolygonBounds(node.polygons)
+        bboxMin, bboxMax = self._getBBoxLimits(node.bbox)
+        split = self._findSplit(polygonMin, polygonMax, bboxMin, bboxMax)
+        if split is None:
+            return SplitNodeResult(True, [], [])
+        groupsBbox = [self._makeBBox(childMin, childMax) for _, childMin, childMax in split]
+        polygonGroups = [[node.polygons[i] for i in childIDs] for childIDs, _, _ in split]
+        return SplitNodeResult(False, groupsBbox, polygonGroups)
+
+    def _buildSplitTree(
+        self,
+        polygonMin: np.ndarray,
+        polygonMax: np.ndarray,
+        polygonIDs: np.ndarray,
+        bboxMin: np.ndarray,
+        bboxMax: np.ndarray,
+        depth: int,
+        maxDepth: int,
+        minLeafSize: int,
+        executor: ProcessPoolExecutor = None,
+        parallelDepth: int = 0,
+    ) -> SplitTree:
+        """Builds the subtree of the given polygon IDs (indices of the bound arrays). Once `parallelDepth` is reached,
+        children are built in the executor with local copies of their polygon bounds."""
+        children = []
+        splitTree = (bboxMin, bboxMax, polygonIDs, children)
+        if depth >= maxDepth or len(polygonIDs) <= minLeafSize:
+            return splitTree
+
+        split = self._findSplit(polygonMin[polygonIDs], polygonMax[polygonIDs], bboxMin, bboxMax)
+        if split is None:
+            return splitTree
+
+        for localIDs, childMin, childMax in split:
+            childIDs = polygonIDs[localIDs]
+            if executor is not None and depth + 1 >= parallelDepth:
+                future = executor.submit(
+                    self._buildSplitTree,
+                    polygonMin[childIDs],
+                    polygonMax[childIDs],
+                    np.arange(len(childIDs)),
+                    childMin,
+                    childMax,
+                    depth + 1,
+                    maxDepth,
+                    minLeafSize,
+                )
+                children.append((future, childIDs))
+            else:
+                children.append(
+                    self._buildSplitTree(
+                        polygonMin,
+                        polygonMax,
+                        childIDs,
+                        childMin,
+                        childMax,
+                        depth + 1,
+                        maxDepth,
+                        minLeafSize,
+                        executor,
+                        parallelDepth,
+                    )
+                )
+        return splitTree
+
+    def _resolveSplitTree(self, splitTree) -> SplitTree:
+        """Waits for the subtrees built in parallel and maps their local polygon IDs back to the node's IDs."""
+        bboxMin, bboxMax, polygonIDs, children = splitTree
+        resolvedChildren = []
+        for child in children:
+            if isinstance(child[0], Future):
+                future, childIDs = child
+                resolvedChildren.append(self._mapPolygonIDs(future.result(), childIDs))
+            else:
+                resolvedChildren.append(self._resolveSplitTree(child))
+        return bboxMin, bboxMax, polygonIDs, resolvedChildren
+
+    def _mapPolygonIDs(self, splitTree: SplitTree, polygonIDs: np.ndarray) -> SplitTree:
+        bboxMin, bboxMax, localIDs, children = splitTree
+        return bboxMin, bboxMax, polygonIDs[localIDs], [self._mapPolygonIDs(child, polygonIDs) for child in children]
+
+    def _attachChildren(self, node: Node, splitTree: SplitTree, polygons: List[Polygon] = None):
+        polygons = node.polygons if polygons is None else polygons
+        for childSplitTree in splitTree[3]:
+            childBBoxMin, childBBoxMax, childIDs, _ = childSplitTree
+            childNode = Node(
+                parent=node,
+                polygons=[polygons[i] for i in childIDs],
+                bbox=self._makeBBox(childBBoxMin, childBBoxMax),
+                depth=node.depth + 1,
+            )
+            node.children.append(childNode)
+            self._attachChildren(childNode, childSplitTree, polygons)
+
+    def _findSplit(
+        self, polygonMin: np.ndarray, polygonMax: np.ndarray, bboxMin: np.ndarray, bboxMax: np.ndarray
+    ) -> Optional[List[Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        """Returns the (localIDs, bboxMin, bboxMax) of the non-empty left and right children of the split plane with
+        the lowest SAH, or None if splitting is not worth it."""
+        nPolygons = len(polygonMin)
+        bestSAH = math.inf
+        bestAxis, bestValue = None, None
+        for axis in range(3):
+            axisMin, axisMax = bboxMin[axis], bboxMax[axis]
+            width = axisMax - axisMin
+            if width <= 0:
+                continue
+            planes = axisMin + width * np.arange(1, self._nbOfBins) / self._nbOfBins
+            nLeft, nRight, nBoth = self._countPolygonsPerSide(polygonMin[:, axis], polygonMax[:, axis], planes)
+
+            otherWidths = np.delete(bboxMax - bboxMin, axis)
+            leftArea = self._getArea(planes - axisMin, *otherWidths)
+            rightArea = self._getArea(axisMax - planes, *otherWidths)
+            SAH = (nLeft + nBoth) * leftArea + (nRight + nBoth) * rightArea
+            SAH = np.where((nBoth == 0) & (nLeft != 0) & (nRight != 0), SAH / self._noSharedBonus, SAH)
+            SAH = np.where(((nLeft == 0) | (nRight == 0)) & (nBoth == 0), SAH / self._emptySpaceBonus, SAH)
+
+            i = int(np.argmin(SAH))
+            if SAH[i] < bestSAH:
+                bestSAH, bestAxis, bestValue = SAH[i], axis, planes[i]
+
+        if bestAxis is None:
+            return None
+
+        axisMin, axisMax = polygonMin[:, bestAxis], polygonMax[:, bestAxis]
+        isLeft = (axisMin < bestValue) & (axisMax <= bestValue)
+        isRight = (axisMin >= bestValue) & (axisMax > bestValue)
+        isBoth = ~isLeft & ~isRight
+
+        children = []
+        childrenSAH = 0
+        for isChild, limit in [(isLeft | isBoth, 1), (isRight | isBoth, 0)]:
+            childMin, childMax = bboxMin.copy(), bboxMax.copy()
+            (childMax if limit else childMin)[bestAxis] = bestValue
+            localIDs = np.nonzero(isChild)[0]
+            if len(localIDs) > 0:
+                # Trim the child bounding box to its polygons.
+                childMin = np.maximum(childMin, polygonMin[localIDs].min(axis=0))
+                childMax = np.minimum(childMax, polygonMax[localIDs].max(axis=0))
+                children.append((localIDs, childMin, childMax))
+            childrenSAH += len(localIDs) * self._getArea(*(childMax - childMin))
+
+        nodeArea = self._getArea(*(bboxMax - bboxMin))
+        if nodeArea <= 0:
+            return None
+        splitCost = self._traversalCost + self._intersectionCost * (childrenSAH / nodeArea)
+        if splitCost >= self._intersectionCost * nPolygons:
+            return None
+        return children
+
+    @staticmethod
+    def _countPolygonsPerSide(
+        axisMin: np.ndarray, axisMax: np.ndarray, planes: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Number of polygons on the left, right and both sides of each split plane with the classification of
+        NoSplitOneAxisConstructor. Each polygon bound is binned once (at the first plane where it is on a given side)
+        and the counts of every plane are obtained with cumulative sums.
+        """
+        nPlanes = len(planes)
+        # Polygons with max <= plane: from the first plane >= max.
+        maxBins = np.searchsorted(planes, axisMax, side="left")
+        nMaxBelow = np.cumsum(np.bincount(maxBins, minlength=nPlanes + 1))[:nPlanes]
+        # Polygons with min >= plane: up to the last plane <= min.
+        minBins = np.searchsorted(planes, axisMin, side="right")
+        nMinAbove = np.cumsum(np.bincount(minBins, minlength=nPlanes + 1)[::-1])[::-1][1:]
+        # Flat polygons lying on a plane are on both sides.
+        flatValues = axisMin[axisMin == axisMax]
+        flatBins = np.searchsorted(planes, flatValues, side="left")
+        isOnPlane = flatBins < nPlanes
+        isOnPlane[isOnPlane] = planes[flatBins[isOnPlane]] == flatValues[isOnPlane]
+        nFlat = np.bincount(flatBins[isOnPlane], minlength=nPlanes)
+
+        nLeft = nMaxBelow - nFlat
+        nRight = nMinAbove - nFlat
+        nBoth = len(axisMin) - nLeft - nRight
+        return nLeft, nRight, nBoth
+
+    @staticmethod
+    def _getArea(a, b, c):
+        return a * b * 2 + a * c * 2 + b * c * 2
+
+    @staticmethod
+    def _getPolygonBounds(polygons: List[Polygon]) -> Tuple[np.ndarray, np.ndarray]:
+        bounds = np.array(
+            [[p.bbox.xMin, p.bbox.yMin, p.bbox.zMin, p.bbox.xMax, p.bbox.yMax, p.bbox.zMax] for p in polygons],
+            dtype=np.float64,
+        ).reshape(-1, 6)
+        return bounds[:, :3], bounds[:, 3:]
+
+    @staticmethod
+    def _getBBoxLimits(bbox: BoundingBox) -> Tuple[np.ndarray, np.ndarray]:
+        return np.array([bbox.xMin, bbox.yMin, bbox.zMin]), np.array([bbox.xMax, bbox.yMax, bbox.zMax])
+
+    @staticmethod
+    def _makeBBox(bboxMin: np.ndarray, bboxMax: np.ndarray) -> BoundingBox:
+        return BoundingBox(
+            xLim=[float(bboxMin[0]), float(bboxMax[0])],
+            yLim=[float(bboxMin[1]), float(bboxMax[1])],
+            zLim=[float(bboxMin[2]), float(bboxMax[2])],
+        )
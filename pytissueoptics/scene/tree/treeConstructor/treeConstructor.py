@@ -5,6 +5,16 @@ from pytissueoptics.scene.tree.treeConstructor import SplitNodeResult
 class TreeConstructor:
     EPSILON = 1e-6
 
+    @property
+    def parameters(self) -> tuple:
+        """Name and scalar settings of the constructor, which identify the trees it builds (e.g. for caching)."""
+        settings = sorted(
+            (name, value)
+            for name, value in vars(self).items()
+            if name.startswith("_") and isinstance(value, (bool, int, float, str))
+        )
+        return (type(self).__name__, *settings)
+
     def _splitNode(self, node: Node) -> SplitNodeResult:
         raise NotImplementedError()
 
@@ -1,3 +1,4 @@
+from .lruCache import LRUCache
 from .progressBar import noProgressBar, progressBar
 
-__all__ = ["noProgressBar", "progressBar"]
+__all__ = ["LRUCache", "noProgressBar", "progressBar"]
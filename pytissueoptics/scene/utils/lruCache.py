@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """Bounded in-memory cache which evicts the least recently used entry once `maxSize` entries are stored."""
+
+    def __init__(self, maxSize: int = 4):
+        self._maxSize = maxSize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+
+    @property
+    def maxSize(self) -> int:
+        return self._maxSize
+
+    @maxSize.setter
+    def maxSize(self, value: int):
+        self._maxSize = value
+        self._evict()
+
+    def clear(self):
+        self._entries.clear()
+
+    def _evict(self):
+        while len(self._entries) > max(self._maxSize, 0):
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)